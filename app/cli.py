@@ -0,0 +1,267 @@
+"""Command Line Interface - Reports, exports, imports and maintenance without the GUI.
+
+Back-office jobs and cron entries run ``python -m app.cli <command>`` against
+the same database file as the desktop app. Nothing here imports Qt, and the
+module behind each command (NumPy for the night audit's price calendar,
+pyarrow for columnar extracts) is imported only when that command runs, so
+a report starts in milliseconds.
+
+    python -m app.cli report revenue --by month --from 2024-04-01
+    python -m app.cli report occupancy --from 2024-06-01 --to 2024-06-30 --csv
+    python -m app.cli export extract /srv/extracts --partition-by month
+    python -m app.cli export customers customers.csv.gz
+    python -m app.cli import Rooms rooms.csv --rejects rejects.csv
+    python -m app.cli night-audit --date 2024-06-30
+    python -m app.cli archive --months 12
+    python -m app.cli vacuum
+    python -m app.cli analyze
+    python -m app.cli stats
+    python -m app.cli backup /backups/hotel-2024-06-30.db
+"""
+
+import argparse
+import csv
+import datetime
+import logging
+import os
+import sys
+from typing import Any, List, Optional, Sequence
+
+from app.core.database import DatabaseManager, archive_path_for
+from app.services.archive_service import ARCHIVE_AFTER_MONTHS, ArchiveService
+from app.services.import_service import IMPORT_SPECS, ImportService
+from app.utils.money import format_money
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hotel_restaurant.db")
+
+# Days a report covers when --from is not given
+DEFAULT_REPORT_DAYS = {"day": 30, "month": 365}
+
+
+# Day numbers as in the generated ``day`` columns; analytics_service has the
+# same helpers but importing it loads NumPy
+def _day(value: datetime.date) -> int:
+    return (value - datetime.date(1970, 1, 1)).days
+
+
+def _date(day: int) -> str:
+    return (datetime.date(1970, 1, 1) + datetime.timedelta(days=day)).isoformat()
+
+
+def _print_table(headers: Sequence[str], rows: Sequence[Sequence[Any]], as_csv: bool) -> None:
+    """Print rows as aligned columns, or as CSV for other programs."""
+    if as_csv:
+        writer = csv.writer(sys.stdout)
+        writer.writerow(headers)
+        writer.writerows(rows)
+        return
+    cells = [[str(value) for value in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+    for row in [list(headers)] + cells:
+        print("  ".join(value.rjust(width) if i else value.ljust(width)
+                        for i, (value, width) in enumerate(zip(row, widths))))
+
+
+def report_revenue(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Takings per day or month from the Payments day/month indexes."""
+    from app.repositories.payments import PaymentRepo
+
+    last = args.to or datetime.date.today()
+    first = args.start or last - datetime.timedelta(days=DEFAULT_REPORT_DAYS[args.by] - 1)
+    payments = PaymentRepo(db)
+    if args.by == "day":
+        totals = payments.daily_totals(_day(first), _day(last))
+        label = _date
+    else:
+        totals = payments.monthly_totals(_day(first), _day(last))
+        label = lambda period: f"{period // 100}-{period % 100:02d}"
+    rows = [(label(t.period), format_money(t.orders_paise, symbol=False), format_money(t.rooms_paise, symbol=False),
+             format_money(t.tax_paise, symbol=False),
+             format_money(t.orders_paise + t.rooms_paise + t.tax_paise, symbol=False), t.payments)
+            for t in totals]
+    _print_table([args.by.capitalize(), "Orders", "Rooms", "Tax", "Total", "Payments"], rows, args.csv)
+    return 0
+
+
+def report_occupancy(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Rooms occupied per category from the night audit's snapshots."""
+    from app.repositories.night_audit import NightAuditRepo
+
+    last = args.to or datetime.date.today()
+    first = args.start or last - datetime.timedelta(days=DEFAULT_REPORT_DAYS["day"] - 1)
+    snapshots = NightAuditRepo(db).occupancy(_day(first), _day(last))
+    rows = [(_date(s.day), s.category, s.rooms,
+             s.occupied, f"{s.occupied / s.rooms:.0%}" if s.rooms else "-",
+             format_money(s.revenue_paise, symbol=False),
+             format_money(s.revenue_paise // s.occupied if s.occupied else 0, symbol=False))
+            for s in snapshots]
+    _print_table(["Day", "Category", "Rooms", "Occupied", "Occupancy", "Revenue", "ADR"], rows, args.csv)
+    if not snapshots:
+        print("No audited days in range; run night-audit to record occupancy.", file=sys.stderr)
+    return 0
+
+
+def export_extract(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Columnar extract of the analytics tables."""
+    from app.services.report_export_service import ReportExportService
+
+    manifest = ReportExportService(db).export_tables(
+        args.output_dir, args.tables, None if args.partition_by == "none" else args.partition_by)
+    for table, files in manifest["tables"].items():
+        print(f"{table}: {sum(f['rows'] for f in files)} rows in {len(files)} file(s)")
+    return 0
+
+
+def export_customers(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Customer list as CSV (gzip-compressed when the path ends in .gz)."""
+    from app.repositories.customers import CustomerRepo
+    from app.utils.export import export_query_to_csv
+
+    rows = export_query_to_csv(db.connect(), CustomerRepo.SQL["export"], output_path=args.output,
+                               headers=["ID", "Name", "Phone", "Email"])
+    print(f"Exported {rows} customers to {args.output}")
+    return 0
+
+
+def import_table(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Validated bulk import of a CSV file; exits with 1 when rows were rejected."""
+    result = ImportService(db).import_csv(args.table, args.path)
+    print(f"Imported {result.inserted} rows into {result.table}, rejected {len(result.rejected)}")
+    if result.rejected and args.rejects:
+        result.write_rejects(args.rejects)
+        print(f"Rejected rows written to {args.rejects}")
+    return 1 if result.rejected else 0
+
+
+def night_audit(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Close a business day."""
+    from app.services.night_audit import NightAudit
+
+    result = NightAudit(db).run(args.date)
+    print(f"Audited {_date(result.day)}: "
+          f"{result.charges_posted} room charges posted, {result.no_shows} no-shows")
+    return 0
+
+
+def archive(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Move closed orders and stays older than --months into the archive database."""
+    result = ArchiveService(db).archive(args.months)
+    print(f"Archived rows closed before {result.cutoff} to {db.archive_path}:")
+    for table, count in result.moved.items():
+        print(f"  {table}: {count}")
+    return 0
+
+
+def vacuum(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Rebuild the database file, returning free pages to the file system."""
+    before = os.path.getsize(db.path)
+    db.connect().execute("VACUUM")
+    print(f"Vacuumed {db.path}: {before} -> {os.path.getsize(db.path)} bytes")
+    return 0
+
+
+def analyze(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Refresh the statistics the query planner chooses indexes by."""
+    from app.services.maintenance_service import MaintenanceService
+
+    MaintenanceService(db).analyze()
+    print(f"Analyzed {db.path}")
+    return 0
+
+
+def stats(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """File size, free pages and fragmentation, as on the Diagnostics page."""
+    from app.services.maintenance_service import MaintenanceService
+
+    s = MaintenanceService(db).stats()
+    print(f"File size: {s.file_bytes} bytes ({s.page_count} pages of {s.page_size} bytes)")
+    print(f"Free pages: {s.freelist_count} ({s.free_ratio:.1%}), auto-vacuum: {s.auto_vacuum}")
+    print("Fragmentation: " + (f"{s.fragmentation:.1%}" if s.fragmentation is not None else "n/a"))
+    return 0
+
+
+def backup(db: DatabaseManager, args: argparse.Namespace) -> int:
+    """Consistent copy of the database, and its archive file, taken with the online backup API."""
+    from app.services.report_export_service import ReportExportService
+
+    print(f"Backed up to {ReportExportService(db).snapshot(args.dest)}")
+    if os.path.exists(db.archive_path):
+        print(f"Archived history backed up to {archive_path_for(args.dest)}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser with one subcommand per job."""
+    parser = argparse.ArgumentParser(prog="python -m app.cli",
+                                     description="Hotel reports, exports and maintenance without the GUI.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database file (default: the app's database)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="print a report").add_subparsers(dest="report", required=True)
+    revenue = report.add_parser("revenue", help="takings per day or month")
+    revenue.add_argument("--by", choices=("day", "month"), default="day")
+    occupancy = report.add_parser("occupancy", help="rooms occupied per category on audited days")
+    for sub, handler in ((revenue, report_revenue), (occupancy, report_occupancy)):
+        sub.add_argument("--from", dest="start", type=datetime.date.fromisoformat, help="first date (YYYY-MM-DD)")
+        sub.add_argument("--to", type=datetime.date.fromisoformat, help="last date (default: today)")
+        sub.add_argument("--csv", action="store_true", help="print CSV instead of a table")
+        sub.set_defaults(handler=handler)
+
+    export = commands.add_parser("export", help="export data").add_subparsers(dest="export", required=True)
+    extract = export.add_parser("extract", help="columnar extract for analysts")
+    extract.add_argument("output_dir")
+    extract.add_argument("--tables", nargs="+", help="tables to export (default: all)")
+    extract.add_argument("--partition-by", choices=("day", "month", "year", "none"), default="month")
+    extract.set_defaults(handler=export_extract)
+    customers = export.add_parser("customers", help="customer list as CSV")
+    customers.add_argument("output", help="CSV file; gzip-compressed when it ends in .gz")
+    customers.set_defaults(handler=export_customers)
+
+    imports = commands.add_parser("import", help="import a CSV file into a table")
+    imports.add_argument("table", choices=IMPORT_SPECS)
+    imports.add_argument("path")
+    imports.add_argument("--rejects", help="write rejected rows and reasons to this CSV file")
+    imports.set_defaults(handler=import_table)
+
+    audit = commands.add_parser("night-audit", help="close a business day")
+    audit.add_argument("--date", type=datetime.date.fromisoformat,
+                       help="business date to close (default: the current business day)")
+    audit.set_defaults(handler=night_audit)
+
+    archiving = commands.add_parser("archive", help="move closed orders and stays to the archive database")
+    archiving.add_argument("--months", type=int, default=ARCHIVE_AFTER_MONTHS,
+                           help=f"keep this many months of closed records in the live file "
+                                f"(default: {ARCHIVE_AFTER_MONTHS})")
+    archiving.set_defaults(handler=archive)
+
+    commands.add_parser("vacuum", help="rebuild and compact the database file").set_defaults(handler=vacuum)
+    commands.add_parser("analyze", help="refresh query planner statistics").set_defaults(handler=analyze)
+    commands.add_parser("stats", help="show file size, free pages and fragmentation").set_defaults(handler=stats)
+    copy = commands.add_parser("backup", help="copy the database and its archive while in use")
+    copy.add_argument("dest")
+    copy.set_defaults(handler=backup)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the exit status."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    if not os.path.exists(args.db):
+        parser.error(f"database {args.db} not found")
+    db = DatabaseManager(args.db)
+    db.initialize()
+    try:
+        return args.handler(db, args)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,28 @@
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from app.views.main_window import MainWindow
+from app.services.analytics_service import AnalyticsService
+from app.services.availability_service import AvailabilityIndex
+from app.services.tax_service import TaxService
+from app.services.kitchen_service import KitchenService
+from app.services.stock_service import StockService
+from app.services.forecast_service import ForecastService
+from app.services.dish_sales_service import DishSalesService
+from app.services.pricing_service import RoomPriceCalendar
+from app.services.maintenance_service import MaintenanceService
+from app.services.archive_service import ArchiveService
+from app.services.order_journal import OrderJournal, default_journal_path
+from app.repositories.rooms import RoomRepo
+from app.repositories.reservations import ReservationRepo
+from app.repositories.customers import CustomerRepo
+from app.repositories.orders import OrderRepo
+from app.repositories.payments import PaymentRepo
+from app.repositories.menu import MenuRepo
+from app.repositories.inventory import InventoryRepo
+from app.repositories.tables import TableRepo
+from app.repositories.recipes import RecipeRepo
+from app.repositories.rate_rules import RateRuleRepo
+from app.utils.idle import IdleWatcher
 import logging
 
 class AppController:
@@ -8,9 +31,36 @@ class AppController:
         self.app = app
         self.current_user = None
         self.main_window = None
+        self.rooms = RoomRepo(db)
+        self.reservations = ReservationRepo(db)
+        self.customers = CustomerRepo(db)
+        self.orders = OrderRepo(db)
+        self.payments = PaymentRepo(db)
+        self.menu = MenuRepo(db)
+        self.inventory = InventoryRepo(db)
+        self.tables = TableRepo(db)
+        self.recipes = RecipeRepo(db)
+        self.rate_rules = RateRuleRepo(db)
+        self.analytics = AnalyticsService(db)
+        self.availability = AvailabilityIndex(db)
+        self.tax = TaxService(db)
+        self.kitchen = KitchenService(db)
+        self.stock = StockService(db)
+        self.forecast = ForecastService(db)
+        self.dish_sales = DishSalesService(db)
+        self.pricing = RoomPriceCalendar(db)
+        self.journal = OrderJournal(db, default_journal_path(db))
+        # Journaled writes land on a worker thread; tell listeners here
+        self.journal_timer = QTimer(app)
+        self.journal_timer.timeout.connect(self.journal.dispatch)
+        self.journal_timer.start(200)
+        # Refresh planner statistics and reclaim free pages while nobody is using the app
+        self.maintenance = MaintenanceService(db)
+        self.idle_watcher = IdleWatcher(app, self.maintenance.run_idle)
+        self.archive = ArchiveService(db)
 
     def login_success(self, user_record):
-        logging.info(f"Login successful for user: {user_record['username']}")
+        logging.info(f"Login successful for user: {user_record.username}")
         self.current_user = user_record
         logging.info("Creating MainWindow instance.")
         self.main_window = MainWindow(self)
@@ -18,59 +68,35 @@ class AppController:
         self.main_window.show()
         logging.info("MainWindow shown. Login process complete.")
 
-    def add_menu_item(self, name, category, price, active):
-        conn = self.db.connect()
-        cursor = conn.cursor()
+    def add_menu_item(self, name, category, price_paise, active):
         try:
-            cursor.execute(
-                "INSERT INTO MenuItems (name, category, price, active) VALUES (?, ?, ?, ?)",
-                (name, category, price, 1 if active else 0)
-            )
-            conn.commit()
+            self.menu.add(name, category, price_paise, active)
             logging.info(f"Menu item '{name}' added successfully.")
         except Exception as e:
-            conn.rollback()
             logging.error(f"Error adding menu item '{name}': {e}")
             raise
 
-    def update_menu_item(self, item_id, name, category, price, active):
-        conn = self.db.connect()
-        cursor = conn.cursor()
+    def update_menu_item(self, item_id, name, category, price_paise, active):
         try:
-            cursor.execute(
-                "UPDATE MenuItems SET name = ?, category = ?, price = ?, active = ? WHERE id = ?",
-                (name, category, price, 1 if active else 0, item_id)
-            )
-            conn.commit()
+            self.menu.update(item_id, name, category, price_paise, active)
             logging.info(f"Menu item '{name}' (ID: {item_id}) updated successfully.")
         except Exception as e:
-            conn.rollback()
             logging.error(f"Error updating menu item '{name}' (ID: {item_id}): {e}")
             raise
 
     def delete_menu_item(self, item_id):
-        conn = self.db.connect()
-        cursor = conn.cursor()
         try:
-            cursor.execute("DELETE FROM MenuItems WHERE id = ?", (item_id,))
-            conn.commit()
+            self.menu.delete(item_id)
             logging.info(f"Menu item with ID: {item_id} deleted successfully.")
         except Exception as e:
-            conn.rollback()
             logging.error(f"Error deleting menu item with ID: {item_id}: {e}")
             raise
 
     def delete_inventory_item(self, item_id):
-        conn = self.db.connect()
-        cursor = conn.cursor()
         try:
-            cursor.execute("DELETE FROM Inventory WHERE id = ?", (item_id,))
-            conn.commit()
+            self.inventory.delete(item_id)
+            self.stock.refresh_item(item_id)
             logging.info(f"Inventory item with ID: {item_id} deleted successfully.")
         except Exception as e:
-            conn.rollback()
             logging.error(f"Error deleting inventory item with ID: {item_id}: {e}")
             raise
-
-
-
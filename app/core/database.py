@@ -6,11 +6,69 @@ operations including user authentication, schema initialization, and
 database migrations.
 """
 import sqlite3
+import logging
 import os
 import hashlib
 import secrets
 import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, List, Callable, NamedTuple, Set
+
+# Compiled statements kept per connection; room for every statement of
+# app.repositories plus the dynamic pager and report queries
+STATEMENT_CACHE_SIZE = 256
+
+# History tables whose closed rows ArchiveService moves to the archive file;
+# each is read across both files through a temporary All<Table> view
+ARCHIVE_TABLES = ("Orders", "OrderDetails", "Payments", "Reservations", "RoomCharges")
+
+
+def archive_path_for(path: str) -> str:
+    """Path of the archive database kept next to a database file."""
+    return os.path.splitext(path)[0] + "_archive.db"
+
+
+def attach_archive(connection: sqlite3.Connection, archive_path: str, create: bool = False) -> bool:
+    """Attach the archive database and (re)create the All<Table> views.
+
+    Each view is ``SELECT ... FROM main.T UNION ALL SELECT ... FROM archive.T``
+    with the columns listed, so a WHERE on an indexed column such as ``day``
+    or ``id`` is pushed down into both halves. Without an archive the views
+    read the live tables alone, and queries against them work either way.
+    The views are TEMP, so they belong to this connection only.
+
+    Args:
+        connection: Connection to the live database.
+        archive_path: Archive database file.
+        create: Create the archive file if it does not exist yet.
+
+    Returns:
+        Whether the archive is attached.
+    """
+    attached = any(row[1] == "archive" for row in connection.execute("PRAGMA database_list"))
+    if not attached and (create or os.path.exists(archive_path)):
+        connection.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        attached = True
+    for table in ARCHIVE_TABLES:
+        columns = [row[1] for row in connection.execute(f"PRAGMA main.table_xinfo({table})") if row[6] != 1]
+        select = f"SELECT {', '.join(columns)} FROM main.{table}"
+        if attached:
+            archived = {row[1] for row in connection.execute(f"PRAGMA archive.table_xinfo({table})")}
+            if archived:
+                # Columns added to the live table since the last archive run read as NULL
+                select += (" UNION ALL SELECT "
+                           + ", ".join(c if c in archived else f"NULL AS {c}" for c in columns)
+                           + f" FROM archive.{table}")
+        connection.execute(f"DROP VIEW IF EXISTS temp.All{table}")
+        connection.execute(f"CREATE TEMP VIEW All{table} AS {select}")
+    return attached
+
+
+class User(NamedTuple):
+    """A signed-in user, without the password hash and salt."""
+    id: int
+    username: str
+    role: str
+    created_at: str
 
 
 class DatabaseManager:
@@ -26,7 +84,9 @@ class DatabaseManager:
             path: File path to the SQLite database file.
         """
         self.path = path
+        self.archive_path = archive_path_for(path) if path else None
         self.conn: Optional[sqlite3.Connection] = None
+        self._change_listeners: List[Callable[[Set[str]], None]] = []
 
     def connect(self) -> sqlite3.Connection:
         """Establish connection to the database.
@@ -36,16 +96,57 @@ class DatabaseManager:
             for dictionary-like row access.
         """
         if not self.conn:
-            self.conn = sqlite3.connect(self.path)
+            self.conn = sqlite3.connect(self.path, cached_statements=STATEMENT_CACHE_SIZE)
             self.conn.row_factory = sqlite3.Row
         return self.conn
 
+    def open_connection(self) -> sqlite3.Connection:
+        """Open an additional connection for a background thread.
+        
+        SQLite connections cannot be shared across threads, so workers use
+        their own; it waits up to 30 seconds for a locked database.
+        
+        Returns:
+            New SQLite connection with row_factory set to sqlite3.Row.
+        """
+        connection = sqlite3.connect(self.path, timeout=30, cached_statements=STATEMENT_CACHE_SIZE)
+        connection.row_factory = sqlite3.Row
+        attach_archive(connection, self.archive_path)
+        return connection
+
     def close(self) -> None:
         """Close the database connection if open."""
         if self.conn:
             self.conn.close()
             self.conn = None
 
+    def add_change_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """Register a callback invoked with the set of tables changed in bulk.
+        
+        Caches built on top of the database subscribe here so they can be
+        invalidated after imports and other bulk writes.
+        
+        Args:
+            callback: Callable receiving a set of table names.
+        """
+        if callback not in self._change_listeners:
+            self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback: Callable[[Set[str]], None]) -> None:
+        """Unregister a callback previously passed to add_change_listener."""
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def notify_changed(self, *tables: str) -> None:
+        """Notify change listeners that the given tables were modified.
+        
+        Args:
+            *tables: Names of the tables whose contents changed.
+        """
+        changed = set(tables)
+        for callback in list(self._change_listeners):
+            callback(changed)
+
     def initialize(self) -> None:
         """Initialize the database schema and seed initial data.
         
@@ -55,6 +156,8 @@ class DatabaseManager:
         connection = self.connect()
         cursor = connection.cursor()
         cursor.execute("PRAGMA foreign_keys = ON")
+        # Only takes effect on a new, empty file; existing files are converted in _apply_migrations
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
         
         # Create all tables
         self._create_users_table(cursor)
@@ -69,10 +172,16 @@ class DatabaseManager:
         self._create_suppliers_table(cursor)
         self._create_inventory_table(cursor)
         self._create_inventory_consumption_table(cursor)
+        self._create_recipes_table(cursor)
+        self._create_item_sales_daily_table(cursor)
+        self._create_rate_rules_table(cursor)
+        self._create_night_audit_tables(cursor)
+        self._create_settings_table(cursor)
         
         connection.commit()
         self._apply_migrations()
         self._seed_if_empty()
+        attach_archive(connection, self.archive_path)
 
     def _create_users_table(self, cursor: sqlite3.Cursor) -> None:
         """Create Users table for user authentication."""
@@ -108,7 +217,7 @@ class DatabaseManager:
                 number TEXT UNIQUE NOT NULL,
                 category TEXT NOT NULL CHECK(category IN ('Standard','Deluxe','Suite')),
                 status TEXT NOT NULL CHECK(status IN ('Available','Occupied','Cleaning')),
-                rate REAL NOT NULL
+                rate_paise INTEGER NOT NULL
             )
         """)
 
@@ -122,6 +231,7 @@ class DatabaseManager:
                 check_in TEXT NOT NULL,
                 check_out TEXT,
                 status TEXT NOT NULL CHECK(status IN ('Reserved','CheckedIn','CheckedOut','Cancelled')),
+                no_show INTEGER NOT NULL DEFAULT 0,
                 FOREIGN KEY(customer_id) REFERENCES Customers(id) ON DELETE CASCADE,
                 FOREIGN KEY(room_id) REFERENCES Rooms(id) ON DELETE CASCADE
             )
@@ -144,7 +254,7 @@ class DatabaseManager:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 category TEXT NOT NULL,
-                price REAL NOT NULL,
+                price_paise INTEGER NOT NULL,
                 active INTEGER NOT NULL DEFAULT 1
             )
         """)
@@ -157,7 +267,11 @@ class DatabaseManager:
                 table_id INTEGER,
                 customer_id INTEGER,
                 status TEXT NOT NULL CHECK(status IN ('Open','InKitchen','Served','Paid','Cancelled')),
-                created_at TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                client_ref TEXT,
+                stock_depleted INTEGER NOT NULL DEFAULT 0,
+                day INTEGER GENERATED ALWAYS AS (created_at / 86400) VIRTUAL,
+                month INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m', created_at, 'unixepoch') AS INTEGER)) VIRTUAL,
                 FOREIGN KEY(table_id) REFERENCES Tables(id),
                 FOREIGN KEY(customer_id) REFERENCES Customers(id)
             )
@@ -171,7 +285,7 @@ class DatabaseManager:
                 order_id INTEGER NOT NULL,
                 item_id INTEGER NOT NULL,
                 qty INTEGER NOT NULL,
-                price REAL NOT NULL,
+                price_paise INTEGER NOT NULL,
                 kitchen_status TEXT NOT NULL CHECK(kitchen_status IN ('Pending','Cooking','Ready','Served')),
                 FOREIGN KEY(order_id) REFERENCES Orders(id) ON DELETE CASCADE,
                 FOREIGN KEY(item_id) REFERENCES MenuItems(id)
@@ -185,10 +299,12 @@ class DatabaseManager:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 order_id INTEGER,
                 reservation_id INTEGER,
-                amount REAL NOT NULL,
-                gst REAL NOT NULL,
+                amount_paise INTEGER NOT NULL,
+                gst_paise INTEGER NOT NULL,
                 method TEXT NOT NULL CHECK(method IN ('Cash','Card','UPI')),
-                paid_at TEXT NOT NULL,
+                paid_at INTEGER NOT NULL,
+                day INTEGER GENERATED ALWAYS AS (paid_at / 86400) VIRTUAL,
+                month INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m', paid_at, 'unixepoch') AS INTEGER)) VIRTUAL,
                 FOREIGN KEY(order_id) REFERENCES Orders(id) ON DELETE CASCADE,
                 FOREIGN KEY(reservation_id) REFERENCES Reservations(id) ON DELETE CASCADE
             )
@@ -201,7 +317,8 @@ class DatabaseManager:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 phone TEXT,
-                email TEXT
+                email TEXT,
+                lead_time_days INTEGER NOT NULL DEFAULT 7
             )
         """)
 
@@ -231,11 +348,110 @@ class DatabaseManager:
                 price REAL NOT NULL,
                 total_value REAL NOT NULL,
                 notes TEXT,
-                created_at TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                day INTEGER GENERATED ALWAYS AS (created_at / 86400) VIRTUAL,
+                month INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m', created_at, 'unixepoch') AS INTEGER)) VIRTUAL,
                 FOREIGN KEY(inventory_id) REFERENCES Inventory(id) ON DELETE CASCADE
             )
         """)
 
+    def _create_recipes_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create Recipes table: stock used by one portion of each dish."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Recipes(
+                menu_item_id INTEGER NOT NULL,
+                inventory_id INTEGER NOT NULL,
+                qty REAL NOT NULL CHECK(qty > 0),
+                PRIMARY KEY(menu_item_id, inventory_id),
+                FOREIGN KEY(menu_item_id) REFERENCES MenuItems(id) ON DELETE CASCADE,
+                FOREIGN KEY(inventory_id) REFERENCES Inventory(id) ON DELETE CASCADE
+            )
+        """)
+
+    def _create_item_sales_daily_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create ItemSalesDaily table: portions and revenue of each dish per day paid."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ItemSalesDaily(
+                day INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                qty INTEGER NOT NULL,
+                revenue_paise INTEGER NOT NULL,
+                PRIMARY KEY(day, item_id)
+            ) WITHOUT ROWID
+        """)
+
+    def _create_rate_rules_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create RateRules table: multipliers on room rates for matching nights.
+
+        A rule applies to a night when every condition it sets holds: room
+        category, date range, weekday (0 = Monday), category occupancy and
+        the stay's length. Unset conditions always hold.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS RateRules(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                category TEXT CHECK(category IN ('Standard','Deluxe','Suite')),
+                start_date TEXT,
+                end_date TEXT,
+                weekdays TEXT,
+                min_nights INTEGER NOT NULL DEFAULT 1,
+                min_occupancy REAL,
+                multiplier REAL NOT NULL CHECK(multiplier > 0)
+            )
+        """)
+
+    def _create_night_audit_tables(self, cursor: sqlite3.Cursor) -> None:
+        """Create the tables the night audit posts to.
+
+        RoomCharges holds one charge per in-house reservation and night,
+        DailyRevenue one roll-up row per audited day and OccupancySnapshots
+        the rooms held per category at the end of that day. Days are day
+        numbers like the generated ``day`` columns.
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS RoomCharges(
+                night INTEGER NOT NULL,
+                reservation_id INTEGER NOT NULL,
+                amount_paise INTEGER NOT NULL,
+                posted_at INTEGER NOT NULL,
+                PRIMARY KEY(night, reservation_id),
+                FOREIGN KEY(reservation_id) REFERENCES Reservations(id) ON DELETE CASCADE
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_room_charges_reservation ON RoomCharges(reservation_id)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS DailyRevenue(
+                day INTEGER PRIMARY KEY,
+                room_charges_paise INTEGER NOT NULL,
+                order_sales_paise INTEGER NOT NULL,
+                room_payments_paise INTEGER NOT NULL,
+                tax_paise INTEGER NOT NULL,
+                open_orders INTEGER NOT NULL,
+                no_shows INTEGER NOT NULL,
+                audited_at INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS OccupancySnapshots(
+                day INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                rooms INTEGER NOT NULL,
+                occupied INTEGER NOT NULL,
+                revenue_paise INTEGER NOT NULL,
+                PRIMARY KEY(day, category)
+            ) WITHOUT ROWID
+        """)
+
+    def _create_settings_table(self, cursor: sqlite3.Cursor) -> None:
+        """Create Settings table for application configuration such as tax rates."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Settings(
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        """)
+
     def _apply_migrations(self) -> None:
         """Apply schema migrations to existing databases.
         
@@ -285,11 +501,177 @@ class DatabaseManager:
                     price REAL NOT NULL,
                     total_value REAL NOT NULL,
                     notes TEXT,
-                    created_at TEXT NOT NULL,
+                    created_at INTEGER NOT NULL,
+                    day INTEGER GENERATED ALWAYS AS (created_at / 86400) VIRTUAL,
+                    month INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m', created_at, 'unixepoch') AS INTEGER)) VIRTUAL,
                     FOREIGN KEY(inventory_id) REFERENCES Inventory(id) ON DELETE CASCADE
                 )
             """)
             connection.commit()
+        
+        # Index check_in so date-window reservation queries avoid full scans
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_check_in ON Reservations(check_in)")
+        # Indexes backing the paged customer and order lists
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_customer ON Reservations(customer_id)")
+        # Booking conflict checks look up a room's stays
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_room ON Reservations(room_id)")
+        # The room rack reads dated stays by check-out, and those without one apart
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_check_out ON Reservations(check_out, check_in)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reservations_open ON Reservations(check_in) WHERE check_out IS NULL")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer ON Orders(customer_id, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_order_details_order ON OrderDetails(order_id)")
+        # Foreign-key checks on deleting an order or stay look payments up by these
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_order ON Payments(order_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_reservation ON Payments(reservation_id)")
+        connection.commit()
+        
+        # Money used to be stored as REAL rupees; convert to integer paise
+        self._migrate_money_column("Rooms", "rate", "rate_paise")
+        self._migrate_money_column("MenuItems", "price", "price_paise")
+        self._migrate_money_column("OrderDetails", "price", "price_paise")
+        self._migrate_money_column("Payments", "amount", "amount_paise")
+        self._migrate_money_column("Payments", "gst", "gst_paise")
+        
+        # Event times used to be ISO strings; store epoch seconds with
+        # indexed day/month buckets so time filters are index range scans
+        self._migrate_timestamp_column("Orders", "created_at")
+        self._migrate_timestamp_column("Payments", "paid_at")
+        self._migrate_timestamp_column("InventoryConsumption", "created_at")
+        for table in ("Orders", "Payments", "InventoryConsumption"):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_day ON {table}(day)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table.lower()}_month ON {table}(month)")
+        connection.commit()
+        
+        # Orders queued by the POS journal carry the id the terminal gave them
+        cursor.execute("PRAGMA table_info(Orders)")
+        if "client_ref" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE Orders ADD COLUMN client_ref TEXT")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_client_ref ON Orders(client_ref)")
+        connection.commit()
+        
+        # Set once an order's recipe stock has been taken out of Inventory
+        cursor.execute("PRAGMA table_info(Orders)")
+        if "stock_depleted" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE Orders ADD COLUMN stock_depleted INTEGER NOT NULL DEFAULT 0")
+            # Orders already sent or settled were never depleted; leave them be
+            cursor.execute("UPDATE Orders SET stock_depleted = 1 WHERE status != 'Open'")
+            connection.commit()
+        
+        # Partial index holding only items at or below their threshold
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_low ON Inventory(name) WHERE qty <= threshold")
+        connection.commit()
+        
+        # Days from placing a purchase order to delivery, used for reorder points
+        cursor.execute("PRAGMA table_info(Suppliers)")
+        if "lead_time_days" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE Suppliers ADD COLUMN lead_time_days INTEGER NOT NULL DEFAULT 7")
+            connection.commit()
+        
+        # Set by the night audit on reservations whose guest never arrived
+        cursor.execute("PRAGMA table_info(Reservations)")
+        if "no_show" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE Reservations ADD COLUMN no_show INTEGER NOT NULL DEFAULT 0")
+            connection.commit()
+        
+        # Fill the dish sales counters from orders paid before they existed
+        if cursor.execute("SELECT 1 FROM ItemSalesDaily LIMIT 1").fetchone() is None:
+            cursor.execute("""
+                INSERT INTO ItemSalesDaily(day, item_id, qty, revenue_paise)
+                SELECT COALESCE((SELECT MIN(p.day) FROM Payments p WHERE p.order_id = o.id), o.day),
+                       od.item_id, SUM(od.qty), SUM(od.qty * od.price_paise)
+                FROM Orders o JOIN OrderDetails od ON od.order_id = o.id
+                WHERE o.status = 'Paid'
+                GROUP BY 1, 2
+            """)
+            connection.commit()
+        
+        # Let free pages be given back to the file system without a full VACUUM
+        self._migrate_auto_vacuum()
+
+    def _migrate_auto_vacuum(self) -> None:
+        """Switch the file to incremental auto-vacuum so deleted pages can be returned.
+
+        Changing the mode of an existing file needs one full VACUUM, which
+        runs once here; afterwards MaintenanceService gives free pages back
+        a few at a time with ``PRAGMA incremental_vacuum`` while the app is idle.
+        """
+        connection = self.conn
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        logging.info("Converting database to incremental auto-vacuum.")
+        connection.commit()
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("VACUUM")
+
+    def _migrate_money_column(self, table: str, old: str, new: str) -> None:
+        """Replace a REAL rupee column with an INTEGER paise column.
+        
+        The new column is added and backfilled, and the old column is
+        dropped, in a single explicit transaction; the migration counts as
+        done only once the old column is gone.
+        
+        Args:
+            table: Table to migrate.
+            old: Existing REAL column holding rupees.
+            new: INTEGER column to create holding paise.
+        """
+        connection = self.conn
+        columns = [row[1] for row in connection.execute(f"PRAGMA table_info({table})")]
+        if old not in columns:
+            return
+        # ALTER TABLE does not open a transaction by itself, so begin one explicitly
+        connection.commit()
+        connection.execute("BEGIN IMMEDIATE")
+        with connection:
+            if new not in columns:
+                connection.execute(f"ALTER TABLE {table} ADD COLUMN {new} INTEGER NOT NULL DEFAULT 0")
+            connection.execute(f"UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS INTEGER)")
+            connection.execute(f"ALTER TABLE {table} DROP COLUMN {old}")
+
+    def _migrate_timestamp_column(self, table: str, column: str) -> None:
+        """Replace an ISO text timestamp column with integer epoch seconds.
+        
+        Values are local wall-clock times, so they are converted without a
+        timezone shift; date-only values become midnight. Indexes on the
+        column are dropped and recreated around the conversion, and virtual
+        ``day`` and ``month`` columns are generated from the new value. It
+        all runs in one explicit transaction, and a file left half-converted
+        by an earlier version picks up where that stopped.
+        
+        Args:
+            table: Table to migrate.
+            column: Existing TEXT column holding ISO date/datetime strings.
+        """
+        connection = self.conn
+        columns = {row[1]: row[2] for row in connection.execute(f"PRAGMA table_xinfo({table})")}
+        if "day" in columns:
+            return
+        indexes = [row[0] for row in connection.execute(
+            "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL", (table,)
+        ) if column in row[0]]
+        connection.commit()
+        connection.execute("BEGIN IMMEDIATE")
+        with connection:
+            for sql in indexes:
+                name = sql.split(" ON ")[0].split()[-1]
+                connection.execute(f"DROP INDEX IF EXISTS {name}")
+            if columns[column].upper() != "INTEGER":
+                if f"{column}_ts" not in columns:
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column}_ts INTEGER NOT NULL DEFAULT 0")
+                connection.execute(
+                    f"UPDATE {table} SET {column}_ts = COALESCE(CAST(strftime('%s', {column}) AS INTEGER), 0)"
+                )
+                connection.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+                connection.execute(f"ALTER TABLE {table} RENAME COLUMN {column}_ts TO {column}")
+            connection.execute(
+                f"ALTER TABLE {table} ADD COLUMN day INTEGER GENERATED ALWAYS AS ({column} / 86400) VIRTUAL"
+            )
+            connection.execute(
+                f"ALTER TABLE {table} ADD COLUMN month INTEGER GENERATED ALWAYS AS "
+                f"(CAST(strftime('%Y%m', {column}, 'unixepoch') AS INTEGER)) VIRTUAL"
+            )
+            for sql in indexes:
+                connection.execute(sql)
 
     def _seed_if_empty(self) -> None:
         """Seed database with default users if database is empty.
@@ -332,7 +714,7 @@ class DatabaseManager:
         )
         connection.commit()
 
-    def verify_user(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+    def verify_user(self, username: str, password: str) -> Optional[User]:
         """Verify user credentials and return user record if valid.
         
         Validates username and password against stored hash using the
@@ -343,7 +725,7 @@ class DatabaseManager:
             password: Plain text password to verify.
             
         Returns:
-            Dictionary with user record if credentials are valid, None otherwise.
+            User if credentials are valid, None otherwise.
         """
         connection = self.connect()
         cursor = connection.cursor()
@@ -361,5 +743,5 @@ class DatabaseManager:
         ).hex()
         
         if pwd_hash == row["password_hash"]:
-            return dict(row)
+            return User(row["id"], row["username"], row["role"], row["created_at"])
         return None
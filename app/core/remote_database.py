@@ -0,0 +1,358 @@
+"""
+Thin database client for terminals that share a sync server.
+
+RemoteDatabaseManager is a drop-in DatabaseManager whose connection forwards
+statements to app.services.sync_server instead of opening the file itself.
+The connection mimics the parts of sqlite3.Connection the app uses.
+Statements are queued and sent together the first time a result is needed
+(a fetch, lastrowid) or on commit, so a write followed by its commit, or a
+burst of inserts, costs one round trip. Errors come back as the matching
+sqlite3 exception, raised where the batch is sent.
+"""
+import collections
+import select
+import socket
+import sqlite3
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from app.core.database import DatabaseManager
+from app.services.sync_server import CODECS, FRAME_HEADER, decode, frame, parse_address
+
+# Seconds to wait for a reply before the server is considered gone
+REPLY_TIMEOUT = 30.0
+
+
+class RemoteRow:
+    """Row returned when row_factory is sqlite3.Row; indexable by position or name."""
+
+    __slots__ = ("_columns", "_lookup", "_values")
+
+    def __init__(self, columns: Tuple[str, ...], lookup: Dict[str, int], values: Sequence[Any]) -> None:
+        self._columns = columns
+        self._lookup = lookup
+        self._values = tuple(values)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return self._values[self._lookup[key.lower()]]
+            except KeyError:
+                raise IndexError("No item with that key") from None
+        return self._values[key]
+
+    def keys(self) -> List[str]:
+        return list(self._columns)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RemoteRow) and self._columns == other._columns and self._values == other._values
+
+    def __hash__(self) -> int:
+        return hash((self._columns, self._values))
+
+    def __repr__(self) -> str:
+        return f"<RemoteRow {dict(zip(self._columns, self._values))}>"
+
+
+class RemoteCursor:
+    """Cursor whose statement runs when its connection next sends a batch."""
+
+    def __init__(self, connection: "RemoteConnection") -> None:
+        self.connection = connection
+        self.row_factory = connection.row_factory
+        self._sent = True
+        self._result: Optional[Dict[str, Any]] = None
+        self._lookup: Optional[Tuple[Tuple[str, ...], Dict[str, int]]] = None
+        self._position = 0
+        self.arraysize = 1
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> "RemoteCursor":
+        self.connection._queue(("execute", [sql, list(parameters)]), self)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters) -> "RemoteCursor":
+        self.connection._queue(("executemany", [sql, [list(p) for p in seq_of_parameters]]), self)
+        return self
+
+    def _expect(self) -> None:
+        self._sent = False
+        self._result = None
+        self._lookup = None
+        self._position = 0
+
+    def _deliver(self, result: Optional[Dict[str, Any]]) -> None:
+        self._sent = True
+        self._result = result
+
+    def _ready(self) -> Dict[str, Any]:
+        if not self._sent:
+            self.connection._flush()
+        return self._result or {"columns": None, "rows": [], "lastrowid": None, "rowcount": -1}
+
+    def _make_row(self, values: List[Any], columns: List[str]):
+        if self.row_factory is sqlite3.Row:
+            return RemoteRow(*self._row_lookup(columns), values)
+        if self.row_factory is not None:
+            return self.row_factory(self, tuple(values))
+        return tuple(values)
+
+    def _row_lookup(self, columns: List[str]) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+        # Built once per result and shared by its rows; like sqlite3.Row,
+        # names match case-insensitively and the first duplicate wins.
+        if self._lookup is None:
+            lookup: Dict[str, int] = {}
+            for i, name in enumerate(columns):
+                lookup.setdefault(name.lower(), i)
+            self._lookup = (tuple(columns), lookup)
+        return self._lookup
+
+    @property
+    def description(self) -> Optional[Tuple[Tuple, ...]]:
+        columns = self._ready()["columns"]
+        return tuple((name, None, None, None, None, None, None) for name in columns) if columns else None
+
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self._ready()["lastrowid"]
+
+    @property
+    def rowcount(self) -> int:
+        return self._ready()["rowcount"]
+
+    def fetchone(self):
+        result = self._ready()
+        if self._position >= len(result["rows"]):
+            return None
+        self._position += 1
+        return self._make_row(result["rows"][self._position - 1], result["columns"])
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        result = self._ready()
+        end = self._position + (size or self.arraysize)
+        rows = result["rows"][self._position:end]
+        self._position += len(rows)
+        return [self._make_row(values, result["columns"]) for values in rows]
+
+    def fetchall(self) -> list:
+        result = self._ready()
+        rows = result["rows"][self._position:]
+        self._position = len(result["rows"])
+        return [self._make_row(values, result["columns"]) for values in rows]
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def close(self) -> None:
+        pass
+
+
+class RemoteConnection:
+    """Socket to the sync server presenting the sqlite3.Connection interface."""
+
+    def __init__(self, address: str, codec: Optional[str] = None) -> None:
+        """Connect and agree on a codec.
+
+        Args:
+            address: ``host:port`` or ``unix:/path`` of the sync server.
+            codec: Preferred codec; msgpack when installed, else JSON.
+        """
+        kind, target = parse_address(address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(REPLY_TIMEOUT)
+        try:
+            self._sock.connect(target)
+        except OSError as e:
+            self._sock.close()
+            raise sqlite3.OperationalError(f"Cannot reach sync server at {address}: {e}") from e
+        if kind == "tcp":
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._buffer = bytearray()
+        self._pending: List[Tuple[Tuple[str, Any], RemoteCursor]] = []
+        self._next_id = 0
+        self.events: Deque[Set[str]] = collections.deque()
+        self.row_factory = None
+        self.codec = "json"
+        self._sock.sendall(frame({"hello": 1, "codec": codec or CODECS[0]}))
+        self.codec = decode(self._next_frame())["codec"]
+
+    def _take_frame(self) -> Optional[bytes]:
+        if len(self._buffer) < FRAME_HEADER.size:
+            return None
+        (length,) = FRAME_HEADER.unpack_from(self._buffer)
+        end = FRAME_HEADER.size + length
+        if len(self._buffer) < end:
+            return None
+        body = bytes(self._buffer[FRAME_HEADER.size:end])
+        del self._buffer[:end]
+        return body
+
+    def _receive(self) -> None:
+        try:
+            chunk = self._sock.recv(65536)
+        except OSError as e:
+            raise sqlite3.OperationalError(f"Sync server connection failed: {e}") from e
+        if not chunk:
+            raise sqlite3.OperationalError("Sync server closed the connection")
+        self._buffer += chunk
+
+    def _next_frame(self) -> bytes:
+        body = self._take_frame()
+        while body is None:
+            self._receive()
+            body = self._take_frame()
+        return body
+
+    def _next_reply(self) -> Dict[str, Any]:
+        while True:
+            message = decode(self._next_frame(), self.codec)
+            if "event" in message:
+                self.events.append(set(message["tables"]))
+            else:
+                return message
+
+    def poll_events(self) -> None:
+        """Read change events that arrived while idle, without blocking."""
+        while select.select([self._sock], [], [], 0)[0]:
+            self._receive()
+            while True:
+                body = self._take_frame()
+                if body is None:
+                    break
+                message = decode(body, self.codec)
+                if "event" in message:
+                    self.events.append(set(message["tables"]))
+
+    def _queue(self, call: Tuple[str, Any], cursor: RemoteCursor) -> None:
+        cursor._expect()
+        self._pending.append((call, cursor))
+
+    def _flush(self, *calls: Tuple[str, Any]) -> List[Any]:
+        """Send queued statements plus ``calls`` in one request.
+
+        Returns:
+            The results of ``calls``.
+        """
+        pending, self._pending = self._pending, []
+        batch = [call for call, _ in pending] + list(calls)
+        if not batch:
+            return []
+        self._next_id += 1
+        self._sock.sendall(frame({"id": self._next_id, "calls": batch}, self.codec))
+        reply = self._next_reply()
+        results = reply["results"]
+        for i, (_, cursor) in enumerate(pending):
+            cursor._deliver(results[i] if i < len(results) else None)
+        error = reply.get("error")
+        if error:
+            raise getattr(sqlite3, error["type"], sqlite3.DatabaseError)(error["message"])
+        return results[len(pending):]
+
+    def cursor(self) -> RemoteCursor:
+        return RemoteCursor(self)
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> RemoteCursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> RemoteCursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        self._flush(("commit", []))
+
+    def rollback(self) -> None:
+        # Statements not sent yet are simply dropped
+        for _, cursor in self._pending:
+            cursor._deliver(None)
+        self._pending = []
+        self._flush(("rollback", []))
+
+    def notify(self, tables: Set[str]) -> None:
+        """Tell the server, and through it the other terminals, what changed."""
+        self._flush(("notify", sorted(tables)))
+
+    def close(self) -> None:
+        self._pending = []
+        self._sock.close()
+
+    def __enter__(self) -> "RemoteConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            try:
+                self.commit()
+            except sqlite3.Error:
+                self.rollback()
+                raise
+        else:
+            self.rollback()
+        return False
+
+
+class RemoteDatabaseManager(DatabaseManager):
+    """DatabaseManager backed by a sync server instead of a local file.
+
+    ``path`` is None: features that open the file directly (snapshots,
+    background CSV export, rack prefetch) are unavailable on a terminal.
+    """
+
+    def __init__(self, address: str, codec: Optional[str] = None) -> None:
+        """Initialize remote database manager.
+
+        Args:
+            address: ``host:port`` or ``unix:/path`` of the sync server.
+            codec: Preferred wire codec, "msgpack" or "json".
+        """
+        super().__init__(None)
+        self.address = address
+        self.codec = codec
+
+    def connect(self) -> RemoteConnection:
+        """Open the server connection on first use.
+
+        Returns:
+            RemoteConnection with row_factory set to sqlite3.Row.
+        """
+        if not self.conn:
+            self.conn = RemoteConnection(self.address, self.codec)
+            self.conn.row_factory = sqlite3.Row
+        return self.conn
+
+    def open_connection(self) -> RemoteConnection:
+        """Open a second server connection for a background thread."""
+        connection = RemoteConnection(self.address, self.codec)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def initialize(self) -> None:
+        """Connect only; the server creates and migrates the schema."""
+        self.connect()
+
+    def notify_changed(self, *tables: str) -> None:
+        """Notify local listeners and forward the change to other terminals.
+
+        Args:
+            *tables: Names of the tables whose contents changed.
+        """
+        self.connect().notify(set(tables))
+        super().notify_changed(*tables)
+
+    def dispatch_events(self) -> None:
+        """Deliver changes made on other terminals to local listeners.
+
+        Called periodically from the UI thread.
+        """
+        if not self.conn:
+            return
+        self.conn.poll_events()
+        while self.conn.events:
+            DatabaseManager.notify_changed(self, *self.conn.events.popleft())
@@ -4,11 +4,18 @@ import sys
 import os
 import logging
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from app.core.app import AppController
 from app.utils.theme import ThemeManager
 from app.utils.calendar_icon import register_calendar_resources
 from app.views.login_view import LoginWindow
 from app.core.database import DatabaseManager
+from app.core.remote_database import RemoteDatabaseManager
+
+# Set to host:port or unix:/path to use a sync server instead of the local file
+SYNC_SERVER_ENV = "HOTEL_SYNC_SERVER"
+# How often changes made on other terminals are picked up, in milliseconds
+SYNC_POLL_MS = 500
 
 
 def setup_logging() -> None:
@@ -21,8 +28,15 @@ def initialize_database() -> DatabaseManager:
     """Initialize and return database manager.
     
     Returns:
-        DatabaseManager instance
+        DatabaseManager instance, or a RemoteDatabaseManager when
+        HOTEL_SYNC_SERVER names a sync server
     """
+    address = os.environ.get(SYNC_SERVER_ENV)
+    if address:
+        logging.info(f"Using sync server at {address}")
+        db = RemoteDatabaseManager(address)
+        db.initialize()
+        return db
     app_dir = os.path.dirname(os.path.abspath(__file__))
     db_path = os.path.join(app_dir, "hotel_restaurant.db")
     db = DatabaseManager(db_path)
@@ -47,6 +61,12 @@ def main() -> None:
     
     # Apply theme
     ThemeManager(app).apply_light()
+
+    # Relay changes made on other terminals to caches and live screens
+    if isinstance(db, RemoteDatabaseManager):
+        sync_timer = QTimer(app)
+        sync_timer.timeout.connect(db.dispatch_events)
+        sync_timer.start(SYNC_POLL_MS)
     
     # Create controller and show login window
     controller = AppController(db, app)
@@ -56,6 +76,7 @@ def main() -> None:
     
     # Run application
     exit_code = app.exec()
+    controller.journal.close()
     logging.info(f"Application exited with code: {exit_code}")
     sys.exit(exit_code)
 
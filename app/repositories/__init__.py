@@ -0,0 +1,5 @@
+# Import every repository so app.repositories.base.STATEMENTS is complete
+# and statements of one repository can be run by name from another.
+from app.repositories import base, rooms, reservations, customers, orders, payments, menu, inventory, tables, recipes, item_sales, rate_rules, night_audit
+
+__all__ = ["base", "rooms", "reservations", "customers", "orders", "payments", "menu", "inventory", "tables", "recipes", "item_sales", "rate_rules", "night_audit"]
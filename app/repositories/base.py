@@ -0,0 +1,75 @@
+"""
+Repository base class and the registry of named SQL statements.
+
+Each repository declares its statements once, by name, in ``SQL``. The text
+of a statement never changes: optional filters are written with parameters
+(``? IS NULL OR category = ?``) instead of concatenated clauses. Each one is
+then compiled once per connection and reused from sqlite3's statement cache
+(see STATEMENT_CACHE_SIZE in app.core.database). ``STATEMENTS`` collects
+every statement as "<namespace>.<name>", e.g. to EXPLAIN them all.
+
+Rows come back as NamedTuples whose fields match the selected columns, so
+views read ``room.number`` instead of indexing sqlite3.Row by name.
+"""
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+STATEMENTS: Dict[str, str] = {}
+
+
+def row_factory(row_type: Any) -> Callable[[Any, Sequence[Any]], Any]:
+    """Return a sqlite3 row factory building ``row_type`` (a NamedTuple)."""
+    make = row_type._make
+    return lambda cursor, values: make(values)
+
+
+class Repository:
+    """Runs the named statements of one entity on the shared connection."""
+
+    NAMESPACE = ""
+    SQL: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, sql in cls.SQL.items():
+            key = f"{cls.NAMESPACE}.{name}"
+            if STATEMENTS.get(key, sql) != sql:
+                raise ValueError(f"Statement {key} is already registered")
+            STATEMENTS[key] = sql
+
+    def __init__(self, db) -> None:
+        """Initialize repository.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    def _sql(self, name: str) -> str:
+        # Names with a dot refer to another repository's statements
+        return STATEMENTS[name] if "." in name else self.SQL[name]
+
+    def _execute(self, name: str, params: Sequence[Any] = (), row: Any = None,
+                 connection: Optional[sqlite3.Connection] = None) -> sqlite3.Cursor:
+        cursor = (connection or self.db.connect()).cursor()
+        if row is not None:
+            cursor.row_factory = row_factory(row)
+        return cursor.execute(self._sql(name), params)
+
+    def _all(self, name: str, params: Sequence[Any] = (), row: Any = None) -> List[Any]:
+        return self._execute(name, params, row).fetchall()
+
+    def _one(self, name: str, params: Sequence[Any] = (), row: Any = None) -> Optional[Any]:
+        return self._execute(name, params, row).fetchone()
+
+    def _scalar(self, name: str, params: Sequence[Any] = ()) -> Any:
+        result = self._execute(name, params).fetchone()
+        return result[0] if result else None
+
+    def _write(self, name: str, params: Sequence[Any], *tables: str) -> sqlite3.Cursor:
+        """Run one statement in its own transaction and notify listeners."""
+        connection = self.db.connect()
+        with connection:
+            cursor = self._execute(name, params, connection=connection)
+        self.db.notify_changed(*tables)
+        return cursor
@@ -0,0 +1,85 @@
+"""Customer Repository - Statements on the Customers table."""
+
+from typing import List, NamedTuple, Optional
+
+from app.repositories.base import Repository
+from app.utils.pagination import KeysetPager
+
+
+class Customer(NamedTuple):
+    """One customer with their identity document."""
+    id: int
+    name: str
+    phone: Optional[str]
+    email: Optional[str]
+    document_type: Optional[str]
+    document_number: Optional[str]
+
+
+class CustomerListing(NamedTuple):
+    """Customer row of the guest list with their current room, if any."""
+    id: int
+    name: str
+    phone: Optional[str]
+    email: Optional[str]
+    room_id: Optional[int]
+    current_room: Optional[str]
+    res_status: Optional[str]
+
+
+class CustomerRepo(Repository):
+    """Guests and restaurant customers."""
+
+    NAMESPACE = "customers"
+    SQL = {
+        "all": "SELECT id, name, phone, email, document_type, document_number FROM Customers ORDER BY id",
+        "count": "SELECT COUNT(*) FROM Customers",
+        "insert": "INSERT INTO Customers(name, phone, email) VALUES(?, ?, ?)",
+        "update": "UPDATE Customers SET name = ?, phone = ?, email = ? WHERE id = ?",
+        "delete": "DELETE FROM Customers WHERE id = ?",
+        "export": "SELECT id, name, phone, email FROM Customers ORDER BY id DESC",
+    }
+
+    # Paged list; the pager appends WHERE/ORDER BY to this
+    LISTING = """
+        SELECT c.id AS id, c.name AS name, c.phone AS phone, c.email AS email,
+               r.room_id AS room_id, rm.number AS current_room, r.status AS res_status
+        FROM Customers c
+        LEFT JOIN Reservations r ON r.id = (
+            SELECT id FROM Reservations WHERE customer_id=c.id AND status IN ('Reserved','CheckedIn') ORDER BY id DESC LIMIT 1
+        )
+        LEFT JOIN Rooms rm ON rm.id = r.room_id
+    """
+    SEARCH = "c.name LIKE ? OR c.phone LIKE ? OR c.email LIKE ?"
+
+    def pager(self) -> KeysetPager:
+        """Pager over all customers, newest first."""
+        return KeysetPager(self.db, self.LISTING, [("c.id", "id")], row=CustomerListing)
+
+    def search(self, pager: KeysetPager, term: str) -> None:
+        """Restart a pager from pager() filtered by name, phone or email."""
+        if term:
+            like = f"%{term}%"
+            pager.reset(self.SEARCH, (like, like, like))
+        else:
+            pager.reset()
+
+    def all(self) -> List[Customer]:
+        """All customers in id order."""
+        return self._all("all", row=Customer)
+
+    def count(self) -> int:
+        """Number of customers."""
+        return self._scalar("count")
+
+    def add(self, name: str, phone: str = "", email: str = "") -> int:
+        """Create a customer and return its id."""
+        return self._write("insert", (name, phone, email), "Customers").lastrowid
+
+    def update(self, customer_id: int, name: str, phone: str, email: str) -> None:
+        """Change a customer's contact details."""
+        self._write("update", (name, phone, email, customer_id), "Customers")
+
+    def delete(self, customer_id: int) -> None:
+        """Remove a customer and, by cascade, their reservations with their payments and charges."""
+        self._write("delete", (customer_id,), "Customers", "Reservations", "Payments", "RoomCharges")
@@ -0,0 +1,95 @@
+"""Inventory Repository - Statements on the Inventory table."""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.repositories.base import Repository
+
+
+class InventoryItem(NamedTuple):
+    """One stock item; qty and threshold in the item's unit."""
+    id: int
+    name: str
+    qty: float
+    unit: str
+    threshold: float
+
+
+class StockLevel(NamedTuple):
+    """Stock item with what reordering it needs; lead time in days."""
+    id: int
+    name: str
+    qty: float
+    unit: str
+    price: float
+    supplier_id: Optional[int]
+    supplier: Optional[str]
+    lead_time_days: Optional[int]
+
+
+class InventoryRepo(Repository):
+    """Kitchen and housekeeping stock."""
+
+    NAMESPACE = "inventory"
+    SQL = {
+        "all": "SELECT id, name, qty, unit, threshold FROM Inventory ORDER BY name",
+        # Served by the partial index idx_inventory_low, so only low rows are read
+        "low": "SELECT id, name, qty, unit, threshold FROM Inventory WHERE qty <= threshold ORDER BY name",
+        "levels": """
+            SELECT i.id, i.name, i.qty, i.unit, i.price, i.supplier_id, s.name, s.lead_time_days
+            FROM Inventory i LEFT JOIN Suppliers s ON s.id = i.supplier_id
+            ORDER BY i.id
+        """,
+        "consumption_after": "SELECT id, inventory_id, day, qty_consumed FROM InventoryConsumption WHERE id > ? ORDER BY id",
+        "by_id": "SELECT id, name, qty, unit, threshold FROM Inventory WHERE id = ?",
+        "last_consumption": "SELECT COALESCE(MAX(id), 0) FROM InventoryConsumption",
+        "consumed_between": """
+            SELECT DISTINCT i.id, i.name, i.qty, i.unit, i.threshold
+            FROM InventoryConsumption c JOIN Inventory i ON i.id = c.inventory_id
+            WHERE c.id > ? AND c.id <= ?
+        """,
+        "insert": "INSERT INTO Inventory(name, qty, unit, threshold) VALUES(?, ?, ?, ?)",
+        "update": "UPDATE Inventory SET name = ?, qty = ?, unit = ?, threshold = ? WHERE id = ?",
+        "delete": "DELETE FROM Inventory WHERE id = ?",
+    }
+
+    def all(self) -> List[InventoryItem]:
+        """All stock items ordered by name."""
+        return self._all("all", row=InventoryItem)
+
+    def low(self) -> List[InventoryItem]:
+        """Items at or below their threshold, ordered by name."""
+        return self._all("low", row=InventoryItem)
+
+    def levels(self) -> List[StockLevel]:
+        """All stock items with their supplier's name and lead time, in id order."""
+        return self._all("levels", row=StockLevel)
+
+    def consumption_after(self, after_id: int) -> List[Tuple[int, int, int, float]]:
+        """(id, inventory id, day number, qty) of consumption rows newer than ``after_id``."""
+        cursor = self._execute("consumption_after", (after_id,))
+        cursor.row_factory = None
+        return cursor.fetchall()
+
+    def get(self, item_id: int) -> Optional[InventoryItem]:
+        """The stock item with an id, or None."""
+        return self._one("by_id", (item_id,), row=InventoryItem)
+
+    def last_consumption(self) -> int:
+        """Id of the newest consumption row, 0 if there are none."""
+        return self._scalar("last_consumption")
+
+    def consumed_between(self, after_id: int, upto_id: int) -> List[InventoryItem]:
+        """Current levels of items with consumption rows in the id range (after_id, upto_id]."""
+        return self._all("consumed_between", (after_id, upto_id), row=InventoryItem)
+
+    def add(self, name: str, qty: float, unit: str, threshold: float) -> int:
+        """Create a stock item and return its id."""
+        return self._write("insert", (name, qty, unit, threshold), "Inventory").lastrowid
+
+    def update(self, item_id: int, name: str, qty: float, unit: str, threshold: float) -> None:
+        """Change a stock item."""
+        self._write("update", (name, qty, unit, threshold, item_id), "Inventory")
+
+    def delete(self, item_id: int) -> None:
+        """Remove a stock item and its consumption history."""
+        self._write("delete", (item_id,), "Inventory")
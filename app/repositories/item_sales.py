@@ -0,0 +1,60 @@
+"""Item Sales Repository - Statements on the ItemSalesDaily counters."""
+
+import sqlite3
+from typing import List, Tuple
+
+from app.repositories.base import Repository
+
+
+class ItemSalesRepo(Repository):
+    """Portions sold and revenue per dish and day, counted when orders are paid."""
+
+    NAMESPACE = "item_sales"
+    SQL = {
+        "record_order": """
+            INSERT INTO ItemSalesDaily(day, item_id, qty, revenue_paise)
+            SELECT ? / 86400, item_id, SUM(qty), SUM(qty * price_paise)
+            FROM OrderDetails WHERE order_id = ? GROUP BY item_id
+            ON CONFLICT(day, item_id) DO UPDATE SET
+                qty = qty + excluded.qty, revenue_paise = revenue_paise + excluded.revenue_paise
+        """,
+        "since": "SELECT day, item_id, qty FROM ItemSalesDaily WHERE day >= ?",
+        "between": """
+            SELECT item_id, SUM(qty) FROM ItemSalesDaily
+            WHERE day BETWEEN ? AND ? GROUP BY item_id
+        """,
+        "last_payment": "SELECT COALESCE(MAX(id), 0) FROM Payments",
+        "paid_between": """
+            SELECT p.paid_at / 86400, od.item_id, SUM(od.qty)
+            FROM Payments p JOIN OrderDetails od ON od.order_id = p.order_id
+            WHERE p.id > ? AND p.id <= ?
+              AND NOT EXISTS (SELECT 1 FROM Payments e WHERE e.order_id = p.order_id AND e.id < p.id)
+            GROUP BY 1, 2
+        """,
+    }
+
+    def record_order(self, order_id: int, paid_at: int, connection: sqlite3.Connection) -> None:
+        """Add a paid order's lines to the counters of its payment day.
+
+        Runs inside the caller's transaction, once per order, when it is paid.
+        """
+        self._execute("record_order", (paid_at, order_id), connection=connection)
+
+    def since(self, day: int) -> List[Tuple[int, int, int]]:
+        """(day, item id, portions) counters from a day number onwards."""
+        return [tuple(row) for row in self._all("since", (day,))]
+
+    def between(self, first_day: int, last_day: int) -> List[Tuple[int, int]]:
+        """(item id, portions) summed over the day numbers first_day..last_day."""
+        return [tuple(row) for row in self._all("between", (first_day, last_day))]
+
+    def last_payment(self) -> int:
+        """Id of the newest payment, 0 when there is none."""
+        return self._scalar("last_payment")
+
+    def paid_between(self, after_id: int, last_id: int) -> List[Tuple[int, int, int]]:
+        """(day, item id, portions) of orders first paid by payments after_id+1..last_id.
+
+        These are the amounts record_order added to the counters for them.
+        """
+        return [tuple(row) for row in self._all("paid_between", (after_id, last_id))]
@@ -0,0 +1,76 @@
+"""Menu Repository - Statements on the MenuItems table."""
+
+from typing import List, NamedTuple, Optional
+
+from app.repositories.base import Repository
+
+
+class MenuItem(NamedTuple):
+    """One dish; price in paise."""
+    id: int
+    name: str
+    category: str
+    price_paise: int
+    active: int
+
+
+class MenuRepo(Repository):
+    """Restaurant menu items."""
+
+    NAMESPACE = "menu"
+    SQL = {
+        # A NULL category or pattern disables that filter, so every search
+        # runs the same statement
+        "search": """
+            SELECT id, name, category, price_paise, active FROM MenuItems
+            WHERE (?1 IS NULL OR category = ?1) AND (?2 IS NULL OR name LIKE ?2)
+              AND (?3 IS NULL OR active = ?3)
+            ORDER BY category, name
+        """,
+        "by_id": "SELECT id, name, category, price_paise, active FROM MenuItems WHERE id = ?",
+        "by_name": "SELECT id, name, category, price_paise, active FROM MenuItems WHERE name = ?",
+        "categories": "SELECT DISTINCT category FROM MenuItems ORDER BY category",
+        "insert": "INSERT INTO MenuItems(name, category, price_paise, active) VALUES(?, ?, ?, ?)",
+        "update": "UPDATE MenuItems SET name = ?, category = ?, price_paise = ?, active = ? WHERE id = ?",
+        "delete": "DELETE FROM MenuItems WHERE id = ?",
+    }
+
+    def search(self, category: Optional[str] = None, text: str = "",
+               active_only: bool = False) -> List[MenuItem]:
+        """Dishes ordered by category and name.
+
+        Args:
+            category: Only this category; None for all.
+            text: Only names containing this text; empty for all.
+            active_only: Leave out dishes taken off the menu.
+        """
+        return self._all("search", (category, f"%{text}%" if text else None, 1 if active_only else None),
+                         row=MenuItem)
+
+    def active(self, category: Optional[str] = None) -> List[MenuItem]:
+        """Dishes currently on the menu, optionally of one category."""
+        return self.search(category, active_only=True)
+
+    def get(self, item_id: int) -> Optional[MenuItem]:
+        """The dish with an id, or None."""
+        return self._one("by_id", (item_id,), row=MenuItem)
+
+    def by_name(self, name: str) -> Optional[MenuItem]:
+        """The dish with a name, or None."""
+        return self._one("by_name", (name,), row=MenuItem)
+
+    def categories(self) -> List[str]:
+        """Distinct categories in use, sorted."""
+        return [row[0] for row in self._all("categories")]
+
+    def add(self, name: str, category: str, price_paise: int, active: bool) -> int:
+        """Create a dish and return its id."""
+        return self._write("insert", (name, category, price_paise, 1 if active else 0), "MenuItems").lastrowid
+
+    def update(self, item_id: int, name: str, category: str, price_paise: int, active: bool) -> None:
+        """Change a dish."""
+        self._write("update", (name, category, price_paise, 1 if active else 0, item_id), "MenuItems")
+
+    def delete(self, item_id: int) -> None:
+        """Remove a dish."""
+        self._write("delete", (item_id,), "MenuItems")
@@ -0,0 +1,159 @@
+"""Night Audit Repository - End-of-day postings, roll-ups and snapshots.
+
+Every step of the audit is one set-based statement over all rooms and
+reservations, so the audit is a handful of statements whatever the hotel size.
+Room rates for the night come in as one JSON parameter of
+[category, min_nights, factor] triples read with json_each, keeping the
+statement text fixed.
+"""
+
+import datetime
+import json
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.repositories.base import Repository
+
+
+class AuditResult(NamedTuple):
+    """What one audit run changed."""
+    day: int
+    charges_posted: int
+    no_shows: int
+
+
+class DailyRevenue(NamedTuple):
+    """Roll-up of one audited day; amounts in paise."""
+    day: int
+    room_charges_paise: int
+    order_sales_paise: int
+    room_payments_paise: int
+    tax_paise: int
+    open_orders: int
+    no_shows: int
+    audited_at: int
+
+
+class OccupancySnapshot(NamedTuple):
+    """Rooms held per category at the end of an audited day."""
+    day: int
+    category: str
+    rooms: int
+    occupied: int
+    revenue_paise: int
+
+
+class NightAuditRepo(Repository):
+    """Statements run by the night audit and the tables it fills."""
+
+    NAMESPACE = "night_audit"
+    SQL = {
+        # One charge per in-house stay and night; re-running a night posts nothing twice
+        "post_room_charges": """
+            INSERT OR IGNORE INTO RoomCharges(night, reservation_id, amount_paise, posted_at)
+            WITH rates(category, min_nights, factor) AS (
+                SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+                FROM json_each(?3)
+            )
+            SELECT ?1, r.id, CAST(ROUND(rm.rate_paise * COALESCE((
+                       SELECT factor FROM rates
+                       WHERE rates.category = rm.category
+                         AND rates.min_nights <= MAX(1, julianday(date(COALESCE(r.check_out, r.check_in)))
+                                                        - julianday(date(r.check_in)))
+                       ORDER BY rates.min_nights DESC LIMIT 1), 1)) AS INTEGER), ?2
+            FROM Reservations r JOIN Rooms rm ON rm.id = r.room_id
+            WHERE r.status = 'CheckedIn' AND r.check_in < ?4
+        """,
+        "flag_no_shows": """
+            UPDATE Reservations SET status = 'Cancelled', no_show = 1
+            WHERE status = 'Reserved' AND check_in < ?
+        """,
+        # Payments is the source of truth for takings: every way of paying an order
+        # (POS, closing a table, checking out a stay) records a row for it
+        "roll_up_revenue": """
+            INSERT INTO DailyRevenue(day, room_charges_paise, order_sales_paise, room_payments_paise,
+                                     tax_paise, open_orders, no_shows, audited_at)
+            SELECT ?1,
+                   (SELECT COALESCE(SUM(amount_paise), 0) FROM RoomCharges WHERE night = ?1),
+                   COALESCE(SUM(CASE WHEN order_id IS NOT NULL THEN amount_paise END), 0),
+                   COALESCE(SUM(CASE WHEN reservation_id IS NOT NULL THEN amount_paise END), 0),
+                   COALESCE(SUM(gst_paise), 0),
+                   (SELECT COUNT(*) FROM Orders WHERE day <= ?1 AND status NOT IN ('Paid', 'Cancelled')),
+                   ?2, ?3
+            FROM Payments WHERE day = ?1
+            ON CONFLICT(day) DO UPDATE SET
+                room_charges_paise = excluded.room_charges_paise,
+                order_sales_paise = excluded.order_sales_paise,
+                room_payments_paise = excluded.room_payments_paise,
+                tax_paise = excluded.tax_paise,
+                open_orders = excluded.open_orders,
+                no_shows = no_shows + excluded.no_shows,
+                audited_at = excluded.audited_at
+        """,
+        "snapshot_occupancy": """
+            INSERT OR REPLACE INTO OccupancySnapshots(day, category, rooms, occupied, revenue_paise)
+            SELECT ?1, rm.category, COUNT(*), COUNT(held.room_id), COALESCE(SUM(held.amount), 0)
+            FROM Rooms rm
+            LEFT JOIN (
+                SELECT r.room_id, SUM(rc.amount_paise) AS amount
+                FROM RoomCharges rc JOIN Reservations r ON r.id = rc.reservation_id
+                WHERE rc.night = ?1
+                GROUP BY r.room_id
+            ) held ON held.room_id = rm.id
+            GROUP BY rm.category
+        """,
+        "revenue": """
+            SELECT day, room_charges_paise, order_sales_paise, room_payments_paise, tax_paise,
+                   open_orders, no_shows, audited_at
+            FROM DailyRevenue WHERE day = ?
+        """,
+        "occupancy": """
+            SELECT day, category, rooms, occupied, revenue_paise
+            FROM OccupancySnapshots WHERE day BETWEEN ?1 AND ?2 ORDER BY day, category
+        """,
+        "charges_for": "SELECT night, amount_paise FROM RoomCharges WHERE reservation_id = ? ORDER BY night",
+    }
+
+    def run(self, night: datetime.date, rates: Sequence[Tuple[str, int, float]], at: int) -> AuditResult:
+        """Close one business day in a single transaction.
+
+        Posts the night's room charge for every checked-in reservation,
+        cancels reservations due on or before the night that never checked
+        in (flagging them as no-shows), rolls up the day's revenue and
+        snapshots occupancy per room category. Order sales and room payments
+        are the Payments rows dated that day, so an order counts on the day
+        it was paid, not the day it was opened.
+
+        Args:
+            night: Business date being closed.
+            rates: (category, min_nights, factor) rate multipliers for the
+                night; the row with the largest min_nights not above the
+                stay's planned length applies.
+            at: Audit timestamp.
+
+        Returns:
+            Number of charges posted and reservations flagged as no-shows.
+        """
+        day = (night - datetime.date(1970, 1, 1)).days
+        next_day = (night + datetime.timedelta(days=1)).isoformat()
+        connection = self.db.connect()
+        with connection:
+            posted = self._execute("post_room_charges", (day, at, json.dumps(list(rates)), next_day),
+                                   connection=connection).rowcount
+            no_shows = self._execute("flag_no_shows", (next_day,), connection=connection).rowcount
+            self._execute("roll_up_revenue", (day, no_shows, at), connection=connection)
+            self._execute("snapshot_occupancy", (day,), connection=connection)
+        self.db.notify_changed("RoomCharges", "Reservations", "DailyRevenue", "OccupancySnapshots")
+        return AuditResult(day, posted, no_shows)
+
+    def revenue(self, day: int) -> Optional[DailyRevenue]:
+        """Roll-up of an audited day, if it was audited."""
+        return self._one("revenue", (day,), row=DailyRevenue)
+
+    def occupancy(self, first_day: int, last_day: Optional[int] = None) -> List[OccupancySnapshot]:
+        """Occupancy per room category at the end of each audited day in first_day..last_day."""
+        return self._all("occupancy", (first_day, first_day if last_day is None else last_day),
+                         row=OccupancySnapshot)
+
+    def charges_for(self, reservation_id: int) -> List[Tuple[int, int]]:
+        """(night, amount in paise) of every room charge posted to a reservation."""
+        return [tuple(row) for row in self._all("charges_for", (reservation_id,))]
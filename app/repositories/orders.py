@@ -0,0 +1,169 @@
+"""Order Repository - Statements on Orders and OrderDetails."""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.repositories.base import Repository
+from app.repositories.item_sales import ItemSalesRepo
+from app.repositories.recipes import RecipeRepo
+from app.services.tax_service import TaxService
+from app.utils.pagination import KeysetPager
+from app.utils.timestamps import now_timestamp
+
+# Orders still on the bill of their table or guest
+OPEN_STATUSES = ("Open", "InKitchen", "Served")
+
+
+class OrderSummary(NamedTuple):
+    """Order row of the billing list; amount in paise."""
+    id: int
+    items: int
+    amount_paise: int
+    status: str
+
+
+class CustomerOrder(NamedTuple):
+    """Order row of a customer's history with its lines as text."""
+    order_id: int
+    created_at: int
+    status: str
+    total_amount: int
+    items: Optional[str]
+
+
+class OrderLine(NamedTuple):
+    """One line of an order with the dish name; unit price in paise."""
+    name: str
+    qty: int
+    price_paise: int
+
+
+class OrderRepo(Repository):
+    """Restaurant orders and their lines."""
+
+    NAMESPACE = "orders"
+    SQL = {
+        "lines": """
+            SELECT mi.name, od.qty, od.price_paise
+            FROM OrderDetails od JOIN MenuItems mi ON od.item_id = mi.id
+            WHERE od.order_id = ?
+        """,
+        "subtotal": "SELECT COALESCE(SUM(qty * price_paise), 0) FROM OrderDetails WHERE order_id = ?",
+        "active_count": "SELECT COUNT(*) FROM Orders WHERE status IN ('Open', 'InKitchen', 'Served')",
+        "open_for_customer": "SELECT id FROM Orders WHERE customer_id = ? AND status NOT IN ('Paid', 'Cancelled') ORDER BY id",
+        "open_for_table": "SELECT id FROM Orders WHERE table_id = ? AND status NOT IN ('Paid', 'Cancelled') ORDER BY id",
+        "insert": "INSERT INTO Orders(table_id, customer_id, status, created_at) VALUES(?, ?, 'Open', ?)",
+        "insert_line": "INSERT INTO OrderDetails(order_id, item_id, qty, price_paise, kitchen_status) VALUES(?, ?, ?, ?, 'Pending')",
+        "set_status": "UPDATE Orders SET status = ? WHERE id = ?",
+        "close_for_table": "UPDATE Orders SET status = ? WHERE table_id = ? AND status NOT IN ('Paid', 'Cancelled')",
+        "set_table_status": "UPDATE Tables SET status = ? WHERE id = ?",
+    }
+
+    BILLING_LISTING = """
+        SELECT Orders.id AS id, COUNT(OrderDetails.id) AS items,
+               COALESCE(SUM(OrderDetails.qty*OrderDetails.price_paise),0) AS amount_paise, Orders.status AS status
+        FROM Orders LEFT JOIN OrderDetails ON Orders.id=OrderDetails.order_id
+    """
+    CUSTOMER_LISTING = """
+        SELECT o.id AS order_id, o.created_at AS created_at, o.status AS status,
+               COALESCE(SUM(od.qty * od.price_paise), 0) AS total_amount,
+               GROUP_CONCAT(mi.name || ' x' || od.qty, ', ') AS items
+        FROM Orders o
+        LEFT JOIN OrderDetails od ON od.order_id = o.id
+        LEFT JOIN MenuItems mi ON mi.id = od.item_id
+    """
+
+    def billing_pager(self) -> KeysetPager:
+        """Pager over all orders with their totals, newest first."""
+        return KeysetPager(self.db, self.BILLING_LISTING, [("Orders.id", "id")],
+                           group_by="Orders.id", page_size=20, row=OrderSummary)
+
+    def customer_pager(self) -> KeysetPager:
+        """Pager over order history, newest first; filter with for_customer()."""
+        return KeysetPager(self.db, self.CUSTOMER_LISTING, [("o.created_at", "created_at"), ("o.id", "order_id")],
+                           group_by="o.id", page_size=20, row=CustomerOrder)
+
+    def for_customer(self, pager: KeysetPager, customer_id: Optional[int]) -> None:
+        """Restart a pager from customer_pager() on one customer's orders."""
+        pager.reset("o.customer_id = ?", (customer_id,))
+        if not customer_id:
+            pager.has_more = False
+
+    def lines(self, order_id: int) -> List[OrderLine]:
+        """Lines of an order in entry order."""
+        return self._all("lines", (order_id,), row=OrderLine)
+
+    def subtotal(self, order_id: int) -> int:
+        """Sum of an order's lines in paise, before tax."""
+        return self._scalar("subtotal", (order_id,))
+
+    def active_count(self) -> int:
+        """Orders not yet paid or cancelled."""
+        return self._scalar("active_count")
+
+    def open_for_customer(self, customer_id: int) -> List[int]:
+        """Ids of a customer's unpaid orders."""
+        return [row[0] for row in self._all("open_for_customer", (customer_id,))]
+
+    def open_for_table(self, table_id: int) -> List[int]:
+        """Ids of a table's unpaid orders."""
+        return [row[0] for row in self._all("open_for_table", (table_id,))]
+
+    def create(self, table_id: Optional[int], customer_id: Optional[int], created_at: int,
+               lines: Sequence[Tuple[int, int, int]]) -> int:
+        """Create an open order with its lines.
+
+        Args:
+            table_id: Restaurant table, or None.
+            customer_id: Guest the order is charged to, or None.
+            created_at: Order timestamp.
+            lines: (menu item id, quantity, unit price in paise) per line.
+
+        Returns:
+            The order id.
+        """
+        connection = self.db.connect()
+        with connection:
+            order_id = self._execute("insert", (table_id, customer_id, created_at), connection=connection).lastrowid
+            connection.executemany(self._sql("insert_line"),
+                                   [(order_id, item_id, qty, price) for item_id, qty, price in lines])
+        self.db.notify_changed("Orders", "OrderDetails")
+        return order_id
+
+    def close_table(self, table_id: int, order_status: str, table_status: str,
+                    method: str = "Cash", tax_basis_points: int = 0) -> None:
+        """Set a table's unpaid orders to ``order_status`` and the table to ``table_status``.
+
+        Orders closed as Paid get a Payments row each, like the other ways
+        of paying, are added to the dish sales counters and have their
+        recipe stock taken out of Inventory if sending them to the kitchen
+        has not already done so.
+
+        Args:
+            table_id: Table being closed.
+            order_status: New status of its unpaid orders.
+            table_status: New status of the table.
+            method: Payment method when the orders are Paid.
+            tax_basis_points: Restaurant tax rate applied to each paid order.
+        """
+        depleted = 0
+        connection = self.db.connect()
+        with connection:
+            if order_status == "Paid":
+                recipes = RecipeRepo(self.db)
+                item_sales = ItemSalesRepo(self.db)
+                paid_at = now_timestamp()
+                for order_id in self.open_for_table(table_id):
+                    subtotal = self._execute("subtotal", (order_id,), connection=connection).fetchone()[0]
+                    if subtotal > 0:
+                        self._execute("payments.insert_for_order",
+                                      (order_id, subtotal, TaxService.apply_rate(subtotal, tax_basis_points),
+                                       method, paid_at), connection=connection)
+                    item_sales.record_order(order_id, paid_at, connection)
+                    depleted += recipes.deplete(order_id, paid_at, connection)
+            self._execute("close_for_table", (order_status, table_id), connection=connection)
+            self._execute("set_table_status", (table_status, table_id), connection=connection)
+        self.db.notify_changed("Orders", "Tables")
+        if order_status == "Paid":
+            self.db.notify_changed("Payments", "ItemSalesDaily")
+        if depleted:
+            self.db.notify_changed("Inventory", "InventoryConsumption")
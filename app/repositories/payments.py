@@ -0,0 +1,66 @@
+"""Payment Repository - Statements on the Payments table."""
+
+from typing import Dict, List, NamedTuple
+
+from app.repositories.base import Repository
+
+
+class RevenueTotals(NamedTuple):
+    """Takings of one day number or month key (YYYYMM); amounts in paise."""
+    period: int
+    orders_paise: int
+    rooms_paise: int
+    tax_paise: int
+    payments: int
+
+
+class PaymentRepo(Repository):
+    """Payments and the sales totals built from them (amounts in paise, tax included)."""
+
+    NAMESPACE = "payments"
+    SQL = {
+        "insert_for_order": "INSERT INTO Payments(order_id, amount_paise, gst_paise, method, paid_at) VALUES(?, ?, ?, ?, ?)",
+        "insert_for_reservation": (
+            "INSERT INTO Payments(reservation_id, amount_paise, gst_paise, method, paid_at) VALUES(?, ?, ?, ?, ?)"
+        ),
+        "sales_on_day": "SELECT COALESCE(SUM(amount_paise + gst_paise), 0) FROM Payments WHERE day = ?",
+        "sales_since_day": "SELECT COALESCE(SUM(amount_paise + gst_paise), 0) FROM Payments WHERE day >= ?",
+        "sales_in_month": "SELECT COALESCE(SUM(amount_paise + gst_paise), 0) FROM Payments WHERE month = ?",
+        "daily_sales_since": "SELECT day, SUM(amount_paise + gst_paise) FROM Payments WHERE day >= ? GROUP BY day",
+        "daily_totals": """
+            SELECT day, COALESCE(SUM(CASE WHEN order_id IS NOT NULL THEN amount_paise END), 0),
+                   COALESCE(SUM(CASE WHEN reservation_id IS NOT NULL THEN amount_paise END), 0),
+                   SUM(gst_paise), COUNT(*)
+            FROM AllPayments WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day
+        """,
+        "monthly_totals": """
+            SELECT month, COALESCE(SUM(CASE WHEN order_id IS NOT NULL THEN amount_paise END), 0),
+                   COALESCE(SUM(CASE WHEN reservation_id IS NOT NULL THEN amount_paise END), 0),
+                   SUM(gst_paise), COUNT(*)
+            FROM AllPayments WHERE day BETWEEN ? AND ? GROUP BY month ORDER BY month
+        """,
+    }
+
+    def sales_on_day(self, day: int) -> int:
+        """Takings on one day number."""
+        return self._scalar("sales_on_day", (day,))
+
+    def sales_since_day(self, day: int) -> int:
+        """Takings from a day number onwards."""
+        return self._scalar("sales_since_day", (day,))
+
+    def sales_in_month(self, month: int) -> int:
+        """Takings in a month key (YYYYMM)."""
+        return self._scalar("sales_in_month", (month,))
+
+    def daily_sales_since(self, day: int) -> Dict[int, int]:
+        """Takings per day number from a day onwards; days without sales are absent."""
+        return {day: total for day, total in self._all("daily_sales_since", (day,))}
+
+    def daily_totals(self, first_day: int, last_day: int) -> List[RevenueTotals]:
+        """Order, room and tax takings per day number in first_day..last_day."""
+        return self._all("daily_totals", (first_day, last_day), row=RevenueTotals)
+
+    def monthly_totals(self, first_day: int, last_day: int) -> List[RevenueTotals]:
+        """Order, room and tax takings per month key over the days first_day..last_day."""
+        return self._all("monthly_totals", (first_day, last_day), row=RevenueTotals)
@@ -0,0 +1,55 @@
+"""Rate Rule Repository - Statements on the RateRules table."""
+
+from typing import List, NamedTuple, Optional
+
+from app.repositories.base import Repository
+
+
+class RateRule(NamedTuple):
+    """Multiplier on room rates for the nights matching every condition set.
+
+    ``weekdays`` lists weekday numbers (0 = Monday) separated by commas and
+    ``min_occupancy`` is a fraction of the category's rooms.
+    """
+    id: int
+    name: str
+    category: Optional[str]
+    start_date: Optional[str]
+    end_date: Optional[str]
+    weekdays: Optional[str]
+    min_nights: int
+    min_occupancy: Optional[float]
+    multiplier: float
+
+
+class RateRuleRepo(Repository):
+    """Seasonal, weekday, length-of-stay and occupancy pricing rules."""
+
+    NAMESPACE = "rate_rules"
+    SQL = {
+        "all": """
+            SELECT id, name, category, start_date, end_date, weekdays, min_nights, min_occupancy, multiplier
+            FROM RateRules ORDER BY id
+        """,
+        "insert": """
+            INSERT INTO RateRules(name, category, start_date, end_date, weekdays, min_nights, min_occupancy, multiplier)
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        "delete": "DELETE FROM RateRules WHERE id = ?",
+    }
+
+    def all(self) -> List[RateRule]:
+        """All rules in the order they were added."""
+        return self._all("all", row=RateRule)
+
+    def add(self, name: str, multiplier: float, category: Optional[str] = None,
+            start_date: Optional[str] = None, end_date: Optional[str] = None,
+            weekdays: Optional[str] = None, min_nights: int = 1,
+            min_occupancy: Optional[float] = None) -> int:
+        """Create a rule and return its id; conditions left as None always hold."""
+        return self._write("insert", (name, category, start_date, end_date, weekdays, min_nights,
+                                      min_occupancy, multiplier), "RateRules").lastrowid
+
+    def delete(self, rule_id: int) -> None:
+        """Remove a rule."""
+        self._write("delete", (rule_id,), "RateRules")
@@ -0,0 +1,112 @@
+"""Recipe Repository - Statements on Recipes and stock depletion by order."""
+
+import sqlite3
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from app.repositories.base import Repository
+from app.utils.money import to_paise
+from app.utils.timestamps import format_timestamp
+
+# Stock each inventory item loses to one order: SUM(portions x recipe qty)
+ORDER_USAGE = """
+    SELECT r.inventory_id AS inventory_id, SUM(od.qty * r.qty) AS used
+    FROM OrderDetails od JOIN Recipes r ON r.menu_item_id = od.item_id
+    WHERE od.order_id = ?
+    GROUP BY r.inventory_id
+"""
+
+
+class RecipeLine(NamedTuple):
+    """One ingredient of a dish; qty per portion in the item's unit."""
+    inventory_id: int
+    name: str
+    qty: float
+    unit: str
+
+
+class RecipeRepo(Repository):
+    """Bill of materials of each dish and the stock taken out by orders."""
+
+    NAMESPACE = "recipes"
+    SQL = {
+        "for_item": """
+            SELECT r.inventory_id, i.name, r.qty, i.unit
+            FROM Recipes r JOIN Inventory i ON i.id = r.inventory_id
+            WHERE r.menu_item_id = ? ORDER BY i.name
+        """,
+        # Inventory prices are rupees per unit
+        "costs": """
+            SELECT r.menu_item_id, SUM(r.qty * i.price)
+            FROM Recipes r JOIN Inventory i ON i.id = r.inventory_id
+            GROUP BY r.menu_item_id
+        """,
+        "clear": "DELETE FROM Recipes WHERE menu_item_id = ?",
+        "insert": "INSERT INTO Recipes(menu_item_id, inventory_id, qty) VALUES(?, ?, ?)",
+        # Marks the order so a later send or payment does not deplete it again
+        "claim": "UPDATE Orders SET stock_depleted = 1 WHERE id = ? AND stock_depleted = 0",
+        "usage": f"""
+            SELECT u.inventory_id, u.used, i.price
+            FROM ({ORDER_USAGE}) u JOIN Inventory i ON i.id = u.inventory_id
+        """,
+        "deplete": f"""
+            UPDATE Inventory SET qty = qty - u.used
+            FROM ({ORDER_USAGE}) AS u
+            WHERE Inventory.id = u.inventory_id
+        """,
+        "insert_consumption": """
+            INSERT INTO InventoryConsumption(inventory_id, qty_consumed, consumption_date, price,
+                                             total_value, notes, created_at)
+            VALUES(?, ?, ?, ?, ?, ?, ?)
+        """,
+    }
+
+    def for_item(self, menu_item_id: int) -> List[RecipeLine]:
+        """Ingredients of a dish ordered by name."""
+        return self._all("for_item", (menu_item_id,), row=RecipeLine)
+
+    def costs(self) -> Dict[int, int]:
+        """Stock cost in paise of one portion of each dish that has a recipe."""
+        return {item_id: to_paise(cost) for item_id, cost in self._all("costs")}
+
+    def replace(self, menu_item_id: int, lines: Sequence[Tuple[int, float]]) -> None:
+        """Replace a dish's recipe.
+
+        Args:
+            menu_item_id: Dish the recipe belongs to.
+            lines: (inventory id, qty per portion) per ingredient.
+        """
+        connection = self.db.connect()
+        with connection:
+            self._execute("clear", (menu_item_id,), connection=connection)
+            connection.executemany(self._sql("insert"), [(menu_item_id, inv, qty) for inv, qty in lines])
+        self.db.notify_changed("Recipes")
+
+    def deplete(self, order_id: int, at: int, connection: sqlite3.Connection) -> int:
+        """Take an order's recipe stock out of Inventory and log the consumption.
+
+        Runs inside the caller's transaction. Inventory is updated by one
+        set-based statement over the order's lines and the consumption rows
+        are inserted in one executemany, however many lines the order has.
+        An order is only depleted once.
+
+        Args:
+            order_id: Order being sent to the kitchen or paid.
+            at: Timestamp recorded on the consumption rows.
+            connection: Connection with the open transaction.
+
+        Returns:
+            Number of inventory items changed; 0 if the order was already
+            depleted or none of its dishes has a recipe.
+        """
+        if not self._execute("claim", (order_id,), connection=connection).rowcount:
+            return 0
+        usage = self._execute("usage", (order_id,), connection=connection).fetchall()
+        if not usage:
+            return 0
+        self._execute("deplete", (order_id,), connection=connection)
+        on = format_timestamp(at, "%Y-%m-%d")
+        note = f"Order {order_id}"
+        connection.executemany(self._sql("insert_consumption"), [
+            (inventory_id, used, on, price, used * price, note, at) for inventory_id, used, price in usage
+        ])
+        return len(usage)
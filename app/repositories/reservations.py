@@ -0,0 +1,236 @@
+"""Reservation Repository - Statements on the Reservations table."""
+
+import datetime
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from app.repositories.base import Repository
+from app.repositories.item_sales import ItemSalesRepo
+from app.repositories.recipes import RecipeRepo
+from app.utils.pagination import KeysetPager
+
+
+class RoomUnavailable(ValueError):
+    """The room is already held by a Reserved or CheckedIn stay on some night of the booking."""
+
+
+class ReservationListing(NamedTuple):
+    """Reservation row of the hotel list."""
+    id: int
+    customer: str
+    room: str
+    check_in: str
+    check_out: Optional[str]
+
+
+class ActiveStay(NamedTuple):
+    """A checked-in reservation and its room."""
+    id: int
+    room_id: int
+
+
+class InHouseGuest(NamedTuple):
+    """A checked-in guest who can charge orders to their room."""
+    customer_id: int
+    name: str
+    room: str
+
+
+class CheckoutStay(NamedTuple):
+    """Everything the checkout bill shows about a reservation."""
+    id: int
+    customer_id: int
+    room_id: int
+    check_in: str
+    check_out: Optional[str]
+    status: str
+    customer_name: str
+    customer_phone: Optional[str]
+    customer_email: Optional[str]
+    room_number: str
+    room_rate: int
+
+
+class ReservationRepo(Repository):
+    """Room reservations and the stay lifecycle."""
+
+    NAMESPACE = "reservations"
+    SQL = {
+        "insert": "INSERT INTO Reservations(customer_id, room_id, check_in, check_out, status) VALUES(?, ?, ?, ?, ?)",
+        # Inserts nothing when an active stay of the room overlaps the new one; stays
+        # count as at least one night and open ones hold the room through tonight
+        "insert_if_free": """
+            INSERT INTO Reservations(customer_id, room_id, check_in, check_out, status)
+            SELECT ?1, ?2, ?3, ?4, ?5
+            WHERE NOT EXISTS (
+                SELECT 1 FROM Reservations
+                WHERE room_id = ?2 AND status IN ('Reserved', 'CheckedIn')
+                  AND date(check_in) < MAX(COALESCE(date(?4), ''), date(?3, '+1 day'))
+                  AND date(?3) < MAX(COALESCE(date(check_out), date('now', 'localtime', '+1 day')),
+                                     date(check_in, '+1 day'))
+            )
+        """,
+        "set_status": "UPDATE Reservations SET status = ? WHERE id = ?",
+        "check_out": "UPDATE Reservations SET status = 'CheckedOut', check_out = ? WHERE id = ?",
+        "set_room_status": "UPDATE Rooms SET status = ? WHERE id = (SELECT room_id FROM Reservations WHERE id = ?)",
+        "active_stay": """
+            SELECT id, room_id FROM Reservations
+            WHERE customer_id = ? AND status = 'CheckedIn' ORDER BY id DESC LIMIT 1
+        """,
+        "in_house_guests": """
+            SELECT c.id, c.name, rm.number
+            FROM Customers c
+            JOIN Reservations r ON r.customer_id = c.id AND r.status = 'CheckedIn'
+            JOIN Rooms rm ON rm.id = r.room_id
+            ORDER BY rm.number
+        """,
+        "checkout_stay": """
+            SELECT r.id, r.customer_id, r.room_id, r.check_in, r.check_out, r.status,
+                   c.name, c.phone, c.email, rm.number, rm.rate_paise
+            FROM Reservations r JOIN Customers c ON r.customer_id = c.id JOIN Rooms rm ON r.room_id = rm.id
+            WHERE r.id = ?
+        """,
+    }
+
+    LISTING = """
+        SELECT Reservations.id AS id, Customers.name AS customer, Rooms.number AS room,
+               Reservations.check_in AS check_in, Reservations.check_out AS check_out
+        FROM Reservations JOIN Customers ON Reservations.customer_id=Customers.id JOIN Rooms ON Reservations.room_id=Rooms.id
+    """
+    SEARCH = "Customers.name LIKE ? OR Rooms.number LIKE ?"
+
+    def pager(self) -> KeysetPager:
+        """Pager over all reservations, newest first."""
+        return KeysetPager(self.db, self.LISTING, [("Reservations.id", "id")], row=ReservationListing)
+
+    def search(self, pager: KeysetPager, term: str) -> None:
+        """Restart a pager from pager() filtered by guest name or room number."""
+        if term:
+            like = f"%{term}%"
+            pager.reset(self.SEARCH, (like, like))
+        else:
+            pager.reset()
+
+    def active_stay(self, customer_id: int) -> Optional[ActiveStay]:
+        """The customer's latest checked-in reservation, or None."""
+        return self._one("active_stay", (customer_id,), row=ActiveStay)
+
+    def in_house_guests(self) -> List[InHouseGuest]:
+        """Checked-in guests ordered by room number."""
+        return self._all("in_house_guests", row=InHouseGuest)
+
+    def checkout_stay(self, reservation_id: int) -> Optional[CheckoutStay]:
+        """Reservation, guest and room details for the checkout bill."""
+        return self._one("checkout_stay", (reservation_id,), row=CheckoutStay)
+
+    def _insert_if_free(self, connection, customer_id: int, room_id: int, check_in: str, check_out: str,
+                        status: str) -> int:
+        """Insert a reservation unless it overlaps an active stay of the room.
+
+        The availability index the screens check first is only as fresh as
+        the last change this terminal heard of, so the database has the
+        final say inside the booking's transaction.
+
+        Raises:
+            RoomUnavailable: If the room is taken on some night of the stay.
+        """
+        cursor = self._execute("insert_if_free", (customer_id, room_id, check_in, check_out, status),
+                               connection=connection)
+        if cursor.rowcount != 1:
+            raise RoomUnavailable(f"Room {room_id} is already booked between {check_in} and {check_out}")
+        return cursor.lastrowid
+
+    def book_for_new_guest(self, guest_name: str, room_id: int, check_in: str, check_out: str) -> int:
+        """Create a guest and a Reserved booking for them in one transaction.
+
+        Returns:
+            The reservation id.
+
+        Raises:
+            RoomUnavailable: If the room is taken on some night of the stay;
+                nothing is written.
+        """
+        connection = self.db.connect()
+        try:
+            with connection:
+                customer_id = self._execute("customers.insert", (guest_name, None, None),
+                                            connection=connection).lastrowid
+                reservation_id = self._insert_if_free(connection, customer_id, room_id, check_in, check_out,
+                                                      "Reserved")
+        except RoomUnavailable:
+            # Whoever checked availability was out of date
+            self.db.notify_changed("Reservations")
+            raise
+        self.db.notify_changed("Customers", "Reservations")
+        return reservation_id
+
+    def walk_in(self, customer_id: int, room_id: int, check_in: str, check_out: str) -> int:
+        """Check a guest straight into a room.
+
+        Returns:
+            The reservation id.
+
+        Raises:
+            RoomUnavailable: If the room is taken on some night of the stay.
+        """
+        connection = self.db.connect()
+        try:
+            with connection:
+                reservation_id = self._insert_if_free(connection, customer_id, room_id, check_in, check_out,
+                                                      "CheckedIn")
+                self._execute("rooms.set_status", ("Occupied", room_id), connection=connection)
+        except RoomUnavailable:
+            self.db.notify_changed("Reservations")
+            raise
+        self.db.notify_changed("Reservations", "Rooms")
+        return reservation_id
+
+    def check_in(self, reservation_id: int) -> None:
+        """Mark a reservation checked in and its room occupied."""
+        connection = self.db.connect()
+        with connection:
+            self._execute("set_status", ("CheckedIn", reservation_id), connection=connection)
+            self._execute("set_room_status", ("Occupied", reservation_id), connection=connection)
+        self.db.notify_changed("Reservations", "Rooms")
+
+    def check_out(self, reservation_id: int, room_status: str = "Cleaning",
+                  on: Optional[datetime.date] = None) -> None:
+        """Close a stay today (or ``on``) and set its room's status."""
+        connection = self.db.connect()
+        with connection:
+            self._execute("check_out", ((on or datetime.date.today()).isoformat(), reservation_id),
+                          connection=connection)
+            self._execute("set_room_status", (room_status, reservation_id), connection=connection)
+        self.db.notify_changed("Reservations", "Rooms")
+
+    def settle_checkout(self, reservation_id: int, order_charges: Sequence[Tuple[int, int, int]],
+                        room_total: int, room_gst: int, paid_at: int, on: datetime.date) -> None:
+        """Pay a stay's open orders and room charge, check out and free the room.
+
+        Args:
+            reservation_id: Reservation being checked out.
+            order_charges: (order id, amount, tax) in paise per unpaid order.
+            room_total: Room charge in paise.
+            room_gst: Tax on the room charge in paise.
+            paid_at: Payment timestamp.
+            on: Check-out date.
+        """
+        recipes = RecipeRepo(self.db)
+        item_sales = ItemSalesRepo(self.db)
+        depleted = 0
+        connection = self.db.connect()
+        with connection:
+            for order_id, amount, gst in order_charges:
+                if amount <= 0:
+                    continue
+                self._execute("payments.insert_for_order", (order_id, amount, gst, "Cash", paid_at), connection=connection)
+                self._execute("orders.set_status", ("Paid", order_id), connection=connection)
+                item_sales.record_order(order_id, paid_at, connection)
+                depleted += recipes.deplete(order_id, paid_at, connection)
+            if room_total > 0:
+                self._execute("payments.insert_for_reservation", (reservation_id, room_total, room_gst, "Cash", paid_at),
+                              connection=connection)
+            self._execute("check_out", (on.isoformat(), reservation_id), connection=connection)
+            self._execute("set_room_status", ("Available", reservation_id), connection=connection)
+        self.db.notify_changed("Payments", "Orders", "ItemSalesDaily", "Reservations", "Rooms")
+        if depleted:
+            self.db.notify_changed("Inventory", "InventoryConsumption")
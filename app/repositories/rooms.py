@@ -0,0 +1,59 @@
+"""Room Repository - Statements on the Rooms table."""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+from app.repositories.base import Repository
+
+
+class Room(NamedTuple):
+    """One hotel room; rate in paise per night."""
+    id: int
+    number: str
+    category: str
+    status: str
+    rate_paise: int
+
+
+class RoomRepo(Repository):
+    """Hotel rooms and their housekeeping status."""
+
+    NAMESPACE = "rooms"
+    SQL = {
+        "all": "SELECT id, number, category, status, rate_paise FROM Rooms ORDER BY number",
+        "by_status": "SELECT id, number, category, status, rate_paise FROM Rooms WHERE status = ? ORDER BY number",
+        "by_number": "SELECT id, number, category, status, rate_paise FROM Rooms WHERE number = ?",
+        "occupancy": "SELECT COUNT(*), COALESCE(SUM(status = 'Occupied'), 0) FROM Rooms",
+        "insert": "INSERT INTO Rooms(number, category, status, rate_paise) VALUES(?, ?, ?, ?)",
+        "update": "UPDATE Rooms SET category = ?, status = ?, rate_paise = ? WHERE number = ?",
+        "delete": "DELETE FROM Rooms WHERE number = ?",
+        "set_status": "UPDATE Rooms SET status = ? WHERE id = ?",
+    }
+
+    def all(self) -> List[Room]:
+        """All rooms ordered by number."""
+        return self._all("all", row=Room)
+
+    def with_status(self, status: str) -> List[Room]:
+        """Rooms in one housekeeping status, ordered by number."""
+        return self._all("by_status", (status,), row=Room)
+
+    def by_number(self, number: str) -> Optional[Room]:
+        """The room with a room number, or None."""
+        return self._one("by_number", (str(number),), row=Room)
+
+    def occupancy(self) -> Tuple[int, int]:
+        """Return (total rooms, occupied rooms)."""
+        total, occupied = self._one("occupancy")
+        return total, occupied
+
+    def add(self, number: str, category: str, status: str, rate_paise: int) -> None:
+        """Create a room."""
+        self._write("insert", (number, category, status, rate_paise), "Rooms")
+
+    def update(self, number: str, category: str, status: str, rate_paise: int) -> None:
+        """Change a room's category, status and rate."""
+        self._write("update", (category, status, rate_paise, number), "Rooms")
+
+    def delete(self, number: str) -> None:
+        """Remove a room and, by cascade, its reservations with their payments and charges."""
+        self._write("delete", (number,), "Rooms", "Reservations", "Payments", "RoomCharges")
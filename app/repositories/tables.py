@@ -0,0 +1,50 @@
+"""Table Repository - Statements on the restaurant Tables table."""
+
+from typing import List, NamedTuple, Optional
+
+from app.repositories.base import Repository
+
+
+class DiningTable(NamedTuple):
+    """One restaurant table."""
+    id: int
+    number: int
+    status: str
+
+
+class TableRepo(Repository):
+    """Restaurant tables and their service status."""
+
+    NAMESPACE = "tables"
+    SQL = {
+        "all": "SELECT id, number, status FROM Tables ORDER BY number",
+        "by_number": "SELECT id, number, status FROM Tables WHERE number = ?",
+        "number_of": "SELECT number FROM Tables WHERE id = ?",
+        "insert_next": "INSERT INTO Tables(number, status) SELECT COALESCE(MAX(number), 0) + 1, 'Available' FROM Tables",
+        "set_status": "UPDATE Tables SET status = ? WHERE id = ?",
+    }
+
+    def all(self) -> List[DiningTable]:
+        """All tables ordered by number."""
+        return self._all("all", row=DiningTable)
+
+    def by_number(self, number: int) -> Optional[DiningTable]:
+        """The table with a table number, or None."""
+        return self._one("by_number", (number,), row=DiningTable)
+
+    def number_of(self, table_id: int) -> Optional[int]:
+        """Table number of a table id, or None."""
+        return self._scalar("number_of", (table_id,))
+
+    def add_next(self) -> int:
+        """Create an Available table numbered after the highest one.
+
+        Returns:
+            The new table's number.
+        """
+        table_id = self._write("insert_next", (), "Tables").lastrowid
+        return self.number_of(table_id)
+
+    def set_status(self, table_id: int, status: str) -> None:
+        """Set a table's service status."""
+        self._write("set_status", (status, table_id), "Tables")
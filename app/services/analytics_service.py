@@ -0,0 +1,447 @@
+"""Analytics Service - In-memory columnar analytics over payments, orders and stays.
+
+Payments, orders, order lines and reservations are loaded once into compact
+NumPy columns and then topped up incrementally by primary key, so switching
+reports or changing a date range only runs vectorized computations over the
+cached arrays instead of issuing SQL. Small catalogs (rooms, menu items,
+customers) are reloaded whenever the database reports them as changed.
+History is read through the All<Table> views, so orders and stays moved to
+the archive database still count.
+"""
+
+import datetime
+import json
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from app.repositories.customers import Customer, CustomerRepo
+from app.repositories.menu import MenuItem, MenuRepo
+from app.repositories.recipes import RecipeRepo
+from app.repositories.rooms import Room, RoomRepo
+from app.services.occupancy_service import Occupancy, compute_occupancy
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# SQL expression turning an ISO date column (reservation dates) into days since 1970-01-01
+DAY_SQL = "CAST(julianday(date({0})) - 2440587.5 AS INTEGER)"
+
+RESERVATION_STATUSES = ("Reserved", "CheckedIn", "CheckedOut", "Cancelled")
+ORDER_STATUSES = ("Open", "InKitchen", "Served", "Paid", "Cancelled")
+PAID = ORDER_STATUSES.index("Paid")
+
+# Menu engineering: a dish is popular when its share of portions sold is at
+# least this fraction of an equal share (1 / number of dishes)
+POPULARITY_FACTOR = 0.7
+
+# Menu engineering class by (popular, above-average margin)
+MENU_CLASSES = {(True, True): "Star", (True, False): "Plowhorse", (False, True): "Puzzle", (False, False): "Dog"}
+
+# Stand-in for reservations whose customer row is gone
+UNKNOWN_CUSTOMER = Customer(None, "", "", "", "", "")
+
+
+def day_number(value: datetime.date) -> int:
+    """Return the number of days between 1970-01-01 and value."""
+    return (value - EPOCH).days
+
+
+def day_date(number: int) -> datetime.date:
+    """Return the date for a day number produced by day_number()."""
+    return EPOCH + datetime.timedelta(days=int(number))
+
+
+class ColumnStore:
+    """A growable set of equally long, typed NumPy columns.
+
+    Capacity doubles as rows are appended, so incremental loads cost time
+    proportional to the new rows only."""
+
+    def __init__(self, dtypes: Dict[str, Any]) -> None:
+        """Initialize an empty store.
+
+        Args:
+            dtypes: Ordered mapping of column name to NumPy dtype. Rows passed
+                to append() must list values in the same order.
+        """
+        self._dtypes = dtypes
+        self._data = {name: np.empty(0, dtype) for name, dtype in dtypes.items()}
+        self.size = 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._data[name][:self.size]
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def max_id(self) -> int:
+        """Largest value of the ``id`` column, or 0 when empty."""
+        return int(self._data["id"][self.size - 1]) if self.size else 0
+
+    def clear(self) -> None:
+        """Drop all rows, keeping the allocated capacity."""
+        self.size = 0
+
+    def append(self, rows: List[tuple]) -> None:
+        """Append rows given as tuples in column order.
+
+        Args:
+            rows: Row tuples; NULLs must already be replaced in SQL.
+        """
+        count = len(rows)
+        if not count:
+            return
+        needed = self.size + count
+        capacity = len(self._data["id"])
+        if needed > capacity:
+            capacity = max(needed, capacity * 2, 1024)
+            for name, column in self._data.items():
+                grown = np.empty(capacity, column.dtype)
+                grown[:self.size] = column[:self.size]
+                self._data[name] = grown
+        for (name, dtype), values in zip(self._dtypes.items(), zip(*rows)):
+            self._data[name][self.size:needed] = np.fromiter(values, dtype, count)
+        self.size = needed
+
+
+class AnalyticsService:
+    """Serves report figures from cached columnar copies of the database."""
+
+    def __init__(self, db) -> None:
+        """Initialize analytics service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.payments = ColumnStore({
+            "id": np.int64, "day": np.int32, "order_id": np.int64,
+            "reservation_id": np.int64, "amount_paise": np.int64, "gst_paise": np.int64,
+        })
+        self.orders = ColumnStore({"id": np.int64, "day": np.int32, "status": np.int8})
+        self.lines = ColumnStore({
+            "id": np.int64, "order_id": np.int64, "item_id": np.int32,
+            "qty": np.int32, "price_paise": np.int64, "day": np.int32,
+        })
+        self.reservations = ColumnStore({
+            "id": np.int64, "customer_id": np.int64, "room_id": np.int32,
+            "check_in": np.int32, "check_out": np.int32, "status": np.int8,
+        })
+        self.rooms: Dict[int, Room] = {}
+        self.menu_items: Dict[int, MenuItem] = {}
+        self.customers: Dict[int, Customer] = {}
+        self.recipe_costs: Dict[int, int] = {}
+        self._engineering: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._dirty: Set[str] = {"Rooms", "MenuItems", "Customers", "Recipes"}
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Mark cached tables as stale; they are reloaded on the next refresh().
+
+        Reservations are updated in place (status and check-out), so they
+        are reloaded in full when reported as changed. Orders only change
+        status until they are paid or cancelled, so the statuses of the
+        cached orders still open are re-read. Other tables are append-only
+        and keep loading by max id.
+
+        Args:
+            tables: Names of changed tables.
+        """
+        self._dirty.update(tables)
+
+    def refresh(self) -> None:
+        """Load rows added since the last refresh and any stale catalogs."""
+        cur = self.db.connect().cursor()
+        cur.row_factory = None
+        sizes = (len(self.payments), len(self.lines))
+        paid_orders = int(np.count_nonzero(self.orders["status"] == PAID))
+        if "Reservations" in self._dirty:
+            self.reservations.clear()
+        self.payments.append(cur.execute(
+            "SELECT id, day, COALESCE(order_id,0), COALESCE(reservation_id,0), "
+            "amount_paise, gst_paise FROM AllPayments WHERE id > ? ORDER BY id", (self.payments.max_id,)).fetchall())
+        order_case = "CASE status " + " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(ORDER_STATUSES)) + " END"
+        if "Orders" in self._dirty and len(self.orders):
+            # Open orders live in the main file; closed ones never change again
+            ids, status = self.orders["id"], self.orders["status"]
+            open_ids = ids[status < PAID]
+            if len(open_ids):
+                changed = cur.execute(f"SELECT id, {order_case} FROM Orders "
+                                      "WHERE id IN (SELECT value FROM json_each(?))",
+                                      (json.dumps(open_ids.tolist()),)).fetchall()
+                if changed:
+                    changed_ids, changed_status = np.array(changed, dtype=np.int64).T
+                    positions = np.searchsorted(ids, changed_ids)
+                    status[positions] = changed_status
+        self.orders.append(cur.execute(
+            f"SELECT id, day, {order_case} FROM AllOrders WHERE id > ? ORDER BY id",
+            (self.orders.max_id,)).fetchall())
+        self.lines.append(cur.execute(
+            "SELECT od.id, od.order_id, od.item_id, od.qty, od.price_paise, o.day "
+            "FROM AllOrderDetails od JOIN AllOrders o ON o.id = od.order_id WHERE od.id > ? ORDER BY od.id",
+            (self.lines.max_id,)).fetchall())
+        status_case = " ".join(f"WHEN '{s}' THEN {i}" for i, s in enumerate(RESERVATION_STATUSES))
+        self.reservations.append(cur.execute(
+            f"SELECT id, customer_id, room_id, {DAY_SQL.format('check_in')}, "
+            f"COALESCE({DAY_SQL.format('check_out')}, -1), CASE status {status_case} END "
+            "FROM AllReservations WHERE id > ? ORDER BY id", (self.reservations.max_id,)).fetchall())
+
+        # Catalogs referenced by new rows but not cached yet are stale too
+        if len(self.lines) and int(self.lines["item_id"].max()) not in self.menu_items:
+            self._dirty.add("MenuItems")
+        if len(self.reservations) and (int(self.reservations["room_id"].max()) not in self.rooms
+                                       or int(self.reservations["customer_id"].max()) not in self.customers):
+            self._dirty.update(("Rooms", "Customers"))
+        if "Rooms" in self._dirty:
+            self.rooms = {room.id: room for room in RoomRepo(self.db).all()}
+        if "MenuItems" in self._dirty:
+            self.menu_items = {item.id: item for item in MenuRepo(self.db).search()}
+        if "Customers" in self._dirty:
+            self.customers = {customer.id: customer for customer in CustomerRepo(self.db).all()}
+        # Recipe costs follow both the recipes and the stock prices
+        if {"Recipes", "Inventory"} & self._dirty:
+            self.recipe_costs = RecipeRepo(self.db).costs()
+        if (sizes != (len(self.payments), len(self.lines))
+                or paid_orders != int(np.count_nonzero(self.orders["status"] == PAID))
+                or {"MenuItems", "Recipes", "Inventory"} & self._dirty):
+            self._engineering.clear()
+        self._dirty.clear()
+
+    # ---- restaurant ----
+
+    def _paid_lines(self, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """Boolean mask of order lines on paid orders created within [start, end]."""
+        lines = self.lines
+        ids = self.orders["id"]
+        if not len(ids):
+            return np.zeros(len(lines), bool)
+        # Orders are cached in id order; a line whose order is not cached yet is not paid
+        positions = np.minimum(np.searchsorted(ids, lines["order_id"]), len(ids) - 1)
+        return ((lines["day"] >= day_number(start)) & (lines["day"] <= day_number(end))
+                & (ids[positions] == lines["order_id"]) & (self.orders["status"][positions] == PAID))
+
+    def category_revenue(self, day: datetime.date) -> List[Tuple[str, int]]:
+        """Revenue of paid order lines per menu category for one day.
+
+        Args:
+            day: Day the orders were created.
+
+        Returns:
+            List of (category, amount in paise) pairs.
+        """
+        mask = self._paid_lines(day, day)
+        if not mask.any():
+            return []
+        item_ids = self.lines["item_id"][mask]
+        amounts = self.lines["qty"][mask] * self.lines["price_paise"][mask]
+        categories = np.array([self.menu_items[i].category if i in self.menu_items else "Uncategorized"
+                               for i in item_ids.tolist()])
+        names, index = np.unique(categories, return_inverse=True)
+        totals = np.bincount(index, weights=amounts).astype(np.int64)
+        return list(zip(names.tolist(), totals.tolist()))
+
+    def orders_per_day(self, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """Number of orders created on each day from start to end inclusive."""
+        first, days = day_number(start), (end - start).days + 1
+        offsets = self.orders["day"] - first
+        offsets = offsets[(offsets >= 0) & (offsets < days)]
+        return np.bincount(offsets, minlength=days)
+
+    def order_revenue_per_day(self, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """Revenue in paise of paid order lines for each day from start to end inclusive."""
+        mask = self._paid_lines(start, end)
+        offsets = self.lines["day"][mask] - day_number(start)
+        amounts = self.lines["qty"][mask] * self.lines["price_paise"][mask]
+        return np.bincount(offsets, weights=amounts, minlength=(end - start).days + 1).astype(np.int64)
+
+    def payment_revenue_per_day(self, start: datetime.date, end: datetime.date) -> np.ndarray:
+        """Collected paise including GST for each day from start to end inclusive."""
+        first, days = day_number(start), (end - start).days + 1
+        offsets = self.payments["day"] - first
+        mask = (offsets >= 0) & (offsets < days)
+        totals = self.payments["amount_paise"][mask] + self.payments["gst_paise"][mask]
+        return np.bincount(offsets[mask], weights=totals, minlength=days).astype(np.int64)
+
+    def top_dishes(self, start: datetime.date, end: datetime.date,
+                   limit: int = 100) -> List[Tuple[str, int]]:
+        """Most ordered dishes on paid orders in a date range.
+
+        Returns:
+            List of (dish name, quantity) pairs, most ordered first.
+        """
+        mask = self._paid_lines(start, end)
+        if not mask.any():
+            return []
+        totals = np.bincount(self.lines["item_id"][mask], weights=self.lines["qty"][mask])
+        ranked = np.argsort(totals, kind="stable")[::-1][:limit]
+        ranked = ranked[totals[ranked] > 0]
+        return [(self.menu_items[i].name if i in self.menu_items else f"Item {i}", int(totals[i]))
+                for i in ranked.tolist()]
+
+    def menu_engineering(self, start: datetime.date, end: datetime.date) -> Dict[str, Any]:
+        """Popularity and contribution margin of each dish over a date range.
+
+        Dishes on the menu or sold on paid orders created within the range
+        are classified as Star, Plowhorse, Puzzle or Dog. A dish is popular
+        when its menu mix reaches POPULARITY_FACTOR of an equal share, and
+        profitable when its margin reaches the average margin per portion
+        sold. Margins use the average price actually charged (the menu price
+        if unsold) less the stock cost of its recipe. Results are cached per
+        range until new lines are loaded or menu, recipes or stock prices
+        change.
+
+        Returns:
+            Dictionary with ``dishes`` (one dictionary per dish, highest
+            total margin first), ``average_margin`` and ``popularity_threshold``
+            (menu mix fraction). Amounts are in paise.
+        """
+        key = (day_number(start), day_number(end))
+        if key in self._engineering:
+            return self._engineering[key]
+        mask = self._paid_lines(start, end)
+        item_ids = self.lines["item_id"][mask]
+        qty = self.lines["qty"][mask]
+        menu_ids = np.array([i for i, item in self.menu_items.items() if item.active], dtype=np.int64)
+        size = int(max(menu_ids.max(initial=0), item_ids.max(initial=0))) + 1
+        sold = np.bincount(item_ids, weights=qty, minlength=size)
+        revenue = np.bincount(item_ids, weights=qty * self.lines["price_paise"][mask], minlength=size)
+        dishes = np.union1d(menu_ids, np.flatnonzero(sold))
+
+        menu_price = np.zeros(size)
+        cost = np.zeros(size)
+        for i in dishes.tolist():
+            item = self.menu_items.get(i)
+            menu_price[i] = item.price_paise if item else 0
+            cost[i] = self.recipe_costs.get(i, 0)
+        sold, revenue, menu_price, cost = sold[dishes], revenue[dishes], menu_price[dishes], cost[dishes]
+        price = np.where(sold > 0, revenue / np.maximum(sold, 1), menu_price)
+        margin = price - cost
+        total_sold = sold.sum()
+        mix = sold / total_sold if total_sold else np.zeros(len(dishes))
+        threshold = POPULARITY_FACTOR / len(dishes) if len(dishes) else 0.0
+        average_margin = float((margin * sold).sum() / total_sold) if total_sold else 0.0
+        popular = mix >= threshold
+        profitable = margin >= average_margin
+
+        rows = []
+        for index in np.argsort(-(margin * sold), kind="stable").tolist():
+            i = int(dishes[index])
+            item = self.menu_items.get(i)
+            rows.append({
+                "item_id": i, "name": item.name if item else f"Item {i}",
+                "category": item.category if item else "",
+                "sold": int(sold[index]), "mix": float(mix[index]),
+                "price": round(price[index]), "cost": round(cost[index]), "margin": round(margin[index]),
+                "total_margin": round(margin[index] * sold[index]),
+                "class": MENU_CLASSES[(bool(popular[index]), bool(profitable[index]))],
+            })
+        result = {"dishes": rows, "average_margin": round(average_margin), "popularity_threshold": threshold}
+        self._engineering[key] = result
+        return result
+
+    # ---- hotel ----
+
+    def occupancy(self, start: datetime.date, end: datetime.date) -> Occupancy:
+        """Occupied nights per room (in self.rooms order) and per day of a range.
+
+        Cancelled stays are ignored; stays still open count through tonight.
+        """
+        res = self.reservations
+        room_ids = np.array(list(self.rooms.keys()), dtype=np.int64)
+        dense = np.full(int(max(room_ids.max(initial=0), res["room_id"].max(initial=0))) + 1, -1, np.int64)
+        dense[room_ids] = np.arange(len(room_ids))
+        check_out = np.where(res["check_out"] >= 0, res["check_out"], day_number(datetime.date.today()) + 1)
+        index = dense[res["room_id"]]
+        keep = (index >= 0) & (res["status"] != RESERVATION_STATUSES.index("Cancelled"))
+        return compute_occupancy(index[keep], res["check_in"][keep], check_out[keep],
+                                 day_number(start), day_number(end), len(room_ids))
+
+    def room_report(self, start: datetime.date, end: datetime.date) -> Dict[str, Any]:
+        """Per-room reservations, revenue and occupancy plus hotel KPIs.
+
+        Reservations and payment revenue count stays checking in within the
+        range; occupancy counts nights actually occupied within the range.
+
+        Returns:
+            Dictionary with a ``rooms`` list of per-room dictionaries and
+            ``occupancy``, ``adr`` and ``revpar`` totals, plus
+            ``daily_occupancy`` with the occupancy percentage of each day.
+            Revenue, ADR and RevPAR are in paise.
+        """
+        res = self.reservations
+        days = (end - start).days + 1
+        room_ids = np.array(list(self.rooms.keys()), dtype=np.int64)
+        size = int(max(room_ids.max(initial=0), res["room_id"].max(initial=0))) + 1
+        rates = np.zeros(size, dtype=np.int64)
+        rates[room_ids] = [self.rooms[i].rate_paise or 0 for i in room_ids.tolist()]
+
+        in_range = (res["check_in"] >= day_number(start)) & (res["check_in"] <= day_number(end))
+        counts = np.bincount(res["room_id"][in_range], minlength=size)
+
+        # Map payment reservation ids onto rooms through a dense id lookup
+        revenue = np.zeros(size, dtype=np.int64)
+        pay_res = self.payments["reservation_id"]
+        if len(res) and (pay_res > 0).any():
+            lookup = np.full(int(max(res["id"].max(), pay_res.max())) + 1, -1, dtype=np.int64)
+            lookup[res["id"][in_range]] = res["room_id"][in_range]
+            rooms_of_payments = lookup[pay_res]
+            paid = rooms_of_payments >= 0
+            totals = self.payments["amount_paise"] + self.payments["gst_paise"]
+            revenue = np.bincount(rooms_of_payments[paid], weights=totals[paid], minlength=size).astype(np.int64)
+
+        occupancy = self.occupancy(start, end)
+        sold = float(occupancy.total)
+        room_revenue = int((occupancy.per_room * rates[room_ids]).sum())
+        available = len(room_ids) * days
+        rooms = [{
+            "number": self.rooms[i].number, "category": self.rooms[i].category, "status": self.rooms[i].status,
+            "reservations": int(counts[i]), "revenue": int(revenue[i]),
+            "occupancy": float(nights) * 100 / days if days > 0 else 0.0,
+        } for i, nights in zip(room_ids.tolist(), occupancy.per_room.tolist())]
+        return {
+            "rooms": rooms,
+            "reservations": int(counts[room_ids].sum()),
+            "revenue": int(revenue[room_ids].sum()),
+            "occupancy": sold * 100 / available if available else 0.0,
+            "adr": round(room_revenue / sold) if sold else 0,
+            "revpar": round(room_revenue / available) if available else 0,
+            "daily_occupancy": occupancy.per_day * 100 / max(len(room_ids), 1),
+        }
+
+    def guest_stays(self, start: datetime.date, end: datetime.date) -> Dict[str, Any]:
+        """Checked-in and checked-out stays starting within a date range.
+
+        Returns:
+            Dictionary with ``guests`` rows (newest check-in first), the
+            number of document-verified guests and the average stay length.
+        """
+        res = self.reservations
+        status = res["status"]
+        mask = ((status == RESERVATION_STATUSES.index("CheckedIn"))
+                | (status == RESERVATION_STATUSES.index("CheckedOut")))
+        mask &= (res["check_in"] >= day_number(start)) & (res["check_in"] <= day_number(end))
+        index = np.flatnonzero(mask)
+        index = index[np.argsort(res["check_in"][index], kind="stable")[::-1]]
+        check_out = res["check_out"][index]
+        stay = np.where(check_out >= 0, check_out, day_number(datetime.date.today())) - res["check_in"][index]
+
+        guests = []
+        verified = 0
+        for i, ci, co in zip(index.tolist(), res["check_in"][index].tolist(), check_out.tolist()):
+            customer = self.customers.get(int(res["customer_id"][i]), UNKNOWN_CUSTOMER)
+            room = self.rooms.get(int(res["room_id"][i]))
+            if customer.document_type and customer.document_number:
+                verified += 1
+            guests.append({
+                "name": customer.name, "phone": customer.phone, "email": customer.email,
+                "document_type": customer.document_type, "document_number": customer.document_number,
+                "check_in": day_date(ci).isoformat(),
+                "check_out": day_date(co).isoformat() if co >= 0 else "",
+                "room_number": room.number if room else "",
+            })
+        return {
+            "guests": guests,
+            "verified": verified,
+            "average_stay": float(stay.mean()) if len(stay) else 0.0,
+        }
@@ -0,0 +1,162 @@
+"""Archive Service - Moves closed orders and stays out of the live database file.
+
+Paid and cancelled orders, and checked-out or cancelled reservations, stop
+changing once they are a few months old but keep growing the tables and
+indexes every screen reads. ``archive`` moves them, with their order lines,
+payments and room charges, into a second SQLite file next to the live one
+(``hotel_restaurant_archive.db``) with the same tables and indexes. The
+archive is ATTACHed to every connection (see app.core.database), and history
+reports read the ``All<Table>`` views that UNION ALL both files, so totals
+are the same before and after a move while the live file stays small.
+"""
+
+import datetime
+import logging
+import re
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from app.core.database import ARCHIVE_TABLES, attach_archive
+
+# Months a closed order or stay stays in the live file by default
+ARCHIVE_AFTER_MONTHS = 12
+
+# Foreign keys cannot point across files; archived rows keep their ids
+FOREIGN_KEY_RE = re.compile(
+    r",\s*FOREIGN KEY\s*\([^)]*\)\s*REFERENCES\s+\w+\s*\([^)]*\)"
+    r"(?:\s+ON\s+(?:DELETE|UPDATE)\s+(?:CASCADE|RESTRICT|NO ACTION|SET NULL|SET DEFAULT))*",
+    re.IGNORECASE,
+)
+CREATE_INDEX_RE = re.compile(r"^CREATE (UNIQUE )?INDEX (\w+) ON", re.IGNORECASE)
+
+# Rows moved with each closed order or reservation, as (table, WHERE clause)
+MOVES = (
+    ("Orders", "id IN (SELECT id FROM temp.ArchivedOrders)"),
+    ("Reservations", "id IN (SELECT id FROM temp.ArchivedReservations)"),
+    ("OrderDetails", "order_id IN (SELECT id FROM temp.ArchivedOrders)"),
+    ("Payments", "order_id IN (SELECT id FROM temp.ArchivedOrders) "
+                 "OR reservation_id IN (SELECT id FROM temp.ArchivedReservations)"),
+    ("RoomCharges", "reservation_id IN (SELECT id FROM temp.ArchivedReservations)"),
+)
+
+
+class ArchiveResult(NamedTuple):
+    """Rows moved by one archive run, per table."""
+    cutoff: datetime.date
+    moved: Dict[str, int]
+
+    @property
+    def total(self) -> int:
+        """Rows moved across all tables."""
+        return sum(self.moved.values())
+
+
+def cutoff_date(months: int, today: Optional[datetime.date] = None) -> datetime.date:
+    """First day of the month ``months`` months before today's month."""
+    today = today or datetime.date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+class ArchiveService:
+    """Moves closed history between the live database and its archive file."""
+
+    def __init__(self, db) -> None:
+        """Initialize archive service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    @property
+    def available(self) -> bool:
+        """Whether the database file is on this machine (not behind a sync server)."""
+        return bool(self.db.path)
+
+    def _sync_schema(self, connection) -> None:
+        """Create archive tables and indexes, and add columns the live tables gained since."""
+        for table in ARCHIVE_TABLES:
+            create = connection.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+            archived = {row[1] for row in connection.execute(f"PRAGMA archive.table_xinfo({table})")}
+            if not archived:
+                connection.execute(re.sub(rf"^CREATE TABLE {table}\b", f"CREATE TABLE archive.{table}",
+                                          FOREIGN_KEY_RE.sub("", create)))
+            else:
+                # Generated columns cannot be added later; every migration adds plain ones
+                for row in connection.execute(f"PRAGMA main.table_xinfo({table})").fetchall():
+                    if row[1] not in archived and row[6] == 0:
+                        connection.execute(f"ALTER TABLE archive.{table} ADD COLUMN {row[1]} {row[2]}")
+            for (sql,) in connection.execute(
+                    "SELECT sql FROM main.sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+                    (table,)).fetchall():
+                connection.execute(CREATE_INDEX_RE.sub(
+                    lambda m: f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS archive.{m.group(2)} ON", sql))
+
+    def archive(self, months: int = ARCHIVE_AFTER_MONTHS) -> ArchiveResult:
+        """Move orders and stays closed before a cutoff into the archive file.
+
+        Orders count as closed once Paid or Cancelled, reservations once
+        CheckedOut or Cancelled; they move with their order lines, payments
+        and room charges. Rows are copied into the archive before they are
+        deleted from the live file, inside one transaction over both files,
+        and a row copied twice by a re-run replaces its earlier copy. The
+        pages freed in the live file are handed back to the file system by
+        the idle-time incremental vacuum (see MaintenanceService).
+
+        Args:
+            months: Keep everything from the first day of the month this
+                many months back in the live file.
+
+        Returns:
+            Cutoff date and the number of rows moved per table.
+        """
+        if months < 1:
+            raise ValueError("Archive cutoff must be at least one month back")
+        cutoff = cutoff_date(months)
+        cutoff_day = (cutoff - datetime.date(1970, 1, 1)).days
+        started = time.perf_counter()
+        connection = self.db.connect()
+        attach_archive(connection, self.db.archive_path, create=True)
+        moved: Dict[str, int] = {}
+        with connection:
+            self._sync_schema(connection)
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS ArchivedOrders(id INTEGER PRIMARY KEY)")
+            connection.execute("CREATE TEMP TABLE IF NOT EXISTS ArchivedReservations(id INTEGER PRIMARY KEY)")
+            connection.execute("DELETE FROM temp.ArchivedOrders")
+            connection.execute("DELETE FROM temp.ArchivedReservations")
+            connection.execute("INSERT INTO temp.ArchivedOrders SELECT id FROM main.Orders "
+                               "WHERE day < ? AND status IN ('Paid', 'Cancelled')", (cutoff_day,))
+            connection.execute("INSERT INTO temp.ArchivedReservations SELECT id FROM main.Reservations "
+                               "WHERE COALESCE(check_out, check_in) < ? AND status IN ('CheckedOut', 'Cancelled')",
+                               (cutoff.isoformat(),))
+            for table, where in MOVES:
+                columns = ", ".join(row[1] for row in connection.execute(f"PRAGMA main.table_xinfo({table})")
+                                    if row[6] == 0)
+                moved[table] = connection.execute(
+                    f"INSERT OR REPLACE INTO archive.{table}({columns}) SELECT {columns} FROM main.{table} "
+                    f"WHERE {where}").rowcount
+            # Children first, so nothing depends on ON DELETE CASCADE being enabled
+            for table, where in reversed(MOVES):
+                connection.execute(f"DELETE FROM main.{table} WHERE {where}")
+        attach_archive(connection, self.db.archive_path)
+        logging.info(f"Archived {sum(moved.values())} rows closed before {cutoff} "
+                     f"in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        if any(moved.values()):
+            self.db.notify_changed(*(table for table, count in moved.items() if count))
+        return ArchiveResult(cutoff, moved)
+
+    def counts(self) -> Dict[str, Tuple[int, int]]:
+        """(live rows, archived rows) per archived table."""
+        connection = self.db.connect()
+        attached = attach_archive(connection, self.db.archive_path)
+        result = {}
+        for table in ARCHIVE_TABLES:
+            live = connection.execute(f"SELECT COUNT(*) FROM main.{table}").fetchone()[0]
+            archived = 0
+            if attached and connection.execute(
+                    "SELECT 1 FROM archive.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+                archived = connection.execute(f"SELECT COUNT(*) FROM archive.{table}").fetchone()[0]
+            result[table] = (live, archived)
+        return result
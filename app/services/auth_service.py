@@ -1,6 +1,8 @@
 """Authentication Service - Handles user login and credential verification."""
 
-from typing import Optional, Dict, Any
+from typing import Optional
+
+from app.core.database import User
 
 
 class AuthService:
@@ -14,7 +16,7 @@ class AuthService:
         """
         self.db = db
 
-    def login(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+    def login(self, username: str, password: str) -> Optional[User]:
         """Verify user credentials and return user record if valid.
         
         Args:
@@ -22,6 +24,6 @@ class AuthService:
             password: User's password (will be hashed for comparison)
             
         Returns:
-            User record dictionary if credentials are valid, None otherwise
+            User if credentials are valid, None otherwise
         """
         return self.db.verify_user(username, password)
@@ -0,0 +1,145 @@
+"""Availability Service - Answers "which rooms are free from X to Y" from memory.
+
+Every room keeps an integer bitmap of booked nights (bit n set means the
+n-th night after the earliest active check-in is taken) built from active
+reservations.
+Range availability for a room is a single AND of that bitmap with the mask
+of the requested nights, so listing free rooms never scans reservations.
+The index is rebuilt lazily after the database reports reservation or room
+changes.
+"""
+
+import datetime
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.repositories.rooms import Room, RoomRepo
+from app.services.analytics_service import DAY_SQL, day_date, day_number
+
+# Reservation statuses that hold a room
+BLOCKING_STATUSES = ("Reserved", "CheckedIn")
+
+
+def nights_mask(first: int, last: int, base: int = 0) -> int:
+    """Return the bitmap of nights first..last-1 (at least one night).
+
+    Nights are counted from day number ``base``; earlier nights are dropped.
+    """
+    last = max(last, first + 1) - base
+    first = max(first - base, 0)
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+
+class AvailabilityIndex:
+    """Per-room booked-night bitmaps for range availability and conflict checks."""
+
+    def __init__(self, db) -> None:
+        """Initialize availability index.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.room_repo = RoomRepo(db)
+        self.rooms: Dict[int, Room] = {}
+        self._booked: Dict[int, int] = {}
+        self._stays: Dict[int, List[Tuple[int, int, int]]] = {}
+        self._base = 0
+        self._stale = True
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Mark the index stale when reservations or rooms changed.
+
+        Args:
+            tables: Names of changed tables.
+        """
+        if "Reservations" in tables or "Rooms" in tables:
+            self._stale = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._stale:
+            return
+        self.rooms = {room.id: room for room in self.room_repo.all()}
+        cur = self.db.connect().cursor()
+        # Open stays without a check-out keep their room at least through tonight
+        tomorrow = day_number(datetime.date.today()) + 1
+        cur.execute(f"""
+            SELECT id, room_id, {DAY_SQL.format('check_in')} AS first,
+                   COALESCE({DAY_SQL.format('check_out')}, ?) AS last
+            FROM Reservations
+            WHERE status IN ({','.join('?' * len(BLOCKING_STATUSES))})
+        """, (tomorrow,) + BLOCKING_STATUSES)
+        rows = [r for r in cur.fetchall() if r["first"] is not None]
+        self._base = min((r["first"] for r in rows), default=0)
+        self._booked = {}
+        self._stays = {}
+        for r in rows:
+            last = max(r["last"], r["first"] + 1)
+            self._booked[r["room_id"]] = self._booked.get(r["room_id"], 0) | nights_mask(r["first"], last, self._base)
+            self._stays.setdefault(r["room_id"], []).append((r["first"], last, r["id"]))
+        self._stale = False
+        logging.info(f"Availability index built for {len(self.rooms)} rooms, "
+                     f"{sum(len(s) for s in self._stays.values())} active stays.")
+
+    def _mask(self, check_in: datetime.date, check_out: datetime.date) -> int:
+        return nights_mask(day_number(check_in), day_number(check_out), self._base)
+
+    def is_available(self, room_id: int, check_in: datetime.date, check_out: datetime.date) -> bool:
+        """Return True when no active reservation holds the room on any night of the stay."""
+        self._ensure_loaded()
+        return not self._booked.get(room_id, 0) & self._mask(check_in, check_out)
+
+    def available_rooms(self, check_in: datetime.date, check_out: datetime.date,
+                        statuses: Optional[Iterable[str]] = None) -> List[Room]:
+        """List rooms free for every night from check_in up to check_out.
+
+        Args:
+            check_in: Arrival date.
+            check_out: Departure date; a same-day stay counts as one night.
+            statuses: Optional room housekeeping statuses to restrict to,
+                e.g. ("Available",) for an immediate check-in.
+
+        Returns:
+            Rooms ordered by number.
+        """
+        self._ensure_loaded()
+        mask = self._mask(check_in, check_out)
+        return [room for room_id, room in self.rooms.items()
+                if not self._booked.get(room_id, 0) & mask
+                and (statuses is None or room.status in statuses)]
+
+    def conflicts(self, room_id: int, check_in: datetime.date, check_out: datetime.date,
+                  exclude_id: Optional[int] = None) -> List[Tuple[int, datetime.date, datetime.date]]:
+        """Return the active reservations of a room overlapping a stay.
+
+        Args:
+            room_id: Room to check.
+            check_in: Arrival date.
+            check_out: Departure date.
+            exclude_id: Reservation to ignore, e.g. the one being edited.
+
+        Returns:
+            List of (reservation id, check-in, check-out) tuples; empty when free.
+        """
+        self._ensure_loaded()
+        first, last = day_number(check_in), max(day_number(check_out), day_number(check_in) + 1)
+        if not self._booked.get(room_id, 0) & self._mask(check_in, check_out):
+            return []
+        return [(res_id, day_date(a), day_date(b)) for a, b, res_id in self._stays.get(room_id, [])
+                if a < last and first < b and res_id != exclude_id]
+
+
+def parse_stay(check_in: str, check_out: str) -> Optional[Tuple[datetime.date, datetime.date]]:
+    """Parse YYYY-MM-DD check-in/check-out text.
+
+    Returns:
+        (check_in, check_out) dates, or None when either is invalid or the
+        check-out falls before the check-in.
+    """
+    try:
+        first = datetime.date.fromisoformat(check_in.strip())
+        last = datetime.date.fromisoformat(check_out.strip())
+    except ValueError:
+        return None
+    return (first, last) if last >= first else None
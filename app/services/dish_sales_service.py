@@ -0,0 +1,130 @@
+"""Dish Sales Service - Top dishes served from in-memory daily counters.
+
+Portions sold per dish and day are counted in ItemSalesDaily when an order
+is paid. The counters of the recent window (this month and the last seven
+days) are held in memory, so rankings for today, this week and this month
+are summed from a few small dicts and picked with a heap instead of joining
+order lines. When ItemSalesDaily is reported as changed, only the lines of
+orders paid since the last look are added to the held counters, and only
+the cached rankings whose range covers their days are dropped. Ranges
+outside the window are summed by the database from the counters, never
+from the order lines.
+"""
+
+import datetime
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.repositories.item_sales import ItemSalesRepo
+from app.repositories.menu import MenuRepo
+from app.services.analytics_service import day_number
+
+
+def period_range(period: str, today: Optional[datetime.date] = None) -> Tuple[datetime.date, datetime.date]:
+    """First and last date of "today", "week" (last 7 days) or "month" (month to date)."""
+    today = today or datetime.date.today()
+    if period == "today":
+        return today, today
+    if period == "week":
+        return today - datetime.timedelta(days=6), today
+    if period == "month":
+        return today.replace(day=1), today
+    raise ValueError(f"Unknown period {period}")
+
+
+class DishSalesService:
+    """Ranks dishes by portions sold over a date range."""
+
+    def __init__(self, db) -> None:
+        """Initialize dish sales service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.item_sales = ItemSalesRepo(db)
+        self.menu = MenuRepo(db)
+        self._days: Dict[int, Dict[int, int]] = {}
+        self._first_day = self._loaded_on = None
+        self._last_payment = 0
+        self._stale = False
+        self._names: Optional[Dict[int, str]] = None
+        self._ranked: Dict[Tuple[int, int, int], List[Tuple[str, int]]] = {}
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Note new counters or drop dish names when their tables change."""
+        tables = set(tables)
+        if "ItemSalesDaily" in tables:
+            self._stale = True
+        if "MenuItems" in tables:
+            self._names = None
+            self._ranked.clear()
+
+    def _load(self) -> None:
+        today = datetime.date.today()
+        if self._loaded_on == today:
+            if self._stale:
+                self._apply_payments()
+            return
+        self._first_day = day_number(min(today.replace(day=1), today - datetime.timedelta(days=6)))
+        # A payment committed between the two reads would be counted twice later
+        while True:
+            last_payment = self.item_sales.last_payment()
+            days: Dict[int, Dict[int, int]] = {}
+            for day, item_id, qty in self.item_sales.since(self._first_day):
+                days.setdefault(day, {})[item_id] = qty
+            if self.item_sales.last_payment() == last_payment:
+                break
+        self._days, self._last_payment = days, last_payment
+        self._loaded_on = today
+        self._stale = False
+        self._ranked.clear()
+
+    def _apply_payments(self) -> None:
+        """Add the lines of orders paid since the last look to the held counters."""
+        self._stale = False
+        last_payment = self.item_sales.last_payment()
+        if last_payment == self._last_payment:
+            # Counters changed without a new payment; nothing to diff against
+            self._loaded_on = None
+            self._load()
+            return
+        changed = set()
+        for day, item_id, qty in self.item_sales.paid_between(self._last_payment, last_payment):
+            changed.add(day)
+            if day >= self._first_day:
+                counters = self._days.setdefault(day, {})
+                counters[item_id] = counters.get(item_id, 0) + qty
+        self._last_payment = last_payment
+        for key in [key for key in self._ranked if any(key[0] <= day <= key[1] for day in changed)]:
+            del self._ranked[key]
+
+    def top(self, start: datetime.date, end: datetime.date, limit: int = 100) -> List[Tuple[str, int]]:
+        """Most sold dishes paid within [start, end].
+
+        Returns:
+            List of (dish name, portions) pairs, most sold first.
+        """
+        self._load()
+        first, last = day_number(start), day_number(end)
+        key = (first, last, limit)
+        if key not in self._ranked:
+            if first >= self._first_day:
+                totals: Dict[int, int] = {}
+                for day in range(first, last + 1):
+                    for item_id, qty in self._days.get(day, {}).items():
+                        totals[item_id] = totals.get(item_id, 0) + qty
+                pairs = totals.items()
+            else:
+                pairs = self.item_sales.between(first, last)
+            if self._names is None:
+                self._names = {item.id: item.name for item in self.menu.search()}
+            self._ranked[key] = [(self._names.get(item_id, f"Item {item_id}"), qty)
+                                 for item_id, qty in heapq.nlargest(limit, pairs, key=lambda pair: pair[1])
+                                 if qty > 0]
+        return self._ranked[key]
+
+    def top_period(self, period: str, limit: int = 100) -> List[Tuple[str, int]]:
+        """Most sold dishes "today", this "week" (last 7 days) or this "month"."""
+        return self.top(*period_range(period), limit)
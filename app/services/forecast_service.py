@@ -0,0 +1,153 @@
+"""Forecast Service - Consumption forecasts, reorder points and purchase suggestions.
+
+Consumption rows are loaded once into NumPy columns and topped up by primary
+key, like the analytics cache. A forecast bins the last HISTORY_DAYS of them
+into one (items x days) matrix with a single bincount; moving averages and
+the spread of daily use then come from cumulative sums along the day axis,
+so all items are computed together in a handful of array operations.
+Results are kept until new consumption, a stock edit or a supplier change
+is reported.
+"""
+
+import datetime
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from app.repositories.inventory import InventoryRepo, StockLevel
+from app.services.analytics_service import ColumnStore, day_number
+
+# Days of consumption history a forecast looks at
+HISTORY_DAYS = 365
+
+# Moving-average windows in days: short for the trend, long for the reorder point
+SHORT_WINDOW = 7
+LONG_WINDOW = 28
+
+# Lead time for items without a supplier
+DEFAULT_LEAD_TIME_DAYS = 7
+
+# Days of use a purchase order should cover beyond the reorder point
+REVIEW_DAYS = 14
+
+# Safety-stock factor: about a 95% chance of not running out during the lead time
+SERVICE_Z = 1.65
+
+
+class ItemForecast(NamedTuple):
+    """Forecast for one stock item; quantities in the item's unit."""
+    id: int
+    name: str
+    unit: str
+    qty: float
+    daily_short: float
+    daily_long: float
+    lead_time_days: int
+    reorder_point: float
+    order_qty: float
+    supplier_id: Optional[int]
+    supplier: Optional[str]
+    price: float
+
+
+class PurchaseOrder(NamedTuple):
+    """Suggested purchase order for one supplier; value in the items' price unit."""
+    supplier_id: Optional[int]
+    supplier: str
+    lines: List[ItemForecast]
+    value: float
+
+
+class ForecastService:
+    """Computes and caches stock forecasts from consumption history."""
+
+    def __init__(self, db) -> None:
+        """Initialize forecast service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.inventory = InventoryRepo(db)
+        self.consumption = ColumnStore({
+            "id": np.int64, "inventory_id": np.int64, "day": np.int32, "qty": np.float64,
+        })
+        self._forecasts: Optional[List[ItemForecast]] = None
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Drop cached results when consumption, stock or suppliers change."""
+        if {"InventoryConsumption", "Inventory", "Suppliers"} & set(tables):
+            self._forecasts = None
+
+    def forecasts(self, today: Optional[datetime.date] = None) -> List[ItemForecast]:
+        """Forecast for every stock item in id order, cached until invalidated.
+
+        Args:
+            today: Last day of history; defaults to today. Passing a date
+                always recomputes.
+        """
+        if self._forecasts is not None and today is None:
+            return self._forecasts
+        self.consumption.append(self.inventory.consumption_after(self.consumption.max_id))
+        result = self._compute(self.inventory.levels(), day_number(today or datetime.date.today()))
+        if today is None:
+            self._forecasts = result
+        return result
+
+    def _compute(self, levels: List[StockLevel], last_day: int) -> List[ItemForecast]:
+        if not levels:
+            return []
+        ids = np.fromiter((level.id for level in levels), np.int64, len(levels))
+        qty = np.fromiter((level.qty for level in levels), np.float64, len(levels))
+        lead = np.fromiter((level.lead_time_days if level.lead_time_days is not None else DEFAULT_LEAD_TIME_DAYS
+                            for level in levels), np.float64, len(levels))
+
+        # Daily use per item over the history window, items in `levels` order
+        days = HISTORY_DAYS
+        store = self.consumption
+        offsets = store["day"] - (last_day - days + 1)
+        dense = np.full(int(max(ids.max(), store["inventory_id"].max(initial=0))) + 1, -1, np.int64)
+        dense[ids] = np.arange(len(ids))
+        index = dense[store["inventory_id"]]
+        keep = (offsets >= 0) & (offsets < days) & (index >= 0)
+        daily = np.bincount(index[keep] * days + offsets[keep], weights=store["qty"][keep],
+                            minlength=len(ids) * days).reshape(len(ids), days)
+
+        # Windowed sums from cumulative sums along the day axis
+        sums = np.cumsum(daily, axis=1)
+        squares = np.cumsum(daily * daily, axis=1)
+        daily_short = (sums[:, -1] - sums[:, -SHORT_WINDOW - 1]) / SHORT_WINDOW
+        daily_long = (sums[:, -1] - sums[:, -LONG_WINDOW - 1]) / LONG_WINDOW
+        variance = (squares[:, -1] - squares[:, -LONG_WINDOW - 1]) / LONG_WINDOW - daily_long ** 2
+        spread = np.sqrt(np.maximum(variance, 0))
+
+        # Cover expected use over the lead time plus safety stock for its variation
+        reorder_point = daily_long * lead + SERVICE_Z * spread * np.sqrt(lead)
+        target = reorder_point + np.maximum(daily_short, daily_long) * REVIEW_DAYS
+        order_qty = np.where((qty <= reorder_point) & (reorder_point > 0), np.ceil(target - qty), 0)
+
+        return [
+            ItemForecast(level.id, level.name, level.unit, level.qty, short, long, int(lead_days), point,
+                         max(order, 0.0), level.supplier_id, level.supplier, level.price)
+            for level, short, long, lead_days, point, order in zip(
+                levels, daily_short.tolist(), daily_long.tolist(), lead.tolist(),
+                reorder_point.tolist(), order_qty.tolist())
+        ]
+
+    def purchase_orders(self) -> List[PurchaseOrder]:
+        """Items due for reordering grouped by supplier, largest order value first.
+
+        Items without a supplier are grouped under "Unassigned".
+        """
+        groups: Dict[Optional[int], List[ItemForecast]] = {}
+        for forecast in self.forecasts():
+            if forecast.order_qty > 0:
+                groups.setdefault(forecast.supplier_id, []).append(forecast)
+        orders = [
+            PurchaseOrder(supplier_id, lines[0].supplier or "Unassigned", lines,
+                          math.fsum(line.order_qty * line.price for line in lines))
+            for supplier_id, lines in groups.items()
+        ]
+        return sorted(orders, key=lambda order: order.value, reverse=True)
@@ -0,0 +1,276 @@
+"""Import Service - Bulk loads rooms, menu items, customers and inventory from CSV.
+
+Rows are parsed as a stream, validated in Python against the same rules the
+schema enforces (NOT NULL, CHECK and UNIQUE constraints), and inserted with
+executemany in batched transactions. Rows that fail validation are reported
+back instead of aborting the import.
+"""
+
+import csv
+import math
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.utils.money import MAX_INTEGER, to_paise
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _text(value: str) -> str:
+    return value.strip()
+
+
+def _real(value: str) -> float:
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError("must be a finite number")
+    if number > MAX_INTEGER:
+        raise ValueError("is too large")
+    if number < 0:
+        raise ValueError("must not be negative")
+    return number
+
+
+def _paise(value: str) -> int:
+    amount = to_paise(value)
+    if amount < 0:
+        raise ValueError("must not be negative")
+    return amount
+
+
+def _integer(value: str) -> int:
+    number = int(value)
+    if abs(number) > MAX_INTEGER:
+        raise ValueError("is too large")
+    return number
+
+
+def _flag(value: str) -> int:
+    lowered = value.strip().lower()
+    if lowered in ("1", "yes", "y", "true", "active"):
+        return 1
+    if lowered in ("0", "no", "n", "false", "inactive"):
+        return 0
+    raise ValueError("must be yes/no or 1/0")
+
+
+@dataclass
+class Field:
+    """Import rules for one column of a target table."""
+    column: str
+    convert: Callable[[str], Any] = _text
+    required: bool = False
+    default: Any = None
+    choices: Optional[Sequence[str]] = None
+    unique: bool = False
+    header: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """CSV header of the column; defaults to the column name."""
+        return self.header or self.column
+
+
+# Target table -> ordered column rules, mirroring the schema in DatabaseManager
+IMPORT_SPECS: Dict[str, List[Field]] = {
+    "Rooms": [
+        Field("number", required=True, unique=True),
+        Field("category", required=True, choices=("Standard", "Deluxe", "Suite")),
+        Field("status", default="Available", choices=("Available", "Occupied", "Cleaning")),
+        Field("rate_paise", _paise, required=True, header="rate"),
+    ],
+    "MenuItems": [
+        Field("name", required=True),
+        Field("category", required=True),
+        Field("price_paise", _paise, required=True, header="price"),
+        Field("active", _flag, default=1),
+    ],
+    "Customers": [
+        Field("name", required=True),
+        Field("phone"),
+        Field("email"),
+        Field("document_type"),
+        Field("document_number"),
+    ],
+    "Suppliers": [
+        Field("name", required=True),
+        Field("phone"),
+        Field("email"),
+        Field("lead_time_days", _integer, default=7),
+    ],
+    "Inventory": [
+        Field("name", required=True),
+        Field("qty", _real, required=True),
+        Field("unit", required=True),
+        Field("threshold", _real, default=5),
+        Field("supplier_id", _integer),
+        Field("price", _real, default=0),
+    ],
+    "Tables": [
+        Field("number", _integer, required=True, unique=True),
+        Field("status", default="Available", choices=("Available", "Occupied", "Cleaning")),
+    ],
+}
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import."""
+    table: str
+    inserted: int = 0
+    rejected: List[Tuple[int, str, Dict[str, str]]] = field(default_factory=list)
+
+    def write_rejects(self, path: str) -> None:
+        """Write rejected rows with their line number and reason to a CSV file.
+
+        Args:
+            path: Output CSV file path.
+        """
+        columns: List[str] = []
+        for _, _, row in self.rejected:
+            columns.extend(c for c in row if c not in columns)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["line", "reason"] + columns)
+            writer.writerows([line, reason] + [row.get(c, "") for c in columns]
+                             for line, reason, row in self.rejected)
+
+
+class ImportService:
+    """Validates and bulk-inserts CSV data into the hotel database."""
+
+    def __init__(self, db):
+        """Initialize import service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    def import_csv(self, table: str, path: str,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   progress: Optional[Callable[[int], None]] = None) -> ImportResult:
+        """Import a CSV file into a table.
+
+        The header row names the target columns (case-insensitive); columns
+        not known to the table are ignored and optional columns may be left
+        out. Money columns are given in rupees and stored as paise.
+
+        Args:
+            table: Target table, one of IMPORT_SPECS.
+            path: CSV file to read.
+            batch_size: Number of rows inserted per transaction.
+            progress: Optional callback receiving the number of rows read.
+
+        Returns:
+            ImportResult with inserted count and rejected rows.
+        """
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            return self.import_rows(table, csv.DictReader(f), batch_size, progress)
+
+    def import_rows(self, table: str, reader: Iterable[Dict[str, str]],
+                    batch_size: int = DEFAULT_BATCH_SIZE,
+                    progress: Optional[Callable[[int], None]] = None) -> ImportResult:
+        """Import rows given as dictionaries keyed by column name.
+
+        Args:
+            table: Target table, one of IMPORT_SPECS.
+            reader: Iterable of row dictionaries, e.g. a csv.DictReader.
+            batch_size: Number of rows inserted per transaction.
+            progress: Optional callback receiving the number of rows read.
+
+        Returns:
+            ImportResult with inserted count and rejected rows.
+        """
+        if table not in IMPORT_SPECS:
+            raise ValueError(f"Bulk import is not supported for table '{table}'")
+        fields = IMPORT_SPECS[table]
+        columns = [f.column for f in fields]
+        sql = f"INSERT INTO {table}({','.join(columns)}) VALUES({','.join('?' * len(columns))})"
+        result = ImportResult(table)
+
+        connection = self.db.connect()
+        seen = self._existing_unique_values(connection, table, fields)
+        foreign = self._existing_foreign_keys(connection, table)
+        batch: List[Tuple[int, Dict[str, str], tuple]] = []
+        line = 1
+        for line, raw in enumerate(reader, start=2):
+            row = {(k or "").strip().lower(): (v or "") for k, v in raw.items()}
+            try:
+                values = self._validate(fields, row, seen, foreign)
+            except ValueError as e:
+                result.rejected.append((line, str(e), raw))
+                continue
+            batch.append((line, raw, values))
+            if len(batch) >= batch_size:
+                self._flush(connection, sql, batch, result)
+                batch = []
+                if progress:
+                    progress(line - 1)
+        if batch:
+            self._flush(connection, sql, batch, result)
+        if progress:
+            progress(line - 1)
+        if result.inserted:
+            self.db.notify_changed(table)
+        return result
+
+    def _validate(self, fields: List[Field], row: Dict[str, str],
+                  seen: Dict[str, Set[Any]], foreign: Dict[str, Set[int]]) -> tuple:
+        """Convert and check one row, raising ValueError on the first problem."""
+        values = []
+        for f in fields:
+            raw = row.get(f.name, "").strip()
+            if raw == "":
+                if f.required:
+                    raise ValueError(f"{f.name} is required")
+                values.append(f.default)
+                continue
+            try:
+                value = f.convert(raw)
+            except ValueError as e:
+                raise ValueError(f"{f.name} '{raw}' is invalid: {e}")
+            if f.choices and value not in f.choices:
+                raise ValueError(f"{f.name} must be one of {', '.join(f.choices)}")
+            if f.column in foreign and value not in foreign[f.column]:
+                raise ValueError(f"{f.column} {value} does not exist")
+            if f.unique:
+                if value in seen[f.column]:
+                    raise ValueError(f"duplicate {f.name} '{raw}'")
+            values.append(value)
+        for f, value in zip(fields, values):
+            if f.unique:
+                seen[f.column].add(value)
+        return tuple(values)
+
+    def _flush(self, connection: sqlite3.Connection, sql: str,
+               batch: List[Tuple[int, Dict[str, str], tuple]], result: ImportResult) -> None:
+        """Insert one batch in a transaction, isolating failing rows if needed."""
+        try:
+            with connection:
+                connection.executemany(sql, [values for _, _, values in batch])
+            result.inserted += len(batch)
+        except sqlite3.IntegrityError:
+            # A constraint the validator does not know about failed; retry
+            # row by row so only the offending rows are rejected.
+            for line, raw, values in batch:
+                try:
+                    with connection:
+                        connection.execute(sql, values)
+                    result.inserted += 1
+                except sqlite3.IntegrityError as e:
+                    result.rejected.append((line, str(e), raw))
+
+    def _existing_unique_values(self, connection: sqlite3.Connection, table: str,
+                                fields: List[Field]) -> Dict[str, Set[Any]]:
+        seen = {}
+        for f in fields:
+            if f.unique:
+                seen[f.column] = {row[0] for row in connection.execute(f"SELECT {f.column} FROM {table}")}
+        return seen
+
+    def _existing_foreign_keys(self, connection: sqlite3.Connection, table: str) -> Dict[str, Set[int]]:
+        if table == "Inventory":
+            return {"supplier_id": {row[0] for row in connection.execute("SELECT id FROM Suppliers")}}
+        return {}
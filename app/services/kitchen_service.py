@@ -0,0 +1,221 @@
+"""Kitchen Service - Live kitchen tickets fed by database change notifications.
+
+Open order lines are loaded once into memory, grouped into one ticket per
+order. After that the ticket set is only touched by events: when OrderDetails
+is reported as changed, new lines are fetched by primary key and the status
+of the lines already held is re-read, so sends and bumps made on another
+terminal show up here. Sends and bumps made through this service update
+memory directly and report the change like any other write. Subscribers are
+told which tickets changed, so a display redraws only those.
+"""
+
+import datetime
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from app.repositories.recipes import RecipeRepo
+from app.services.analytics_service import day_number
+from app.utils.timestamps import now_timestamp
+
+# Line statuses in kitchen order; bumping advances one step
+KITCHEN_STATUSES = ("Pending", "Cooking", "Ready", "Served")
+
+# Open lines of orders older than this are not shown on the display
+KITCHEN_WINDOW_DAYS = 1
+
+
+@dataclass(slots=True)
+class TicketLine:
+    """One order line on a kitchen ticket."""
+    id: int
+    order_id: int
+    item: str
+    station: str
+    qty: int
+    status: str
+
+
+@dataclass(slots=True)
+class Ticket:
+    """All open lines of one order."""
+    order_id: int
+    label: str
+    created_at: int
+    lines: Dict[int, TicketLine] = field(default_factory=dict)
+
+    def stations(self) -> Set[str]:
+        """Stations with at least one line on this ticket."""
+        return {line.station for line in self.lines.values()}
+
+    def age_minutes(self, now: Optional[int] = None) -> int:
+        """Minutes since the order was placed."""
+        return max(0, ((now if now is not None else now_timestamp()) - self.created_at) // 60)
+
+
+class KitchenService:
+    """Keeps the open kitchen tickets and publishes changes to them."""
+
+    def __init__(self, db) -> None:
+        """Initialize kitchen service and load the open tickets.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.recipes = RecipeRepo(db)
+        self.tickets: Dict[int, Ticket] = {}
+        self._lines: Dict[int, TicketLine] = {}
+        self._last_line_id = 0
+        self._listeners: List[Callable[[Set[int]], None]] = []
+        self._load()
+        db.add_change_listener(self._on_tables_changed)
+
+    def add_listener(self, callback: Callable[[Set[int]], None]) -> None:
+        """Register a callback invoked with the ids of changed tickets.
+
+        A ticket id that is no longer in ``tickets`` was completed or
+        cancelled.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Set[int]], None]) -> None:
+        """Unregister a callback previously passed to add_listener."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _publish(self, order_ids: Set[int]) -> None:
+        if order_ids:
+            for callback in list(self._listeners):
+                callback(order_ids)
+
+    def stations(self) -> List[str]:
+        """All stations with open lines, sorted by name."""
+        return sorted({s for ticket in self.tickets.values() for s in ticket.stations()})
+
+    def _line_query(self, condition: str) -> str:
+        return f"""
+            SELECT od.id, od.order_id, od.qty, od.kitchen_status, mi.name AS item,
+                   mi.category AS station, o.created_at, t.number AS table_number,
+                   c.name AS guest
+            FROM OrderDetails od
+            JOIN Orders o ON o.id = od.order_id
+            JOIN MenuItems mi ON mi.id = od.item_id
+            LEFT JOIN Tables t ON t.id = o.table_id
+            LEFT JOIN Customers c ON c.id = o.customer_id
+            WHERE {condition} AND od.kitchen_status != 'Served' AND o.status != 'Cancelled'
+        """
+
+    def _load(self) -> None:
+        """Load open lines of recent orders; only done once at start-up."""
+        first_day = day_number(datetime.date.today()) - KITCHEN_WINDOW_DAYS
+        rows = self.db.connect().execute(self._line_query("o.day >= ?"), (first_day,)).fetchall()
+        self._add_rows(rows)
+        row = self.db.connect().execute("SELECT MAX(id) FROM OrderDetails").fetchone()
+        self._last_line_id = row[0] or 0
+
+    def _add_rows(self, rows: Iterable) -> Set[int]:
+        changed = set()
+        for r in rows:
+            ticket = self.tickets.get(r["order_id"])
+            if ticket is None:
+                label = f"Table {r['table_number']}" if r["table_number"] is not None else (r["guest"] or "Takeaway")
+                ticket = self.tickets[r["order_id"]] = Ticket(r["order_id"], label, r["created_at"])
+            line = TicketLine(r["id"], r["order_id"], r["item"], r["station"], r["qty"], r["kitchen_status"])
+            ticket.lines[line.id] = self._lines[line.id] = line
+            changed.add(r["order_id"])
+            self._last_line_id = max(self._last_line_id, r["id"])
+        return changed
+
+    def _drop_served(self, order_ids: Iterable[int]) -> None:
+        """Take served lines off these tickets and remove tickets left empty."""
+        for order_id in order_ids:
+            ticket = self.tickets.get(order_id)
+            if ticket is None:
+                continue
+            for line_id in [i for i, line in ticket.lines.items() if line.status == "Served"]:
+                del ticket.lines[line_id]
+                self._lines.pop(line_id, None)
+            if not ticket.lines:
+                del self.tickets[order_id]
+
+    def _on_tables_changed(self, tables: Set[str]) -> None:
+        """Pick up lines, status changes and cancellations written elsewhere."""
+        changed = set()
+        if "OrderDetails" in tables:
+            if self._lines:
+                held = dict.fromkeys(self._lines, "Served")  # a deleted line leaves the ticket too
+                held.update(self.db.connect().execute(
+                    "SELECT id, kitchen_status FROM OrderDetails WHERE id IN (SELECT value FROM json_each(?))",
+                    (json.dumps(list(held)),)
+                ).fetchall())
+                for line_id, status in held.items():
+                    line = self._lines[line_id]
+                    if line.status != status:
+                        line.status = status
+                        changed.add(line.order_id)
+                self._drop_served(changed)
+            rows = self.db.connect().execute(self._line_query("od.id > ?"), (self._last_line_id,)).fetchall()
+            changed |= self._add_rows(rows)
+        if "Orders" in tables and self.tickets:
+            ids = list(self.tickets)
+            cancelled = self.db.connect().execute(
+                f"SELECT id FROM Orders WHERE status = 'Cancelled' AND id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+            for (order_id,) in cancelled:
+                for line_id in self.tickets.pop(order_id).lines:
+                    self._lines.pop(line_id, None)
+                changed.add(order_id)
+        self._publish(changed)
+
+    def send(self, order_id: int) -> None:
+        """Fire an order: its pending lines start cooking.
+
+        The first send of an order also takes its recipe stock out of
+        Inventory, in the same transaction.
+
+        Args:
+            order_id: Order to send to the kitchen.
+        """
+        connection = self.db.connect()
+        with connection:
+            connection.execute("UPDATE OrderDetails SET kitchen_status='Cooking' "
+                               "WHERE order_id=? AND kitchen_status='Pending'", (order_id,))
+            connection.execute("UPDATE Orders SET status='InKitchen' WHERE id=? AND status='Open'", (order_id,))
+            depleted = self.recipes.deplete(order_id, now_timestamp(), connection)
+        ticket = self.tickets.get(order_id)
+        if ticket:
+            for line in ticket.lines.values():
+                if line.status == "Pending":
+                    line.status = "Cooking"
+        self.db.notify_changed("OrderDetails", "Orders")
+        if depleted:
+            self.db.notify_changed("Inventory", "InventoryConsumption")
+        self._publish({order_id})
+
+    def bump(self, line_ids: Iterable[int]) -> None:
+        """Advance lines to their next kitchen status.
+
+        Served lines leave their ticket; a ticket whose lines are all served
+        is removed and its order marked Served.
+
+        Args:
+            line_ids: Order line ids to bump.
+        """
+        lines = [self._lines[i] for i in set(line_ids) if i in self._lines]
+        if not lines:
+            return
+        for line in lines:
+            line.status = KITCHEN_STATUSES[min(KITCHEN_STATUSES.index(line.status) + 1, len(KITCHEN_STATUSES) - 1)]
+        changed = {line.order_id for line in lines}
+        self._drop_served(changed)
+        completed = [order_id for order_id in changed if order_id not in self.tickets]
+        connection = self.db.connect()
+        with connection:
+            connection.executemany("UPDATE OrderDetails SET kitchen_status=? WHERE id=?",
+                                   [(line.status, line.id) for line in lines])
+            connection.executemany("UPDATE Orders SET status='Served' WHERE id=? AND status IN ('Open','InKitchen')",
+                                   [(order_id,) for order_id in completed])
+        self.db.notify_changed(*(("OrderDetails", "Orders") if completed else ("OrderDetails",)))
+        self._publish(changed)
@@ -0,0 +1,156 @@
+"""Maintenance Service - Planner statistics and free-space reclaim for the database file.
+
+``PRAGMA optimize`` re-runs ANALYZE on the tables whose statistics have gone
+stale, so the planner keeps choosing the right indexes as orders pile up.
+With auto_vacuum=INCREMENTAL, pages freed by deletes stay on the freelist
+until ``PRAGMA incremental_vacuum`` hands them back to the file system;
+doing that a bounded number of pages at a time keeps each step short enough
+to run between user actions. Both are meant to be called while the app is
+idle (see app.utils.idle) and record when they last ran in Settings.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import NamedTuple, Optional
+
+# Seconds between two idle-time PRAGMA optimize runs
+OPTIMIZE_INTERVAL = 6 * 3600
+
+# Free pages reclaimed per incremental_vacuum step, and the freelist size worth reclaiming
+VACUUM_STEP_PAGES = 256
+VACUUM_MIN_FREE_PAGES = 64
+
+# Seconds one idle maintenance run may spend reclaiming pages
+IDLE_BUDGET_SECONDS = 0.5
+
+AUTO_VACUUM_MODES = {0: "None", 1: "Full", 2: "Incremental"}
+
+
+class DatabaseStats(NamedTuple):
+    """Size and free space of the database file."""
+    file_bytes: int
+    page_size: int
+    page_count: int
+    freelist_count: int
+    auto_vacuum: str
+    fragmentation: Optional[float]
+    last_optimize: Optional[int]
+    last_vacuum: Optional[int]
+
+    @property
+    def free_ratio(self) -> float:
+        """Share of the file's pages that are unused."""
+        return self.freelist_count / self.page_count if self.page_count else 0.0
+
+
+class MaintenanceService:
+    """Runs ANALYZE, PRAGMA optimize and incremental vacuum on the local database."""
+
+    def __init__(self, db) -> None:
+        """Initialize maintenance service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    @property
+    def available(self) -> bool:
+        """Whether the database file is on this machine (not behind a sync server)."""
+        return bool(self.db.path)
+
+    def _setting(self, key: str) -> Optional[int]:
+        row = self.db.connect().execute("SELECT value FROM Settings WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else None
+
+    def _record(self, key: str, at: int) -> None:
+        connection = self.db.connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO Settings(key, value) VALUES(?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(at))
+            )
+
+    def stats(self, fragmentation: bool = True) -> DatabaseStats:
+        """Read the file's size, page counts and auto-vacuum mode.
+
+        Args:
+            fragmentation: Also measure the share of b-tree leaf pages not
+                stored right after their predecessor. This reads every page
+                through the dbstat table, so it costs a scan of the file; it
+                is None when SQLite was built without dbstat.
+        """
+        connection = self.db.connect()
+        pragma = lambda name: connection.execute(f"PRAGMA {name}").fetchone()[0]
+        scattered = None
+        if fragmentation:
+            try:
+                out_of_order, leaves = connection.execute("""
+                    SELECT SUM(pageno != previous + 1), COUNT(*) FROM (
+                        SELECT pageno, LAG(pageno) OVER (PARTITION BY name ORDER BY path) AS previous
+                        FROM dbstat WHERE pagetype = 'leaf'
+                    ) WHERE previous IS NOT NULL
+                """).fetchone()
+                scattered = (out_of_order or 0) / leaves if leaves else 0.0
+            except sqlite3.OperationalError:
+                scattered = None
+        return DatabaseStats(
+            os.path.getsize(self.db.path), pragma("page_size"), pragma("page_count"), pragma("freelist_count"),
+            AUTO_VACUUM_MODES.get(pragma("auto_vacuum"), "Unknown"), scattered,
+            self._setting("maintenance.last_optimize"), self._setting("maintenance.last_vacuum"),
+        )
+
+    def optimize(self) -> None:
+        """Refresh planner statistics where they are stale (PRAGMA optimize)."""
+        started = time.perf_counter()
+        self.db.connect().execute("PRAGMA optimize")
+        self._record("maintenance.last_optimize", int(time.time()))
+        logging.info(f"PRAGMA optimize took {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+    def analyze(self) -> None:
+        """Rebuild planner statistics for every table and index."""
+        connection = self.db.connect()
+        with connection:
+            connection.execute("ANALYZE")
+        self._record("maintenance.last_optimize", int(time.time()))
+
+    def reclaim(self, budget_seconds: Optional[float] = None) -> int:
+        """Give free pages back to the file system, VACUUM_STEP_PAGES at a time.
+
+        Args:
+            budget_seconds: Stop after the step that exceeds this much time;
+                reclaim the whole freelist when None.
+
+        Returns:
+            Number of pages reclaimed.
+        """
+        connection = self.db.connect()
+        started = time.perf_counter()
+        reclaimed = 0
+        free = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        while free:
+            connection.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+            remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= free:
+                break  # the file is not in incremental auto-vacuum mode
+            reclaimed += free - remaining
+            free = remaining
+            if budget_seconds is not None and time.perf_counter() - started >= budget_seconds:
+                break
+        if reclaimed:
+            self._record("maintenance.last_vacuum", int(time.time()))
+            logging.info(f"Reclaimed {reclaimed} free pages in {(time.perf_counter() - started) * 1000:.0f} ms.")
+        return reclaimed
+
+    def run_idle(self) -> None:
+        """Maintenance worth doing now; called when the user has been idle a while."""
+        if not self.available:
+            return
+        last = self._setting("maintenance.last_optimize")
+        if last is None or time.time() - last >= OPTIMIZE_INTERVAL:
+            self.optimize()
+        if self.db.connect().execute("PRAGMA freelist_count").fetchone()[0] >= VACUUM_MIN_FREE_PAGES:
+            self.reclaim(IDLE_BUDGET_SECONDS)
@@ -0,0 +1,85 @@
+"""Night Audit - Closes a business day: room charges, revenue, no-shows, occupancy.
+
+The audit posts the night's room charge to every checked-in reservation at
+the rate the price calendar gives for that night, cancels reservations that
+never arrived as no-shows, rolls the day's takings up into DailyRevenue and
+snapshots occupancy per room category. All of it runs in one transaction of
+set-based statements (see NightAuditRepo), and re-running a day never posts
+a charge twice.
+
+Run with ``python -m app.services.night_audit [--db PATH] [--date YYYY-MM-DD]``,
+e.g. nightly from cron; without ``--date`` it closes the current business
+day.
+"""
+
+import argparse
+import datetime
+import logging
+import os
+from typing import List, Optional
+
+from app.core.database import DatabaseManager
+from app.repositories.night_audit import AuditResult, NightAuditRepo
+from app.services.pricing_service import RoomPriceCalendar
+from app.utils.money import format_money
+from app.utils.timestamps import now_timestamp
+
+# Runs before this hour close the previous day, so an audit just after midnight still closes yesterday
+DAY_CLOSES_HOUR = 6
+
+
+def business_date(now: Optional[datetime.datetime] = None) -> datetime.date:
+    """Business day an audit started at ``now`` closes."""
+    now = now or datetime.datetime.now()
+    return (now - datetime.timedelta(hours=DAY_CLOSES_HOUR)).date()
+
+
+class NightAudit:
+    """Runs the end-of-day audit against one database."""
+
+    def __init__(self, db, pricing: Optional[RoomPriceCalendar] = None) -> None:
+        """Initialize the night audit.
+
+        Args:
+            db: DatabaseManager instance
+            pricing: Price calendar to rate nights from; one is built if omitted.
+        """
+        self.db = db
+        self.audit = NightAuditRepo(db)
+        self.pricing = pricing or RoomPriceCalendar(db)
+
+    def run(self, night: Optional[datetime.date] = None) -> AuditResult:
+        """Close a business day, by default the current one."""
+        night = night or business_date()
+        result = self.audit.run(night, self.pricing.night_rates(night), now_timestamp())
+        logging.info(f"Night audit {night}: {result.charges_posted} room charges posted, "
+                     f"{result.no_shows} no-shows.")
+        return result
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Close a business day of the hotel.")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                     "hotel_restaurant.db"),
+                        help="database file to audit")
+    parser.add_argument("--date", type=datetime.date.fromisoformat,
+                        help="business date to close (default: the current business day)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    db = DatabaseManager(args.db)
+    db.initialize()
+    audit = NightAudit(db)
+    result = audit.run(args.date)
+    revenue = audit.audit.revenue(result.day)
+    print(f"Room charges: {format_money(revenue.room_charges_paise)} ({result.charges_posted} posted)")
+    print(f"Order sales: {format_money(revenue.order_sales_paise)}, room payments: "
+          f"{format_money(revenue.room_payments_paise)}, tax: {format_money(revenue.tax_paise)}")
+    print(f"Open orders: {revenue.open_orders}, no-shows: {revenue.no_shows}")
+    for snapshot in audit.audit.occupancy(result.day):
+        print(f"{snapshot.category}: {snapshot.occupied}/{snapshot.rooms} rooms occupied")
+
+
+if __name__ == "__main__":
+    main()
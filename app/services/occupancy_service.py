@@ -0,0 +1,70 @@
+"""Occupancy Service - Room-night occupancy from reservation intervals.
+
+A stay occupies the nights [check_in, check_out). Intervals are clipped to
+the report range and overlapping bookings of the same room are merged with
+a sweep over (room, check_in) order, so a night is never counted twice.
+Occupied nights per day come from a difference array over the merged
+intervals, so the whole computation is O(n log n) in reservations plus
+O(days + rooms), independent of stay length.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class Occupancy:
+    """Occupied nights within a report range."""
+    per_room: np.ndarray  # nights per room index
+    per_day: np.ndarray   # occupied rooms per night, one entry per day of the range
+
+    @property
+    def total(self) -> int:
+        """Total occupied room-nights."""
+        return int(self.per_room.sum())
+
+
+def compute_occupancy(room_index: np.ndarray, check_in: np.ndarray, check_out: np.ndarray,
+                      first_day: int, last_day: int, room_count: int) -> Occupancy:
+    """Compute occupied nights per room and per day.
+
+    Args:
+        room_index: Dense room index (0..room_count-1) of each stay.
+        check_in: Check-in day number of each stay.
+        check_out: Check-out day number of each stay (exclusive).
+        first_day: First night of the report range.
+        last_day: Last night of the report range (inclusive).
+        room_count: Number of rooms.
+
+    Returns:
+        Occupancy with per-room and per-day night counts.
+    """
+    days = max(last_day - first_day + 1, 0)
+    start = np.maximum(check_in.astype(np.int64), first_day) - first_day
+    end = np.minimum(check_out.astype(np.int64), last_day + 1) - first_day
+    keep = end > start
+    rooms, start, end = room_index[keep].astype(np.int64), start[keep], end[keep]
+    if not len(rooms):
+        return Occupancy(np.zeros(room_count, np.int64), np.zeros(days, np.int64))
+
+    # Shift each room onto its own stretch of the number line so a single
+    # running maximum over (room, start) order never crosses rooms.
+    span = days + 1
+    start += rooms * span
+    end += rooms * span
+    order = np.lexsort((start, rooms))
+    start, end, rooms = start[order], end[order], rooms[order]
+    covered = np.maximum.accumulate(end)
+    previous = np.concatenate(([0], covered[:-1]))
+    # The part of each stay not already covered by earlier stays of its room
+    piece_start = np.maximum(start, previous)
+    piece_end = np.maximum(end, piece_start)
+
+    per_room = np.bincount(rooms, weights=piece_end - piece_start, minlength=room_count).astype(np.int64)
+    piece_start -= rooms * span
+    piece_end -= rooms * span
+    diff = np.zeros(days + 1, np.int64)
+    np.add.at(diff, piece_start, 1)
+    np.add.at(diff, piece_end, -1)
+    return Occupancy(per_room, np.cumsum(diff[:-1]))
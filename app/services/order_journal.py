@@ -0,0 +1,386 @@
+"""Order Journal - Write-behind queue for POS order entry.
+
+Order-entry screens append their writes to a local append-only file and
+return at once; a writer thread applies them to the database in batches.
+A report or export holding the SQLite lock then delays the write instead of
+failing it in front of the cashier. Each entry is synced to disk before it
+is accepted, and entries not yet applied are replayed on the next start.
+
+Orders created through the journal are known by their ``client_ref`` until
+the writer has inserted them. An entry the database refuses (say, a payment
+for an order that no longer exists) is dropped so it cannot block the queue;
+listeners added with add_rejection_listener hear about it on the next
+dispatch(). The sequence number of the last applied entry
+is committed in the same transaction as the batch, so replay after a crash
+never applies an entry twice.
+"""
+
+import collections
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.repositories.item_sales import ItemSalesRepo
+from app.repositories.recipes import RecipeRepo
+from app.services.tax_service import TaxService
+from app.utils.timestamps import now_timestamp
+
+JOURNAL_FILE = "pos_journal.jsonl"
+
+# Most entries applied in one transaction
+JOURNAL_BATCH_SIZE = 100
+
+# Seconds between attempts while the database stays locked
+RETRY_DELAY = 0.5
+
+# Seconds order-entry screens wait to confirm a write before reporting it queued
+CONFIRM_WAIT = 0.5
+
+# Fully applied journals larger than this are truncated
+COMPACT_BYTES = 1024 * 1024
+
+
+def default_journal_path(db) -> str:
+    """Journal file beside the database, or in the app folder on a sync terminal."""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(os.path.dirname(db.path) if db.path else app_dir, JOURNAL_FILE)
+
+
+class OrderJournal:
+    """Durable queue of order writes applied to the database on a thread."""
+
+    def __init__(self, db, path: str) -> None:
+        """Open the journal, replay unapplied entries and start the writer.
+
+        Args:
+            db: DatabaseManager instance
+            path: File path of the journal.
+        """
+        self.db = db
+        self.path = path
+        self.recipes = RecipeRepo(db)
+        self.item_sales = ItemSalesRepo(db)
+        self._lock = threading.Condition()
+        self._queue: Deque[Dict[str, Any]] = collections.deque()
+        self._order_ids: Dict[str, int] = {}
+        self._changed: Set[str] = set()
+        self._rejected: Dict[int, str] = {}
+        self._undelivered: List[Tuple[Dict[str, Any], str]] = []
+        self._rejection_listeners: List[Callable[[Dict[str, Any], str], None]] = []
+        self._stopping = False
+
+        self._journal_id, entries = self._read()
+        self._settings_key = f"pos_journal.{self._journal_id}.applied_seq"
+        row = db.connect().execute("SELECT value FROM Settings WHERE key = ?", (self._settings_key,)).fetchone()
+        self._applied = int(row[0]) if row else 0
+        self._queue.extend(e for e in entries if e["seq"] > self._applied)
+        self._seq = max([self._applied] + [e["seq"] for e in entries])
+        if self._queue:
+            logging.info(f"Replaying {len(self._queue)} journaled order writes")
+        # Rewrite with only the pending entries; this also drops a line
+        # torn by a crash so later appends start on a clean line.
+        self._rewrite(self._queue)
+        self._thread = threading.Thread(target=self._run, name="order-journal", daemon=True)
+        self._thread.start()
+
+    def _read(self) -> Tuple[str, List[Dict[str, Any]]]:
+        if not os.path.exists(self.path):
+            return uuid.uuid4().hex, []
+        journal_id, entries = None, []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Ignoring a torn line in {self.path}")
+                    continue
+                if "journal" in record:
+                    journal_id = record["journal"]
+                else:
+                    entries.append(record)
+        return journal_id or uuid.uuid4().hex, entries
+
+    def _rewrite(self, entries: Iterable[Dict[str, Any]]) -> None:
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"journal": self._journal_id}) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _append(self, entry: Dict[str, Any]) -> int:
+        with self._lock:
+            self._seq += 1
+            entry["seq"] = self._seq
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._queue.append(entry)
+            self._lock.notify_all()
+            return self._seq
+
+    def open_order(self, table_id: Optional[int], customer_id: Optional[int],
+                   lines: Sequence[Tuple[int, int, int]],
+                   occupy_from: Optional[Sequence[str]] = None) -> str:
+        """Queue a new open order with its lines.
+
+        Args:
+            table_id: Restaurant table, or None for a room order.
+            customer_id: Room guest, or None for a table order.
+            lines: (menu item id, quantity, unit price in paise) per line.
+            occupy_from: Table statuses that become Occupied; None for any.
+
+        Returns:
+            The order's client_ref, usable with order_id() and pay().
+        """
+        ref = uuid.uuid4().hex
+        self._append({"op": "open_order", "ref": ref, "table_id": table_id, "customer_id": customer_id,
+                      "created_at": now_timestamp(), "lines": [list(line) for line in lines],
+                      "occupy_from": list(occupy_from) if occupy_from is not None else None})
+        return ref
+
+    def pay(self, ref: str, tax_basis_points: int, method: str = "Cash") -> int:
+        """Queue payment in full of a journaled order, freeing its table.
+
+        The amount is the order's line total when the payment is applied.
+
+        Args:
+            ref: client_ref returned by open_order.
+            tax_basis_points: Restaurant tax rate at the time of payment.
+            method: Payment method.
+
+        Returns:
+            The entry's sequence number, for wait() and rejection().
+        """
+        return self._append({"op": "pay", "ref": ref, "tax_bp": tax_basis_points,
+                      "method": method, "paid_at": now_timestamp()})
+
+    def order_id(self, ref: str, timeout: float = 5.0) -> Optional[int]:
+        """Return the database id of a journaled order.
+
+        Waits up to ``timeout`` seconds for the order to be written.
+
+        Returns:
+            The order id, or None if it is not written yet.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while ref not in self._order_ids and any(e["ref"] == ref for e in self._queue):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._lock.wait(remaining)
+            if ref in self._order_ids:
+                return self._order_ids[ref]
+        row = self.db.connect().execute("SELECT id FROM Orders WHERE client_ref = ?", (ref,)).fetchone()
+        return row[0] if row else None
+
+    def wait(self, timeout: float, seq: Optional[int] = None) -> bool:
+        """Wait up to ``timeout`` seconds for queued writes to be applied.
+
+        Args:
+            timeout: Seconds to wait at most.
+            seq: Wait only for the writes up to this sequence number.
+
+        Returns:
+            True if those writes (all of them when ``seq`` is None) left the
+            queue, whether applied or rejected.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._queue if seq is None else self._applied < seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+            return True
+
+    def rejection(self, seq: int) -> Optional[str]:
+        """Why the entry with this sequence number was dropped, or None if it was not."""
+        with self._lock:
+            return self._rejected.get(seq)
+
+    def add_rejection_listener(self, callback: Callable[[Dict[str, Any], str], None]) -> None:
+        """Register a callback invoked by dispatch() with each dropped entry and the reason."""
+        if callback not in self._rejection_listeners:
+            self._rejection_listeners.append(callback)
+
+    def remove_rejection_listener(self, callback: Callable[[Dict[str, Any], str], None]) -> None:
+        """Unregister a callback previously passed to add_rejection_listener."""
+        if callback in self._rejection_listeners:
+            self._rejection_listeners.remove(callback)
+
+    def pending(self) -> int:
+        """Number of queued writes not yet applied."""
+        with self._lock:
+            return len(self._queue)
+
+    def dispatch(self) -> None:
+        """Notify listeners of tables written and entries dropped since the last call.
+
+        Called periodically from the UI thread, since listeners touch widgets.
+        """
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            rejected, self._undelivered = self._undelivered, []
+        if changed:
+            self.db.notify_changed(*sorted(changed))
+        for entry, reason in rejected:
+            for callback in list(self._rejection_listeners):
+                callback(entry, reason)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the writer after it drains the queue, waiting up to ``timeout``.
+
+        Anything still queued stays in the file and is replayed next start.
+        """
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+        self._thread.join(timeout)
+        self._file.close()
+
+    def _run(self) -> None:
+        connection = None
+        while True:
+            with self._lock:
+                while not self._queue and not self._stopping:
+                    self._lock.wait()
+                if not self._queue:
+                    break
+                batch = list(itertools.islice(self._queue, JOURNAL_BATCH_SIZE))
+            try:
+                if connection is None:
+                    connection = self.db.open_connection()
+                changed = self._apply(connection, batch)
+            except sqlite3.OperationalError as e:
+                # Locked or unreachable database: keep the entries and retry
+                # on a fresh connection
+                logging.warning(f"Journaled order writes delayed: {e}")
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                    connection = None
+                with self._lock:
+                    if self._stopping:
+                        break
+                time.sleep(RETRY_DELAY)
+                continue
+            with self._lock:
+                for _ in batch:
+                    self._queue.popleft()
+                self._changed |= changed
+                if not self._queue and self._file.tell() > COMPACT_BYTES:
+                    self._file.close()
+                    self._rewrite(())
+                self._lock.notify_all()
+        if connection is not None:
+            connection.close()
+
+    def _apply(self, connection, batch: List[Dict[str, Any]]) -> Set[str]:
+        """Apply a batch in one transaction; on a bad entry, apply one by one."""
+        try:
+            return self._apply_batch(connection, batch)
+        except (sqlite3.IntegrityError, LookupError):
+            changed = set()
+            for entry in batch:
+                try:
+                    changed |= self._apply_batch(connection, [entry])
+                except (sqlite3.IntegrityError, LookupError) as e:
+                    logging.error(f"Dropping journaled {entry['op']} {entry['ref']}: {e}")
+                    with connection:
+                        self._record_applied(connection, entry["seq"])
+                    with self._lock:
+                        self._applied = entry["seq"]
+                        self._rejected[entry["seq"]] = str(e)
+                        self._undelivered.append((entry, str(e)))
+            return changed
+
+    def _apply_batch(self, connection, batch: List[Dict[str, Any]]) -> Set[str]:
+        entries = [e for e in batch if e["seq"] > self._applied]
+        changed: Set[str] = set()
+        order_ids: Dict[str, int] = {}
+        if not entries:
+            return changed
+        # Take the write lock up front so a busy database fails before any work
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in entries:
+                if entry["op"] == "open_order":
+                    changed |= self._apply_open_order(connection, entry, order_ids)
+                elif entry["op"] == "pay":
+                    changed |= self._apply_pay(connection, entry)
+                else:
+                    raise LookupError(f"Unknown journal operation {entry['op']}")
+            self._record_applied(connection, entries[-1]["seq"])
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        with self._lock:
+            self._order_ids.update(order_ids)
+            self._applied = entries[-1]["seq"]
+        return changed
+
+    def _record_applied(self, connection, seq: int) -> None:
+        connection.execute(
+            "INSERT INTO Settings(key, value) VALUES(?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (self._settings_key, str(seq))
+        )
+
+    def _apply_open_order(self, connection, entry: Dict[str, Any], order_ids: Dict[str, int]) -> Set[str]:
+        cursor = connection.execute(
+            "INSERT INTO Orders(table_id, customer_id, status, created_at, client_ref) VALUES(?, ?, 'Open', ?, ?)",
+            (entry["table_id"], entry["customer_id"], entry["created_at"], entry["ref"])
+        )
+        order_id = order_ids[entry["ref"]] = cursor.lastrowid
+        connection.executemany(
+            "INSERT INTO OrderDetails(order_id, item_id, qty, price_paise, kitchen_status) VALUES(?, ?, ?, ?, 'Pending')",
+            [(order_id, item_id, qty, price) for item_id, qty, price in entry["lines"]]
+        )
+        if entry["table_id"]:
+            statuses = entry["occupy_from"]
+            if statuses is None:
+                connection.execute("UPDATE Tables SET status = 'Occupied' WHERE id = ?", (entry["table_id"],))
+            else:
+                connection.execute(
+                    f"UPDATE Tables SET status = 'Occupied' WHERE id = ? AND status IN ({','.join('?' * len(statuses))})",
+                    (entry["table_id"], *statuses)
+                )
+        return {"Orders", "OrderDetails", "Tables"}
+
+    def _apply_pay(self, connection, entry: Dict[str, Any]) -> Set[str]:
+        row = connection.execute("""
+            SELECT o.id, o.table_id, COALESCE(SUM(od.qty * od.price_paise), 0) AS amount
+            FROM Orders o LEFT JOIN OrderDetails od ON od.order_id = o.id
+            WHERE o.client_ref = ? GROUP BY o.id
+        """, (entry["ref"],)).fetchone()
+        if row is None:
+            raise LookupError(f"Order {entry['ref']} not found")
+        # Closing the table or checking out may have settled the order before the journal drained
+        if connection.execute("UPDATE Orders SET status = 'Paid' WHERE id = ? AND status NOT IN ('Paid', 'Cancelled')",
+                              (row["id"],)).rowcount != 1:
+            raise LookupError(f"Order {entry['ref']} is already paid or cancelled")
+        connection.execute(
+            "INSERT INTO Payments(order_id, amount_paise, gst_paise, method, paid_at) VALUES(?, ?, ?, ?, ?)",
+            (row["id"], row["amount"], TaxService.apply_rate(row["amount"], entry["tax_bp"]),
+             entry["method"], entry["paid_at"])
+        )
+        self.item_sales.record_order(row["id"], entry["paid_at"], connection)
+        if row["table_id"]:
+            connection.execute("UPDATE Tables SET status = 'Available' WHERE id = ?", (row["table_id"],))
+        if self.recipes.deplete(row["id"], entry["paid_at"], connection):
+            return {"Payments", "Orders", "Tables", "ItemSalesDaily", "Inventory", "InventoryConsumption"}
+        return {"Payments", "Orders", "Tables", "ItemSalesDaily"}
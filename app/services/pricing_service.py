@@ -0,0 +1,179 @@
+"""Pricing Service - Room prices looked up from a precomputed rate calendar.
+
+Rate rules are evaluated once per room category and night into a matrix of
+rate multipliers (categories x nights) covering the recent past and the
+coming year; each rule is a handful of vectorized comparisons over all
+nights at once. Quoting a stay is then a slice of that matrix times the
+room's base rate. Rules that need a minimum length of stay get a calendar
+of their own per threshold, applied only to stays long enough.
+
+The calendar is rebuilt lazily after rate rules, rooms or reservations are
+reported as changed, since occupancy rules follow the bookings.
+"""
+
+import datetime
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+from app.repositories.rate_rules import RateRuleRepo
+from app.repositories.rooms import Room, RoomRepo
+from app.services.analytics_service import DAY_SQL, day_date, day_number
+from app.services.availability_service import BLOCKING_STATUSES
+
+ROOM_CATEGORIES = ("Standard", "Deluxe", "Suite")
+
+# Nights before today kept in the calendar so stays being checked out price from it
+CALENDAR_PAST_DAYS = 90
+
+# Nights from today onwards covered by the calendar
+CALENDAR_DAYS = 366
+
+
+class Quote(NamedTuple):
+    """Price of a stay; amounts in paise."""
+    room_id: int
+    nights: List[Tuple[datetime.date, int]]
+    total: int
+
+    @property
+    def average(self) -> int:
+        """Average nightly price."""
+        return round(self.total / len(self.nights)) if self.nights else 0
+
+
+class RoomPriceCalendar:
+    """Nightly rate multipliers per room category, built from the rate rules."""
+
+    def __init__(self, db) -> None:
+        """Initialize the price calendar; it is built on first use.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.room_repo = RoomRepo(db)
+        self.rule_repo = RateRuleRepo(db)
+        self.rooms: Dict[int, Room] = {}
+        self.first_day = 0
+        self.factors = np.ones((len(ROOM_CATEGORIES), 0))
+        self._los: List[Tuple[int, np.ndarray]] = []
+        self._stale = True
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Mark the calendar stale when rules, rooms or bookings changed."""
+        if {"RateRules", "Rooms", "Reservations"} & set(tables):
+            self._stale = True
+
+    def _ensure_covers(self, first: int, last: int) -> None:
+        """Build the calendar if stale or if nights first..last-1 fall outside it."""
+        if not self._stale and first >= self.first_day and last <= self.first_day + self.factors.shape[1]:
+            return
+        today = day_number(datetime.date.today())
+        self.build(min(first, today - CALENDAR_PAST_DAYS), max(last, today + CALENDAR_DAYS))
+
+    def build(self, first: int, last: int) -> None:
+        """Evaluate every rule over the nights first..last-1 (day numbers)."""
+        self.rooms = {room.id: room for room in self.room_repo.all()}
+        days = np.arange(first, last)
+        weekdays = (days + 3) % 7  # 1970-01-01 was a Thursday
+        occupancy = self._occupancy(first, last)
+        base = np.ones((len(ROOM_CATEGORIES), len(days)))
+        by_length: Dict[int, np.ndarray] = {}
+        for rule in self.rule_repo.all():
+            rows = [ROOM_CATEGORIES.index(rule.category)] if rule.category in ROOM_CATEGORIES else slice(None)
+            applies = np.ones((len(ROOM_CATEGORIES), len(days)), dtype=bool)
+            if rule.start_date:
+                applies &= days >= day_number(datetime.date.fromisoformat(rule.start_date))
+            if rule.end_date:
+                applies &= days <= day_number(datetime.date.fromisoformat(rule.end_date))
+            if rule.weekdays:
+                applies &= np.isin(weekdays, [int(d) for d in rule.weekdays.split(",") if d.strip()])
+            if rule.min_occupancy is not None:
+                applies &= occupancy >= rule.min_occupancy
+            target = base if rule.min_nights <= 1 else by_length.setdefault(
+                rule.min_nights, np.ones((len(ROOM_CATEGORIES), len(days))))
+            target[rows] *= np.where(applies[rows], rule.multiplier, 1.0)
+        self.first_day = first
+        self.factors = base
+        self._los = sorted(by_length.items())
+        self._stale = False
+
+    def _occupancy(self, first: int, last: int) -> np.ndarray:
+        """Fraction of each category's rooms held by active bookings on each night."""
+        rooms_per_category = np.zeros(len(ROOM_CATEGORIES))
+        category_of: Dict[int, int] = {}
+        for room in self.rooms.values():
+            if room.category in ROOM_CATEGORIES:
+                category_of[room.id] = ROOM_CATEGORIES.index(room.category)
+                rooms_per_category[category_of[room.id]] += 1
+        cur = self.db.connect().cursor()
+        cur.row_factory = None
+        # Open stays without a check-out hold their room at least through tonight
+        stays = [(category_of[room_id], a, b) for room_id, a, b in cur.execute(f"""
+            SELECT room_id, {DAY_SQL.format('check_in')}, COALESCE({DAY_SQL.format('check_out')}, ?)
+            FROM Reservations WHERE status IN ({','.join('?' * len(BLOCKING_STATUSES))})
+        """, (day_number(datetime.date.today()) + 1,) + BLOCKING_STATUSES)
+            if room_id in category_of and a is not None]
+        width = last - first
+        change = np.zeros((len(ROOM_CATEGORIES), width + 1))
+        if stays:
+            category, start, end = (np.array(column, dtype=np.int64) for column in zip(*stays))
+            end = np.maximum(end, start + 1)
+            np.add.at(change, (category, np.clip(start - first, 0, width)), 1)
+            np.add.at(change, (category, np.clip(end - first, 0, width)), -1)
+        held = np.cumsum(change, axis=1)[:, :width]
+        return held / np.maximum(rooms_per_category, 1)[:, None]
+
+    def nightly(self, room_id: int, check_in: datetime.date, check_out: datetime.date) -> np.ndarray:
+        """Price in paise of each night of a stay; a same-day stay counts as one night."""
+        first = day_number(check_in)
+        last = max(day_number(check_out), first + 1)
+        self._ensure_covers(first, last)
+        room = self.rooms.get(room_id)
+        if room is None:
+            raise LookupError(f"Room {room_id} not found")
+        row = ROOM_CATEGORIES.index(room.category) if room.category in ROOM_CATEGORIES else None
+        start, end = first - self.first_day, last - self.first_day
+        factors = self.factors[row, start:end] if row is not None else np.ones(end - start)
+        for min_nights, extra in self._los:
+            if end - start >= min_nights and row is not None:
+                factors = factors * extra[row, start:end]
+        # Halves round up, like ROUND() in the night audit's SQL
+        return np.floor((room.rate_paise or 0) * factors + 0.5).astype(np.int64)
+
+    def night_rates(self, night: datetime.date) -> List[Tuple[str, int, float]]:
+        """Rate multipliers of one night per category and stay-length threshold.
+
+        Returns:
+            (category, min_nights, factor) rows; a stay uses the row with the
+            largest min_nights it reaches, so each factor already includes
+            the length-of-stay rules of smaller thresholds.
+        """
+        day = day_number(night)
+        self._ensure_covers(day, day + 1)
+        column = day - self.first_day
+        rates = []
+        for row, category in enumerate(ROOM_CATEGORIES):
+            factor = float(self.factors[row, column])
+            rates.append((category, 1, factor))
+            for min_nights, extra in self._los:
+                factor *= float(extra[row, column])
+                rates.append((category, min_nights, factor))
+        return rates
+
+    def quote(self, room_id: int, check_in: datetime.date, check_out: datetime.date) -> Quote:
+        """Price a stay night by night from the calendar.
+
+        Args:
+            room_id: Room being priced.
+            check_in: Arrival date.
+            check_out: Departure date; a same-day stay counts as one night.
+
+        Returns:
+            The nights with their prices and the stay total, in paise.
+        """
+        prices = self.nightly(room_id, check_in, check_out).tolist()
+        first = day_number(check_in)
+        return Quote(room_id, [(day_date(first + i), price) for i, price in enumerate(prices)], sum(prices))
@@ -0,0 +1,323 @@
+"""Report Export Service - Writes columnar extracts and database snapshots for analysts.
+
+Extracts are taken from a point-in-time copy of the database made with the
+SQLite online backup API, so analysts never query the live database file.
+The copy includes the archive file of closed history when there is one, and
+extracts read the All<Table> views over both, so archiving never removes
+rows from them.
+Tables are written as date-partitioned columnar files: Parquet (zstd) when
+pyarrow is installed, otherwise gzip-compressed JSON with one array per
+column.
+"""
+
+import datetime
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from app.core.database import archive_path_for, attach_archive
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional
+    pa = None
+    pq = None
+
+
+# Table name -> (select list, FROM clause, SQL expression of its ISO date);
+# the All<Table> views cover the live and the archive file
+EXPORT_TABLES: Dict[str, tuple] = {
+    "Orders": ("Orders.*", "AllOrders Orders", "date(Orders.created_at, 'unixepoch')"),
+    "OrderDetails": (
+        "OrderDetails.*, Orders.created_at AS order_created_at",
+        "AllOrderDetails OrderDetails JOIN AllOrders Orders ON Orders.id = OrderDetails.order_id",
+        "date(Orders.created_at, 'unixepoch')",
+    ),
+    "Payments": ("Payments.*", "AllPayments Payments", "date(Payments.paid_at, 'unixepoch')"),
+    "Reservations": ("Reservations.*", "AllReservations Reservations", "Reservations.check_in"),
+}
+
+# Pages copied per online-backup step, and seconds to pause between steps so
+# writers on other connections get the database in between
+SNAPSHOT_PAGES = 256
+SNAPSHOT_SLEEP = 0.005
+
+# Partitioning granularity -> number of leading characters of an ISO date
+PARTITION_WIDTHS = {"day": 10, "month": 7, "year": 4}
+
+
+def _remove_snapshot(path: str) -> None:
+    """Delete a snapshot file and the archive copy taken with it."""
+    for name in (path, archive_path_for(path)):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def columnar_format() -> str:
+    """Return the columnar file format used for extracts ("parquet" or "json")."""
+    return "parquet" if pa is not None else "json"
+
+
+class ReportExportService:
+    """Produces analyst-facing copies of the hotel and restaurant data.
+
+    Each call opens its own connections from the database path, so the
+    service can be used from a worker thread."""
+
+    def __init__(self, db) -> None:
+        """Initialize report export service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    def snapshot(self, dest_path: str, pages: int = SNAPSHOT_PAGES,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 sleep: float = SNAPSHOT_SLEEP) -> str:
+        """Write a consistent point-in-time copy of the database.
+
+        Uses the SQLite online backup API, copying ``pages`` pages per step
+        and pausing ``sleep`` seconds between steps, so other connections
+        are not blocked for the whole copy. This takes a while on a large
+        file; the GUI runs it on a SnapshotJob. When the database has an
+        archive file, it is copied next to the snapshot under the name
+        ``archive_path_for(dest_path)``, where a DatabaseManager opened on
+        the snapshot finds it. Each file is consistent on its own; an
+        archive run during the copy may leave rows it moved in both files
+        or in neither.
+
+        Args:
+            dest_path: File path of the snapshot to create (overwritten).
+            pages: Number of pages copied per backup step.
+            progress: Optional callback receiving (remaining, total) pages
+                over both files.
+            sleep: Seconds to pause between backup steps.
+
+        Returns:
+            The snapshot path.
+
+        Raises:
+            ValueError: If the database is reached through a sync server.
+        """
+        if not self.db.path:
+            raise ValueError("Snapshots can only be taken on the machine that holds the database")
+        copies = [(self.db.path, dest_path)]
+        if os.path.exists(self.db.archive_path):
+            copies.append((self.db.archive_path, archive_path_for(dest_path)))
+        _remove_snapshot(dest_path)
+        sources = [sqlite3.connect(source_path) for source_path, _ in copies]
+        try:
+            sizes = [source.execute("PRAGMA page_count").fetchone()[0] for source in sources]
+            for index, (source, (_, path)) in enumerate(zip(sources, copies)):
+                # Pages of the other files, so progress spans the whole copy
+                done, pending = sum(sizes[:index]), sum(sizes[index + 1:])
+                dest = sqlite3.connect(path)
+                try:
+                    source.backup(
+                        dest, pages=pages,
+                        progress=(lambda status, remaining, total: progress(remaining + pending,
+                                                                            done + total + pending))
+                        if progress else None,
+                        sleep=sleep
+                    )
+                finally:
+                    dest.close()
+        finally:
+            for source in sources:
+                source.close()
+        return dest_path
+
+    def export_tables(self, output_dir: str, tables: Optional[Sequence[str]] = None,
+                      partition_by: Optional[str] = "month",
+                      snapshot_path: Optional[str] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """Export tables as date-partitioned columnar files.
+
+        Files are laid out as ``<output_dir>/<Table>/<partition_by>=<key>/part-0.<ext>``
+        and a ``_manifest.json`` describing every file is written alongside.
+
+        Args:
+            output_dir: Directory that receives the extract.
+            tables: Table names from EXPORT_TABLES; all of them when omitted.
+            partition_by: "day", "month", "year", or None for one file per table.
+            snapshot_path: Existing snapshot to read from, with its archive
+                copy beside it if any. When omitted a temporary snapshot is
+                taken and removed afterwards.
+            progress: Optional callback receiving (tables written, tables)
+                after each table.
+
+        Returns:
+            The manifest dictionary.
+        """
+        tables = list(tables or EXPORT_TABLES.keys())
+        unknown = [t for t in tables if t not in EXPORT_TABLES]
+        if unknown:
+            raise ValueError(f"Unsupported export table(s): {', '.join(unknown)}")
+        if partition_by is not None and partition_by not in PARTITION_WIDTHS:
+            raise ValueError(f"Unsupported partitioning: {partition_by}")
+
+        temp_snapshot = None
+        if snapshot_path is None:
+            handle, temp_snapshot = tempfile.mkstemp(suffix=".db")
+            os.close(handle)
+            snapshot_path = self.snapshot(temp_snapshot)
+
+        manifest = {
+            "created_at": datetime.datetime.now().isoformat(),
+            "format": columnar_format(),
+            "partition_by": partition_by,
+            "tables": {},
+        }
+        connection = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+        try:
+            attach_archive(connection, archive_path_for(snapshot_path))
+            for index, table in enumerate(tables, 1):
+                manifest["tables"][table] = self._export_table(connection, table, output_dir, partition_by)
+                if progress:
+                    progress(index, len(tables))
+        finally:
+            connection.close()
+            if temp_snapshot:
+                _remove_snapshot(temp_snapshot)
+
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "_manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def _export_table(self, connection: sqlite3.Connection, table: str,
+                      output_dir: str, partition_by: Optional[str]) -> List[Dict[str, Any]]:
+        """Stream one table out of the snapshot, one file per partition."""
+        select, source, date_column = EXPORT_TABLES[table]
+        partition = f"substr({date_column}, 1, {PARTITION_WIDTHS[partition_by]})" if partition_by else "NULL"
+        query = f"SELECT {partition} AS _partition, {select} FROM {source} ORDER BY {date_column}"
+        cursor = connection.cursor()
+        cursor.execute(query)
+        columns = [d[0] for d in cursor.description][1:]
+
+        files = []
+        current_key = None
+        buffer: Dict[str, list] = {name: [] for name in columns}
+        while True:
+            rows = cursor.fetchmany(5000)
+            for row in rows:
+                key = row[0]
+                if key != current_key and buffer[columns[0]]:
+                    files.append(self._write_partition(output_dir, table, partition_by, current_key, columns, buffer))
+                    buffer = {name: [] for name in columns}
+                current_key = key
+                for index, name in enumerate(columns, 1):
+                    buffer[name].append(row[index])
+            if not rows:
+                break
+        if buffer[columns[0]]:
+            files.append(self._write_partition(output_dir, table, partition_by, current_key, columns, buffer))
+        cursor.close()
+        return files
+
+    def _write_partition(self, output_dir: str, table: str, partition_by: Optional[str],
+                         key: Optional[str], columns: List[str],
+                         data: Dict[str, list]) -> Dict[str, Any]:
+        """Write one partition's columns to disk and return its manifest entry."""
+        directory = os.path.join(output_dir, table)
+        if partition_by:
+            directory = os.path.join(directory, f"{partition_by}={key or 'unknown'}")
+        os.makedirs(directory, exist_ok=True)
+        if pa is not None:
+            path = os.path.join(directory, "part-0.parquet")
+            pq.write_table(pa.table(data), path, compression="zstd")
+        else:
+            path = os.path.join(directory, "part-0.json.gz")
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                json.dump({"table": table, "columns": columns, "data": data}, f)
+        return {
+            "path": os.path.relpath(path, output_dir),
+            "partition": key,
+            "rows": len(data[columns[0]]),
+        }
+
+
+class SnapshotJob(threading.Thread):
+    """Takes a database snapshot on a background thread.
+
+    Progress is exposed through the ``remaining`` and ``total`` page counts
+    so a UI can poll them from its own thread; the outcome is recorded in
+    ``error`` once the thread has finished."""
+
+    def __init__(self, db, dest_path: str) -> None:
+        """Initialize the snapshot job.
+
+        Args:
+            db: DatabaseManager instance
+            dest_path: File path of the snapshot to create (overwritten).
+        """
+        super().__init__(daemon=True)
+        self.service = ReportExportService(db)
+        self.dest_path = dest_path
+        self.remaining = 0
+        self.total = 0
+        self.error: Optional[BaseException] = None
+
+    def _on_progress(self, remaining: int, total: int) -> None:
+        self.remaining = remaining
+        self.total = total
+
+    def run(self) -> None:
+        """Copy the database, recording the outcome on the job."""
+        try:
+            self.service.snapshot(self.dest_path, progress=self._on_progress)
+        except Exception as e:
+            self.error = e
+
+
+class ExtractJob(threading.Thread):
+    """Snapshots the database and writes an analyst extract on a background thread.
+
+    Progress is exposed through ``stage`` ("snapshot", then "export") with
+    ``done`` and ``total`` counting pages copied or tables written, so a UI
+    can poll it from its own thread; the outcome is recorded in ``manifest``
+    or ``error`` once the thread has finished."""
+
+    def __init__(self, db, output_dir: str, partition_by: Optional[str] = "month") -> None:
+        """Initialize the extract job.
+
+        Args:
+            db: DatabaseManager instance
+            output_dir: Directory that receives the extract.
+            partition_by: "day", "month", "year", or None for one file per table.
+        """
+        super().__init__(daemon=True)
+        self.service = ReportExportService(db)
+        self.output_dir = output_dir
+        self.partition_by = partition_by
+        self.stage = "snapshot"
+        self.done = 0
+        self.total = 0
+        self.manifest: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+
+    def _on_progress(self, stage: str, done: int, total: int) -> None:
+        self.stage = stage
+        self.done = done
+        self.total = total
+
+    def run(self) -> None:
+        """Take a temporary snapshot and export every table from it."""
+        handle, snapshot_path = tempfile.mkstemp(suffix=".db")
+        os.close(handle)
+        try:
+            self.service.snapshot(snapshot_path,
+                                  progress=lambda remaining, total: self._on_progress("snapshot", total - remaining, total))
+            self.manifest = self.service.export_tables(
+                self.output_dir, partition_by=self.partition_by, snapshot_path=snapshot_path,
+                progress=lambda done, total: self._on_progress("export", done, total))
+        except Exception as e:
+            self.error = e
+        finally:
+            _remove_snapshot(snapshot_path)
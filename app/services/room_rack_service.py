@@ -0,0 +1,134 @@
+"""Room Rack Service - Windowed reservation loading for the room-by-date grid.
+
+Reservations are fetched one week at a time and only for weeks that become
+visible. Each week query reads dated stays from the (check_out, check_in)
+index, starting at the week's first day, so a stay of any length is found
+without scanning the stays that ended before it; stays without a check-out
+come from a partial index of their own. Neighbouring weeks can be prefetched
+on a background thread with its own read-only connection.
+"""
+
+import datetime
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Set
+
+from app.services.analytics_service import DAY_SQL, day_date, day_number
+
+
+class Stay(NamedTuple):
+    """One reservation drawn on the rack; first/last are day numbers, last exclusive."""
+    id: int
+    room_id: int
+    first: int
+    last: int
+    status: str
+    guest: str
+
+
+class RoomRackService:
+    """Caches reservations intersecting the visible rack window by week."""
+
+    def __init__(self, db) -> None:
+        """Initialize room rack service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self._weeks: Dict[int, List[Stay]] = {}
+        self._pending: Set[int] = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+        db.add_change_listener(self.invalidate)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Drop cached weeks after reservations, customers or rooms changed.
+
+        Args:
+            tables: Names of changed tables.
+        """
+        if {"Reservations", "Customers", "Rooms"} & set(tables):
+            with self._lock:
+                self._weeks.clear()
+                self._generation += 1
+
+    def stays(self, first_day: int, last_day: int) -> List[Stay]:
+        """Return stays intersecting the days first_day..last_day inclusive.
+
+        Weeks not cached yet are loaded synchronously on the main connection.
+        """
+        found: Dict[int, Stay] = {}
+        for week in range(first_day // 7, last_day // 7 + 1):
+            with self._lock:
+                cached = self._weeks.get(week)
+            if cached is None:
+                cached = self._load_week(self.db.connect(), week)
+                with self._lock:
+                    self._weeks[week] = cached
+            for stay in cached:
+                if stay.first <= last_day and stay.last > first_day:
+                    found[stay.id] = stay
+        return list(found.values())
+
+    def prefetch(self, first_day: int, last_day: int) -> None:
+        """Load the weeks covering first_day..last_day in the background.
+
+        Already cached or in-flight weeks are skipped. Nothing is prefetched
+        without a local database file (a sync server terminal).
+        """
+        if not self.db.path:
+            return
+        with self._lock:
+            weeks = [w for w in range(first_day // 7, last_day // 7 + 1)
+                     if w not in self._weeks and w not in self._pending]
+            self._pending.update(weeks)
+            generation = self._generation
+        if weeks:
+            threading.Thread(target=self._prefetch, args=(weeks, generation), daemon=True).start()
+
+    def _prefetch(self, weeks: List[int], generation: int) -> None:
+        try:
+            connection = sqlite3.connect(f"file:{self.db.path}?mode=ro", uri=True)
+            connection.row_factory = sqlite3.Row
+            try:
+                for week in weeks:
+                    stays = self._load_week(connection, week)
+                    with self._lock:
+                        # Results from before an invalidation would be stale
+                        if generation == self._generation:
+                            self._weeks.setdefault(week, stays)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logging.warning(f"Room rack prefetch failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.difference_update(weeks)
+
+    def _load_week(self, connection: sqlite3.Connection, week: int) -> List[Stay]:
+        """Query the stays intersecting one week (days week*7 .. week*7+6)."""
+        start = week * 7
+        # A dated stay touching this week checks out after its first day; an
+        # open one (no check-out) holds its room through tonight. The unary +
+        # keeps the planner off idx_reservations_check_in, whose range covers
+        # every stay that started before the week
+        lower = day_date(start).isoformat()
+        upper = day_date(start + 7).isoformat()
+        tomorrow = day_number(datetime.date.today()) + 1
+        columns = f"""
+            SELECT r.id, r.room_id, {DAY_SQL.format('r.check_in')} AS first,
+                   COALESCE({DAY_SQL.format('r.check_out')}, ?1) AS last, r.status, c.name
+            FROM Reservations r
+            JOIN Customers c ON c.id = r.customer_id
+        """
+        rows = connection.execute(f"""
+            {columns}
+            WHERE r.check_out > ?2 AND +r.check_in < ?3 AND r.status != 'Cancelled'
+            UNION ALL
+            {columns}
+            WHERE r.check_out IS NULL AND r.check_in < ?3 AND r.status != 'Cancelled'
+        """, (tomorrow, lower, upper)).fetchall()
+        return [Stay(r[0], r[1], r[2], max(r[3], r[2] + 1), r[4], r[5] or "")
+                for r in rows if r[2] is not None and max(r[3], r[2] + 1) > start]
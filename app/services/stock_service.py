@@ -0,0 +1,99 @@
+"""Stock Service - Low-stock state kept up to date from consumption.
+
+The items at or below their threshold are read once at start-up through the
+partial index idx_inventory_low, so the rest of Inventory is never scanned.
+After that only the items an order actually used are looked at: when
+InventoryConsumption is reported as changed, the rows added since the last
+look are joined to Inventory by primary key and those levels are re-checked.
+Hand edits made on the inventory page re-check the single item edited. Any
+other change to Inventory (another terminal through the sync server, a CLI
+import) re-reads the low items from the partial index.
+
+Subscribers are told which items crossed their threshold in either
+direction, so the sidebar badge and dashboard update without polling.
+"""
+
+from typing import Callable, Dict, Iterable, List, Set
+
+from app.repositories.inventory import InventoryItem, InventoryRepo
+
+
+class StockService:
+    """Keeps the set of stock items running low and publishes changes to it."""
+
+    def __init__(self, db) -> None:
+        """Initialize stock service and load the low-stock items.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+        self.inventory = InventoryRepo(db)
+        self.low: Dict[int, InventoryItem] = {}
+        self._last_consumption_id = 0
+        self._listeners: List[Callable[[Set[int]], None]] = []
+        self.reload()
+        db.add_change_listener(self._on_tables_changed)
+
+    def add_listener(self, callback: Callable[[Set[int]], None]) -> None:
+        """Register a callback invoked with the ids of items that crossed their threshold.
+
+        An id that is in ``low`` went low; one that is not has been restocked
+        or deleted.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Set[int]], None]) -> None:
+        """Unregister a callback previously passed to add_listener."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _publish(self, item_ids: Set[int]) -> None:
+        if item_ids:
+            for callback in list(self._listeners):
+                callback(item_ids)
+
+    def reload(self) -> None:
+        """Re-read the low-stock items from the partial index, e.g. after an import."""
+        self._last_consumption_id = self.inventory.last_consumption()
+        low = {item.id: item for item in self.inventory.low()}
+        crossed = set(low).symmetric_difference(self.low)
+        self.low = low
+        self._publish(crossed)
+
+    def low_items(self) -> List[InventoryItem]:
+        """Items at or below their threshold, ordered by name."""
+        return sorted(self.low.values(), key=lambda item: item.name)
+
+    def update(self, items: Iterable[InventoryItem]) -> None:
+        """Re-check the given current levels against their thresholds."""
+        crossed = set()
+        for item in items:
+            if item.qty <= item.threshold:
+                if item.id not in self.low:
+                    crossed.add(item.id)
+                self.low[item.id] = item
+            elif self.low.pop(item.id, None) is not None:
+                crossed.add(item.id)
+        self._publish(crossed)
+
+    def refresh_item(self, item_id: int) -> None:
+        """Re-read one item after it was added, edited or deleted."""
+        item = self.inventory.get(item_id)
+        if item is not None:
+            self.update([item])
+        elif self.low.pop(item_id, None) is not None:
+            self._publish({item_id})
+
+    def _on_tables_changed(self, tables) -> None:
+        """Re-check the items consumed since the last notification, or reload on other edits."""
+        if "InventoryConsumption" not in tables:
+            # Consumption reports Inventory alongside; an edit alone comes from elsewhere
+            if "Inventory" in tables:
+                self.reload()
+            return
+        last = self.inventory.last_consumption()
+        if last > self._last_consumption_id:
+            self.update(self.inventory.consumed_between(self._last_consumption_id, last))
+            self._last_consumption_id = last
@@ -0,0 +1,296 @@
+"""Sync Server - Lets several terminals share one SQLite database over a socket.
+
+The server process owns the database file. Each desktop client keeps a
+single socket open to it (TCP on the local network, or a Unix socket on the
+same machine) and sends batches of calls; the whole batch runs on that
+client's own server-side connection and the results come back in one reply,
+so a screen that issues several statements pays one round trip.
+
+Wire format: every message is a frame of a 4-byte big-endian length followed
+by the encoded body. The first frame in each direction is a JSON handshake
+choosing the codec for the rest of the session - msgpack when both sides
+have it installed, JSON otherwise.
+
+    request  {"id": 7, "calls": [["execute", [sql, params]], ["commit", []]]}
+    reply    {"id": 7, "results": [{...}, null]}
+    failure  {"id": 7, "results": [...], "error": {"type": "IntegrityError",
+              "message": "...", "index": 1}}
+    event    {"event": "changed", "tables": ["Orders"]}
+
+Calls after a failing call in the same batch are not run. Change events are
+pushed to every other client when one of them reports a write with
+``notify``, so their caches and live screens refresh like they do locally.
+
+Run with ``python -m app.services.sync_server --db PATH [--host H --port P |
+--unix PATH]``; the app connects to it when HOTEL_SYNC_SERVER is set.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.database import STATEMENT_CACHE_SIZE, DatabaseManager, archive_path_for, attach_archive
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Frame header: body length as an unsigned 32-bit big-endian integer
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Milliseconds a session waits for another session's write lock
+BUSY_TIMEOUT_MS = 5000
+
+CODECS = ("msgpack", "json") if msgpack is not None else ("json",)
+
+
+def encode(message: Any, codec: str = "json") -> bytes:
+    """Encode a message body with the session codec."""
+    if codec == "msgpack":
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+
+def decode(body: bytes, codec: str = "json") -> Any:
+    """Decode a message body with the session codec."""
+    if codec == "msgpack":
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def frame(message: Any, codec: str = "json") -> bytes:
+    """Encode a message and prefix it with its length."""
+    body = encode(message, codec)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def parse_address(address: str) -> Tuple[str, Any]:
+    """Split a server address into ("unix", path) or ("tcp", (host, port)).
+
+    Accepts ``unix:/path/to.sock``, ``host:port`` or a bare host.
+    """
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    if not host:
+        return "tcp", (address, DEFAULT_PORT)
+    return "tcp", (host, int(port))
+
+
+class _Session:
+    """One connected client: its own connection and a worker thread for it."""
+
+    def __init__(self, server: "SyncServer", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter) -> None:
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.codec = "json"
+        # SQLite calls block, so they run on a thread of their own; one
+        # thread per session keeps each connection on a single thread.
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-session")
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> None:
+        self.connection = sqlite3.connect(self.server.path, check_same_thread=False,
+                                          cached_statements=STATEMENT_CACHE_SIZE)
+        self.connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        attach_archive(self.connection, archive_path_for(self.server.path))
+
+    def _close(self) -> None:
+        if self.connection is not None:
+            if self.connection.in_transaction:
+                self.connection.rollback()
+            self.connection.close()
+            self.connection = None
+
+    def _run_calls(self, calls: List[Any]) -> Tuple[List[Any], Optional[Dict[str, Any]], Set[str]]:
+        """Run a batch in order, stopping at the first failing call."""
+        results: List[Any] = []
+        notified: Set[str] = set()
+        for index, (method, params) in enumerate(calls):
+            try:
+                if method == "execute":
+                    sql, args = params
+                    cursor = self.connection.execute(sql, args or ())
+                    columns = [d[0] for d in cursor.description] if cursor.description else None
+                    rows = [list(r) for r in cursor.fetchall()] if columns else []
+                    results.append({"columns": columns, "rows": rows,
+                                    "lastrowid": cursor.lastrowid, "rowcount": cursor.rowcount})
+                elif method == "executemany":
+                    sql, seq = params
+                    cursor = self.connection.executemany(sql, seq)
+                    results.append({"columns": None, "rows": [],
+                                    "lastrowid": cursor.lastrowid, "rowcount": cursor.rowcount})
+                elif method == "commit":
+                    self.connection.commit()
+                    results.append(None)
+                elif method == "rollback":
+                    self.connection.rollback()
+                    results.append(None)
+                elif method == "notify":
+                    notified.update(params)
+                    results.append(None)
+                elif method == "ping":
+                    results.append("pong")
+                else:
+                    raise sqlite3.ProgrammingError(f"Unknown method: {method}")
+            except (sqlite3.Error, ValueError, TypeError) as e:
+                error_type = type(e).__name__ if isinstance(e, sqlite3.Error) else "ProgrammingError"
+                return results, {"type": error_type, "message": str(e), "index": index}, notified
+        return results, None, notified
+
+    async def _read(self) -> Optional[bytes]:
+        try:
+            header = await self.reader.readexactly(FRAME_HEADER.size)
+            (length,) = FRAME_HEADER.unpack(header)
+            if length > MAX_FRAME_BYTES:
+                raise ValueError(f"Frame of {length} bytes exceeds the limit")
+            return await self.reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return None
+
+    def send(self, message: Any) -> None:
+        self.writer.write(frame(message, self.codec))
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        peer = self.writer.get_extra_info("peername") or "local socket"
+        try:
+            hello = await self._read()
+            if hello is None:
+                return
+            wanted = decode(hello).get("codec", "json")
+            self.codec = wanted if wanted in CODECS else "json"
+            self.writer.write(frame({"ok": True, "codec": self.codec}))
+            await loop.run_in_executor(self.executor, self._open)
+            logging.info(f"Sync client connected: {peer} ({self.codec})")
+            while True:
+                body = await self._read()
+                if body is None:
+                    break
+                request = decode(body, self.codec)
+                results, error, notified = await loop.run_in_executor(
+                    self.executor, self._run_calls, request.get("calls", [])
+                )
+                reply = {"id": request.get("id"), "results": results}
+                if error:
+                    reply["error"] = error
+                self.send(reply)
+                await self.writer.drain()
+                if notified:
+                    self.server.broadcast(notified, exclude=self)
+        except (ConnectionError, ValueError) as e:
+            logging.warning(f"Sync client {peer} dropped: {e}")
+        finally:
+            self.server.sessions.discard(self)
+            await loop.run_in_executor(self.executor, self._close)
+            self.executor.shutdown(wait=False)
+            self.writer.close()
+            logging.info(f"Sync client disconnected: {peer}")
+
+
+class SyncServer:
+    """Serves one database file to any number of thin clients."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize sync server.
+
+        Args:
+            path: File path to the SQLite database file the server owns.
+        """
+        self.path = path
+        self.sessions: Set[_Session] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def prepare(self) -> None:
+        """Create or migrate the schema and switch the file to WAL mode.
+
+        WAL lets the sessions read while another one is writing.
+        """
+        db = DatabaseManager(self.path)
+        db.initialize()
+        db.connect().execute("PRAGMA journal_mode = WAL")
+        db.close()
+
+    def broadcast(self, tables: Set[str], exclude: Optional[_Session] = None) -> None:
+        """Push a change event to every session except the writer."""
+        message = {"event": "changed", "tables": sorted(tables)}
+        for session in list(self.sessions):
+            if session is not exclude:
+                session.send(message)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = _Session(self, reader, writer)
+        self.sessions.add(session)
+        await session.serve()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_path: Optional[str] = None) -> None:
+        """Start listening; returns once the socket is bound.
+
+        Args:
+            host: TCP address to bind.
+            port: TCP port to bind; 0 picks a free one.
+            unix_path: Listen on this Unix socket instead of TCP.
+        """
+        if unix_path:
+            if os.path.exists(unix_path):
+                os.remove(unix_path)
+            self._server = await asyncio.start_unix_server(self._accept, path=unix_path)
+        else:
+            self._server = await asyncio.start_server(self._accept, host, port)
+        for sock in self._server.sockets:
+            logging.info(f"Sync server listening on {sock.getsockname()}")
+
+    @property
+    def address(self) -> str:
+        """Address clients should connect to, in the form parse_address accepts."""
+        name = self._server.sockets[0].getsockname()
+        return f"unix:{name}" if isinstance(name, str) else f"{name[0]}:{name[1]}"
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Share the hotel database with other terminals.")
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                     "hotel_restaurant.db"),
+                        help="database file to serve")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="TCP address to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to bind")
+    parser.add_argument("--unix", help="listen on a Unix socket at this path instead of TCP")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    server = SyncServer(args.db)
+    server.prepare()
+
+    async def run() -> None:
+        await server.start(args.host, args.port, args.unix)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
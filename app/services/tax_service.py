@@ -0,0 +1,91 @@
+"""Tax Service - The single place GST is configured and computed.
+
+Rates are kept in the Settings table in basis points (1800 = 18%) per
+charge kind, and tax is computed on integer paise with half-up rounding, so
+every screen and bill produces the same figure for the same subtotal.
+"""
+
+from typing import Dict
+
+# Charge kind -> default rate in basis points
+DEFAULT_RATES: Dict[str, int] = {
+    "restaurant": 1800,
+    "room": 0,
+}
+
+BASIS_POINTS = 10000
+
+
+class TaxService:
+    """Reads configurable tax rates and applies them to paise amounts."""
+
+    def __init__(self, db) -> None:
+        """Initialize tax service.
+
+        Args:
+            db: DatabaseManager instance
+        """
+        self.db = db
+
+    def rate(self, kind: str = "restaurant") -> int:
+        """Return the tax rate for a charge kind in basis points.
+
+        Args:
+            kind: Charge kind, one of DEFAULT_RATES.
+
+        Returns:
+            The configured rate, or the default when none is stored.
+        """
+        if kind not in DEFAULT_RATES:
+            raise ValueError(f"Unknown charge kind: {kind}")
+        row = self.db.connect().execute(
+            "SELECT value FROM Settings WHERE key = ?", (f"tax_rate_bp.{kind}",)
+        ).fetchone()
+        return int(row[0]) if row else DEFAULT_RATES[kind]
+
+    def set_rate(self, kind: str, basis_points: int) -> None:
+        """Store the tax rate for a charge kind.
+
+        Args:
+            kind: Charge kind, one of DEFAULT_RATES.
+            basis_points: Rate in basis points, e.g. 500 for 5%.
+        """
+        if kind not in DEFAULT_RATES:
+            raise ValueError(f"Unknown charge kind: {kind}")
+        if not 0 <= basis_points <= BASIS_POINTS:
+            raise ValueError("Tax rate must be between 0% and 100%")
+        connection = self.db.connect()
+        with connection:
+            connection.execute(
+                "INSERT INTO Settings(key, value) VALUES(?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (f"tax_rate_bp.{kind}", str(int(basis_points)))
+            )
+        self.db.notify_changed("Settings")
+
+    def tax(self, amount_paise: int, kind: str = "restaurant") -> int:
+        """Compute the tax on an amount, rounded half up to the paisa.
+
+        Args:
+            amount_paise: Taxable amount in paise.
+            kind: Charge kind, one of DEFAULT_RATES.
+
+        Returns:
+            Tax in paise.
+        """
+        return self.apply_rate(amount_paise, self.rate(kind))
+
+    @staticmethod
+    def apply_rate(amount_paise: int, basis_points: int) -> int:
+        """Compute tax at a given rate, rounded half up to the paisa.
+
+        Used where the rate was read earlier, e.g. by queued writes applied
+        on another thread.
+        """
+        return (amount_paise * basis_points + BASIS_POINTS // 2) // BASIS_POINTS
+
+    def label(self, kind: str = "restaurant") -> str:
+        """Return a display label such as "GST (18%)" for a charge kind."""
+        rate = self.rate(kind)
+        percent = f"{rate // 100}" if rate % 100 == 0 else f"{rate / 100:g}"
+        return f"GST ({percent}%)"
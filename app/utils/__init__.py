@@ -1 +1 @@
-__all__ = ["message", "export", "theme"]
+__all__ = ["message", "export", "theme", "pagination", "money", "timestamps"]
@@ -2,11 +2,31 @@
 Export utility module for converting database query results to CSV format.
 
 This module provides functionality to export query results from SQLite database
-to CSV files with optional headers.
+to CSV files with optional headers. Rows are streamed from the cursor in
+chunks so large tables never have to be held in memory, and exports can be
+gzip-compressed, restricted to a subset of columns, and run on a background
+thread with progress reporting and cancellation.
 """
 import csv
+import gzip
+import operator
+import os
 import sqlite3
-from typing import List, Optional, Tuple
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled before all rows were written."""
+
+
+def _open_output(output_path: str, compress: bool):
+    """Open the output file for CSV writing, optionally gzip-compressed."""
+    if compress:
+        return gzip.open(output_path, "wt", newline="", encoding="utf-8")
+    return open(output_path, "w", newline="", encoding="utf-8")
 
 
 def export_query_to_csv(
@@ -14,13 +34,20 @@ def export_query_to_csv(
     query: str,
     params: Optional[Tuple] = None,
     output_path: str = "",
-    headers: Optional[List[str]] = None
-) -> None:
+    headers: Optional[List[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    compress: Optional[bool] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    cancel_event: Optional[threading.Event] = None
+) -> int:
     """Export SQL query results to a CSV file.
-    
-    Executes the provided SQL query and writes the results to a CSV file
-    with optional column headers.
-    
+
+    Executes the provided SQL query and streams the results to a CSV file
+    with optional column headers. Rows are fetched with ``fetchmany`` and
+    written positionally, and the file is written under a temporary name
+    and moved into place only once the export has completed.
+
     Args:
         connection: SQLite database connection object.
         query: SQL SELECT query to execute.
@@ -28,17 +55,120 @@ def export_query_to_csv(
         output_path: File path where CSV will be written.
         headers: Optional list of column header names. If provided, will be
                 written as the first row of the CSV file.
-    
+        columns: Optional names of result columns to export, in output order.
+                All columns are exported when omitted.
+        chunk_size: Number of rows fetched from the cursor per batch.
+        compress: Write gzip-compressed output. Defaults to True when
+                output_path ends with ".gz".
+        progress: Optional callback receiving the running row count after
+                every written chunk.
+        cancel_event: Optional event; when set, the export stops, the
+                partial file is removed and ExportCancelled is raised.
+
     Returns:
-        None
+        Number of data rows written.
     """
+    if compress is None:
+        compress = output_path.endswith(".gz")
+
     cursor = connection.cursor()
+    cursor.row_factory = None
     cursor.execute(query, params or ())
-    rows = cursor.fetchall()
-    
-    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
-        writer = csv.writer(csv_file)
-        if headers:
-            writer.writerow(headers)
-        for row in rows:
-            writer.writerow([row[column_name] for column_name in row.keys()])
+
+    select = None
+    if columns:
+        names = [description[0] for description in cursor.description]
+        missing = [name for name in columns if name not in names]
+        if missing:
+            raise ValueError(f"Unknown export column(s): {', '.join(missing)}")
+        indexes = [names.index(name) for name in columns]
+        select = operator.itemgetter(*indexes) if len(indexes) > 1 else (lambda row, i=indexes[0]: (row[i],))
+
+    partial_path = output_path + ".part"
+    written = 0
+    try:
+        with _open_output(partial_path, compress) as csv_file:
+            writer = csv.writer(csv_file)
+            if headers:
+                writer.writerow(headers)
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled(f"Export to {output_path} was cancelled")
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                writer.writerows(map(select, rows) if select else rows)
+                written += len(rows)
+                if progress:
+                    progress(written)
+        os.replace(partial_path, output_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    finally:
+        cursor.close()
+    return written
+
+
+class CsvExportJob(threading.Thread):
+    """Runs export_query_to_csv on a background thread.
+
+    The job opens its own read-only connection to the database file, since
+    SQLite connections cannot be shared across threads. Progress is exposed
+    through the ``rows_written`` attribute so a UI can poll it from its own
+    thread, and the job can be stopped at the next chunk with cancel()."""
+
+    def __init__(self, db_path: str, query: str, params: Optional[Tuple] = None,
+                 output_path: str = "", headers: Optional[List[str]] = None,
+                 columns: Optional[Sequence[str]] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 compress: Optional[bool] = None) -> None:
+        """Initialize the export job.
+
+        Args:
+            db_path: File path to the SQLite database file.
+            query: SQL SELECT query to execute.
+            params: Optional tuple of query parameters.
+            output_path: File path where CSV will be written.
+            headers: Optional list of column header names.
+            columns: Optional names of result columns to export.
+            chunk_size: Number of rows fetched from the cursor per batch.
+            compress: Write gzip-compressed output (see export_query_to_csv).
+        """
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.query = query
+        self.params = params
+        self.output_path = output_path
+        self.headers = headers
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.rows_written = 0
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """Request cancellation; the job stops before the next chunk."""
+        self._cancel_event.set()
+
+    def _on_progress(self, rows_written: int) -> None:
+        self.rows_written = rows_written
+
+    def run(self) -> None:
+        """Execute the export, recording the outcome on the job."""
+        connection = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            self.rows_written = export_query_to_csv(
+                connection, self.query, self.params, self.output_path,
+                self.headers, self.columns, self.chunk_size, self.compress,
+                self._on_progress, self._cancel_event
+            )
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            connection.close()
@@ -0,0 +1,61 @@
+"""
+Idle detection for running background work between user actions.
+
+An event filter on the QApplication notes the time of the last keyboard or
+mouse input anywhere in the app. A timer checks periodically and, once the
+user has been inactive for a while, calls the idle callback on every check
+until input resumes. Each call should do a short, bounded piece of work, so
+jobs such as database maintenance never compete with typing at the till.
+"""
+import time
+from typing import Callable
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+# Seconds without input after which the app counts as idle
+IDLE_AFTER_SECONDS = 120
+
+# How often the idle state is checked, in milliseconds
+IDLE_CHECK_MS = 15000
+
+INPUT_EVENTS = {
+    QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.Wheel, QEvent.TouchBegin,
+}
+
+
+class IdleWatcher(QObject):
+    """Calls a callback periodically while the user is inactive."""
+
+    def __init__(self, app, on_idle: Callable[[], None], idle_after: float = IDLE_AFTER_SECONDS,
+                 check_ms: int = IDLE_CHECK_MS) -> None:
+        """Start watching input to the application.
+
+        Args:
+            app: The QApplication whose input events are watched.
+            on_idle: Callback run at each check while the app is idle.
+            idle_after: Seconds without input before the app counts as idle.
+            check_ms: Interval between idle checks in milliseconds.
+        """
+        super().__init__(app)
+        self.on_idle = on_idle
+        self.idle_after = idle_after
+        self.last_input = time.monotonic()
+        app.installEventFilter(self)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._check)
+        self.timer.start(check_ms)
+
+    def eventFilter(self, watched, event) -> bool:
+        """Record user input; never consumes the event."""
+        if event.type() in INPUT_EVENTS:
+            self.last_input = time.monotonic()
+        return False
+
+    @property
+    def idle_seconds(self) -> float:
+        """Seconds since the last keyboard or mouse input."""
+        return time.monotonic() - self.last_input
+
+    def _check(self) -> None:
+        if self.idle_seconds >= self.idle_after:
+            self.on_idle()
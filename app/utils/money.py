@@ -0,0 +1,63 @@
+"""
+Money helpers for amounts stored as integer paise (1 rupee = 100 paise).
+
+All prices, payments and taxes are kept in integer minor units so sums are
+exact; conversion to and from rupees happens only at the UI boundary.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Union
+
+PAISE_PER_RUPEE = 100
+CURRENCY_SYMBOL = "₹"
+# Largest value a SQLite INTEGER column holds (signed 64-bit)
+MAX_INTEGER = 2 ** 63 - 1
+
+
+def to_paise(rupees: Union[int, float, str, Decimal, None]) -> int:
+    """Convert a rupee amount to integer paise, rounding half up.
+
+    Args:
+        rupees: Amount in rupees as a number or numeric string.
+
+    Returns:
+        The amount in paise; 0 for None or an empty string.
+
+    Raises:
+        ValueError: If the value is not a number or too large to store.
+    """
+    if rupees is None or rupees == "":
+        return 0
+    try:
+        value = Decimal(str(rupees).replace(CURRENCY_SYMBOL, "").replace(",", "").strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {rupees!r}")
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount: {rupees!r}")
+    try:
+        paise = int((value * PAISE_PER_RUPEE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"Amount out of range: {rupees!r}")
+    if abs(paise) > MAX_INTEGER:
+        raise ValueError(f"Amount out of range: {rupees!r}")
+    return paise
+
+
+def to_rupees(paise: int) -> float:
+    """Convert paise to rupees for charts and spin boxes (display only)."""
+    return (paise or 0) / PAISE_PER_RUPEE
+
+
+def format_money(paise: int, symbol: bool = True) -> str:
+    """Format paise as a rupee string such as "₹1234.50".
+
+    Args:
+        paise: Amount in paise.
+        symbol: Whether to prefix the currency symbol.
+
+    Returns:
+        Formatted amount with two decimals.
+    """
+    paise = int(paise or 0)
+    sign = "-" if paise < 0 else ""
+    rupees, remainder = divmod(abs(paise), PAISE_PER_RUPEE)
+    return f"{sign}{CURRENCY_SYMBOL if symbol else ''}{rupees}.{remainder:02d}"
@@ -0,0 +1,105 @@
+"""
+Keyset pagination helpers for long, newest-first list views.
+
+Pages are fetched with a ``WHERE (key...) < (last seen key...)`` condition
+instead of OFFSET, so loading page 500 costs the same as loading page 1 and
+rows inserted while browsing never shift or duplicate later pages.
+"""
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # Qt is only needed by views; repositories import this module headless
+    from PySide6.QtWidgets import QAbstractItemView
+
+DEFAULT_PAGE_SIZE = 50
+
+
+class KeysetPager:
+    """Fetches successive pages of a query ordered descending by a unique key.
+
+    The key may be a single column such as an id, or a composite such as
+    (created_at, id) to page by date with the id breaking ties."""
+
+    def __init__(self, db, select: str, keys: Sequence[Tuple[str, str]],
+                 where: str = "", params: Sequence[Any] = (),
+                 group_by: str = "", page_size: int = DEFAULT_PAGE_SIZE,
+                 row: Optional[Callable[..., Any]] = None) -> None:
+        """Initialize a pager.
+
+        Args:
+            db: DatabaseManager instance
+            select: SELECT ... FROM ... clause without WHERE/ORDER BY.
+            keys: (SQL expression, result column name) pairs forming the
+                unique sort key, most significant first.
+            where: Optional filter condition.
+            params: Parameters of the filter condition.
+            group_by: Optional GROUP BY clause (without the keywords).
+            page_size: Rows per page.
+            row: Optional NamedTuple type the rows are returned as; its
+                fields must match the selected columns in order.
+        """
+        self.db = db
+        self.select = select
+        self.keys = list(keys)
+        self.group_by = group_by
+        self.page_size = page_size
+        self.row = row
+        self.reset(where, params)
+
+    def reset(self, where: str = "", params: Sequence[Any] = ()) -> None:
+        """Restart from the first page, optionally with a new filter.
+
+        Args:
+            where: Filter condition.
+            params: Parameters of the filter condition.
+        """
+        self.where = where
+        self.params = tuple(params)
+        self.cursor: Optional[Tuple[Any, ...]] = None
+        self.has_more = True
+
+    def next_page(self) -> List[Any]:
+        """Fetch the page after the last row returned so far.
+
+        Returns:
+            Up to page_size rows; an empty list once the end is reached.
+        """
+        if not self.has_more:
+            return []
+        conditions = [f"({self.where})"] if self.where else []
+        params = list(self.params)
+        expressions = ", ".join(expr for expr, _ in self.keys)
+        if self.cursor is not None:
+            conditions.append(f"({expressions}) < ({', '.join('?' * len(self.keys))})")
+            params.extend(self.cursor)
+        query = self.select
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if self.group_by:
+            query += f" GROUP BY {self.group_by}"
+        query += " ORDER BY " + ", ".join(f"{expr} DESC" for expr, _ in self.keys) + " LIMIT ?"
+        # One extra row tells whether another page exists
+        params.append(self.page_size + 1)
+        cursor = self.db.connect().cursor()
+        if self.row is not None:
+            make = self.row._make
+            cursor.row_factory = lambda _, values: make(values)
+        rows = cursor.execute(query, params).fetchall()
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if rows:
+            last = rows[-1]
+            self.cursor = tuple(getattr(last, name) if self.row is not None else last[name] for _, name in self.keys)
+        return rows
+
+
+def connect_infinite_scroll(view: "QAbstractItemView", load_more: Callable[[], None]) -> None:
+    """Call load_more whenever a list view is scrolled to its bottom.
+
+    Args:
+        view: Table or list widget showing the paged rows.
+        load_more: Callback appending the next page.
+    """
+    scroll_bar = view.verticalScrollBar()
+    scroll_bar.valueChanged.connect(
+        lambda value: load_more() if value and value == scroll_bar.maximum() else None
+    )
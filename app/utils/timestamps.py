@@ -0,0 +1,49 @@
+"""
+Timestamp helpers for event times stored as integer seconds.
+
+Order, payment and stock-consumption times are stored as local wall-clock
+time counted in seconds from 1970-01-01 00:00, without a timezone shift.
+``timestamp // 86400`` is then the local day number, and SQLite's
+'unixepoch' modifier formats them without a 'localtime' conversion.
+"""
+import datetime
+from typing import Union
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def to_timestamp(value: Union[datetime.datetime, datetime.date, str]) -> int:
+    """Convert a datetime, date or ISO string to a stored timestamp.
+
+    Args:
+        value: Local date/time; a date means midnight.
+
+    Returns:
+        Seconds since 1970-01-01 00:00 local wall-clock time.
+    """
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return int((value.replace(tzinfo=None) - EPOCH).total_seconds())
+
+
+def now_timestamp() -> int:
+    """Return the current local time as a stored timestamp."""
+    return to_timestamp(datetime.datetime.now())
+
+
+def from_timestamp(timestamp: int) -> datetime.datetime:
+    """Convert a stored timestamp back to a naive local datetime."""
+    return EPOCH + datetime.timedelta(seconds=int(timestamp))
+
+
+def format_timestamp(timestamp: int, fmt: str = "%Y-%m-%d %H:%M") -> str:
+    """Format a stored timestamp for display; empty for None."""
+    return "" if timestamp is None else from_timestamp(timestamp).strftime(fmt)
+
+
+def month_key(value: datetime.date) -> int:
+    """Return the value of the generated ``month`` column for a date (YYYYMM)."""
+    return value.year * 100 + value.month
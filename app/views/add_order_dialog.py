@@ -4,8 +4,9 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSpinB
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QColor
 import logging
-import datetime
 from app.utils.message import MessageBox
+from app.utils.money import format_money
+from app.services.order_journal import CONFIRM_WAIT
 
 class AddOrderDialog(QDialog):
     def __init__(self, table_id, controller, parent=None):
@@ -120,26 +121,20 @@ class AddOrderDialog(QDialog):
         self.update_selected_items_display()
 
     def get_table_number(self, table_id):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number FROM Tables WHERE id = ?", (table_id,))
-        result = cur.fetchone()
-        return result['number'] if result else "N/A"
+        number = self.controller.tables.number_of(table_id)
+        return number if number is not None else "N/A"
 
     def load_menu_items(self):
         # Clear existing tabs
         self.menu_tabs.clear()
         self.category_lists.clear()
 
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, price, category FROM MenuItems WHERE active = 1 ORDER BY category, name")
-        self.all_menu_items = cur.fetchall()
+        self.menu_items = {item.id: item for item in self.controller.menu.active()}
 
         # Group items by category
         categories = {}
-        for item in self.all_menu_items:
-            category = item['category']
+        for item in self.menu_items.values():
+            category = item.category
             if category not in categories:
                 categories[category] = []
             categories[category].append(item)
@@ -150,8 +145,8 @@ class AddOrderDialog(QDialog):
             list_widget.itemDoubleClicked.connect(self.add_item_to_order)
 
             for item in categories[category]:
-                list_item = QListWidgetItem(f"{item['name']} (₹{item['price']:.2f})")
-                list_item.setData(Qt.UserRole, item['id'])
+                list_item = QListWidgetItem(f"{item.name} ({format_money(item.price_paise)})")
+                list_item.setData(Qt.UserRole, item.id)
                 list_widget.addItem(list_item)
 
             self.category_lists[category] = list_widget
@@ -233,22 +228,19 @@ class AddOrderDialog(QDialog):
 
     def update_selected_items_display(self):
         self.selected_items_list.clear()
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
 
         total_items = 0
-        total_price = 0.0
+        total_price = 0
 
         for item_id, quantity in self.selected_items.items():
-            cur.execute("SELECT name, price FROM MenuItems WHERE id = ?", (item_id,))
-            item_info = cur.fetchone()
+            item_info = self.menu_items.get(item_id)
             if item_info:
-                item_total = item_info['price'] * quantity
+                item_total = item_info.price_paise * quantity
                 total_items += quantity
                 total_price += item_total
 
                 # Create detailed item display
-                item_text = f"{quantity}x {item_info['name']}\n₹{item_info['price']:.2f} each → ₹{item_total:.2f}"
+                item_text = f"{quantity}x {item_info.name}\n{format_money(item_info.price_paise)} each → {format_money(item_total)}"
                 list_item = QListWidgetItem(item_text)
                 list_item.setData(Qt.UserRole, item_id)
 
@@ -259,44 +251,35 @@ class AddOrderDialog(QDialog):
 
         # Update summary
         self.summary_label.setText(f"Total Items: {total_items}")
-        self.total_price_label.setText(f"Total: ₹{total_price:.2f}")
+        self.total_price_label.setText(f"Total: {format_money(total_price)}")
 
     def save_order(self):
         if not self.selected_items:
             MessageBox.warning(self, "No Items", "Please add items to the order before saving.")
             return
 
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
         try:
             logging.info(f"Attempting to save order for table_id: {self.table_id} with items: {self.selected_items}")
-            # Create a new order (include created_at and use valid status)
-            created_at = datetime.datetime.now().isoformat()
-            cur.execute("INSERT INTO Orders (table_id, status, created_at) VALUES (?, ?, ?)", (self.table_id, "Open", created_at))
-            order_id = cur.lastrowid
-            logging.info(f"New order created with ID: {order_id}")
-
-            # Add order items
+            lines = []
             for menu_item_id, quantity in self.selected_items.items():
-                cur.execute("SELECT price FROM MenuItems WHERE id = ?", (menu_item_id,))
-                item_price_result = cur.fetchone()
-                if not item_price_result:
+                item = self.menu_items.get(menu_item_id)
+                if not item:
                     raise ValueError(f"Menu item with ID {menu_item_id} not found.")
-                item_price = item_price_result['price']
-                cur.execute("INSERT INTO OrderDetails (order_id, item_id, qty, price, kitchen_status) VALUES (?, ?, ?, ?, ?)",
-                            (order_id, menu_item_id, quantity, item_price, "Pending"))
-                logging.info(f"Added item {menu_item_id} (qty: {quantity}, price: {item_price}) to order {order_id}")
-            
-            # Update table status to Occupied if it was Available
-            cur.execute("UPDATE Tables SET status = 'Occupied' WHERE id = ? AND status = 'Available'", (self.table_id,))
-            logging.info(f"Table {self.table_id} status updated to 'Occupied' if it was 'Available'.")
-
-            conn.commit()
-            logging.info(f"Order {order_id} for Table {self.get_table_number(self.table_id)} saved successfully.")
-            MessageBox.success(self, "Order Saved", f"Order {order_id} for Table {self.get_table_number(self.table_id)} has been saved.")
+                lines.append((menu_item_id, quantity, item.price_paise))
+
+            # Queue the order; the journal writes it and marks an Available
+            # table Occupied as soon as the database is free
+            ref = self.controller.journal.open_order(self.table_id, None, lines, occupy_from=("Available",))
+            order_id = self.controller.journal.order_id(ref, timeout=CONFIRM_WAIT)
+            self.controller.journal.dispatch()
+            if order_id:
+                logging.info(f"Order {order_id} for Table {self.get_table_number(self.table_id)} saved successfully.")
+                MessageBox.success(self, "Order Saved", f"Order {order_id} for Table {self.get_table_number(self.table_id)} has been saved.")
+            else:
+                logging.info(f"Order {ref} for table_id {self.table_id} queued in the journal.")
+                MessageBox.success(self, "Order Queued", "The order will be saved as soon as the database is free.")
             self.accept() # Close the dialog
         except Exception as e:
-            conn.rollback()
             logging.error(f"Failed to save order for table {self.table_id}: {e}", exc_info=True)
             MessageBox.error(self, "Error Saving Order", f"Failed to save order: {e}")
 
@@ -1,6 +1,10 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QHBoxLayout, QLabel, QDateEdit, QPushButton, QTableWidget, QTableWidgetItem
-from PySide6.QtCore import QDate, Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QHBoxLayout, QLabel, QDateEdit, QPushButton, QTableWidget, QTableWidgetItem, QFileDialog, QComboBox, QProgressDialog
+from PySide6.QtCore import QDate, Qt, QTimer
 from app.utils.calendar_icon import apply_calendar_icon
+from app.utils.message import MessageBox
+from app.utils.money import format_money, to_rupees
+from app.services.report_export_service import ExtractJob, SnapshotJob, columnar_format
+from app.services.dish_sales_service import period_range
 from PySide6.QtCharts import QChartView, QChart, QBarSeries, QBarSet, QPieSeries, QLineSeries, QValueAxis, QBarCategoryAxis
 import datetime
 
@@ -8,6 +12,8 @@ class AnalyticsView(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
+        self._snapshot_job = None
+        self._extract_job = None
         v = QVBoxLayout(self)
         v.setSpacing(20)
         page_title = QLabel("Reports")
@@ -16,15 +22,100 @@ class AnalyticsView(QWidget):
         page_subtitle.setObjectName("PageSubtitle")
         v.addWidget(page_title)
         v.addWidget(page_subtitle)
+        export_bar = QHBoxLayout()
+        export_bar.addWidget(QLabel("Partition by"))
+        self.export_partition = QComboBox()
+        self.export_partition.addItems(["month", "day", "year", "none"])
+        export_bar.addWidget(self.export_partition)
+        self.btn_export_data = QPushButton("Export for Analysis")
+        self.btn_snapshot = QPushButton("Database Snapshot")
+        export_bar.addWidget(self.btn_export_data)
+        export_bar.addWidget(self.btn_snapshot)
+        export_bar.addStretch()
+        v.addLayout(export_bar)
+        self.btn_export_data.clicked.connect(self.export_for_analysis)
+        self.btn_snapshot.clicked.connect(self.export_snapshot)
         self.tabs = QTabWidget()
         v.addWidget(self.tabs, 1)
+        self.controller.analytics.refresh()
         self._setup_daily()
         self._setup_weekly()
         self._setup_monthly()
         self._setup_dishes()
+        self._setup_menu_engineering()
         self._setup_hotel_report()
         self._setup_guest_report()
 
+    def export_for_analysis(self):
+        if self._extract_job and self._extract_job.is_alive():
+            MessageBox.warning(self, "Export Running", "An export for analysis is already in progress.")
+            return
+        if not self.controller.db.path:
+            MessageBox.warning(self, "Export Unavailable", "Exports run on the machine that holds the database.")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Export directory")
+        if not out_dir:
+            return
+        partition = self.export_partition.currentText()
+        self._extract_job = ExtractJob(self.controller.db, out_dir, None if partition == "none" else partition)
+        self._extract_progress = QProgressDialog("Copying database...", None, 0, 100, self)
+        self._extract_progress.setWindowTitle("Export for Analysis")
+        self._extract_progress.setMinimumDuration(300)
+        self._extract_timer = QTimer(self)
+        self._extract_timer.setInterval(100)
+        self._extract_timer.timeout.connect(self._poll_extract)
+        self._extract_job.start()
+        self._extract_timer.start()
+
+    def _poll_extract(self):
+        job = self._extract_job
+        if job.total:
+            self._extract_progress.setLabelText("Copying database..." if job.stage == "snapshot" else "Writing files...")
+            self._extract_progress.setValue(100 * job.done // job.total)
+        if job.is_alive():
+            return
+        self._extract_timer.stop()
+        self._extract_progress.reset()
+        if job.error:
+            MessageBox.error(self, "Export Failed", f"Unable to export data: {job.error}")
+            return
+        summary = "\n".join(f"{table}: {sum(f['rows'] for f in files)} rows in {len(files)} file(s)"
+                             for table, files in job.manifest["tables"].items())
+        MessageBox.success(self, "Export Complete", f"Exported {columnar_format()} files to {job.output_dir}", summary)
+
+    def export_snapshot(self):
+        if self._snapshot_job and self._snapshot_job.is_alive():
+            MessageBox.warning(self, "Snapshot Running", "A database snapshot is already in progress.")
+            return
+        if not self.controller.db.path:
+            MessageBox.warning(self, "Snapshot Unavailable", "Snapshots run on the machine that holds the database.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save database snapshot", "hotel_snapshot.db", "SQLite database (*.db)")
+        if not path:
+            return
+        self._snapshot_job = SnapshotJob(self.controller.db, path)
+        self._snapshot_progress = QProgressDialog("Copying database...", None, 0, 100, self)
+        self._snapshot_progress.setWindowTitle("Database Snapshot")
+        self._snapshot_progress.setMinimumDuration(300)
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.setInterval(100)
+        self._snapshot_timer.timeout.connect(self._poll_snapshot)
+        self._snapshot_job.start()
+        self._snapshot_timer.start()
+
+    def _poll_snapshot(self):
+        job = self._snapshot_job
+        if job.total:
+            self._snapshot_progress.setValue(100 * (job.total - job.remaining) // job.total)
+        if job.is_alive():
+            return
+        self._snapshot_timer.stop()
+        self._snapshot_progress.reset()
+        if job.error:
+            MessageBox.error(self, "Snapshot Failed", f"Unable to snapshot database: {job.error}")
+        else:
+            MessageBox.success(self, "Snapshot Complete", f"Database snapshot saved to {job.dest_path}")
+
     def _setup_daily(self):
         w = QWidget()
         layout = QVBoxLayout(w)
@@ -43,7 +134,7 @@ class AnalyticsView(QWidget):
         layout.addLayout(filter_bar)
         self.daily_chart = QChartView()
         layout.addWidget(self.daily_chart, 1)
-        self.daily_refresh.clicked.connect(self._refresh_daily)
+        self.daily_refresh.clicked.connect(self.refresh)
         self.tabs.addTab(w, "Daily")
         self._refresh_daily()
 
@@ -67,15 +158,23 @@ class AnalyticsView(QWidget):
         w = QWidget()
         layout = QVBoxLayout(w)
         filter_bar = QHBoxLayout()
-        self.dishes_date = QDateEdit()
-        self.dishes_date.setCalendarPopup(True)
-        self.dishes_date.setDisplayFormat('yyyy-MM-dd')
-        self.dishes_date.setDate(QDate.currentDate())
-        self.dishes_date.setMinimumWidth(140)
-        self.dishes_date.setToolTip("Click the calendar icon to select date")
-        apply_calendar_icon(self.dishes_date)
-        filter_bar.addWidget(QLabel("Date:"))
-        filter_bar.addWidget(self.dishes_date)
+        self.dishes_from = QDateEdit()
+        self.dishes_to = QDateEdit()
+        for edit in (self.dishes_from, self.dishes_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat('yyyy-MM-dd')
+            edit.setDate(QDate.currentDate())
+            edit.setMinimumWidth(140)
+            edit.setToolTip("Click the calendar icon to select date")
+            apply_calendar_icon(edit)
+        filter_bar.addWidget(QLabel("From:"))
+        filter_bar.addWidget(self.dishes_from)
+        filter_bar.addWidget(QLabel("To:"))
+        filter_bar.addWidget(self.dishes_to)
+        for label, period in (("Today", "today"), ("This Week", "week"), ("This Month", "month")):
+            btn = QPushButton(label)
+            btn.clicked.connect(lambda checked=False, p=period: self._set_dishes_period(p))
+            filter_bar.addWidget(btn)
         self.dishes_refresh = QPushButton("Refresh")
         filter_bar.addWidget(QLabel("Most Ordered Dishes"))
         filter_bar.addWidget(self.dishes_refresh)
@@ -87,43 +186,46 @@ class AnalyticsView(QWidget):
         self.dishes_table.setHorizontalHeaderLabels(["Rank", "Dish", "Times Ordered"])
         layout.addWidget(self.dishes_table, 1)
 
-        self.dishes_refresh.clicked.connect(self._refresh_dishes)
-        self.dishes_date.dateChanged.connect(self._refresh_dishes)
+        self.dishes_refresh.clicked.connect(self.refresh)
+        self.dishes_from.dateChanged.connect(self._refresh_dishes)
+        self.dishes_to.dateChanged.connect(self._refresh_dishes)
         self.tabs.addTab(w, "Dishes")
         self._refresh_dishes()
 
+    def _set_dishes_period(self, period):
+        start, end = period_range(period)
+        for edit, value in ((self.dishes_from, start), (self.dishes_to, end)):
+            edit.blockSignals(True)
+            edit.setDate(QDate(value.year, value.month, value.day))
+            edit.blockSignals(False)
+        self._refresh_dishes()
+
+    def refresh(self):
+        self.controller.analytics.refresh()
+        self._refresh_daily()
+        self._refresh_weekly()
+        self._refresh_monthly()
+        self._refresh_dishes()
+        self._refresh_menu_engineering()
+        self._refresh_hotel_report()
+        self._refresh_guest_report()
+
     def _refresh_daily(self):
         date = self.daily_date.date().toPython()
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT MenuItems.category AS cat, SUM(OrderDetails.qty*OrderDetails.price) AS amt
-            FROM Orders
-            JOIN OrderDetails ON OrderDetails.order_id=Orders.id
-            JOIN MenuItems ON OrderDetails.item_id=MenuItems.id
-            WHERE Orders.status='Paid' AND DATE(Orders.created_at)=DATE(?)
-            GROUP BY cat
-        """, (date.isoformat(),))
         series = QPieSeries()
-        rows = cur.fetchall()
-        if rows:
-            for r in rows:
-                series.append(r["cat"] or "Uncategorized", float(r["amt"] or 0))
+        for category, amount in self.controller.analytics.category_revenue(date):
+            series.append(category or "Uncategorized", to_rupees(amount))
         chart = QChart()
         chart.addSeries(series)
         chart.setTitle("Category-wise revenue")
         self.daily_chart.setChart(chart)
 
     def _refresh_weekly(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        start = datetime.date.today() - datetime.timedelta(days=6)
+        end = datetime.date.today()
+        counts = self.controller.analytics.orders_per_day(end - datetime.timedelta(days=6), end)
         series = QBarSeries()
         s = QBarSet("Orders")
-        for i in range(7):
-            day = start + datetime.timedelta(days=i)
-            cur.execute("SELECT COUNT(*) AS c FROM Orders WHERE DATE(created_at)=DATE(?)", (day.isoformat(),))
-            s.append(float(cur.fetchone()["c"]))
+        s.append([float(c) for c in counts])
         series.append(s)
         chart = QChart()
         chart.addSeries(series)
@@ -131,7 +233,7 @@ class AnalyticsView(QWidget):
         axis_x = QValueAxis()
         axis_x.setRange(0,6)
         axis_y = QValueAxis()
-        axis_y.setRange(0, max([s.at(i) for i in range(s.count())] + [5]))
+        axis_y.setRange(0, max(counts.max(initial=0), 5))
         chart.addAxis(axis_x, Qt.AlignBottom)
         chart.addAxis(axis_y, Qt.AlignLeft)
         series.attachAxis(axis_x)
@@ -139,18 +241,12 @@ class AnalyticsView(QWidget):
         self.weekly_chart.setChart(chart)
 
     def _refresh_monthly(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
+        first = datetime.date.today().replace(day=1)
+        revenue = self.controller.analytics.order_revenue_per_day(first, first + datetime.timedelta(days=29))
         series = QLineSeries()
-        for d in range(1, 31):
-            cur.execute("""
-                SELECT COALESCE(SUM(OrderDetails.qty*OrderDetails.price),0) AS s 
-                FROM Orders
-                JOIN OrderDetails ON OrderDetails.order_id=Orders.id
-                WHERE Orders.status='Paid' AND strftime('%Y-%m',Orders.created_at)=strftime('%Y-%m','now') AND CAST(strftime('%d',Orders.created_at) AS INTEGER)=?
-            """, (d,))
-            val = cur.fetchone()["s"] or 0
-            series.append(d, float(val))
+        for d, val in enumerate(revenue.tolist(), 1):
+            # Days past the end of a short month belong to the next month
+            series.append(d, to_rupees(val) if (first + datetime.timedelta(days=d - 1)).month == first.month else 0.0)
         chart = QChart()
         chart.addSeries(series)
         chart.setTitle("Monthly revenue")
@@ -165,28 +261,18 @@ class AnalyticsView(QWidget):
         self.monthly_chart.setChart(chart)
 
     def _refresh_dishes(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        # Filter by selected date (per-day counts)
-        sel_date = self.dishes_date.date().toPython()
-        cur.execute("""
-            SELECT MenuItems.name, SUM(OrderDetails.qty) AS total_qty
-            FROM Orders
-            JOIN OrderDetails ON OrderDetails.order_id=Orders.id
-            JOIN MenuItems ON OrderDetails.item_id=MenuItems.id
-            WHERE Orders.status='Paid' AND DATE(Orders.created_at)=DATE(?)
-            GROUP BY MenuItems.id, MenuItems.name
-            ORDER BY total_qty DESC
-            LIMIT 100
-        """, (sel_date.isoformat(),))
-        rows = cur.fetchall()
+        # Portions sold per dish over the selected range, from the daily counters
+        start, end = self.dishes_from.date().toPython(), self.dishes_to.date().toPython()
+        if end < start:
+            start, end = end, start
+        rows = self.controller.dish_sales.top(start, end, 100)
 
         # Populate table
         self.dishes_table.setRowCount(len(rows))
-        for i, r in enumerate(rows):
+        for i, (name, qty) in enumerate(rows):
             rank_item = QTableWidgetItem(str(i+1))
-            name_item = QTableWidgetItem(r["name"])
-            times_item = QTableWidgetItem(str(r["total_qty"] or 0))
+            name_item = QTableWidgetItem(name)
+            times_item = QTableWidgetItem(str(qty))
             self.dishes_table.setItem(i, 0, rank_item)
             self.dishes_table.setItem(i, 1, name_item)
             self.dishes_table.setItem(i, 2, times_item)
@@ -194,8 +280,57 @@ class AnalyticsView(QWidget):
             # show a single row with 'No data'
             self.dishes_table.setRowCount(1)
             self.dishes_table.setItem(0, 0, QTableWidgetItem("-"))
-            self.dishes_table.setItem(0, 1, QTableWidgetItem("No data for selected date"))
+            self.dishes_table.setItem(0, 1, QTableWidgetItem("No data for selected dates"))
             self.dishes_table.setItem(0, 2, QTableWidgetItem("0"))
+    def _setup_menu_engineering(self):
+        w = QWidget()
+        layout = QVBoxLayout(w)
+        filter_bar = QHBoxLayout()
+        filter_bar.addWidget(QLabel("From:"))
+        self.engineering_from = QDateEdit()
+        self.engineering_to = QDateEdit()
+        for edit, date in ((self.engineering_from, QDate.currentDate().addDays(-30)),
+                           (self.engineering_to, QDate.currentDate())):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat('yyyy-MM-dd')
+            edit.setDate(date)
+            edit.setMinimumWidth(140)
+            apply_calendar_icon(edit)
+        filter_bar.addWidget(self.engineering_from)
+        filter_bar.addWidget(QLabel("To:"))
+        filter_bar.addWidget(self.engineering_to)
+        self.engineering_summary = QLabel("")
+        filter_bar.addWidget(self.engineering_summary)
+        filter_bar.addStretch()
+        layout.addLayout(filter_bar)
+
+        self.engineering_table = QTableWidget(0, 9)
+        self.engineering_table.setHorizontalHeaderLabels(["Dish", "Category", "Sold", "Menu Mix %", "Avg Price",
+                                                          "Recipe Cost", "Margin", "Total Margin", "Class"])
+        layout.addWidget(self.engineering_table, 1)
+
+        self.engineering_from.dateChanged.connect(self._refresh_menu_engineering)
+        self.engineering_to.dateChanged.connect(self._refresh_menu_engineering)
+        self.tabs.addTab(w, "Menu Engineering")
+        self._refresh_menu_engineering()
+
+    def _refresh_menu_engineering(self):
+        start, end = self.engineering_from.date().toPython(), self.engineering_to.date().toPython()
+        if end < start:
+            start, end = end, start
+        report = self.controller.analytics.menu_engineering(start, end)
+        self.engineering_summary.setText(
+            f"Average margin {format_money(report['average_margin'])} · "
+            f"popular from {report['popularity_threshold'] * 100:.1f}% mix")
+        self.engineering_table.setRowCount(len(report["dishes"]))
+        for i, d in enumerate(report["dishes"]):
+            values = [d["name"], d["category"], str(d["sold"]), f"{d['mix'] * 100:.1f}",
+                      format_money(d["price"]), format_money(d["cost"]), format_money(d["margin"]),
+                      format_money(d["total_margin"]), d["class"]]
+            for col, value in enumerate(values):
+                self.engineering_table.setItem(i, col, QTableWidgetItem(value))
+        self.engineering_table.resizeColumnsToContents()
+
     def _setup_hotel_report(self):
         w = QWidget()
         layout = QVBoxLayout(w)
@@ -231,6 +366,9 @@ class AnalyticsView(QWidget):
         self.hotel_stats_table.setMaximumHeight(300)
         layout.addWidget(QLabel("Room-wise Report"))
         layout.addWidget(self.hotel_stats_table)
+        self.hotel_occupancy_chart = QChartView()
+        self.hotel_occupancy_chart.setMinimumHeight(200)
+        layout.addWidget(self.hotel_occupancy_chart, 1)
         
         # Summary info
         self.hotel_summary_layout = QHBoxLayout()
@@ -243,11 +381,18 @@ class AnalyticsView(QWidget):
         
         self.hotel_summary_layout.addWidget(self.hotel_total_revenue)
         self.hotel_summary_layout.addWidget(self.hotel_occupancy_rate)
+        self.hotel_adr = QLabel("ADR: ₹0.00")
+        self.hotel_adr.setObjectName("StatValue")
+        self.hotel_revpar = QLabel("RevPAR: ₹0.00")
+        self.hotel_revpar.setObjectName("StatValue")
+        
         self.hotel_summary_layout.addWidget(self.hotel_total_reservations)
+        self.hotel_summary_layout.addWidget(self.hotel_adr)
+        self.hotel_summary_layout.addWidget(self.hotel_revpar)
         self.hotel_summary_layout.addStretch()
         layout.addLayout(self.hotel_summary_layout)
         
-        self.hotel_refresh.clicked.connect(self._refresh_hotel_report)
+        self.hotel_refresh.clicked.connect(self.refresh)
         self.hotel_date_from.dateChanged.connect(self._refresh_hotel_report)
         self.hotel_date_to.dateChanged.connect(self._refresh_hotel_report)
         self.tabs.addTab(w, "Hotel Report")
@@ -303,112 +448,71 @@ class AnalyticsView(QWidget):
         self.guest_summary_layout.addStretch()
         layout.addLayout(self.guest_summary_layout)
         
-        self.guest_refresh.clicked.connect(self._refresh_guest_report)
+        self.guest_refresh.clicked.connect(self.refresh)
         self.guest_date_from.dateChanged.connect(self._refresh_guest_report)
         self.guest_date_to.dateChanged.connect(self._refresh_guest_report)
         self.tabs.addTab(w, "Guest Report")
         self._refresh_guest_report()
 
     def _refresh_hotel_report(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        
-        date_from = self.hotel_date_from.date().toString('yyyy-MM-dd')
-        date_to = self.hotel_date_to.date().toString('yyyy-MM-dd')
-        
-        # Get all rooms with their reservation and revenue data
-        cur.execute("""
-            SELECT r.id, r.number, r.category, r.status, r.rate,
-                   COUNT(DISTINCT res.id) as reservation_count,
-                   COALESCE(SUM(Payments.amount + Payments.gst), 0) as total_revenue
-            FROM Rooms r
-            LEFT JOIN Reservations res ON res.room_id = r.id 
-                AND DATE(res.check_in) >= ? AND DATE(res.check_in) <= ?
-            LEFT JOIN Payments ON Payments.reservation_id = res.id
-            GROUP BY r.id, r.number, r.category, r.status, r.rate
-            ORDER BY r.number
-        """, (date_from, date_to))
-        
-        rooms = cur.fetchall()
+        report = self.controller.analytics.room_report(self.hotel_date_from.date().toPython(),
+                                                       self.hotel_date_to.date().toPython())
+        rooms = report["rooms"]
         self.hotel_stats_table.setRowCount(len(rooms))
-        
-        total_revenue = 0
-        total_reservations = 0
-        total_days = (self.hotel_date_to.date().toPython() - self.hotel_date_from.date().toPython()).days + 1
-        
         for i, room in enumerate(rooms):
-            res_count = room['reservation_count'] or 0
-            revenue = float(room['total_revenue'] or 0)
-            total_revenue += revenue
-            total_reservations += res_count
-            
-            # Calculate occupancy percentage
-            occupancy = (res_count * 100 / total_days) if total_days > 0 else 0
-            
             self.hotel_stats_table.setItem(i, 0, QTableWidgetItem(room['number']))
             self.hotel_stats_table.setItem(i, 1, QTableWidgetItem(room['category']))
-            self.hotel_stats_table.setItem(i, 2, QTableWidgetItem(str(res_count)))
-            self.hotel_stats_table.setItem(i, 3, QTableWidgetItem(f"₹{revenue:.2f}"))
-            self.hotel_stats_table.setItem(i, 4, QTableWidgetItem(f"{occupancy:.1f}%"))
+            self.hotel_stats_table.setItem(i, 2, QTableWidgetItem(str(room['reservations'])))
+            self.hotel_stats_table.setItem(i, 3, QTableWidgetItem(format_money(room['revenue'])))
+            self.hotel_stats_table.setItem(i, 4, QTableWidgetItem(f"{room['occupancy']:.1f}%"))
             self.hotel_stats_table.setItem(i, 5, QTableWidgetItem(room['status']))
-        
+
         # Update summary
-        total_occupancy = (total_reservations * 100 / (len(rooms) * total_days)) if (len(rooms) * total_days) > 0 else 0
-        self.hotel_total_revenue.setText(f"Total Hotel Revenue: ₹{total_revenue:.2f}")
-        self.hotel_occupancy_rate.setText(f"Average Occupancy: {total_occupancy:.1f}%")
-        self.hotel_total_reservations.setText(f"Total Reservations: {total_reservations}")
+        self.hotel_total_revenue.setText(f"Total Hotel Revenue: {format_money(report['revenue'])}")
+        self.hotel_occupancy_rate.setText(f"Average Occupancy: {report['occupancy']:.1f}%")
+        self.hotel_total_reservations.setText(f"Total Reservations: {report['reservations']}")
+        self.hotel_adr.setText(f"ADR: {format_money(report['adr'])}")
+        self.hotel_revpar.setText(f"RevPAR: {format_money(report['revpar'])}")
+
+        series = QLineSeries()
+        for d, pct in enumerate(report["daily_occupancy"].tolist()):
+            series.append(d, pct)
+        chart = QChart()
+        chart.addSeries(series)
+        chart.setTitle("Daily occupancy %")
+        chart.legend().hide()
+        axis_x = QValueAxis()
+        axis_x.setRange(0, max(len(report["daily_occupancy"]) - 1, 1))
+        axis_x.setLabelFormat("%d")
+        axis_x.setTitleText(f"Days from {self.hotel_date_from.date().toString('yyyy-MM-dd')}")
+        axis_y = QValueAxis()
+        axis_y.setRange(0, 100)
+        chart.addAxis(axis_x, Qt.AlignBottom)
+        chart.addAxis(axis_y, Qt.AlignLeft)
+        series.attachAxis(axis_x)
+        series.attachAxis(axis_y)
+        self.hotel_occupancy_chart.setChart(chart)
 
     def _refresh_guest_report(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        
-        date_from = self.guest_date_from.date().toString('yyyy-MM-dd')
-        date_to = self.guest_date_to.date().toString('yyyy-MM-dd')
-        
-        # Get guest check-in details with document information
-        cur.execute("""
-            SELECT 
-                c.name, c.phone, c.email, c.document_type, c.document_number,
-                res.check_in, res.check_out, rm.number as room_number,
-                CAST(JULIANDAY(COALESCE(res.check_out, 'now')) - JULIANDAY(res.check_in) AS INTEGER) as stay_days
-            FROM Reservations res
-            JOIN Customers c ON res.customer_id = c.id
-            LEFT JOIN Rooms rm ON res.room_id = rm.id
-            WHERE res.status IN ('CheckedIn', 'CheckedOut')
-                AND DATE(res.check_in) >= ? AND DATE(res.check_in) <= ?
-            ORDER BY res.check_in DESC
-        """, (date_from, date_to))
-        
-        guests = cur.fetchall()
+        report = self.controller.analytics.guest_stays(self.guest_date_from.date().toPython(),
+                                                       self.guest_date_to.date().toPython())
+        guests = report["guests"]
         self.guest_table.setRowCount(len(guests))
-        
-        total_guests = 0
-        verified_guests = 0
-        total_stay_days = 0
-        
         for i, guest in enumerate(guests):
-            total_guests += 1
-            if guest['document_type'] and guest['document_number']:
-                verified_guests += 1
-            
-            stay_days = guest['stay_days'] or 0
-            total_stay_days += stay_days
-            
             self.guest_table.setItem(i, 0, QTableWidgetItem(guest['name'] or ""))
             self.guest_table.setItem(i, 1, QTableWidgetItem(guest['phone'] or ""))
             self.guest_table.setItem(i, 2, QTableWidgetItem(guest['email'] or ""))
             self.guest_table.setItem(i, 3, QTableWidgetItem(guest['document_type'] or ""))
             self.guest_table.setItem(i, 4, QTableWidgetItem(guest['document_number'] or ""))
-            self.guest_table.setItem(i, 5, QTableWidgetItem(guest['check_in'] or ""))
-            self.guest_table.setItem(i, 6, QTableWidgetItem(guest['check_out'] or ""))
+            self.guest_table.setItem(i, 5, QTableWidgetItem(guest['check_in']))
+            self.guest_table.setItem(i, 6, QTableWidgetItem(guest['check_out']))
             self.guest_table.setItem(i, 7, QTableWidgetItem(guest['room_number'] or ""))
-        
+
         # Update summary
-        avg_stay = (total_stay_days / total_guests) if total_guests > 0 else 0
-        self.guest_total_checkins.setText(f"Total Check-ins: {total_guests}")
-        self.guest_verified.setText(f"Document Verified: {verified_guests}")
-        self.guest_avg_stay.setText(f"Average Stay: {avg_stay:.1f} days")
-        
+        self.guest_total_checkins.setText(f"Total Check-ins: {len(guests)}")
+        self.guest_verified.setText(f"Document Verified: {report['verified']}")
+        self.guest_avg_stay.setText(f"Average Stay: {report['average_stay']:.1f} days")
+
         if not guests:
             self.guest_table.setRowCount(1)
             self.guest_table.setItem(0, 0, QTableWidgetItem("No data for selected date range"))
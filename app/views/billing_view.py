@@ -5,6 +5,8 @@ from PySide6.QtGui import QTextDocument
 from PySide6.QtPrintSupport import QPrinter
 import datetime
 import os
+from app.utils.pagination import connect_infinite_scroll
+from app.utils.money import format_money
 
 class BillingView(QWidget):
     def __init__(self, controller):
@@ -33,7 +35,12 @@ class BillingView(QWidget):
         self.orders = QTableWidget(0,4)
         self.orders.setHorizontalHeaderLabels(["Order ID","Items","Amount","Status"])
         v.addWidget(self.orders)
+        self.btn_more = QPushButton("Load more")
+        v.addWidget(self.btn_more, 0, Qt.AlignLeft)
+        self.pager = self.controller.orders.billing_pager()
         self.btn_invoice.clicked.connect(self.generate_invoice)
+        self.btn_more.clicked.connect(self.load_more)
+        connect_infinite_scroll(self.orders, self.load_more)
         self.refresh()
 
     def showEvent(self, event: QShowEvent):
@@ -41,20 +48,20 @@ class BillingView(QWidget):
         self.refresh()
 
     def refresh(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT Orders.id AS oid, COUNT(OrderDetails.id) AS items, COALESCE(SUM(OrderDetails.qty*OrderDetails.price),0) AS amt, Orders.status AS st
-            FROM Orders LEFT JOIN OrderDetails ON Orders.id=OrderDetails.order_id
-            GROUP BY Orders.id ORDER BY Orders.id DESC LIMIT 20
-        """)
-        rows = cur.fetchall()
-        self.orders.setRowCount(len(rows))
-        for i, r in enumerate(rows):
-            self.orders.setItem(i,0,QTableWidgetItem(str(r["oid"])))
-            self.orders.setItem(i,1,QTableWidgetItem(str(r["items"])))
-            self.orders.setItem(i,2,QTableWidgetItem(f"{r['amt']:.2f}"))
-            self.orders.setItem(i,3,QTableWidgetItem(r["st"]))
+        self.pager.reset()
+        self.orders.setRowCount(0)
+        self.load_more()
+
+    def load_more(self):
+        rows = self.pager.next_page()
+        start = self.orders.rowCount()
+        self.orders.setRowCount(start + len(rows))
+        for i, r in enumerate(rows, start):
+            self.orders.setItem(i,0,QTableWidgetItem(str(r.id)))
+            self.orders.setItem(i,1,QTableWidgetItem(str(r.items)))
+            self.orders.setItem(i,2,QTableWidgetItem(format_money(r.amount_paise, symbol=False)))
+            self.orders.setItem(i,3,QTableWidgetItem(r.status))
+        self.btn_more.setEnabled(self.pager.has_more)
 
     def generate_invoice(self):
         row = self.orders.currentRow()
@@ -62,21 +69,17 @@ class BillingView(QWidget):
             QMessageBox.warning(self, "Selection", "Please select an order to generate invoice.")
             return
         oid = int(self.orders.item(row,0).text())
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT MenuItems.name AS name, OrderDetails.qty AS qty, OrderDetails.price AS price FROM OrderDetails JOIN MenuItems ON OrderDetails.item_id=MenuItems.id WHERE order_id=?", (oid,))
-        items = cur.fetchall()
-        cur.execute("SELECT COALESCE(SUM(qty*price),0) AS amt FROM OrderDetails WHERE order_id=?", (oid,))
-        amt = float(cur.fetchone()["amt"] or 0)
-        gst = round(amt*0.18,2)
+        items = self.controller.orders.lines(oid)
+        amt = self.controller.orders.subtotal(oid)
+        gst = self.controller.tax.tax(amt)
         total = amt + gst
         html = "<h2>Invoice</h2>"
         html += f"<p>Order #{oid} - {datetime.datetime.now().isoformat()}</p>"
         html += "<table border='1' cellspacing='0' cellpadding='4'><tr><th>Item</th><th>Qty</th><th>Price</th></tr>"
         for it in items:
-            html += f"<tr><td>{it['name']}</td><td>{it['qty']}</td><td>{it['price']:.2f}</td></tr>"
+            html += f"<tr><td>{it.name}</td><td>{it.qty}</td><td>{format_money(it.price_paise, symbol=False)}</td></tr>"
         html += "</table>"
-        html += f"<p>Subtotal: ₹{amt:.2f}</p><p>GST (18%): ₹{gst:.2f}</p><h3>Total: ₹{total:.2f}</h3>"
+        html += f"<p>Subtotal: {format_money(amt)}</p><p>{self.controller.tax.label()}: {format_money(gst)}</p><h3>Total: {format_money(total)}</h3>"
         html += f"<p>Payment Method: {self.method.currentText()}</p>"
         doc = QTextDocument()
         doc.setHtml(html)
@@ -2,6 +2,9 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGridLa
 from PySide6.QtCore import QTimer, Qt, QDate
 from PySide6.QtCharts import QChartView, QChart, QLineSeries, QValueAxis
 import datetime
+from app.utils.money import format_money, to_rupees
+from app.utils.timestamps import month_key
+from app.services.analytics_service import day_number
 
 class DashboardView(QWidget):
     def __init__(self, controller):
@@ -18,10 +21,10 @@ class DashboardView(QWidget):
         v.addWidget(page_title)
         v.addWidget(page_subtitle)
 
-        # Stats row - 5 compact cards in one line
+        # Stats row - 6 compact cards in one line
         stats_row = QHBoxLayout()
         stats_row.setSpacing(16)
-        for name in ["Today Sales", "Weekly Sales", "Monthly Sales", "Active Orders", "Room Occupancy"]:
+        for name in ["Today Sales", "Weekly Sales", "Monthly Sales", "Active Orders", "Room Occupancy", "Low Stock"]:
             card = QFrame()
             card.setObjectName("StatCard")
             card.setFixedHeight(90)
@@ -65,6 +68,9 @@ class DashboardView(QWidget):
         self.timer.timeout.connect(self.refresh)
         self.refresh()
         self.timer.start()
+        # Pushed by the stock service when an item crosses its threshold
+        self.controller.stock.add_listener(self._show_low_stock)
+        self._show_low_stock()
         self.btn_rooms.clicked.connect(lambda: self.controller.main_window._switch(1))
         self.btn_reservations.clicked.connect(lambda: self.controller.main_window._switch(1))
         self.btn_pos.clicked.connect(lambda: self.controller.main_window._switch(2))
@@ -73,35 +79,29 @@ class DashboardView(QWidget):
         self.btn_reports.clicked.connect(lambda: self.controller.main_window._switch(5))
 
     def refresh(self):
-        db = self.controller.db
-        conn = db.connect()
-        cur = conn.cursor()
-        today = datetime.date.today().isoformat()
-        cur.execute("SELECT COALESCE(SUM(amount+gst),0) AS s FROM Payments WHERE DATE(paid_at)=DATE(?)", (today,))
-        self.cards["Today Sales"].setText(f"₹{cur.fetchone()['s']:.2f}")
-        cur.execute("SELECT COALESCE(SUM(amount+gst),0) AS s FROM Payments WHERE DATE(paid_at)>=DATE(?)", ((datetime.date.today()-datetime.timedelta(days=7)).isoformat(),))
-        self.cards["Weekly Sales"].setText(f"₹{cur.fetchone()['s']:.2f}")
-        cur.execute("SELECT COALESCE(SUM(amount+gst),0) AS s FROM Payments WHERE strftime('%Y-%m',paid_at)=strftime('%Y-%m','now')")
-        self.cards["Monthly Sales"].setText(f"₹{cur.fetchone()['s']:.2f}")
-        cur.execute("SELECT COUNT(*) AS c FROM Orders WHERE status IN ('Open','InKitchen','Served')")
-        self.cards["Active Orders"].setText(str(cur.fetchone()["c"]))
-        cur.execute("SELECT COUNT(*) AS total, SUM(CASE WHEN status='Occupied' THEN 1 ELSE 0 END) AS occ FROM Rooms")
-        r = cur.fetchone()
-        occ = 0 if r["total"] == 0 else int((r["occ"] or 0)/r["total"]*100)
+        payments = self.controller.payments
+        today = datetime.date.today()
+        self.cards["Today Sales"].setText(format_money(payments.sales_on_day(day_number(today))))
+        self.cards["Weekly Sales"].setText(format_money(payments.sales_since_day(day_number(today)-7)))
+        self.cards["Monthly Sales"].setText(format_money(payments.sales_in_month(month_key(today))))
+        self.cards["Active Orders"].setText(str(self.controller.orders.active_count()))
+        total, occupied = self.controller.rooms.occupancy()
+        occ = 0 if total == 0 else int(occupied/total*100)
         self.cards["Room Occupancy"].setText(f"{occ}%")
         self._build_revenue_chart()
 
+    def _show_low_stock(self, item_ids=None):
+        low = self.controller.stock.low_items()
+        self.cards["Low Stock"].setText(str(len(low)))
+        self.cards["Low Stock"].setToolTip("\n".join(f"{item.name}: {item.qty:g} {item.unit}" for item in low))
+
     def _build_revenue_chart(self):
-        db = self.controller.db
-        conn = db.connect()
-        cur = conn.cursor()
         chart = QChart()
         series = QLineSeries()
+        first = day_number(datetime.date.today()) - 13
+        totals = self.controller.payments.daily_sales_since(first)
         for i in range(0, 14):
-            day = datetime.date.today() - datetime.timedelta(days=13-i)
-            cur.execute("SELECT COALESCE(SUM(amount+gst),0) AS s FROM Payments WHERE DATE(paid_at)=DATE(?)", (day.isoformat(),))
-            val = cur.fetchone()["s"] or 0
-            series.append(i, float(val))
+            series.append(i, to_rupees(totals.get(first + i, 0)))
         chart.addSeries(series)
         axis_x = QValueAxis()
         axis_x.setRange(0, 13)
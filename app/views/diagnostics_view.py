@@ -0,0 +1,137 @@
+import datetime
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QFormLayout, QApplication, QSpinBox
+from PySide6.QtCore import Qt
+from app.utils.message import MessageBox
+from app.services.archive_service import ARCHIVE_AFTER_MONTHS
+
+def _when(timestamp):
+    return datetime.datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M") if timestamp else "Never"
+
+class DiagnosticsView(QWidget):
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        self.maintenance = controller.maintenance
+        self.archive = controller.archive
+        self.cards = {}
+        v = QVBoxLayout(self)
+        v.setSpacing(24)
+        page_title = QLabel("Diagnostics")
+        page_title.setObjectName("PageTitle")
+        page_subtitle = QLabel("Database file size, free space and maintenance")
+        page_subtitle.setObjectName("PageSubtitle")
+        v.addWidget(page_title)
+        v.addWidget(page_subtitle)
+
+        stats_row = QHBoxLayout()
+        stats_row.setSpacing(16)
+        for name in ["File Size", "Pages", "Free Pages", "Free Space", "Fragmentation", "Auto-Vacuum"]:
+            card = QFrame()
+            card.setObjectName("StatCard")
+            card.setFixedHeight(90)
+            card_layout = QVBoxLayout(card)
+            card_layout.setContentsMargins(16, 12, 16, 12)
+            card_layout.setSpacing(4)
+            lbl = QLabel("-")
+            lbl.setObjectName("StatValue")
+            card_layout.addWidget(QLabel(name))
+            card_layout.addWidget(lbl)
+            stats_row.addWidget(card, 1)
+            self.cards[name] = lbl
+        v.addLayout(stats_row)
+
+        f = QFormLayout()
+        self.last_optimize = QLabel("")
+        self.last_vacuum = QLabel("")
+        self.idle = QLabel("")
+        f.addRow("Statistics refreshed:", self.last_optimize)
+        f.addRow("Free pages last reclaimed:", self.last_vacuum)
+        f.addRow("Idle for:", self.idle)
+        self.archived = QLabel("")
+        f.addRow("Live / archived rows:", self.archived)
+        v.addLayout(f)
+
+        bar = QHBoxLayout()
+        bar.setSpacing(12)
+        self.btn_refresh = QPushButton("Refresh")
+        self.btn_refresh.setObjectName("PrimaryButton")
+        self.btn_optimize = QPushButton("Optimize Now")
+        self.btn_analyze = QPushButton("Full ANALYZE")
+        self.btn_reclaim = QPushButton("Reclaim Free Space")
+        for b in [self.btn_refresh, self.btn_optimize, self.btn_analyze, self.btn_reclaim]:
+            bar.addWidget(b)
+        bar.addStretch()
+        v.addLayout(bar)
+
+        archive_bar = QHBoxLayout()
+        archive_bar.setSpacing(12)
+        self.months = QSpinBox()
+        self.months.setRange(1, 120)
+        self.months.setValue(ARCHIVE_AFTER_MONTHS)
+        self.months.setSuffix(" months")
+        self.btn_archive = QPushButton("Archive Closed Records")
+        archive_bar.addWidget(QLabel("Move paid orders and finished stays older than"))
+        archive_bar.addWidget(self.months)
+        archive_bar.addWidget(self.btn_archive)
+        archive_bar.addStretch()
+        v.addLayout(archive_bar)
+        v.addStretch(1)
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_optimize.clicked.connect(lambda: self._run(self.maintenance.optimize))
+        self.btn_analyze.clicked.connect(lambda: self._run(self.maintenance.analyze))
+        self.btn_reclaim.clicked.connect(lambda: self._run(self.maintenance.reclaim))
+        self.btn_archive.clicked.connect(self._archive)
+        if not self.maintenance.available:
+            for b in [self.btn_refresh, self.btn_optimize, self.btn_analyze, self.btn_reclaim, self.btn_archive]:
+                b.setEnabled(False)
+            page_subtitle.setText("Maintenance runs on the machine that holds the database")
+
+    def refresh(self):
+        if not self.maintenance.available:
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            stats = self.maintenance.stats()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.cards["File Size"].setText(f"{stats.file_bytes / (1024 * 1024):.1f} MB")
+        self.cards["Pages"].setText(f"{stats.page_count} x {stats.page_size // 1024} KB")
+        self.cards["Free Pages"].setText(str(stats.freelist_count))
+        self.cards["Free Space"].setText(f"{stats.free_ratio:.1%}")
+        self.cards["Fragmentation"].setText(f"{stats.fragmentation:.1%}" if stats.fragmentation is not None else "n/a")
+        self.cards["Auto-Vacuum"].setText(stats.auto_vacuum)
+        self.last_optimize.setText(_when(stats.last_optimize))
+        self.last_vacuum.setText(_when(stats.last_vacuum))
+        self.idle.setText(f"{int(self.controller.idle_watcher.idle_seconds)} s")
+        counts = self.archive.counts()
+        self.archived.setText(", ".join(f"{table} {live} / {archived}" for table, (live, archived) in counts.items()))
+
+    def _archive(self):
+        months = self.months.value()
+        if not MessageBox.confirm(self, "Archive Closed Records",
+                                  f"Move paid or cancelled orders and finished stays older than {months} months "
+                                  "to the archive database? Reports keep including them.",
+                                  confirm_text="Archive"):
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            result = self.archive.archive(months)
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            MessageBox.error(self, "Archive Failed", f"Unable to archive records: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+        self.refresh()
+        MessageBox.success(self, "Archive Complete",
+                           f"Moved {result.total} rows closed before {result.cutoff.isoformat()} to the archive.")
+
+    def _run(self, job):
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            job()
+        except Exception as e:
+            QApplication.restoreOverrideCursor()
+            MessageBox.error(self, "Maintenance Failed", f"Unable to complete maintenance: {e}")
+            return
+        QApplication.restoreOverrideCursor()
+        self.refresh()
@@ -1,9 +1,17 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QTabWidget, QGridLayout, QMessageBox, QHeaderView, QListWidget, QListWidgetItem, QDoubleSpinBox
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QTabWidget, QGridLayout, QMessageBox, QHeaderView, QListWidget, QListWidgetItem, QDoubleSpinBox, QProgressDialog
+from PySide6.QtCore import Qt, QTimer
 import datetime
 import logging
-import csv, os
+import os
+from app.utils.export import CsvExportJob
 from app.utils.message import MessageBox # Assuming MessageBox is in utils
+from app.views.import_dialog import import_csv
+from app.services.availability_service import parse_stay
+from app.repositories.reservations import RoomUnavailable
+from app.repositories.customers import CustomerRepo
+from app.utils.pagination import connect_infinite_scroll
+from app.utils.money import format_money
+from app.utils.timestamps import format_timestamp, now_timestamp
 
 class CustomerDialog(QDialog):
     def __init__(self, parent=None):
@@ -21,10 +29,11 @@ class CustomerDialog(QDialog):
         f.addRow(ok)
 
 class CustomerCheckinDialog(QDialog):
-    def __init__(self, parent=None, db=None):
+    def __init__(self, parent=None, rooms=None, availability=None):
         super().__init__(parent)
         self.setWindowTitle("Customer Check-in")
-        self.db = db
+        self.rooms = rooms
+        self.availability = availability
         f = QFormLayout(self)
         self.room = QComboBox()
         self.room.setMinimumWidth(200)
@@ -36,51 +45,31 @@ class CustomerCheckinDialog(QDialog):
         f.addRow("Check-in (YYYY-MM-DD)", self.check_in)
         f.addRow("Planned Check-out (YYYY-MM-DD)", self.check_out)
         f.addRow(ok)
-        if db:
+        self.check_in.textChanged.connect(self._load_available_rooms)
+        self.check_out.textChanged.connect(self._load_available_rooms)
+        if rooms:
             self._load_available_rooms()
 
     def _load_available_rooms(self):
-        conn = self.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number, category, rate FROM Rooms WHERE status='Available' ORDER BY number")
-        self.room.clear()
-        for r in cur.fetchall():
-            self.room.addItem(f"{r['number']} ({r['category']} - ₹{r['rate']:.0f})", r["number"])
-
-class CustomerCheckinDialog(QDialog):
-    def __init__(self, parent=None, db=None):
-        super().__init__(parent)
-        self.setWindowTitle("Customer Check-in")
-        self.db = db
-        f = QFormLayout(self)
-        self.room = QComboBox()
-        self.room.setMinimumWidth(200)
-        self.check_in = QLineEdit()
-        self.check_out = QLineEdit()
-        ok = QPushButton("Check-in")
-        ok.clicked.connect(self.accept)
-        f.addRow("Room", self.room)
-        f.addRow("Check-in (YYYY-MM-DD)", self.check_in)
-        f.addRow("Planned Check-out (YYYY-MM-DD)", self.check_out)
-        f.addRow(ok)
-        if db:
-            self._load_available_rooms()
-
-    def _load_available_rooms(self):
-        conn = self.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number, category, rate FROM Rooms WHERE status='Available' ORDER BY number")
+        if not self.rooms:
+            return
+        stay = parse_stay(self.check_in.text(), self.check_out.text())
+        if self.availability and stay:
+            # Free for the whole stay and ready to hand over now
+            rooms = self.availability.available_rooms(*stay, statuses=("Available",))
+        else:
+            rooms = self.rooms.with_status("Available")
         self.room.clear()
-        for r in cur.fetchall():
-            self.room.addItem(f"{r['number']} ({r['category']} - ₹{r['rate']:.0f})", r["number"])
+        for r in rooms:
+            self.room.addItem(f"{r.number} ({r.category} - {format_money(r.rate_paise)})", r.number)
 
 class AddCustomerOrderDialog(QDialog):
-    def __init__(self, parent=None, db=None):
+    def __init__(self, parent=None, menu=None):
         super().__init__(parent)
         self.setWindowTitle("Add Customer Order")
-        self.db = db
+        self.menu = menu
         self.selected_items = {} # {menu_item_id: quantity}
-        self.menu_items_data = {} # {menu_item_id: {'name': name, 'price': price}}
+        self.menu_items_data = {} # {menu_item_id: MenuItem}
 
         main_layout = QVBoxLayout(self)
 
@@ -109,23 +98,20 @@ class AddCustomerOrderDialog(QDialog):
         self._load_menu_items()
 
     def _load_menu_items(self):
-        if not self.db:
+        if not self.menu:
             return
-        conn = self.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, price FROM MenuItems ORDER BY name")
-        for item in cur.fetchall():
-            item_id = item['id']
-            item_name = item['name']
-            item_price = item['price']
-            self.menu_items_data[item_id] = {'name': item_name, 'price': item_price}
+        for item in sorted(self.menu.active(), key=lambda item: item.name):
+            item_id = item.id
+            item_name = item.name
+            item_price = item.price_paise
+            self.menu_items_data[item_id] = item
 
             list_item = QListWidgetItem(self.menu_list_widget)
             item_widget = QWidget()
             item_layout = QHBoxLayout(item_widget)
             item_layout.setContentsMargins(0, 0, 0, 0)
 
-            name_label = QLabel(f"{item_name} (₹{item_price:.2f})")
+            name_label = QLabel(f"{item_name} ({format_money(item_price)})")
             quantity_spinbox = QSpinBox()
             quantity_spinbox.setMinimum(0)
             quantity_spinbox.setMaximum(99)
@@ -147,19 +133,23 @@ class AddCustomerOrderDialog(QDialog):
         self._update_total()
 
     def _update_total(self):
-        total = 0.0
+        total = 0
         for item_id, quantity in self.selected_items.items():
             if item_id in self.menu_items_data:
-                total += self.menu_items_data[item_id]['price'] * quantity
-        self.total_label.setText(f"Total: ₹{total:.2f}")
+                total += self.menu_items_data[item_id].price_paise * quantity
+        self.total_label.setText(f"Total: {format_money(total)}")
 
     def get_order_details(self):
         return self.selected_items
 
+    def get_price(self, item_id):
+        return self.menu_items_data[item_id].price_paise
+
 class GuestView(QWidget):
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
+        self._export_job = None
         self.init_ui()
 
     def init_ui(self):
@@ -189,6 +179,8 @@ class GuestView(QWidget):
         self.btn_add_order.setObjectName("ActionButton") # For QSS styling
         self.btn_export_cust = QPushButton("Export CSV")
         self.btn_export_cust.setObjectName("ActionButton") # For QSS styling
+        self.btn_import_cust = QPushButton("Import CSV")
+        self.btn_import_cust.setObjectName("ActionButton") # For QSS styling
 
         cust_bar.addWidget(self.customer_search, 1)
         cust_bar.addWidget(self.btn_add_cust)
@@ -198,6 +190,7 @@ class GuestView(QWidget):
         cust_bar.addWidget(self.btn_cust_checkout)
         cust_bar.addWidget(self.btn_add_order)
         cust_bar.addWidget(self.btn_export_cust)
+        cust_bar.addWidget(self.btn_import_cust)
         cust_layout.addLayout(cust_bar)
 
         self.customers = QTableWidget(0, 6)
@@ -207,6 +200,8 @@ class GuestView(QWidget):
         self.customers.horizontalHeader().setStretchLastSection(True) # Stretch last column
         self.customers.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents) # Resize columns to content
         cust_layout.addWidget(self.customers)
+        self.btn_more_cust = QPushButton("Load more")
+        cust_layout.addWidget(self.btn_more_cust, 0, Qt.AlignLeft)
 
         # Customer Orders Section
         orders_header_label = QLabel("Customer Orders")
@@ -222,6 +217,11 @@ class GuestView(QWidget):
         self.customer_orders.setFixedWidth(700)
         self.customer_orders.setFixedHeight(250)
         cust_layout.addWidget(self.customer_orders)
+        self.btn_more_orders = QPushButton("Load more orders")
+        cust_layout.addWidget(self.btn_more_orders, 0, Qt.AlignLeft)
+
+        self.customers_pager = self.controller.customers.pager()
+        self.orders_pager = self.controller.orders.customer_pager()
 
         self.btn_add_cust.clicked.connect(self.add_customer)
         self.btn_edit_cust.clicked.connect(self.edit_customer)
@@ -230,91 +230,51 @@ class GuestView(QWidget):
         self.btn_cust_checkout.clicked.connect(self.customer_check_out)
         self.customer_search.textChanged.connect(self.refresh_customers)
         self.btn_export_cust.clicked.connect(self.export_customers_csv)
+        self.btn_import_cust.clicked.connect(self.import_customers_csv)
         self.btn_add_order.clicked.connect(self.add_customer_order)
         self.customers.itemSelectionChanged.connect(self._on_customer_selection_changed)
+        self.btn_more_cust.clicked.connect(self.load_more_customers)
+        self.btn_more_orders.clicked.connect(self.load_more_customer_orders)
+        connect_infinite_scroll(self.customers, self.load_more_customers)
+        connect_infinite_scroll(self.customer_orders, self.load_more_customer_orders)
         self.refresh_customers()
 
     def refresh_customers(self):
-        """Show only active guests (Reserved/CheckedIn) or customers with no reservations. Hide checked-out."""
-        term = self.customer_search.text().strip()
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        if term:
-            like = f"%{term}%"
-            cur.execute("""
-                SELECT c.id AS id, c.name AS name, c.phone AS phone, c.email AS email,
-                       r.room_id AS room_id, rm.number AS current_room, r.status AS res_status
-                FROM Customers c
-                LEFT JOIN Reservations r ON r.id = (
-                    SELECT id FROM Reservations WHERE customer_id=c.id AND status IN ('Reserved','CheckedIn') ORDER BY id DESC LIMIT 1
-                )
-                LEFT JOIN Rooms rm ON rm.id = r.room_id
-                WHERE (c.name LIKE ? OR c.phone LIKE ? OR c.email LIKE ?)
-                AND (r.id IS NOT NULL OR c.id NOT IN (SELECT customer_id FROM Reservations))
-                ORDER BY c.id DESC
-            """, (like, like, like))
-        else:
-            cur.execute("""
-                SELECT c.id AS id, c.name AS name, c.phone AS phone, c.email AS email,
-                       r.room_id AS room_id, rm.number AS current_room, r.status AS res_status
-                FROM Customers c
-                LEFT JOIN Reservations r ON r.id = (
-                    SELECT id FROM Reservations WHERE customer_id=c.id AND status IN ('Reserved','CheckedIn') ORDER BY id DESC LIMIT 1
-                )
-                LEFT JOIN Rooms rm ON rm.id = r.room_id
-                WHERE r.id IS NOT NULL OR c.id NOT IN (SELECT customer_id FROM Reservations)
-                ORDER BY c.id DESC
-            """)
-        rows = cur.fetchall()
-        self.customers.setRowCount(len(rows))
-        for i, r in enumerate(rows):
-            self.customers.setItem(i,0,QTableWidgetItem(str(r["id"])))
-            self.customers.setItem(i,1,QTableWidgetItem(r["name"] or ""))
-            self.customers.setItem(i,2,QTableWidgetItem(r["phone"] or ""))
-            self.customers.setItem(i,3,QTableWidgetItem(r["email"] or ""))
-            self.customers.setItem(i,4,QTableWidgetItem(r["current_room"] or ""))
-            self.customers.setItem(i,5,QTableWidgetItem(r["res_status"] or ""))
-        self.customer_orders.setRowCount(0) # Clear orders when customers are refreshed
+        """Show customers newest first, one page at a time, with their active reservation if any."""
+        self.controller.customers.search(self.customers_pager, self.customer_search.text().strip())
+        self.customers.setRowCount(0)
+        self.load_more_customers()
+        self.refresh_customer_orders(None) # Clear orders when customers are refreshed
+
+    def load_more_customers(self):
+        rows = self.customers_pager.next_page()
+        start = self.customers.rowCount()
+        self.customers.setRowCount(start + len(rows))
+        for i, r in enumerate(rows, start):
+            self.customers.setItem(i,0,QTableWidgetItem(str(r.id)))
+            self.customers.setItem(i,1,QTableWidgetItem(r.name or ""))
+            self.customers.setItem(i,2,QTableWidgetItem(r.phone or ""))
+            self.customers.setItem(i,3,QTableWidgetItem(r.email or ""))
+            self.customers.setItem(i,4,QTableWidgetItem(r.current_room or ""))
+            self.customers.setItem(i,5,QTableWidgetItem(r.res_status or ""))
+        self.btn_more_cust.setEnabled(self.customers_pager.has_more)
 
     def refresh_customer_orders(self, customer_id):
         self.customer_orders.setRowCount(0) # Clear existing orders
-        if not customer_id:
-            return
-
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT
-                o.id AS order_id,
-                o.order_date,
-                o.status,
-                SUM(oi.quantity * mi.price) AS total_amount
-            FROM Orders o
-            JOIN OrderItems oi ON o.id = oi.order_id
-            JOIN MenuItems mi ON oi.menu_item_id = mi.id
-            WHERE o.customer_id = ?
-            GROUP BY o.id, o.order_date, o.status
-            ORDER BY o.order_date DESC, o.id DESC
-        """, (customer_id,))
-        orders = cur.fetchall()
-
-        self.customer_orders.setRowCount(len(orders))
-        for i, order in enumerate(orders):
-            self.customer_orders.setItem(i, 0, QTableWidgetItem(str(order["order_id"])))
-            self.customer_orders.setItem(i, 1, QTableWidgetItem(order["order_date"]))
-            self.customer_orders.setItem(i, 2, QTableWidgetItem(f"₹{order['total_amount']:.2f}"))
-            self.customer_orders.setItem(i, 3, QTableWidgetItem(order["status"]))
-
-            # Fetch and display order items for each order
-            cur.execute("""
-                SELECT mi.name, oi.quantity
-                FROM OrderItems oi
-                JOIN MenuItems mi ON oi.menu_item_id = mi.id
-                WHERE oi.order_id = ?
-            """, (order["order_id"],))
-            items = cur.fetchall()
-            item_details = ", ".join([f"{item['name']} x{item['quantity']}" for item in items])
-            self.customer_orders.setItem(i, 4, QTableWidgetItem(item_details))
+        self.controller.orders.for_customer(self.orders_pager, customer_id)
+        self.load_more_customer_orders()
+
+    def load_more_customer_orders(self):
+        orders = self.orders_pager.next_page()
+        start = self.customer_orders.rowCount()
+        self.customer_orders.setRowCount(start + len(orders))
+        for i, order in enumerate(orders, start):
+            self.customer_orders.setItem(i, 0, QTableWidgetItem(str(order.order_id)))
+            self.customer_orders.setItem(i, 1, QTableWidgetItem(format_timestamp(order.created_at)))
+            self.customer_orders.setItem(i, 2, QTableWidgetItem(format_money(order.total_amount)))
+            self.customer_orders.setItem(i, 3, QTableWidgetItem(order.status))
+            self.customer_orders.setItem(i, 4, QTableWidgetItem(order.items or ""))
+        self.btn_more_orders.setEnabled(self.orders_pager.has_more)
 
     def add_customer(self):
         dlg = CustomerDialog(self)
@@ -322,11 +282,7 @@ class GuestView(QWidget):
             if not dlg.name.text().strip():
                 MessageBox.warning(self, "Validation Required", "Customer name is required.")
                 return
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("INSERT INTO Customers(name,phone,email) VALUES(?,?,?)",
-                        (dlg.name.text().strip(), dlg.phone.text().strip(), dlg.email.text().strip()))
-            conn.commit()
+            self.controller.customers.add(dlg.name.text().strip(), dlg.phone.text().strip(), dlg.email.text().strip())
             self.refresh_customers()
 
     def _on_customer_selection_changed(self):
@@ -337,19 +293,6 @@ class GuestView(QWidget):
         else:
             self.refresh_customer_orders(None) # Clear orders if no customer is selected
 
-    def refresh_customers(self):
-        self.customers.setRowCount(0)
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, name, phone, email FROM Customers")
-        customers = cur.fetchall()
-        self.customers.setRowCount(len(customers))
-        for i, customer in enumerate(customers):
-            self.customers.setItem(i, 0, QTableWidgetItem(str(customer["id"])))
-            self.customers.setItem(i, 1, QTableWidgetItem(customer["name"]))
-            self.customers.setItem(i, 2, QTableWidgetItem(customer["phone"]))
-            self.customers.setItem(i, 3, QTableWidgetItem(customer["email"]))
-
     def edit_customer(self):
         row = self.customers.currentRow()
         if row < 0:
@@ -361,11 +304,8 @@ class GuestView(QWidget):
         dlg.phone.setText(self.customers.item(row,2).text())
         dlg.email.setText(self.customers.item(row,3).text())
         if dlg.exec():
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("UPDATE Customers SET name=?, phone=?, email=? WHERE id=?",
-                        (dlg.name.text().strip(), dlg.phone.text().strip(), dlg.email.text().strip(), cust_id))
-            conn.commit()
+            self.controller.customers.update(cust_id, dlg.name.text().strip(), dlg.phone.text().strip(),
+                                             dlg.email.text().strip())
             self.refresh_customers()
             MessageBox.success(self, "Customer Updated", "Customer information has been updated successfully!")
 
@@ -376,26 +316,53 @@ class GuestView(QWidget):
             return
         cust_id = int(self.customers.item(row,0).text())
         if MessageBox.confirm(self, "Confirm Deletion", "Are you sure you want to delete this customer? This action cannot be undone."):
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("DELETE FROM Customers WHERE id=?", (cust_id,))
-            conn.commit()
+            self.controller.customers.delete(cust_id)
             self.refresh_customers()
             MessageBox.success(self, "Customer Deleted", "Customer has been deleted successfully.")
 
+    def import_customers_csv(self):
+        if import_csv(self, self.controller.db, "Customers"):
+            self.refresh_customers()
+
     def export_customers_csv(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id,name,phone,email FROM Customers ORDER BY id DESC")
-        rows = cur.fetchall()
+        if self._export_job and self._export_job.is_alive():
+            MessageBox.warning(self, "Export Running", "A customer export is already in progress.")
+            return
+        if not self.controller.db.path:
+            MessageBox.warning(self, "Export Unavailable", "CSV export runs on the machine that holds the database.")
+            return
+        total = self.controller.customers.count()
         app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         path = os.path.join(app_dir, "customers_export.csv")
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["ID","Name","Phone","Email"])
-            for r in rows:
-                w.writerow([r["id"], r["name"], r["phone"] or "", r["email"] or ""])
-        MessageBox.info(self, "Export Complete", f"Exported {len(rows)} customers to customers_export.csv")
+        self._export_job = CsvExportJob(
+            self.controller.db.path,
+            CustomerRepo.SQL["export"],
+            output_path=path,
+            headers=["ID","Name","Phone","Email"],
+        )
+        self._export_progress = QProgressDialog("Exporting customers...", "Cancel", 0, max(total, 1), self)
+        self._export_progress.setWindowTitle("Export CSV")
+        self._export_progress.setMinimumDuration(300)
+        self._export_progress.canceled.connect(self._export_job.cancel)
+        self._export_timer = QTimer(self)
+        self._export_timer.setInterval(100)
+        self._export_timer.timeout.connect(self._poll_export)
+        self._export_job.start()
+        self._export_timer.start()
+
+    def _poll_export(self):
+        job = self._export_job
+        self._export_progress.setValue(min(job.rows_written, self._export_progress.maximum()))
+        if job.is_alive():
+            return
+        self._export_timer.stop()
+        self._export_progress.reset()
+        if job.cancelled:
+            MessageBox.info(self, "Export Cancelled", "Customer export was cancelled.")
+        elif job.error:
+            MessageBox.error(self, "Export Failed", f"Unable to export customers: {job.error}")
+        else:
+            MessageBox.info(self, "Export Complete", f"Exported {job.rows_written} customers to {os.path.basename(job.output_path)}")
 
     def customer_check_in(self):
         row = self.customers.currentRow()
@@ -403,7 +370,7 @@ class GuestView(QWidget):
             MessageBox.warning(self, "Selection Required", "Please select a customer to check in.")
             return
         cust_id = int(self.customers.item(row,0).text())
-        dlg = CustomerCheckinDialog(self, self.controller.db)
+        dlg = CustomerCheckinDialog(self, self.controller.rooms, self.controller.availability)
         dlg.check_in.setText(datetime.date.today().isoformat())
         dlg.check_out.setText((datetime.date.today() + datetime.timedelta(days=1)).isoformat())
         if dlg.exec():
@@ -411,21 +378,28 @@ class GuestView(QWidget):
             if not room_number:
                 QMessageBox.warning(self, "Validation", "Please select a room.")
                 return
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("SELECT id, status FROM Rooms WHERE number=?", (str(room_number),))
-            room_row = cur.fetchone()
-            if not room_row:
+            room = self.controller.rooms.by_number(room_number)
+            if not room:
                 QMessageBox.warning(self, "Error", "Room not found.")
                 return
-            if room_row["status"] != "Available":
+            if room.status != "Available":
                 MessageBox.warning(self, "Room Unavailable", "Selected room is not available.")
                 return
-            room_id = room_row["id"]
-            cur.execute("INSERT INTO Reservations(customer_id,room_id,check_in,check_out,status) VALUES(?,?,?,?,?)",
-                        (cust_id, room_id, dlg.check_in.text(), dlg.check_out.text(), "CheckedIn"))
-            cur.execute("UPDATE Rooms SET status='Occupied' WHERE id=?", (room_id,))
-            conn.commit()
+            room_id = room.id
+            stay = parse_stay(dlg.check_in.text(), dlg.check_out.text())
+            if not stay:
+                MessageBox.warning(self, "Invalid Dates", "Enter check-in and check-out as YYYY-MM-DD, with check-out on or after check-in.")
+                return
+            conflicts = self.controller.availability.conflicts(room_id, *stay)
+            if conflicts:
+                MessageBox.warning(self, "Room Unavailable", f"Room {room_number} is already booked for these dates.",
+                                   "\n".join(f"Reservation #{rid}: {a} to {b}" for rid, a, b in conflicts))
+                return
+            try:
+                self.controller.reservations.walk_in(cust_id, room_id, stay[0].isoformat(), stay[1].isoformat())
+            except RoomUnavailable:
+                MessageBox.warning(self, "Room Unavailable", f"Room {room_number} has just been booked for these dates.")
+                return
             self.refresh_customers() # Refresh customer list after check-in
             MessageBox.success(self, "Check-in Successful", "Customer checked in successfully!")
 
@@ -435,16 +409,11 @@ class GuestView(QWidget):
             MessageBox.warning(self, "Selection Required", "Please select a customer to check out.")
             return
         cust_id = int(self.customers.item(row,0).text())
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, room_id FROM Reservations WHERE customer_id=? AND status='CheckedIn' ORDER BY id DESC LIMIT 1", (cust_id,))
-        res = cur.fetchone()
-        if not res:
+        stay = self.controller.reservations.active_stay(cust_id)
+        if not stay:
             MessageBox.warning(self, "No Active Stay", "No active stay found for this customer.")
             return
-        cur.execute("UPDATE Reservations SET status='CheckedOut', check_out=? WHERE id=?", (datetime.date.today().isoformat(), res["id"]))
-        cur.execute("UPDATE Rooms SET status='Cleaning' WHERE id=?", (res["room_id"],))
-        conn.commit()
+        self.controller.reservations.check_out(stay.id)
         self.refresh_customers()
         # self.refresh_rooms() # This would be handled by a RoomView if it existed
 
@@ -456,30 +425,21 @@ class GuestView(QWidget):
         cust_id = int(self.customers.item(row,0).text())
         cust_name = self.customers.item(row,1).text()
 
-        dlg = AddCustomerOrderDialog(self, self.controller.db)
+        dlg = AddCustomerOrderDialog(self, self.controller.menu)
         if dlg.exec():
             order_details = dlg.get_order_details()
             if not order_details:
                 MessageBox.info(self, "Order Empty", "No items selected for the order.")
                 return
 
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
             try:
-                # Create a new order record
-                cur.execute("INSERT INTO Orders (customer_id, order_date, status) VALUES (?, ?, ?)",
-                            (cust_id, datetime.date.today().isoformat(), "Pending"))
-                order_id = cur.lastrowid
-
-                # Insert order items
-                for item_id, quantity in order_details.items():
-                    cur.execute("INSERT INTO OrderItems (order_id, menu_item_id, quantity) VALUES (?, ?, ?)",
-                                (order_id, item_id, quantity))
-                conn.commit()
+                # Order items at the current menu price
+                self.controller.orders.create(None, cust_id, now_timestamp(),
+                                              [(item_id, quantity, dlg.get_price(item_id))
+                                               for item_id, quantity in order_details.items()])
                 MessageBox.success(self, "Order Placed", f"Order for {cust_name} placed successfully!")
                 self.refresh_customer_orders(cust_id) # Refresh orders after placing a new one
             except Exception as e:
-                conn.rollback()
                 MessageBox.critical(self, "Order Error", f"Failed to place order: {e}")
 
     
@@ -1,9 +1,18 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QTabWidget, QGridLayout, QMessageBox
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QTabWidget, QGridLayout, QMessageBox, QDoubleSpinBox, QCheckBox
 from PySide6.QtCore import Qt
-import datetime
 from app.views.table_management_dialog import TableManagementDialog
+from app.views.import_dialog import import_csv
+from app.services.availability_service import parse_stay
+from app.repositories.reservations import RoomUnavailable
+from app.views.room_rack_view import RoomRack
+from app.utils.pagination import connect_infinite_scroll
+from app.utils.message import MessageBox
+from app.utils.money import format_money, to_paise, PAISE_PER_RUPEE
+import datetime
 import logging
 
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
 class RoomDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -25,10 +34,13 @@ class RoomDialog(QDialog):
         f.addRow(ok)
 
 class ReservationDialog(QDialog):
-    def __init__(self, parent=None, db=None):
+    def __init__(self, parent=None, rooms=None, availability=None, pricing=None):
         super().__init__(parent)
         self.setWindowTitle("Reservation")
-        self.db = db
+        self.rooms = rooms
+        self.availability = availability
+        self.pricing = pricing
+        self.room_ids = {}
         f = QFormLayout(self)
         self.customer = QLineEdit()
         self.customer.setPlaceholderText("Guest name")
@@ -38,23 +50,44 @@ class ReservationDialog(QDialog):
         self.check_in.setPlaceholderText("YYYY-MM-DD")
         self.check_out = QLineEdit()
         self.check_out.setPlaceholderText("YYYY-MM-DD")
+        self.quote = QLabel("")
         ok = QPushButton("Save")
         ok.clicked.connect(self.accept)
         f.addRow("Customer Name", self.customer)
         f.addRow("Room", self.room)
         f.addRow("Check-in", self.check_in)
         f.addRow("Check-out", self.check_out)
+        f.addRow("Stay Price", self.quote)
         f.addRow(ok)
-        if db:
+        self.check_in.textChanged.connect(self._load_rooms)
+        self.check_out.textChanged.connect(self._load_rooms)
+        self.room.currentIndexChanged.connect(self._show_quote)
+        if rooms:
             self._load_rooms()
 
     def _load_rooms(self):
-        conn = self.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number, category, status, rate FROM Rooms ORDER BY number")
+        if not self.rooms:
+            return
+        stay = parse_stay(self.check_in.text(), self.check_out.text())
+        if self.availability and stay:
+            rooms = self.availability.available_rooms(*stay)
+        else:
+            rooms = self.rooms.all()
+        self.room_ids = {r.number: r.id for r in rooms}
         self.room.clear()
-        for r in cur.fetchall():
-            self.room.addItem(f"{r['number']} ({r['category']} - ₹{r['rate']:.0f}) [{r['status']}]", r["number"])
+        for r in rooms:
+            self.room.addItem(f"{r.number} ({r.category} - {format_money(r.rate_paise)}) [{r.status}]", r.number)
+        self._show_quote()
+
+    def _show_quote(self):
+        stay = parse_stay(self.check_in.text(), self.check_out.text())
+        room_id = self.room_ids.get(self.room.currentData())
+        if not self.pricing or not stay or room_id is None:
+            self.quote.setText("")
+            return
+        quote = self.pricing.quote(room_id, *stay)
+        self.quote.setText(f"{format_money(quote.total)} for {len(quote.nights)} night(s), "
+                           f"avg {format_money(quote.average)}")
 
 class CustomerDialog(QDialog):
     def __init__(self, parent=None):
@@ -72,10 +105,11 @@ class CustomerDialog(QDialog):
         f.addRow(ok)
 
 class CustomerCheckinDialog(QDialog):
-    def __init__(self, parent=None, db=None):
+    def __init__(self, parent=None, rooms=None, availability=None):
         super().__init__(parent)
         self.setWindowTitle("Customer Check-in")
-        self.db = db
+        self.rooms = rooms
+        self.availability = availability
         f = QFormLayout(self)
         self.room = QComboBox()
         self.room.setMinimumWidth(200)
@@ -87,16 +121,127 @@ class CustomerCheckinDialog(QDialog):
         f.addRow("Check-in (YYYY-MM-DD)", self.check_in)
         f.addRow("Planned Check-out (YYYY-MM-DD)", self.check_out)
         f.addRow(ok)
-        if db:
+        self.check_in.textChanged.connect(self._load_available_rooms)
+        self.check_out.textChanged.connect(self._load_available_rooms)
+        if rooms:
             self._load_available_rooms()
 
     def _load_available_rooms(self):
-        conn = self.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number, category, rate FROM Rooms WHERE status='Available' ORDER BY number")
+        if not self.rooms:
+            return
+        stay = parse_stay(self.check_in.text(), self.check_out.text())
+        if self.availability and stay:
+            rooms = self.availability.available_rooms(*stay, statuses=("Available",))
+        else:
+            rooms = self.rooms.with_status("Available")
         self.room.clear()
-        for r in cur.fetchall():
-            self.room.addItem(f"{r['number']} ({r['category']} - ₹{r['rate']:.0f})", r["number"])
+        for r in rooms:
+            self.room.addItem(f"{r.number} ({r.category} - {format_money(r.rate_paise)})", r.number)
+
+class RateRuleDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Rate Rule")
+        f = QFormLayout(self)
+        self.name = QLineEdit()
+        self.category = QComboBox()
+        self.category.addItems(["All","Standard","Deluxe","Suite"])
+        self.start_date = QLineEdit()
+        self.start_date.setPlaceholderText("YYYY-MM-DD (optional)")
+        self.end_date = QLineEdit()
+        self.end_date.setPlaceholderText("YYYY-MM-DD (optional)")
+        days = QHBoxLayout()
+        self.weekdays = [QCheckBox(d) for d in WEEKDAYS]
+        for box in self.weekdays:
+            days.addWidget(box)
+        self.min_nights = QSpinBox()
+        self.min_nights.setRange(1, 365)
+        self.min_occupancy = QSpinBox()
+        self.min_occupancy.setRange(0, 100)
+        self.min_occupancy.setSuffix(" %")
+        self.multiplier = QDoubleSpinBox()
+        self.multiplier.setRange(0.05, 10.0)
+        self.multiplier.setSingleStep(0.05)
+        self.multiplier.setValue(1.0)
+        ok = QPushButton("Save")
+        ok.clicked.connect(self.accept)
+        f.addRow("Name", self.name)
+        f.addRow("Category", self.category)
+        f.addRow("From", self.start_date)
+        f.addRow("To", self.end_date)
+        f.addRow("Weekdays (none = all)", days)
+        f.addRow("Minimum Nights", self.min_nights)
+        f.addRow("Minimum Occupancy (0 = any)", self.min_occupancy)
+        f.addRow("Rate Multiplier", self.multiplier)
+        f.addRow(ok)
+
+class RatePlansDialog(QDialog):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.setWindowTitle("Rate Plans")
+        self.resize(820, 400)
+        v = QVBoxLayout(self)
+        v.addWidget(QLabel("Rules multiply the room rate on the nights they match; matching rules combine."))
+        self.table = QTableWidget(0, 8)
+        self.table.setHorizontalHeaderLabels(["ID","Name","Category","From","To","Weekdays","Min Nights / Occupancy","Multiplier"])
+        v.addWidget(self.table)
+        bar = QHBoxLayout()
+        btn_add = QPushButton("Add Rule")
+        btn_add.setObjectName("PrimaryButton")
+        btn_delete = QPushButton("Delete Rule")
+        close = QPushButton("Close")
+        bar.addWidget(btn_add)
+        bar.addWidget(btn_delete)
+        bar.addStretch()
+        bar.addWidget(close)
+        v.addLayout(bar)
+        btn_add.clicked.connect(self.add_rule)
+        btn_delete.clicked.connect(self.delete_rule)
+        close.clicked.connect(self.accept)
+        self.refresh()
+
+    def refresh(self):
+        rules = self.controller.rate_rules.all()
+        self.table.setRowCount(len(rules))
+        for i, r in enumerate(rules):
+            days = ", ".join(WEEKDAYS[int(d)] for d in r.weekdays.split(",")) if r.weekdays else "All"
+            limits = f"{r.min_nights} / " + (f"{r.min_occupancy:.0%}" if r.min_occupancy is not None else "any")
+            values = [r.id, r.name, r.category or "All", r.start_date or "", r.end_date or "", days, limits, f"x{r.multiplier:g}"]
+            for col, value in enumerate(values):
+                self.table.setItem(i, col, QTableWidgetItem(str(value)))
+
+    def add_rule(self):
+        dlg = RateRuleDialog(self)
+        if not dlg.exec():
+            return
+        if not dlg.name.text().strip():
+            QMessageBox.warning(self, "Validation", "Rule name is required.")
+            return
+        dates = []
+        for field in (dlg.start_date, dlg.end_date):
+            text = field.text().strip()
+            try:
+                dates.append(datetime.date.fromisoformat(text).isoformat() if text else None)
+            except ValueError:
+                MessageBox.warning(self, "Invalid Dates", "Enter dates as YYYY-MM-DD or leave them empty.")
+                return
+        weekdays = ",".join(str(i) for i, box in enumerate(dlg.weekdays) if box.isChecked())
+        category = dlg.category.currentText()
+        occupancy = dlg.min_occupancy.value()
+        self.controller.rate_rules.add(dlg.name.text().strip(), dlg.multiplier.value(),
+                                       None if category == "All" else category, dates[0], dates[1],
+                                       weekdays or None, dlg.min_nights.value(),
+                                       occupancy / 100 if occupancy else None)
+        self.refresh()
+
+    def delete_rule(self):
+        row = self.table.currentRow()
+        if row < 0:
+            MessageBox.warning(self, "Selection Required", "Please select a rule to delete.")
+            return
+        self.controller.rate_rules.delete(int(self.table.item(row, 0).text()))
+        self.refresh()
 
 class HotelView(QWidget):
     def __init__(self, controller):
@@ -124,9 +269,13 @@ class HotelView(QWidget):
         self.btn_add_room.setObjectName("PrimaryButton")
         self.btn_edit_room = QPushButton("Edit Room")
         self.btn_delete_room = QPushButton("Delete Room")
+        self.btn_import_rooms = QPushButton("Import CSV")
+        self.btn_rate_plans = QPushButton("Rate Plans")
         top.addWidget(self.btn_add_room)
         top.addWidget(self.btn_edit_room)
         top.addWidget(self.btn_delete_room)
+        top.addWidget(self.btn_import_rooms)
+        top.addWidget(self.btn_rate_plans)
         top.addStretch()
         rooms_layout.addLayout(top)
         self.rooms = QTableWidget(0, 4)
@@ -155,51 +304,52 @@ class HotelView(QWidget):
         self.reservations.setFixedWidth(800)
         self.reservations.setFixedHeight(300)
         res_layout.addWidget(self.reservations)
+        self.btn_more_res = QPushButton("Load more")
+        res_layout.addWidget(self.btn_more_res, 0, Qt.AlignLeft)
         self.tabs.addTab(res_tab, "Reservations")
+        self.res_pager = self.controller.reservations.pager()
+
+        # ---- Room rack tab ----
+        self.room_rack = RoomRack(self.controller)
+        self.tabs.addTab(self.room_rack, "Room Rack")
 
         self.btn_add_room.clicked.connect(self.add_room)
         self.btn_edit_room.clicked.connect(self.edit_room)
         self.btn_delete_room.clicked.connect(self.delete_room)
+        self.btn_import_rooms.clicked.connect(self.import_rooms)
+        self.btn_rate_plans.clicked.connect(lambda: RatePlansDialog(self.controller, self).exec())
         self.btn_add_res.clicked.connect(self.add_reservation)
         self.btn_check_in.clicked.connect(self.check_in)
         self.btn_check_out.clicked.connect(self.check_out)
         self.res_search.textChanged.connect(self.refresh)
+        self.btn_more_res.clicked.connect(self.load_more_reservations)
+        connect_infinite_scroll(self.reservations, self.load_more_reservations)
         self.refresh()
 
     def refresh(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number,category,status,rate FROM Rooms ORDER BY number")
-        rows = cur.fetchall()
+        rows = self.controller.rooms.all()
         self.rooms.setRowCount(len(rows))
         for i, r in enumerate(rows):
-            self.rooms.setItem(i,0,QTableWidgetItem(r["number"]))
-            self.rooms.setItem(i,1,QTableWidgetItem(r["category"]))
-            self.rooms.setItem(i,2,QTableWidgetItem(r["status"]))
-            self.rooms.setItem(i,3,QTableWidgetItem(str(r["rate"])))
-        term = self.res_search.text().strip()
-        if term:
-            like = f"%{term}%"
-            cur.execute("""
-                SELECT Reservations.id AS id, Customers.name AS customer, Rooms.number AS room, Reservations.check_in AS ci, Reservations.check_out AS co
-                FROM Reservations JOIN Customers ON Reservations.customer_id=Customers.id JOIN Rooms ON Reservations.room_id=Rooms.id
-                WHERE Customers.name LIKE ? OR Rooms.number LIKE ?
-                ORDER BY Reservations.id DESC
-            """, (like, like))
-        else:
-            cur.execute("""
-                SELECT Reservations.id AS id, Customers.name AS customer, Rooms.number AS room, Reservations.check_in AS ci, Reservations.check_out AS co
-                FROM Reservations JOIN Customers ON Reservations.customer_id=Customers.id JOIN Rooms ON Reservations.room_id=Rooms.id
-                ORDER BY Reservations.id DESC
-            """)
-        rows = cur.fetchall()
-        self.reservations.setRowCount(len(rows))
-        for i, r in enumerate(rows):
-            self.reservations.setItem(i,0,QTableWidgetItem(str(r["id"])))
-            self.reservations.setItem(i,1,QTableWidgetItem(r["customer"]))
-            self.reservations.setItem(i,2,QTableWidgetItem(r["room"]))
-            self.reservations.setItem(i,3,QTableWidgetItem(r["ci"]))
-            self.reservations.setItem(i,4,QTableWidgetItem(r["co"] or ""))
+            self.rooms.setItem(i,0,QTableWidgetItem(r.number))
+            self.rooms.setItem(i,1,QTableWidgetItem(r.category))
+            self.rooms.setItem(i,2,QTableWidgetItem(r.status))
+            self.rooms.setItem(i,3,QTableWidgetItem(format_money(r.rate_paise, symbol=False)))
+        self.controller.reservations.search(self.res_pager, self.res_search.text().strip())
+        self.reservations.setRowCount(0)
+        self.load_more_reservations()
+        self.room_rack.refresh()
+
+    def load_more_reservations(self):
+        rows = self.res_pager.next_page()
+        start = self.reservations.rowCount()
+        self.reservations.setRowCount(start + len(rows))
+        for i, r in enumerate(rows, start):
+            self.reservations.setItem(i,0,QTableWidgetItem(str(r.id)))
+            self.reservations.setItem(i,1,QTableWidgetItem(r.customer))
+            self.reservations.setItem(i,2,QTableWidgetItem(r.room))
+            self.reservations.setItem(i,3,QTableWidgetItem(r.check_in))
+            self.reservations.setItem(i,4,QTableWidgetItem(r.check_out or ""))
+        self.btn_more_res.setEnabled(self.res_pager.has_more)
 
 
 
@@ -209,17 +359,18 @@ class HotelView(QWidget):
             if not dlg.number.text().strip():
                 MessageBox.warning(self, "Validation Required", "Please provide a room number.")
                 return
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
             try:
-                cur.execute("INSERT INTO Rooms(number,category,status,rate) VALUES(?,?,?,?)",
-                            (dlg.number.text().strip(), dlg.category.currentText(), dlg.status.currentText(), dlg.rate.value()))
-                conn.commit()
+                self.controller.rooms.add(dlg.number.text().strip(), dlg.category.currentText(),
+                                          dlg.status.currentText(), dlg.rate.value() * PAISE_PER_RUPEE)
                 self.refresh()
                 MessageBox.success(self, "Room Added", "Room has been added successfully!")
             except Exception as e:
                 MessageBox.error(self, "Operation Failed", f"Unable to add room: {e}")
 
+    def import_rooms(self):
+        if import_csv(self, self.controller.db, "Rooms"):
+            self.refresh()
+
     def edit_room(self):
         row = self.rooms.currentRow()
         if row < 0:
@@ -231,13 +382,10 @@ class HotelView(QWidget):
         dlg.number.setReadOnly(True)
         dlg.category.setCurrentText(self.rooms.item(row,1).text())
         dlg.status.setCurrentText(self.rooms.item(row,2).text())
-        dlg.rate.setValue(int(float(self.rooms.item(row,3).text())))
+        dlg.rate.setValue(to_paise(self.rooms.item(row,3).text()) // PAISE_PER_RUPEE)
         if dlg.exec():
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("UPDATE Rooms SET category=?, status=?, rate=? WHERE number=?",
-                        (dlg.category.currentText(), dlg.status.currentText(), dlg.rate.value(), number))
-            conn.commit()
+            self.controller.rooms.update(number, dlg.category.currentText(), dlg.status.currentText(),
+                                         dlg.rate.value() * PAISE_PER_RUPEE)
             self.refresh()
 
     def delete_room(self):
@@ -246,14 +394,11 @@ class HotelView(QWidget):
             MessageBox.warning(self, "Selection Required", "Please select a room to delete.")
             return
         number = self.rooms.item(row,0).text()
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("DELETE FROM Rooms WHERE number=?", (number,))
-        conn.commit()
+        self.controller.rooms.delete(number)
         self.refresh()
 
     def add_reservation(self):
-        dlg = ReservationDialog(self, self.controller.db)
+        dlg = ReservationDialog(self, self.controller.rooms, self.controller.availability, self.controller.pricing)
         if dlg.exec():
             if not dlg.customer.text().strip():
                 QMessageBox.warning(self, "Validation", "Customer name is required.")
@@ -267,19 +412,27 @@ class HotelView(QWidget):
             if not dlg.check_in.text().strip() or not dlg.check_out.text().strip():
                 QMessageBox.warning(self, "Validation", "Check-in and check-out dates are required.")
                 return
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("SELECT id FROM Rooms WHERE number=?", (str(room_number),))
-            room_row = cur.fetchone()
-            if not room_row:
+            stay = parse_stay(dlg.check_in.text(), dlg.check_out.text())
+            if not stay:
+                MessageBox.warning(self, "Invalid Dates", "Enter check-in and check-out as YYYY-MM-DD, with check-out on or after check-in.")
+                return
+            room = self.controller.rooms.by_number(room_number)
+            if not room:
                 MessageBox.error(self, "Room Error", "Selected room not found.")
                 return
-            room_id = room_row["id"]
-            cur.execute("INSERT INTO Customers(name) VALUES(?)", (dlg.customer.text().strip(),))
-            cust_id = cur.lastrowid
-            cur.execute("INSERT INTO Reservations(customer_id,room_id,check_in,check_out,status) VALUES(?,?,?,?,?)",
-                        (cust_id, room_id, dlg.check_in.text().strip(), dlg.check_out.text().strip(), "Reserved"))
-            conn.commit()
+            room_id = room.id
+            conflicts = self.controller.availability.conflicts(room_id, *stay)
+            if conflicts:
+                MessageBox.warning(self, "Room Unavailable", f"Room {room_number} is already booked for these dates.",
+                                   "\n".join(f"Reservation #{rid}: {a} to {b}" for rid, a, b in conflicts))
+                return
+            try:
+                # Store the parsed dates, so compact forms like 20260301 save as YYYY-MM-DD
+                self.controller.reservations.book_for_new_guest(dlg.customer.text().strip(), room_id,
+                                                                stay[0].isoformat(), stay[1].isoformat())
+            except RoomUnavailable:
+                MessageBox.warning(self, "Room Unavailable", f"Room {room_number} has just been booked for these dates.")
+                return
             self.refresh()
             QMessageBox.information(self, "Success", "Reservation created successfully.")
 
@@ -290,11 +443,7 @@ class HotelView(QWidget):
             MessageBox.warning(self, "Selection Required", "Please select a reservation to check in.")
             return
         res_id = int(self.reservations.item(row,0).text())
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("UPDATE Reservations SET status='CheckedIn' WHERE id=?", (res_id,))
-        cur.execute("UPDATE Rooms SET status='Occupied' WHERE number=?", (self.reservations.item(row,2).text(),))
-        conn.commit()
+        self.controller.reservations.check_in(res_id)
         self.refresh()
         MessageBox.success(self, "Reservation Check-in", "Reservation checked in successfully!")
 
@@ -304,11 +453,6 @@ class HotelView(QWidget):
             MessageBox.warning(self, "Selection Required", "Please select a reservation to check out.")
             return
         res_id = int(self.reservations.item(row,0).text())
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("UPDATE Reservations SET status='CheckedOut', check_out=? WHERE id=?", (datetime.date.today().isoformat(), res_id))
-        cur.execute("UPDATE Rooms SET status='Cleaning' WHERE number=?", (self.reservations.item(row,2).text(),))
-        conn.commit()
-        self.refresh_reservations()
-        self.refresh_rooms()
+        self.controller.reservations.check_out(res_id)
+        self.refresh()
         MessageBox.success(self, "Reservation Check-out", "Reservation checked out successfully!")
@@ -0,0 +1,36 @@
+from PySide6.QtWidgets import QFileDialog, QApplication
+from PySide6.QtCore import Qt
+import logging
+import os
+from app.services.import_service import ImportService, IMPORT_SPECS
+from app.utils.message import MessageBox
+
+
+def import_csv(parent, db, table):
+    """Ask for a CSV file, bulk-import it into table and report the outcome.
+
+    Returns True when at least one row was inserted."""
+    columns = ", ".join(f.name for f in IMPORT_SPECS[table])
+    path, _ = QFileDialog.getOpenFileName(parent, f"Import {table} (columns: {columns})", "", "CSV files (*.csv)")
+    if not path:
+        return False
+    QApplication.setOverrideCursor(Qt.WaitCursor)
+    try:
+        result = ImportService(db).import_csv(table, path)
+    except Exception as e:
+        QApplication.restoreOverrideCursor()
+        logging.error(f"Bulk import of {path} into {table} failed: {e}", exc_info=True)
+        MessageBox.error(parent, "Import Failed", f"Unable to import {os.path.basename(path)}: {e}")
+        return False
+    QApplication.restoreOverrideCursor()
+    logging.info(f"Imported {result.inserted} rows into {table}; {len(result.rejected)} rejected.")
+    if result.rejected:
+        rejects_path = os.path.splitext(path)[0] + "_rejected.csv"
+        result.write_rejects(rejects_path)
+        details = "\n".join(f"Line {line}: {reason}" for line, reason, _ in result.rejected[:200])
+        MessageBox.warning(parent, "Import Finished With Errors",
+                           f"Imported {result.inserted} rows. {len(result.rejected)} rows were rejected "
+                           f"and written to {os.path.basename(rejects_path)}.", details)
+    else:
+        MessageBox.success(parent, "Import Complete", f"Imported {result.inserted} rows into {table}.")
+    return result.inserted > 0
@@ -1,7 +1,8 @@
 import logging
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QMessageBox, QDoubleSpinBox
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QMessageBox, QDoubleSpinBox, QTreeWidget, QTreeWidgetItem
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QShowEvent
+from app.views.import_dialog import import_csv
 
 class InventoryDialog(QDialog):
     def __init__(self, parent=None):
@@ -23,6 +24,35 @@ class InventoryDialog(QDialog):
         f.addRow("Threshold", self.threshold)
         f.addRow(ok)
 
+class ReorderDialog(QDialog):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Reorder Suggestions")
+        self.resize(760, 480)
+        v = QVBoxLayout(self)
+        v.addWidget(QLabel("Items at or below their reorder point, by supplier"))
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Supplier / Item", "In Stock", "Use/Day (7d)", "Use/Day (28d)",
+                                   "Lead Time", "Reorder Point", "Order Qty", "Value"])
+        v.addWidget(self.tree)
+        orders = controller.forecast.purchase_orders()
+        for order in orders:
+            parent_item = QTreeWidgetItem([order.supplier, "", "", "", "", "", f"{len(order.lines)} items",
+                                           f"{order.value:.2f}"])
+            for f in order.lines:
+                QTreeWidgetItem(parent_item, [f.name, f"{f.qty:g} {f.unit}", f"{f.daily_short:.2f}",
+                                              f"{f.daily_long:.2f}", f"{f.lead_time_days} d",
+                                              f"{f.reorder_point:.1f}", f"{f.order_qty:g} {f.unit}",
+                                              f"{f.order_qty * f.price:.2f}"])
+            self.tree.addTopLevelItem(parent_item)
+            parent_item.setExpanded(True)
+        if not orders:
+            self.tree.addTopLevelItem(QTreeWidgetItem(["Nothing to reorder"]))
+        self.tree.resizeColumnToContents(0)
+        close = QPushButton("Close")
+        close.clicked.connect(self.accept)
+        v.addWidget(close)
+
 class InventoryView(QWidget):
     def __init__(self, controller):
         super().__init__()
@@ -41,9 +71,13 @@ class InventoryView(QWidget):
         self.btn_add.setObjectName("PrimaryButton")
         self.btn_update = QPushButton("Update Stock")
         self.btn_delete = QPushButton("Delete Item")
+        self.btn_import = QPushButton("Import CSV")
+        self.btn_reorder = QPushButton("Reorder Suggestions")
         top.addWidget(self.btn_add)
         top.addWidget(self.btn_update)
         top.addWidget(self.btn_delete)
+        top.addWidget(self.btn_import)
+        top.addWidget(self.btn_reorder)
         self.alert_lbl = QLabel("")
         self.alert_lbl.setObjectName("LoginMessage")
         top.addWidget(self.alert_lbl, 1)
@@ -54,28 +88,44 @@ class InventoryView(QWidget):
         self.btn_add.clicked.connect(self.add_item)
         self.btn_update.clicked.connect(self.update_stock)
         self.btn_delete.clicked.connect(self.delete_item)
+        self.btn_import.clicked.connect(self.import_items)
+        self.btn_reorder.clicked.connect(lambda: ReorderDialog(self.controller, self).exec())
+        self._dirty = True
+        self.controller.db.add_change_listener(self._on_tables_changed)
+        self.controller.stock.add_listener(self._on_stock_changed)
         self.refresh()
+        self._show_alerts()
 
     def showEvent(self, event: QShowEvent):
         super().showEvent(event)
         self.refresh()
 
+    def _on_tables_changed(self, tables):
+        if "Inventory" in tables:
+            self._dirty = True
+            if self.isVisible():
+                self.refresh()
+
+    def _on_stock_changed(self, item_ids):
+        self._show_alerts()
+
+    def _show_alerts(self):
+        alerts = [item.name for item in self.controller.stock.low_items()]
+        self.alert_lbl.setText("Low stock: " + ", ".join(alerts) if alerts else "")
+
     def refresh(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id,name,qty,unit,threshold FROM Inventory ORDER BY name")
-        rows = cur.fetchall()
+        # Only reload after Inventory was written since the last load
+        if not self._dirty:
+            return
+        self._dirty = False
+        rows = self.controller.inventory.all()
         self.table.setRowCount(len(rows))
-        alerts = []
         for i, r in enumerate(rows):
-            self.table.setItem(i,0,QTableWidgetItem(str(r["id"])))
-            self.table.setItem(i,1,QTableWidgetItem(r["name"]))
-            self.table.setItem(i,2,QTableWidgetItem(str(r["qty"])))
-            self.table.setItem(i,3,QTableWidgetItem(r["unit"]))
-            self.table.setItem(i,4,QTableWidgetItem(str(r["threshold"])))
-            if r["qty"] <= r["threshold"]:
-                alerts.append(r["name"])
-        self.alert_lbl.setText("Low stock: " + ", ".join(alerts) if alerts else "")
+            self.table.setItem(i,0,QTableWidgetItem(str(r.id)))
+            self.table.setItem(i,1,QTableWidgetItem(r.name))
+            self.table.setItem(i,2,QTableWidgetItem(str(r.qty)))
+            self.table.setItem(i,3,QTableWidgetItem(r.unit))
+            self.table.setItem(i,4,QTableWidgetItem(str(r.threshold)))
 
     def add_item(self):
         dlg = InventoryDialog(self)
@@ -86,14 +136,17 @@ class InventoryView(QWidget):
             if not dlg.unit.text().strip():
                 QMessageBox.warning(self, "Validation", "Unit is required.")
                 return
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("INSERT INTO Inventory(name,qty,unit,threshold) VALUES(?,?,?,?)",
-                        (dlg.name.text().strip(), dlg.qty.value(), dlg.unit.text().strip(), dlg.threshold.value()))
-            conn.commit()
+            item_id = self.controller.inventory.add(dlg.name.text().strip(), dlg.qty.value(),
+                                                    dlg.unit.text().strip(), dlg.threshold.value())
+            self.controller.stock.refresh_item(item_id)
             self.refresh()
             QMessageBox.information(self, "Success", "Item added successfully.")
 
+    def import_items(self):
+        if import_csv(self, self.controller.db, "Inventory"):
+            self.controller.stock.reload()
+            self.refresh()
+
     def update_stock(self):
         logging.info("update_stock method called.")
         row = self.table.currentRow()
@@ -107,14 +160,12 @@ class InventoryView(QWidget):
         dlg.name.setText(self.table.item(row,1).text())
         dlg.qty.setValue(float(self.table.item(row,2).text()))
         dlg.unit.setText(self.table.item(row,3).text())
-        dlg.threshold.setValue(int(self.table.item(row,4).text()))
+        dlg.threshold.setValue(int(float(self.table.item(row,4).text())))
         if dlg.exec():
             logging.info(f"InventoryDialog accepted for item ID: {item_id}. New values: Name={dlg.name.text()}, Qty={dlg.qty.value()}, Unit={dlg.unit.text()}, Threshold={dlg.threshold.value()}")
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("UPDATE Inventory SET name=?, qty=?, unit=?, threshold=? WHERE id=?",
-                        (dlg.name.text().strip(), float(dlg.qty.value()), dlg.unit.text().strip(), dlg.threshold.value(), item_id))
-            conn.commit()
+            self.controller.inventory.update(item_id, dlg.name.text().strip(), float(dlg.qty.value()),
+                                             dlg.unit.text().strip(), dlg.threshold.value())
+            self.controller.stock.refresh_item(item_id)
             logging.info(f"Database update committed for item ID: {item_id}.")
             self.refresh()
             QMessageBox.information(self, "Success", "Stock updated successfully.")
@@ -138,8 +189,7 @@ class InventoryView(QWidget):
 
         if reply == QMessageBox.Yes:
             try:
-                # This will be implemented in the AppController
-                # self.controller.delete_inventory_item(item_id)
+                self.controller.delete_inventory_item(item_id)
                 QMessageBox.information(self, "Success", f"Item '{item_name}' deleted successfully.")
                 self.refresh()
             except Exception as e:
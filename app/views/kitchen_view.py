@@ -0,0 +1,154 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QListWidget, QListWidgetItem, QListView
+from PySide6.QtCore import Qt, QSize, QTimer
+from PySide6.QtGui import QColor
+from app.utils.timestamps import now_timestamp
+
+ALL_STATIONS = "All stations"
+STATUS_COLORS = {
+    "Pending": "#F59E0B",
+    "Cooking": "#3B82F6",
+    "Ready": "#10B981",
+}
+# Tickets waiting longer than this many minutes are highlighted
+LATE_MINUTES = 20
+
+
+class KitchenView(QWidget):
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        self.kitchen = controller.kitchen
+        v = QVBoxLayout(self)
+        v.setSpacing(20)
+        page_title = QLabel("Kitchen")
+        page_title.setObjectName("PageTitle")
+        page_subtitle = QLabel("Live tickets by station")
+        page_subtitle.setObjectName("PageSubtitle")
+        v.addWidget(page_title)
+        v.addWidget(page_subtitle)
+        top = QHBoxLayout()
+        top.setSpacing(12)
+        top.addWidget(QLabel("Station"))
+        self.station = QComboBox()
+        self.station.setMinimumWidth(160)
+        top.addWidget(self.station)
+        self.btn_bump_ticket = QPushButton("Bump Ticket")
+        self.btn_bump_ticket.setObjectName("PrimaryButton")
+        self.btn_bump_item = QPushButton("Bump Item")
+        top.addWidget(self.btn_bump_ticket)
+        top.addWidget(self.btn_bump_item)
+        top.addStretch()
+        self.count_lbl = QLabel()
+        top.addWidget(self.count_lbl)
+        v.addLayout(top)
+        mid = QHBoxLayout()
+        mid.setSpacing(16)
+        self.board = QListWidget()
+        self.board.setViewMode(QListView.IconMode)
+        self.board.setFlow(QListView.LeftToRight)
+        self.board.setWrapping(True)
+        self.board.setResizeMode(QListView.Adjust)
+        self.board.setMovement(QListView.Static)
+        self.board.setUniformItemSizes(True)
+        self.board.setGridSize(QSize(230, 170))
+        self.board.setSpacing(8)
+        self.board.setWordWrap(True)
+        self.lines = QListWidget()
+        self.lines.setFixedWidth(300)
+        mid.addWidget(self.board, 1)
+        mid.addWidget(self.lines)
+        v.addLayout(mid, 1)
+
+        self._items = {}
+        self.station.currentTextChanged.connect(self.refresh)
+        self.board.currentItemChanged.connect(self._show_lines)
+        self.board.itemDoubleClicked.connect(self.bump_ticket)
+        self.lines.itemDoubleClicked.connect(self.bump_item)
+        self.btn_bump_ticket.clicked.connect(self.bump_ticket)
+        self.btn_bump_item.clicked.connect(self.bump_item)
+        self.kitchen.add_listener(self._on_tickets_changed)
+        # Ticket ages are recomputed from memory; nothing is read from the database
+        self.age_timer = QTimer(self)
+        self.age_timer.timeout.connect(self._update_ages)
+        self.age_timer.start(30000)
+        self.refresh()
+
+    def refresh(self):
+        current = self.station.currentText() or ALL_STATIONS
+        self.station.blockSignals(True)
+        self.station.clear()
+        self.station.addItems([ALL_STATIONS] + self.kitchen.stations())
+        self.station.setCurrentText(current)
+        self.station.blockSignals(False)
+        self.board.clear()
+        self._items = {}
+        self._on_tickets_changed(set(self.kitchen.tickets))
+
+    def _station_lines(self, ticket):
+        station = self.station.currentText()
+        return [line for line in ticket.lines.values() if station in (ALL_STATIONS, "", line.station)]
+
+    def _on_tickets_changed(self, order_ids):
+        now = now_timestamp()
+        for order_id in sorted(order_ids):
+            ticket = self.kitchen.tickets.get(order_id)
+            lines = self._station_lines(ticket) if ticket else []
+            item = self._items.get(order_id)
+            if not lines:
+                if item is not None:
+                    self.board.takeItem(self.board.row(item))
+                    del self._items[order_id]
+                continue
+            if item is None:
+                item = self._items[order_id] = QListWidgetItem()
+                item.setData(Qt.UserRole, order_id)
+                item.setTextAlignment(Qt.AlignLeft | Qt.AlignTop)
+                self.board.addItem(item)
+            self._render(item, ticket, lines, now)
+        current = self.board.currentItem()
+        if current is not None and current.data(Qt.UserRole) in order_ids:
+            self._show_lines(current)
+        elif current is None:
+            self.lines.clear()
+        self.count_lbl.setText(f"{len(self._items)} open tickets")
+
+    def _render(self, item, ticket, lines, now):
+        age = ticket.age_minutes(now)
+        text = [f"#{ticket.order_id}  {ticket.label}  ·  {age} min"]
+        text += [f"{line.qty}x {line.item}  [{line.status}]" for line in lines]
+        item.setText("\n".join(text))
+        # The least advanced line decides the ticket colour
+        status = min((line.status for line in lines), key=list(STATUS_COLORS).index)
+        color = QColor("#EF4444") if age >= LATE_MINUTES and status != "Ready" else QColor(STATUS_COLORS[status])
+        item.setBackground(color.lighter(170))
+
+    def _update_ages(self):
+        now = now_timestamp()
+        for order_id, item in self._items.items():
+            ticket = self.kitchen.tickets.get(order_id)
+            if ticket:
+                self._render(item, ticket, self._station_lines(ticket), now)
+
+    def _show_lines(self, item, previous=None):
+        self.lines.clear()
+        ticket = self.kitchen.tickets.get(item.data(Qt.UserRole)) if item else None
+        if not ticket:
+            return
+        for line in self._station_lines(ticket):
+            row = QListWidgetItem(f"{line.qty}x {line.item} ({line.station}) - {line.status}")
+            row.setData(Qt.UserRole, line.id)
+            row.setForeground(QColor(STATUS_COLORS[line.status]))
+            self.lines.addItem(row)
+
+    def bump_ticket(self, *args):
+        item = self.board.currentItem()
+        if item is None:
+            return
+        ticket = self.kitchen.tickets.get(item.data(Qt.UserRole))
+        if ticket:
+            self.kitchen.bump([line.id for line in self._station_lines(ticket)])
+
+    def bump_item(self, *args):
+        row = self.lines.currentItem()
+        if row is not None:
+            self.kitchen.bump([row.data(Qt.UserRole)])
@@ -11,6 +11,8 @@ from .billing_view import BillingView
 from .table_view import TableView
 from .guest_view import GuestView
 from .menu_management_view import MenuManagementView
+from .kitchen_view import KitchenView
+from .diagnostics_view import DiagnosticsView
 
 class MainWindow(QMainWindow):
     def __init__(self, controller):
@@ -38,6 +40,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(wrap)
         self._build_sidebar()
         self._build_pages()
+        self.controller.stock.add_listener(self._on_stock_changed)
+        self._show_stock_badge()
 
     def _build_sidebar(self):
         v = QVBoxLayout(self.sidebar)
@@ -58,9 +62,11 @@ class MainWindow(QMainWindow):
         self.btn_inventory = QPushButton("Inventory")
         self.btn_menu_management = QPushButton("Menu")
         self.btn_reports = QPushButton("Reports")
+        self.btn_kitchen = QPushButton("Kitchen")
+        self.btn_diagnostics = QPushButton("Diagnostics")
         self.btn_theme = QPushButton("Toggle Theme")
         self.btn_theme.setObjectName("ThemeButton")
-        for b in [self.btn_dashboard, self.btn_hotel, self.btn_tables, self.btn_guests, self.btn_billing, self.btn_inventory, self.btn_menu_management, self.btn_reports]:
+        for b in [self.btn_dashboard, self.btn_hotel, self.btn_tables, self.btn_guests, self.btn_billing, self.btn_inventory, self.btn_menu_management, self.btn_reports, self.btn_kitchen, self.btn_diagnostics]:
             b.setCheckable(True)
             b.setObjectName("NavButton")
             v.addWidget(b)
@@ -74,6 +80,8 @@ class MainWindow(QMainWindow):
         self.btn_inventory.clicked.connect(lambda: self._switch(5))
         self.btn_menu_management.clicked.connect(lambda: self._switch(6))
         self.btn_reports.clicked.connect(lambda: self._switch(7))
+        self.btn_kitchen.clicked.connect(lambda: self._switch(8))
+        self.btn_diagnostics.clicked.connect(lambda: self._switch(9))
         self.btn_theme.clicked.connect(self._toggle_theme)
         self.btn_dashboard.setChecked(True)
 
@@ -86,7 +94,9 @@ class MainWindow(QMainWindow):
         self.page_inventory = InventoryView(self.controller)
         self.page_menu_management = MenuManagementView(self.controller)
         self.page_reports = AnalyticsView(self.controller)
-        for p in [self.page_dashboard, self.page_hotel, self.page_tables, self.page_guests, self.page_billing, self.page_inventory, self.page_menu_management, self.page_reports]:
+        self.page_kitchen = KitchenView(self.controller)
+        self.page_diagnostics = DiagnosticsView(self.controller)
+        for p in [self.page_dashboard, self.page_hotel, self.page_tables, self.page_guests, self.page_billing, self.page_inventory, self.page_menu_management, self.page_reports, self.page_kitchen, self.page_diagnostics]:
             self.stack.addWidget(p)
 
     def _switch(self, index):
@@ -96,9 +106,19 @@ class MainWindow(QMainWindow):
         if hasattr(current_widget, 'refresh'):
             current_widget.refresh()
         self._animate_transition(old, index)
-        for i, b in enumerate([self.btn_dashboard, self.btn_hotel, self.btn_tables, self.btn_guests, self.btn_billing, self.btn_inventory, self.btn_menu_management, self.btn_reports]):
+        for i, b in enumerate([self.btn_dashboard, self.btn_hotel, self.btn_tables, self.btn_guests, self.btn_billing, self.btn_inventory, self.btn_menu_management, self.btn_reports, self.btn_kitchen, self.btn_diagnostics]):
             b.setChecked(i == index)
 
+    def _show_stock_badge(self):
+        count = len(self.controller.stock.low)
+        self.btn_inventory.setText(f"Inventory ({count})" if count else "Inventory")
+
+    def _on_stock_changed(self, item_ids):
+        self._show_stock_badge()
+        went_low = [self.controller.stock.low[i].name for i in item_ids if i in self.controller.stock.low]
+        if went_low:
+            self.statusBar().showMessage("Low stock: " + ", ".join(sorted(went_low)), 10000)
+
     def _animate_transition(self, old, new):
         w = self.stack.currentWidget()
         anim = QPropertyAnimation(w, b"geometry")
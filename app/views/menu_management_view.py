@@ -1,10 +1,82 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QMessageBox, QDoubleSpinBox, QHeaderView, QCheckBox
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QSpinBox, QDialog, QFormLayout, QLabel, QMessageBox, QDoubleSpinBox, QHeaderView, QCheckBox, QComboBox
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QShowEvent
 import logging
 
 from app.core.database import DatabaseManager
 from app.utils.message import MessageBox
+from app.utils.money import format_money, to_paise, to_rupees
+from app.views.import_dialog import import_csv
+
+class RecipeDialog(QDialog):
+    def __init__(self, controller, item_id, item_name, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.item_id = item_id
+        self.setWindowTitle(f"Recipe - {item_name}")
+        self.setMinimumWidth(420)
+        self.stock = self.controller.inventory.all()
+        v = QVBoxLayout(self)
+        v.addWidget(QLabel("Stock used by one portion:"))
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Ingredient", "Qty", "Unit"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        v.addWidget(self.table)
+        btns = QHBoxLayout()
+        self.btn_add = QPushButton("Add Ingredient")
+        self.btn_remove = QPushButton("Remove")
+        self.btn_save = QPushButton("Save")
+        self.btn_save.setObjectName("PrimaryButton")
+        self.btn_cancel = QPushButton("Cancel")
+        btns.addWidget(self.btn_add)
+        btns.addWidget(self.btn_remove)
+        btns.addStretch()
+        btns.addWidget(self.btn_save)
+        btns.addWidget(self.btn_cancel)
+        v.addLayout(btns)
+        self.btn_add.clicked.connect(lambda: self._add_row())
+        self.btn_remove.clicked.connect(self._remove_row)
+        self.btn_save.clicked.connect(self._save)
+        self.btn_cancel.clicked.connect(self.reject)
+        for line in self.controller.recipes.for_item(item_id):
+            self._add_row(line.inventory_id, line.qty)
+
+    def _add_row(self, inventory_id=None, qty=1.0):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        combo = QComboBox()
+        for item in self.stock:
+            combo.addItem(item.name, item.id)
+        if inventory_id is not None:
+            combo.setCurrentIndex(max(0, combo.findData(inventory_id)))
+        spin = QDoubleSpinBox()
+        spin.setDecimals(3)
+        spin.setMinimum(0.001)
+        spin.setMaximum(100000.0)
+        spin.setValue(qty)
+        unit = QLabel()
+        combo.currentIndexChanged.connect(lambda i: unit.setText(self.stock[i].unit if i >= 0 else ""))
+        unit.setText(self.stock[combo.currentIndex()].unit if combo.currentIndex() >= 0 else "")
+        self.table.setCellWidget(row, 0, combo)
+        self.table.setCellWidget(row, 1, spin)
+        self.table.setCellWidget(row, 2, unit)
+
+    def _remove_row(self):
+        row = self.table.currentRow()
+        if row >= 0:
+            self.table.removeRow(row)
+
+    def _save(self):
+        lines = {}
+        for row in range(self.table.rowCount()):
+            inventory_id = self.table.cellWidget(row, 0).currentData()
+            if inventory_id is not None:
+                lines[inventory_id] = lines.get(inventory_id, 0) + self.table.cellWidget(row, 1).value()
+        try:
+            self.controller.recipes.replace(self.item_id, list(lines.items()))
+            self.accept()
+        except Exception as e:
+            MessageBox.critical(self, "Error", f"Failed to save recipe: {e}")
 
 class MenuManagementView(QWidget):
     def __init__(self, controller, parent=None):
@@ -65,10 +137,14 @@ class MenuManagementView(QWidget):
         self.add_new_button = QPushButton("Add New Dish")
         self.save_changes_button = QPushButton("Save Changes")
         self.delete_button = QPushButton("Delete Dish")
+        self.import_button = QPushButton("Import CSV")
+        self.recipe_button = QPushButton("Edit Recipe")
 
         button_layout.addWidget(self.add_new_button)
         button_layout.addWidget(self.save_changes_button)
         button_layout.addWidget(self.delete_button)
+        button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.recipe_button)
         self.layout.addLayout(button_layout)
 
         self.setLayout(self.layout)
@@ -77,6 +153,8 @@ class MenuManagementView(QWidget):
         self.add_new_button.clicked.connect(self._add_new_dish)
         self.save_changes_button.clicked.connect(self._save_changes)
         self.delete_button.clicked.connect(self._delete_dish)
+        self.import_button.clicked.connect(self._import_dishes)
+        self.recipe_button.clicked.connect(self._edit_recipe)
         self.menu_table.itemSelectionChanged.connect(self._item_selected)
         self.category_filter.currentIndexChanged.connect(self._load_menu_items)
         self.search_input.textChanged.connect(self._load_menu_items)
@@ -89,7 +167,7 @@ class MenuManagementView(QWidget):
         logging.info("Add New Dish button clicked.")
         name = self.item_name_input.text().strip()
         category = self.item_category_combo.currentText()
-        price = self.item_price_input.value()
+        price = to_paise(self.item_price_input.value())
         active = self.item_active_checkbox.isChecked()
 
         if not name or category == "All Categories":
@@ -119,7 +197,7 @@ class MenuManagementView(QWidget):
 
         name = self.item_name_input.text().strip()
         category = self.item_category_combo.currentText()
-        price = self.item_price_input.value()
+        price = to_paise(self.item_price_input.value())
         active = self.item_active_checkbox.isChecked()
 
         if not name or category == "All Categories":
@@ -157,6 +235,18 @@ class MenuManagementView(QWidget):
             except Exception as e:
                 MessageBox.critical(self, "Error", f"Failed to delete dish: {e}")
 
+    def _edit_recipe(self):
+        item_id_text = self.item_id_label.text().replace("ID: ", "")
+        if item_id_text == "(New)":
+            MessageBox.warning(self, "Selection Error", "Please select an existing dish to edit its recipe.")
+            return
+        RecipeDialog(self.controller, int(item_id_text), self.item_name_input.text(), self).exec()
+
+    def _import_dishes(self):
+        logging.info("Import CSV button clicked.")
+        if import_csv(self, self.controller.db, "MenuItems"):
+            self.refresh()
+
     def _item_selected(self):
         selected_items = self.menu_table.selectedItems()
         if not selected_items:
@@ -167,13 +257,13 @@ class MenuManagementView(QWidget):
         item_id = self.menu_table.item(row, 0).text()
         name = self.menu_table.item(row, 1).text()
         category = self.menu_table.item(row, 2).text()
-        price_text = self.menu_table.item(row, 3).text().replace("₹", "")
+        price = to_paise(self.menu_table.item(row, 3).text())
         active_text = self.menu_table.item(row, 4).text()
 
         self.item_id_label.setText(f"ID: {item_id}")
         self.item_name_input.setText(name)
         self.item_category_combo.setCurrentText(category)
-        self.item_price_input.setValue(float(price_text))
+        self.item_price_input.setValue(to_rupees(price))
         self.item_active_checkbox.setChecked(active_text == "Yes")
 
 
@@ -185,12 +275,7 @@ class MenuManagementView(QWidget):
         self.item_category_combo.clear()
         self.category_filter.addItem("All Categories")
         
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT DISTINCT category FROM MenuItems ORDER BY category")
-        categories = [row['category'] for row in cur.fetchall()]
-        
-        for cat in categories:
+        for cat in self.controller.menu.categories():
             self.category_filter.addItem(cat)
             self.item_category_combo.addItem(cat)
 
@@ -206,36 +291,16 @@ class MenuManagementView(QWidget):
         selected_category = self.category_filter.currentText()
         search_text = self.search_input.text().strip()
 
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-
-        query = "SELECT id, name, category, price, active FROM MenuItems"
-        params = []
-        conditions = []
-
-        if selected_category != "All Categories":
-            conditions.append("category = ?")
-            params.append(selected_category)
-        
-        if search_text:
-            conditions.append("name LIKE ?")
-            params.append(f"%{search_text}%")
-        
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
-        query += " ORDER BY category, name"
-        
-        cur.execute(query, params)
-        menu_items = cur.fetchall()
+        category = None if selected_category == "All Categories" else selected_category
+        menu_items = self.controller.menu.search(category, search_text)
 
         self.menu_table.setRowCount(len(menu_items))
         for row_idx, item in enumerate(menu_items):
-            self.menu_table.setItem(row_idx, 0, QTableWidgetItem(str(item['id'])))
-            self.menu_table.setItem(row_idx, 1, QTableWidgetItem(item['name']))
-            self.menu_table.setItem(row_idx, 2, QTableWidgetItem(item['category']))
-            self.menu_table.setItem(row_idx, 3, QTableWidgetItem(f"₹{item['price']:.2f}"))
-            active_status = "Yes" if item['active'] else "No"
+            self.menu_table.setItem(row_idx, 0, QTableWidgetItem(str(item.id)))
+            self.menu_table.setItem(row_idx, 1, QTableWidgetItem(item.name))
+            self.menu_table.setItem(row_idx, 2, QTableWidgetItem(item.category))
+            self.menu_table.setItem(row_idx, 3, QTableWidgetItem(format_money(item.price_paise)))
+            active_status = "Yes" if item.active else "No"
             self.menu_table.setItem(row_idx, 4, QTableWidgetItem(active_status))
         
         self.menu_table.resizeColumnsToContents()
@@ -1,11 +1,12 @@
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QComboBox, QMessageBox
 from PySide6.QtCore import Qt
+from app.utils.money import format_money
 
 class PaymentDialog(QDialog):
-    def __init__(self, parent=None, total_amount=0.0):
+    def __init__(self, parent=None, total_paise=0):
         super().__init__(parent)
         self.setWindowTitle("Process Payment")
-        self.total_amount = total_amount
+        self.total_paise = total_paise
         self.payment_method = None
 
         self.init_ui()
@@ -14,7 +15,7 @@ class PaymentDialog(QDialog):
         main_layout = QVBoxLayout()
 
         # Total Amount Display
-        total_label = QLabel(f"Amount Due: ₹{self.total_amount:.2f}")
+        total_label = QLabel(f"Amount Due: {format_money(self.total_paise)}")
         total_label.setStyleSheet("font-size: 24px; font-weight: bold;")
         main_layout.addWidget(total_label, alignment=Qt.AlignCenter)
 
@@ -37,7 +38,7 @@ class PaymentDialog(QDialog):
     def accept_payment(self):
         self.payment_method = self.method_combo.currentText()
         QMessageBox.information(self, "Payment Confirmation", 
-                                f"Payment of ₹{self.total_amount:.2f} received via {self.payment_method}.")
+                                f"Payment of {format_money(self.total_paise)} received via {self.payment_method}.")
         self.accept() # Close dialog with accept result
 
 if __name__ == '__main__':
@@ -45,7 +46,7 @@ if __name__ == '__main__':
     import sys
 
     app = QApplication(sys.argv)
-    dialog = PaymentDialog(total_amount=1234.50)
+    dialog = PaymentDialog(total_paise=123450)
     if dialog.exec() == QDialog.Accepted:
         print(f"Payment confirmed via: {dialog.payment_method}")
     else:
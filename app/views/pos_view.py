@@ -2,6 +2,8 @@ from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QT
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QShowEvent
 import datetime
+from app.utils.money import format_money, to_paise
+from app.services.order_journal import CONFIRM_WAIT
 
 class POSView(QWidget):
     def __init__(self, controller):
@@ -74,12 +76,20 @@ class POSView(QWidget):
         self.btn_kitchen.clicked.connect(self.send_kitchen)
         self.btn_pay.clicked.connect(self.pay)
         self.btn_bill.clicked.connect(self.generate_bill)
-        self.current_order_id = None
+        self.current_order_ref = None
+        self.controller.journal.add_rejection_listener(self._on_rejected)
         self.load_tables()
         self.load_room_guests()
         self.load_menu()
         self._on_order_type_changed("Table")
 
+    def _on_rejected(self, entry, reason):
+        what = "payment" if entry["op"] == "pay" else "order"
+        if entry["ref"] == self.current_order_ref and entry["op"] == "open_order":
+            self.current_order_ref = None
+        self.load_tables()
+        QMessageBox.critical(self, "Not Saved", f"A queued {what} could not be saved and was discarded: {reason}")
+
     def showEvent(self, event: QShowEvent):
         super().showEvent(event)
         self.load_tables()
@@ -93,42 +103,24 @@ class POSView(QWidget):
         self.lbl_guest.setVisible(not is_table)
 
     def load_tables(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number, status FROM Tables ORDER BY number")
         self.tables.clear()
-        for r in cur.fetchall():
-            self.tables.addItem(f"Table {r['number']} ({r['status']})")
+        for r in self.controller.tables.all():
+            self.tables.addItem(f"Table {r.number} ({r.status})")
 
     def load_room_guests(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT c.id AS cust_id, c.name AS name, rm.number AS room
-            FROM Customers c
-            JOIN Reservations r ON r.customer_id = c.id AND r.status = 'CheckedIn'
-            JOIN Rooms rm ON rm.id = r.room_id
-            ORDER BY rm.number
-        """)
         self.room_guests.clear()
         self.room_guests.addItem("— Select guest —", None)
-        for r in cur.fetchall():
-            self.room_guests.addItem(f"{r['name']} (Room {r['room']})", r["cust_id"])
+        for r in self.controller.reservations.in_house_guests():
+            self.room_guests.addItem(f"{r.name} (Room {r.room})", r.customer_id)
 
     def load_menu(self):
         cat = self.categories.currentText()
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        if cat == "All":
-            cur.execute("SELECT name, category, price FROM MenuItems WHERE active=1 ORDER BY category,name")
-        else:
-            cur.execute("SELECT name, category, price FROM MenuItems WHERE active=1 AND category=? ORDER BY name", (cat,))
-        rows = cur.fetchall()
+        rows = self.controller.menu.active(None if cat == "All" else cat)
         self.menu.setRowCount(len(rows))
         for i, r in enumerate(rows):
-            self.menu.setItem(i,0,QTableWidgetItem(r["name"]))
-            self.menu.setItem(i,1,QTableWidgetItem(r["category"]))
-            self.menu.setItem(i,2,QTableWidgetItem(f"{r['price']:.2f}"))
+            self.menu.setItem(i,0,QTableWidgetItem(r.name))
+            self.menu.setItem(i,1,QTableWidgetItem(r.category))
+            self.menu.setItem(i,2,QTableWidgetItem(format_money(r.price_paise, symbol=False)))
 
     def add_to_cart(self):
         row = self.menu.currentRow()
@@ -136,29 +128,27 @@ class POSView(QWidget):
             QMessageBox.warning(self, "Selection", "Please select a menu item to add.")
             return
         item = self.menu.item(row,0).text()
-        price = float(self.menu.item(row,2).text())
+        price = to_paise(self.menu.item(row,2).text())
         qty = 1
         self.cart.insertRow(self.cart.rowCount())
         self.cart.setItem(self.cart.rowCount()-1,0,QTableWidgetItem(item))
         self.cart.setItem(self.cart.rowCount()-1,1,QTableWidgetItem(str(qty)))
-        self.cart.setItem(self.cart.rowCount()-1,2,QTableWidgetItem(f"{price:.2f}"))
+        self.cart.setItem(self.cart.rowCount()-1,2,QTableWidgetItem(format_money(price, symbol=False)))
         self.update_total()
 
     def update_total(self):
-        total = 0.0
+        total = 0
         for i in range(self.cart.rowCount()):
             qty = int(self.cart.item(i,1).text())
-            price = float(self.cart.item(i,2).text())
+            price = to_paise(self.cart.item(i,2).text())
             total += qty*price
-        gst = round(total*0.18,2)
-        self.total_lbl.setText(f"Total: ₹{total+gst:.2f} (GST ₹{gst:.2f})")
+        gst = self.controller.tax.tax(total)
+        self.total_lbl.setText(f"Total: {format_money(total+gst)} (GST {format_money(gst)})")
 
     def open_order(self):
         if self.cart.rowCount() == 0:
             QMessageBox.warning(self, "Cart", "Add items to cart first.")
             return
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
         table_id = None
         customer_id = None
         if self.order_type.currentText() == "Table":
@@ -166,87 +156,80 @@ class POSView(QWidget):
                 QMessageBox.warning(self, "Selection", "Please select a table.")
                 return
             table_number = int(self.tables.currentItem().text().split()[1])
-            cur.execute("SELECT id FROM Tables WHERE number=?", (table_number,))
-            row = cur.fetchone()
-            if not row:
+            table = self.controller.tables.by_number(table_number)
+            if not table:
                 return
-            table_id = row["id"]
-            cur.execute("UPDATE Tables SET status='Occupied' WHERE id=?", (table_id,))
+            table_id = table.id
         else:
             customer_id = self.room_guests.currentData()
             if not customer_id:
                 QMessageBox.warning(self, "Selection", "Please select a room guest.")
                 return
-        cur.execute("INSERT INTO Orders(table_id,customer_id,status,created_at) VALUES(?,?,?,?)",
-                    (table_id, customer_id, "Open", datetime.datetime.now().isoformat()))
-        self.current_order_id = cur.lastrowid
+        lines = []
         for i in range(self.cart.rowCount()):
             name = self.cart.item(i,0).text()
-            cur.execute("SELECT id, price FROM MenuItems WHERE name=?", (name,))
-            item = cur.fetchone()
-            cur.execute("INSERT INTO OrderDetails(order_id,item_id,qty,price,kitchen_status) VALUES(?,?,?,?,?)",
-                        (self.current_order_id, item["id"], int(self.cart.item(i,1).text()), item["price"], "Pending"))
-        conn.commit()
+            item = self.controller.menu.by_name(name)
+            lines.append((item.id, int(self.cart.item(i,1).text()), item.price_paise))
+        # Queued in the order journal; written as soon as the database is free
+        self.current_order_ref = self.controller.journal.open_order(table_id, customer_id, lines)
+        order_id = self.controller.journal.order_id(self.current_order_ref, timeout=CONFIRM_WAIT)
+        self.controller.journal.dispatch()
         self.load_tables()
         self.load_room_guests()
-        QMessageBox.information(self, "Order", f"Order #{self.current_order_id} created.")
+        if order_id:
+            QMessageBox.information(self, "Order", f"Order #{order_id} created.")
+        else:
+            QMessageBox.information(self, "Order", "Order queued; it will be saved as soon as the database is free.")
 
     def send_kitchen(self):
-        if not self.current_order_id:
+        if not self.current_order_ref:
             QMessageBox.warning(self, "Order", "Open an order first.")
             return
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("UPDATE Orders SET status='InKitchen' WHERE id=?", (self.current_order_id,))
-        cur.execute("UPDATE OrderDetails SET kitchen_status='Cooking' WHERE order_id=?", (self.current_order_id,))
-        conn.commit()
+        order_id = self.controller.journal.order_id(self.current_order_ref)
+        if not order_id:
+            QMessageBox.warning(self, "Order", "The order is still being saved. Try again shortly.")
+            return
+        self.controller.kitchen.send(order_id)
 
     def pay(self):
-        if not self.current_order_id:
+        if not self.current_order_ref:
             QMessageBox.warning(self, "Order", "Open an order first.")
             return
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT table_id FROM Orders WHERE id=?", (self.current_order_id,))
-        row = cur.fetchone()
-        table_id = row["table_id"] if row else None
-        cur.execute("SELECT SUM(qty*price) AS amt FROM OrderDetails WHERE order_id=?", (self.current_order_id,))
-        amt = cur.fetchone()["amt"] or 0
-        gst = round(amt*0.18,2)
-        cur.execute("INSERT INTO Payments(order_id,amount,gst,method,paid_at) VALUES(?,?,?,?,?)",
-                    (self.current_order_id, amt, gst, "Cash", datetime.datetime.now().isoformat()))
-        cur.execute("UPDATE Orders SET status='Paid' WHERE id=?", (self.current_order_id,))
-        if table_id:
-            cur.execute("UPDATE Tables SET status='Available' WHERE id=?", (table_id,))
-        conn.commit()
-        self.current_order_id = None
+        journal = self.controller.journal
+        seq = journal.pay(self.current_order_ref, self.controller.tax.rate())
+        saved = journal.wait(CONFIRM_WAIT, seq)
+        rejected = journal.rejection(seq)
+        # A rejected payment is reported by _on_rejected
+        journal.dispatch()
+        if rejected:
+            return
+        self.current_order_ref = None
         self.cart.setRowCount(0)
         self.update_total()
         self.load_tables()
-        QMessageBox.information(self, "Payment", "Payment completed.")
+        if saved:
+            QMessageBox.information(self, "Payment", "Payment completed.")
+        else:
+            QMessageBox.information(self, "Payment", "Payment queued; it will be recorded as soon as the database is free.")
 
     def generate_bill(self):
         """Generate invoice PDF for current order, or switch to Billing if none."""
-        if self.current_order_id:
+        oid = self.controller.journal.order_id(self.current_order_ref) if self.current_order_ref else None
+        if oid:
             from PySide6.QtGui import QTextDocument
             from PySide6.QtPrintSupport import QPrinter
             import os
-            oid = self.current_order_id
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
-            cur.execute("SELECT MenuItems.name AS name, OrderDetails.qty AS qty, OrderDetails.price AS price FROM OrderDetails JOIN MenuItems ON OrderDetails.item_id=MenuItems.id WHERE order_id=?", (oid,))
-            items = cur.fetchall()
-            cur.execute("SELECT COALESCE(SUM(qty*price),0) AS amt FROM OrderDetails WHERE order_id=?", (oid,))
-            amt = float(cur.fetchone()["amt"] or 0)
-            gst = round(amt*0.18,2)
+            items = self.controller.orders.lines(oid)
+            amt = self.controller.orders.subtotal(oid)
+            gst = self.controller.tax.tax(amt)
             total = amt + gst
             html = "<h2>Restaurant Bill</h2>"
             html += f"<p>Order #{oid} - {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}</p>"
             html += "<table border='1' cellspacing='0' cellpadding='4'><tr><th>Item</th><th>Qty</th><th>Price</th></tr>"
             for it in items:
-                html += f"<tr><td>{it['name']}</td><td>{it['qty']}</td><td>₹{it['price']:.2f}</td></tr>"
+                html += f"<tr><td>{it.name}</td><td>{it.qty}</td><td>{format_money(it.price_paise)}</td></tr>"
             html += "</table>"
-            html += f"<p>Subtotal: ₹{amt:.2f}</p><p>GST (18%): ₹{gst:.2f}</p><h3>Total: ₹{total:.2f}</h3>"
+            html += f"<p>Subtotal: {format_money(amt)}</p><p>{self.controller.tax.label()}: {format_money(gst)}</p><h3>Total: {format_money(total)}</h3>"
             doc = QTextDocument()
             doc.setHtml(html)
             pdf_path = os.path.join(os.getcwd(), f"bill_order_{oid}.pdf")
@@ -0,0 +1,139 @@
+from PySide6.QtWidgets import QAbstractScrollArea, QToolTip
+from PySide6.QtGui import QPainter, QColor, QPen
+from PySide6.QtCore import Qt, QRect, QEvent
+import datetime
+from app.services.analytics_service import day_number, day_date
+from app.services.room_rack_service import RoomRackService
+
+STATUS_COLORS = {
+    "Reserved": "#3B82F6",
+    "CheckedIn": "#10B981",
+    "CheckedOut": "#94A3B8",
+}
+
+
+class RoomRack(QAbstractScrollArea):
+    CELL_WIDTH = 34
+    ROW_HEIGHT = 26
+    HEADER_HEIGHT = 40
+    LABEL_WIDTH = 90
+    DAYS_BEFORE = 30
+    DAYS_AFTER = 365
+    PREFETCH_DAYS = 14
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        self.service = RoomRackService(controller.db)
+        self.rooms = []
+        self.first_day = day_number(datetime.date.today()) - self.DAYS_BEFORE
+        self.day_count = self.DAYS_BEFORE + self.DAYS_AFTER
+        self._visible = []
+        self.setMouseTracking(True)
+        self.viewport().setMouseTracking(True)
+        self.horizontalScrollBar().setSingleStep(self.CELL_WIDTH)
+        self.verticalScrollBar().setSingleStep(self.ROW_HEIGHT)
+        self.refresh()
+        self.horizontalScrollBar().setValue(self.DAYS_BEFORE * self.CELL_WIDTH - self.CELL_WIDTH * 2)
+
+    def refresh(self):
+        self.rooms = self.controller.rooms.all()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def _update_scrollbars(self):
+        area = self.viewport().size()
+        self.horizontalScrollBar().setPageStep(area.width())
+        self.horizontalScrollBar().setRange(0, max(0, self.day_count * self.CELL_WIDTH - (area.width() - self.LABEL_WIDTH)))
+        self.verticalScrollBar().setPageStep(area.height())
+        self.verticalScrollBar().setRange(0, max(0, len(self.rooms) * self.ROW_HEIGHT - (area.height() - self.HEADER_HEIGHT)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def _visible_window(self):
+        x, y = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        width = self.viewport().width() - self.LABEL_WIDTH
+        height = self.viewport().height() - self.HEADER_HEIGHT
+        first_col = x // self.CELL_WIDTH
+        last_col = min(self.day_count - 1, (x + width) // self.CELL_WIDTH)
+        first_row = y // self.ROW_HEIGHT
+        last_row = min(len(self.rooms) - 1, (y + height) // self.ROW_HEIGHT)
+        return x, y, first_col, last_col, first_row, last_row
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        palette = self.palette()
+        painter.fillRect(self.viewport().rect(), palette.base())
+        x, y, first_col, last_col, first_row, last_row = self._visible_window()
+        grid = QPen(palette.mid().color())
+        text = palette.text().color()
+        today = day_number(datetime.date.today())
+
+        # Reservations intersecting the visible days only; neighbours load in the background
+        first_day, last_day = self.first_day + first_col, self.first_day + last_col
+        stays = self.service.stays(first_day, last_day)
+        self.service.prefetch(first_day - self.PREFETCH_DAYS, last_day + self.PREFETCH_DAYS)
+        rows = {self.rooms[i].id: i for i in range(first_row, last_row + 1)}
+
+        painter.setClipRect(QRect(self.LABEL_WIDTH, self.HEADER_HEIGHT, self.viewport().width(), self.viewport().height()))
+        painter.setPen(grid)
+        for col in range(first_col, last_col + 1):
+            left = self.LABEL_WIDTH + col * self.CELL_WIDTH - x
+            if self.first_day + col == today:
+                painter.fillRect(left, self.HEADER_HEIGHT, self.CELL_WIDTH, self.viewport().height(), palette.alternateBase())
+            painter.drawLine(left, self.HEADER_HEIGHT, left, self.viewport().height())
+        for row in range(first_row, last_row + 2):
+            top = self.HEADER_HEIGHT + row * self.ROW_HEIGHT - y
+            painter.drawLine(self.LABEL_WIDTH, top, self.viewport().width(), top)
+
+        metrics = painter.fontMetrics()
+        self._visible = []
+        for stay in stays:
+            row = rows.get(stay.room_id)
+            if row is None:
+                continue
+            rect = QRect(self.LABEL_WIDTH + (stay.first - self.first_day) * self.CELL_WIDTH - x + 2,
+                         self.HEADER_HEIGHT + row * self.ROW_HEIGHT - y + 3,
+                         (stay.last - stay.first) * self.CELL_WIDTH - 4, self.ROW_HEIGHT - 6)
+            painter.fillRect(rect, QColor(STATUS_COLORS.get(stay.status, "#94A3B8")))
+            painter.setPen(QColor("#FFFFFF"))
+            painter.drawText(rect.adjusted(4, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft,
+                             metrics.elidedText(stay.guest, Qt.ElideRight, rect.width() - 6))
+            self._visible.append((rect, stay))
+
+        # Frozen date header and room column
+        painter.setClipping(False)
+        painter.fillRect(0, 0, self.viewport().width(), self.HEADER_HEIGHT, palette.window())
+        painter.fillRect(0, 0, self.LABEL_WIDTH, self.viewport().height(), palette.window())
+        painter.setClipRect(QRect(self.LABEL_WIDTH, 0, self.viewport().width(), self.HEADER_HEIGHT))
+        for col in range(first_col, last_col + 1):
+            day = day_date(self.first_day + col)
+            left = self.LABEL_WIDTH + col * self.CELL_WIDTH - x
+            painter.setPen(text)
+            if day.day == 1 or col == first_col:
+                painter.drawText(QRect(left + 2, 0, 80, 13), Qt.AlignLeft | Qt.AlignVCenter, day.strftime("%b %Y"))
+            painter.drawText(QRect(left, 13, self.CELL_WIDTH, 13), Qt.AlignCenter, day.strftime("%a")[:2])
+            painter.drawText(QRect(left, 26, self.CELL_WIDTH, 14), Qt.AlignCenter, str(day.day))
+        painter.setClipRect(QRect(0, self.HEADER_HEIGHT, self.LABEL_WIDTH, self.viewport().height()))
+        for row in range(first_row, last_row + 1):
+            top = self.HEADER_HEIGHT + row * self.ROW_HEIGHT - y
+            painter.setPen(text)
+            painter.drawText(QRect(8, top, self.LABEL_WIDTH - 8, self.ROW_HEIGHT), Qt.AlignVCenter | Qt.AlignLeft,
+                             f"{self.rooms[row].number} {self.rooms[row].category[:3]}")
+        painter.end()
+
+    def viewportEvent(self, event):
+        if event.type() == QEvent.ToolTip:
+            for rect, stay in self._visible:
+                if rect.contains(event.pos()):
+                    QToolTip.showText(event.globalPos(), f"#{stay.id} {stay.guest}\n{stay.status}: "
+                                      f"{day_date(stay.first)} to {day_date(stay.last)}", self)
+                    return True
+            QToolTip.hideText()
+            return True
+        return super().viewportEvent(event)
@@ -9,6 +9,7 @@ import os
 import logging
 from app.utils.message import MessageBox
 from app.views.add_order_dialog import AddOrderDialog
+from app.utils.money import format_money
 
 class TableManagementDialog(QDialog):
     def __init__(self, table_id, controller, parent=None):
@@ -42,7 +43,7 @@ class TableManagementDialog(QDialog):
         summary_layout.setContentsMargins(0, 10, 0, 10) # Add vertical padding to summary
         summary_layout.setSpacing(5)
         self.total_label = QLabel("Total: ₹0.00")
-        self.gst_label = QLabel("GST (5%): ₹0.00")
+        self.gst_label = QLabel(f"{self.controller.tax.label()}: ₹0.00")
         self.grand_total_label = QLabel("Grand Total: ₹0.00")
         
         # Make summary labels bold for emphasis
@@ -91,6 +92,7 @@ class TableManagementDialog(QDialog):
 
         self.layout.addLayout(self.button_layout)
 
+        self.grand_total = 0
         self.refresh_orders() # Re-enable refresh_orders
 
         # Connect signals
@@ -102,72 +104,58 @@ class TableManagementDialog(QDialog):
         self.btn_mark_available.clicked.connect(self.mark_table_available) # Connect Mark Available button
 
     def get_table_number(self, table_id):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT number FROM Tables WHERE id = ?", (table_id,))
-        result = cur.fetchone()
-        return result['number'] if result else "N/A"
+        number = self.controller.tables.number_of(table_id)
+        return number if number is not None else "N/A"
 
     def refresh_orders(self):
         logging.info(f"Starting refresh_orders for table_id: {self.table_id}")
         self.orders_table.setRowCount(0) # Clear existing rows
-        total_amount = 0.0
+        total_amount = 0
 
         # Fetch all active orders for the table
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, status FROM Orders WHERE table_id = ? AND status IN ('Pending', 'Preparing', 'Ready')", (self.table_id,))
-        orders = cur.fetchall()
+        orders = self.controller.orders.open_for_table(self.table_id)
         logging.info(f"Fetched {len(orders)} active orders for table_id {self.table_id}: {orders}")
 
         row_idx = 0
         if not orders:
             logging.info(f"No active orders found for table_id {self.table_id}.")
-        for order in orders:
+        for order_id in orders:
             # Fetch order items
-            cur.execute("""
-                SELECT od.qty, m.name, od.price
-                FROM OrderDetails od
-                JOIN MenuItems m ON od.item_id = m.id
-                WHERE od.order_id = ?
-            """, (order['id'],))
-            items = cur.fetchall()
-            logging.info(f"Order {order['id']} has {len(items)} items: {items}")
+            items = self.controller.orders.lines(order_id)
+            logging.info(f"Order {order_id} has {len(items)} items: {items}")
 
             if not items:
-                logging.warning(f"Order {order['id']} has no items. Skipping display for this order.")
+                logging.warning(f"Order {order_id} has no items. Skipping display for this order.")
                 continue
 
             for item in items:
-                item_subtotal = item['qty'] * item['price']
-                logging.info(f"  - Item: {item['name']}, Qty: {item['qty']}, Price: {item['price']:.2f}, Subtotal: {item_subtotal:.2f}")
+                item_subtotal = item.qty * item.price_paise
+                logging.info(f"  - Item: {item.name}, Qty: {item.qty}, Price: {format_money(item.price_paise, symbol=False)}, Subtotal: {format_money(item_subtotal, symbol=False)}")
                 self.orders_table.insertRow(row_idx)
-                self.orders_table.setItem(row_idx, 0, QTableWidgetItem(item['name']))
-                self.orders_table.setItem(row_idx, 1, QTableWidgetItem(str(item['qty'])))
-                self.orders_table.setItem(row_idx, 2, QTableWidgetItem(f"₹{item['price']:.2f}"))
-                self.orders_table.setItem(row_idx, 3, QTableWidgetItem(f"₹{item_subtotal:.2f}"))
+                self.orders_table.setItem(row_idx, 0, QTableWidgetItem(item.name))
+                self.orders_table.setItem(row_idx, 1, QTableWidgetItem(str(item.qty)))
+                self.orders_table.setItem(row_idx, 2, QTableWidgetItem(format_money(item.price_paise)))
+                self.orders_table.setItem(row_idx, 3, QTableWidgetItem(format_money(item_subtotal)))
                 total_amount += item_subtotal
                 row_idx += 1
         
         # Calculate GST and Grand Total
-        gst_rate = 0.05 # 5% GST
-        gst_amount = total_amount * gst_rate
-        grand_total = total_amount + gst_amount
+        gst_amount = self.controller.tax.tax(total_amount)
+        self.grand_total = total_amount + gst_amount
 
         # Update summary labels
-        self.total_label.setText(f"Total: ₹{total_amount:.2f}")
-        self.gst_label.setText(f"GST ({gst_rate*100:.0f}%): ₹{gst_amount:.2f}")
-        self.grand_total_label.setText(f"Grand Total: ₹{grand_total:.2f}")
+        self.total_label.setText(f"Total: {format_money(total_amount)}")
+        self.gst_label.setText(f"{self.controller.tax.label()}: {format_money(gst_amount)}")
+        self.grand_total_label.setText(f"Grand Total: {format_money(self.grand_total)}")
 
         self.orders_table.resizeColumnsToContents()
         self.orders_table.resizeRowsToContents()
-        logging.info(f"Finished refresh_orders for table_id: {self.table_id}. Total amount: {total_amount:.2f}")
+        logging.info(f"Finished refresh_orders for table_id: {self.table_id}. Total amount: {format_money(total_amount, symbol=False)}")
 
     def add_order(self):
         dialog = AddOrderDialog(self.table_id, self.controller, self)
         if dialog.exec():
             self.refresh_orders()
-            self.controller.hotel_view.refresh_tables()
 
     def edit_order(self):
         MessageBox.info(self, "Edit Order", "Editing individual order items is not yet implemented.")
@@ -176,15 +164,8 @@ class TableManagementDialog(QDialog):
         MessageBox.info(self, "Delete Order", "Deleting individual order items is not yet implemented.")
 
     def generate_bill(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-
         # Fetch all active orders for this table
-        cur.execute("""
-            SELECT id FROM Orders
-            WHERE table_id = ? AND status NOT IN ('Completed', 'Billed')
-        """, (self.table_id,))
-        active_order_ids = [row['id'] for row in cur.fetchall()]
+        active_order_ids = self.controller.orders.open_for_table(self.table_id)
 
         if not active_order_ids:
             MessageBox.info(self, "Generate Bill", "No active orders to bill for this table.")
@@ -192,46 +173,34 @@ class TableManagementDialog(QDialog):
 
         total_bill = 0
         bill_details = []
+        order_items = {}
 
         for order_id in active_order_ids:
-            cur.execute("""
-                SELECT od.qty, m.name, od.price
-                FROM OrderDetails od
-                JOIN MenuItems m ON od.item_id = m.id
-                WHERE od.order_id = ?
-            """, (order_id,))
-            items = cur.fetchall()
+            items = order_items[order_id] = self.controller.orders.lines(order_id)
             
             order_total = 0
             order_items_details = []
             for item in items:
-                item_cost = item['qty'] * item['price']
+                item_cost = item.qty * item.price_paise
                 order_total += item_cost
-                order_items_details.append(f"{item['qty']}x {item['name']} (@₹{item['price']:.2f} each) = ₹{item_cost:.2f}")
+                order_items_details.append(f"{item.qty}x {item.name} (@{format_money(item.price_paise)} each) = {format_money(item_cost)}")
             
             total_bill += order_total
-            bill_details.append(f"Order ID: {order_id} (Total: ₹{order_total:.2f})\n  " + "\n  ".join(order_items_details))
+            bill_details.append(f"Order ID: {order_id} (Total: {format_money(order_total)})\n  " + "\n  ".join(order_items_details))
 
         detailed_bill_text = "\n\n".join(bill_details)
         
         if MessageBox.confirm(self, "Confirm Bill Generation", 
-                              f"Total Bill for Table {self.get_table_number(self.table_id)}: ₹{total_bill:.2f}\n\n"
-                              f"Do you want to finalize this bill and mark orders as completed?",
+                              f"Total Bill for Table {self.get_table_number(self.table_id)}: {format_money(total_bill)}\n\n"
+                              f"Do you want to finalize this bill and mark orders as served?",
                               detailed_text=detailed_bill_text):
             try:
-                # Update orders status to 'Completed'
-                for order_id in active_order_ids:
-                    cur.execute("UPDATE Orders SET status = 'Completed' WHERE id = ?", (order_id,))
-                
-                # Update table status to 'Cleaning'
-                cur.execute("UPDATE Tables SET status = 'Cleaning' WHERE id = ?", (self.table_id,))
-                
-                conn.commit()
+                # Billed orders stay on the table as Served until paid; the table goes to 'Cleaning'
+                self.controller.orders.close_table(self.table_id, "Served", "Cleaning")
                 MessageBox.success(self, "Bill Generated", 
-                                    f"Bill for Table {self.get_table_number(self.table_id)} (₹{total_bill:.2f}) has been finalized.\n"
-                                    "Table status set to 'Cleaning' and orders marked as 'Completed'.")
+                                    f"Bill for Table {self.get_table_number(self.table_id)} ({format_money(total_bill)}) has been finalized.\n"
+                                    "Table status set to 'Cleaning' and orders marked as 'Served'.")
                 self.refresh_orders()
-                self.controller.hotel_view.refresh_tables() # Refresh tables in main view
 
                 # Generate PDF bill
                 html = "<h2>Restaurant Bill</h2>"
@@ -239,24 +208,15 @@ class TableManagementDialog(QDialog):
                 html += "<table border='1' cellspacing='0' cellpadding='4'><tr><th>Item</th><th>Qty</th><th>Price</th><th>Total</th></tr>"
                 
                 for order_id in active_order_ids:
-                    cur.execute("""
-                        SELECT od.qty, m.name, od.price
-                        FROM OrderDetails od
-                        JOIN MenuItems m ON od.item_id = m.id
-                        WHERE od.order_id = ?
-                    """, (order_id,))
-                    items = cur.fetchall()
-                    
-                    for item in items:
-                        item_cost = item['qty'] * item['price']
-                        html += f"<tr><td>{item['name']}</td><td>{item['qty']}</td><td>₹{item['price']:.2f}</td><td>₹{item_cost:.2f}</td></tr>"
+                    for item in order_items[order_id]:
+                        item_cost = item.qty * item.price_paise
+                        html += f"<tr><td>{item.name}</td><td>{item.qty}</td><td>{format_money(item.price_paise)}</td><td>{format_money(item_cost)}</td></tr>"
                 
-                gst_rate_pdf = 0.05 # 5% GST for PDF
-                gst_pdf = round(total_bill * gst_rate_pdf, 2)
+                gst_pdf = self.controller.tax.tax(total_bill)
                 total_with_gst_pdf = total_bill + gst_pdf
 
                 html += "</table>"
-                html += f"<p>Subtotal: ₹{total_bill:.2f}</p><p>GST ({gst_rate_pdf*100:.0f}%): ₹{gst_pdf:.2f}</p><h3>Total: ₹{total_with_gst_pdf:.2f}</h3>"
+                html += f"<p>Subtotal: {format_money(total_bill)}</p><p>{self.controller.tax.label()}: {format_money(gst_pdf)}</p><h3>Total: {format_money(total_with_gst_pdf)}</h3>"
                 
                 doc = QTextDocument()
                 doc.setHtml(html)
@@ -267,72 +227,48 @@ class TableManagementDialog(QDialog):
                 doc.print(printer)
                 MessageBox.info(self, "Bill PDF Generated", f"Bill saved as {os.path.basename(pdf_path)}")
             except Exception as e:
-                conn.rollback()
                 MessageBox.error(self, "Billing Error", f"Failed to finalize bill: {e}")
 
     def process_payment(self):
-        grand_total_text = self.grand_total_label.text()
-        # Extract the numerical value from "Grand Total: ₹X.XX"
-        try:
-            grand_total = float(grand_total_text.split('₹')[1])
-        except (IndexError, ValueError):
-            MessageBox.warning(self, "Payment Error", "Could not determine grand total for payment.")
-            return
-
+        grand_total = self.grand_total
         if grand_total <= 0:
             MessageBox.information(self, "Payment", "No outstanding amount to pay.")
             return
 
-        payment_dialog = PaymentDialog(self, total_amount=grand_total)
+        payment_dialog = PaymentDialog(self, total_paise=grand_total)
         if payment_dialog.exec() == QDialog.Accepted:
             payment_method = payment_dialog.payment_method
             MessageBox.information(self, "Payment Successful",
-                                   f"Payment of ₹{grand_total:.2f} received via {payment_method}. Table {self.table_number} is now available.")
-            self.update_table_status_to_available()
+                                   f"Payment of {format_money(grand_total)} received via {payment_method}. Table {self.get_table_number(self.table_id)} is now available.")
+            self.update_table_status_to_available(payment_method)
             self.accept() # Close the dialog after successful payment
         else:
             MessageBox.information(self, "Payment Cancelled", "Payment process was cancelled.")
 
-    def update_table_status_to_available(self):
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
+    def update_table_status_to_available(self, payment_method="Cash"):
         try:
-            # Update table status to 'Available'
-            cur.execute("UPDATE Tables SET status = ? WHERE id = ?", ("Available", self.table_id))
-            # Update all orders associated with this table to 'Completed'
-            cur.execute("UPDATE Orders SET status = ? WHERE table_id = ?", ("Completed", self.table_id))
-            conn.commit()
-            logging.info(f"Table {self.table_id} status updated to 'Available' and all orders marked 'Completed'.")
-            self.controller.hotel_view.refresh_tables() # Notify hotel_view to refresh
+            # Record the payments, mark the table's open orders 'Paid' and the table 'Available'
+            self.controller.orders.close_table(self.table_id, "Paid", "Available", payment_method,
+                                               self.controller.tax.rate())
+            logging.info(f"Table {self.table_id} status updated to 'Available' and all orders marked 'Paid'.")
         except Exception as e:
-            conn.rollback()
             logging.error(f"Failed to update table status or orders for table {self.table_id}: {e}")
             MessageBox.error(self, "Database Error", f"Failed to update table status after payment: {e}")
-        # Removed  to prevent premature closing of the database connection
 
     def mark_table_available(self):
         logging.info(f"mark_table_available called for table_id: {self.table_id}")
         if MessageBox.confirm(self, "Confirm Action", 
                               f"Are you sure you want to mark Table {self.get_table_number(self.table_id)} as 'Available' and clear all its active orders?"):
             logging.info(f"User confirmed marking table {self.table_id} as available.")
-            conn = self.controller.db.connect()
-            cur = conn.cursor()
             try:
-                # Update table status to 'Available'
-                logging.info(f"Attempting to update Tables status to 'Available' for table_id: {self.table_id}")
-                cur.execute("UPDATE Tables SET status = ? WHERE id = ?", ("Available", self.table_id))
-                # Update all active orders associated with this table to 'Completed'
-                logging.info(f"Attempting to update active Orders status to 'Completed' for table_id: {self.table_id}")
-                cur.execute("UPDATE Orders SET status = ? WHERE table_id = ? AND status NOT IN ('Completed', 'Billed')", ("Completed", self.table_id))
-                conn.commit()
-                logging.info(f"Table {self.table_id} status updated to 'Available' and active orders marked 'Completed' by manual action.")
+                # Cancel the table's active orders and set it 'Available'
+                logging.info(f"Attempting to cancel active Orders and free table_id: {self.table_id}")
+                self.controller.orders.close_table(self.table_id, "Cancelled", "Available")
+                logging.info(f"Table {self.table_id} status updated to 'Available' and active orders marked 'Cancelled' by manual action.")
                 MessageBox.success(self, "Table Status Updated", f"Table {self.get_table_number(self.table_id)} is now 'Available'.")
-                self.controller.hotel_view.refresh_tables() # Notify hotel_view to refresh
                 self.accept() # Close the dialog
             except Exception as e:
-                conn.rollback()
                 logging.error(f"Failed to manually update table status or orders for table {self.table_id}: {e}", exc_info=True)
                 MessageBox.error(self, "Database Error", f"Failed to mark table available: {e}")
-            # Removed conn.close() to prevent premature closing of the database connection
         else:
             logging.info(f"User cancelled marking table {self.table_id} as available.")
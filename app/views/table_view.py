@@ -44,20 +44,17 @@ class TableView(QWidget):
                 widget.deleteLater() # Schedule for deletion
             del item # Delete the layout item
 
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id, number, status FROM Tables ORDER BY number")
-        tables = cur.fetchall()
+        tables = self.controller.tables.all()
         logging.debug(f"Fetched {len(tables)} tables from the database.")
 
         row = 0
         col = 0
         for table in tables:
-            logging.debug(f"Processing Table: ID={table['id']}, Number={table['number']}, Status={table['status']}")
-            btn = QPushButton(f"Table {table['number']}\n({table['status']})")
+            logging.debug(f"Processing Table: ID={table.id}, Number={table.number}, Status={table.status}")
+            btn = QPushButton(f"Table {table.number}\n({table.status})")
             btn.setFixedSize(120, 100) # Slightly larger buttons
             btn.setObjectName("TableButton") # For QSS styling
-            if table['status'] == 'Available':
+            if table.status == 'Available':
                 btn.setStyleSheet("""
                     QPushButton#TableButton {
                         background-color: #66BB6A; /* Light Green */
@@ -70,7 +67,7 @@ class TableView(QWidget):
                         background-color: #81C784; /* Lighter Green on hover */
                     }
                 """)
-            elif table['status'] == 'Occupied':
+            elif table.status == 'Occupied':
                 btn.setStyleSheet("""
                     QPushButton#TableButton {
                         background-color: #FFA726; /* Orange */
@@ -83,7 +80,7 @@ class TableView(QWidget):
                         background-color: #FFB74D; /* Lighter Orange on hover */
                     }
                 """)
-            elif table['status'] == 'Cleaning':
+            elif table.status == 'Cleaning':
                 btn.setStyleSheet("""
                     QPushButton#TableButton {
                         background-color: #78909C; /* Blue Grey */
@@ -109,8 +106,8 @@ class TableView(QWidget):
                         background-color: #64B5F6; /* Lighter Blue on hover */
                     }
                 """)
-            btn.clicked.connect(lambda checked, t=table: self.open_table_management(t['id']))
-            logging.info(f"Connected click signal for Table {table['number']} (ID: {table['id']}, Status: {table['status']})")
+            btn.clicked.connect(lambda checked, t=table: self.open_table_management(t.id))
+            logging.info(f"Connected click signal for Table {table.number} (ID: {table.id}, Status: {table.status})")
             self.tables_grid.addWidget(btn, row, col)
             col += 1
             if col > 4: # Max 5 tables per row
@@ -129,17 +126,9 @@ class TableView(QWidget):
 
     def add_new_table(self):
         logging.debug("Add New Table button clicked.")
-        conn = self.controller.db.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT MAX(number) FROM Tables")
-        max_table_number = cur.fetchone()[0]
-        next_table_number = (max_table_number or 0) + 1
-
         try:
-            cur.execute("INSERT INTO Tables (number, status) VALUES (?, ?)", (next_table_number, "Available"))
-            conn.commit()
+            next_table_number = self.controller.tables.add_next()
             MessageBox.success(self, "Table Added", f"Table {next_table_number} added successfully!")
             self.refresh_tables()
         except Exception as e:
-            conn.rollback()
             MessageBox.critical(self, "Error", f"Failed to add new table: {e}")